@@ -8,131 +8,109 @@ Reads results/tables/scoring_matrix.csv and reports:
 - Most common failure mode per step
 
 Usage:
-    python scripts/aggregate_scores.py [--markdown]
+    python scripts/aggregate_scores.py [--markdown] [--stream [--chunksize N] | --incremental]
+                                       [--ci [--resamples N] [--level P] [--seed N]]
+                                       [--profile] [--profile-json PATH] [--profile-stats PATH]
 
 Options:
     --markdown    Output results as a markdown file to evaluations/summary_generated.md
+    --stream      Aggregate the matrix in chunks with bounded memory (single pass)
+    --chunksize   Rows per chunk in --stream mode (default: 100000)
+    --incremental Recompute only (family, version, step) groups whose rows changed
+                  since the last --incremental run
+    --ci          Add a bootstrap confidence interval column to the step ranking
+    --resamples, --level, --seed
+                  Bootstrap resamples (default: 2000), confidence level
+                  (default: 0.95) and seed (default: 0) for --ci
+    --profile     Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                  Also write the breakdown as JSON / cProfile stats to PATH
 """
 
 import argparse
 import sys
-from collections import Counter
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
-SCORE_MAP = {
-    "tool_selection": {"C": 1.0, "A": 0.5, "I": 0.0},
-    "parameter_accuracy": {"C": 1.0, "P": 0.5, "I": 0.0},
-    "output_compatibility": {"P": 1.0, "F": 0.0},
-    "scientific_validity": {"S": 1.0, "Q": 0.5, "I": 0.0},
-    "executability": {"R": 1.0, "M": 0.5, "N": 0.0},
-}
-
-FULLY_CORRECT = {
-    "tool_selection": "C",
-    "parameter_accuracy": "C",
-    "output_compatibility": "P",
-    "scientific_validity": "S",
-    "executability": "R",
-}
-
-DIMENSIONS = list(SCORE_MAP.keys())
-
-
-def load_scores(csv_path: str) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
-    # Strip whitespace from score columns
-    for dim in DIMENSIONS:
-        df[dim] = df[dim].astype(str).str.strip().replace("nan", "")
-    return df
-
-
-def is_step_correct(row: pd.Series) -> bool:
-    """Check if a single step has all-correct scores."""
-    for dim, expected in FULLY_CORRECT.items():
-        val = row.get(dim, "")
-        if val.upper() != expected:
-            return False
-    return True
-
-
-def has_all_scores(row: pd.Series) -> bool:
-    """Check if all dimensions have been scored."""
-    for dim in DIMENSIONS:
-        val = row.get(dim, "")
-        if val == "" or val == "nan":
-            return False
-    return True
-
-
-def first_fully_correct(df):
+from scoring import (
+    DIMENSIONS,
+    EncodedScores,
+    ScoreCube,
+    encode_scores,
+    failure_counts,
+    group_mean,
+    incremental_reports,
+    load_cube,
+    load_scores,
+    row_composites,
+    stream_scores,
+)
+from scoring.bootstrap import add_bootstrap_arguments, bootstrap_composites
+from scoring.instrument import add_profile_arguments, profiled, record_output, stage
+
+
+def _encoded(scores) -> EncodedScores:
+    """Accept a loaded DataFrame, a ScoreCube or already-encoded scores."""
+    if isinstance(scores, EncodedScores):
+        return scores
+    if isinstance(scores, ScoreCube):
+        return scores.encoded
+    return encode_scores(scores)
+
+
+def first_fully_correct(scores):
     """Find the first model version per family that got all steps correct."""
+    enc = _encoded(scores)
+    row_ok = enc.scored.all(axis=1) & enc.correct.all(axis=1)
+    failing = np.bincount(enc.model_index, weights=~row_ok, minlength=len(enc.models))
+
     results = {}
-    for family in df["model_family"].unique():
-        family_df = df[df["model_family"] == family]
-        versions = family_df["model_version"].unique()
-        results[family] = None
-        for version in versions:
-            version_df = family_df[family_df["model_version"] == version]
-            if len(version_df) == 0:
-                continue
-            # All steps must have scores and all must be correct
-            all_scored = all(has_all_scores(row) for _, row in version_df.iterrows())
-            if not all_scored:
-                continue
-            all_correct = all(is_step_correct(row) for _, row in version_df.iterrows())
-            if all_correct:
-                results[family] = version
-                break
+    for (family, version), n_failing in zip(enc.models, failing):
+        results.setdefault(family, None)
+        if results[family] is None and n_failing == 0:
+            results[family] = version
     return results
 
 
-def hardest_step(df):
+def hardest_step(scores):
     """Rank steps by average composite score (lowest = hardest)."""
-    step_scores = []
-    for step_num in sorted(df["step_number"].unique()):
-        step_df = df[df["step_number"] == step_num]
-        scores = []
-        for _, row in step_df.iterrows():
-            if not has_all_scores(row):
-                continue
-            vals = []
-            for dim in DIMENSIONS:
-                val = row[dim].upper()
-                mapped = SCORE_MAP[dim].get(val)
-                if mapped is not None:
-                    vals.append(mapped)
-            if vals:
-                scores.append(sum(vals) / len(vals))
-        avg = sum(scores) / len(scores) if scores else float("nan")
-        step_name = step_df["step_name"].iloc[0] if len(step_df) > 0 else "unknown"
-        step_scores.append((step_num, step_name, avg))
+    enc = _encoded(scores)
+    composite = row_composites(enc)
+    usable = ~np.isnan(composite)
+    avgs = group_mean(enc.step_index[usable], composite[usable], len(enc.steps))
+    step_scores = [(step_num, step_name, float(avg))
+                   for step_num, step_name, avg in zip(enc.steps, enc.step_names, avgs)]
     return sorted(step_scores, key=lambda x: x[2])
 
 
-def common_failures_per_step(df):
+def common_failures_per_step(scores):
     """Find the most common non-correct score per dimension per step."""
-    results = {}
-    for step_num in sorted(df["step_number"].unique()):
-        step_df = df[df["step_number"] == step_num]
-        step_failures = {}
-        for dim in DIMENSIONS:
-            correct_val = FULLY_CORRECT[dim]
-            failures = []
-            for _, row in step_df.iterrows():
-                val = row[dim].upper()
-                if val and val != correct_val and val != "NAN":
-                    failures.append(val)
-            if failures:
-                most_common = Counter(failures).most_common(1)[0]
-                step_failures[dim] = f"{most_common[0]} ({most_common[1]}×)"
-        results[step_num] = step_failures
+    enc = _encoded(scores)
+    results = {step_num: {} for step_num in enc.steps}
+    for j, dim in enumerate(DIMENSIONS):
+        counts, first_seen = failure_counts(enc, j)
+        # Highest count wins; ties go to the code seen first within the step
+        ranking = counts * (enc.n_rows + 1) - first_seen
+        best = ranking.argmax(axis=1)
+        for s, step_num in enumerate(enc.steps):
+            n = counts[s, best[s]]
+            if n > 0:
+                results[step_num][dim] = f"{enc.alphabets[j][best[s]]} ({n}×)"
     return results
 
 
+def step_intervals(cube: ScoreCube, cis) -> dict:
+    """{step_number: (low, high)} from ``scoring.bootstrap`` CIs."""
+    return {step_num: (float(low), float(high))
+            for step_num, low, high in zip(cube.steps, cis.step.low, cis.step.high)}
+
+
 def format_output(first_correct: dict, steps_ranked: list, failures: dict,
-                  as_markdown: bool = False) -> str:
+                  as_markdown: bool = False, intervals: dict = None,
+                  level: float = 0.95) -> str:
+    """Format the three reports; ``intervals`` adds a CI column to the ranking."""
     lines = []
 
     if as_markdown:
@@ -147,11 +125,19 @@ def format_output(first_correct: dict, steps_ranked: list, failures: dict,
 
     # Section 2: Hardest step
     lines.append("\n## Steps Ranked by Difficulty (lowest average score first)\n")
-    lines.append("| Rank | Step | Avg Score |")
-    lines.append("|:-----|:-----|:----------|")
+    if intervals is None:
+        lines.append("| Rank | Step | Avg Score |")
+        lines.append("|:-----|:-----|:----------|")
+    else:
+        lines.append(f"| Rank | Step | Avg Score | {level:.0%} CI |")
+        lines.append("|:-----|:-----|:----------|:-------|")
     for rank, (step_num, step_name, avg) in enumerate(steps_ranked, 1):
         score_str = f"{avg:.2f}" if not pd.isna(avg) else "no data"
-        lines.append(f"| {rank} | {step_num}. {step_name} | {score_str} |")
+        row = f"| {rank} | {step_num}. {step_name} | {score_str} |"
+        if intervals is not None:
+            low, high = intervals.get(step_num, (np.nan, np.nan))
+            row += f" {low:.2f}–{high:.2f} |" if not np.isnan(low) else " — |"
+        lines.append(row)
 
     # Section 3: Common failures
     lines.append("\n## Most Common Failure Mode per Step\n")
@@ -166,12 +152,39 @@ def format_output(first_correct: dict, steps_ranked: list, failures: dict,
     return "\n".join(lines)
 
 
+def summarize(scores, as_markdown: bool = False) -> str:
+    """Run all three reports over ``scores`` and format them."""
+    enc = _encoded(scores)
+    return format_output(first_fully_correct(enc), hardest_step(enc),
+                         common_failures_per_step(enc), as_markdown=as_markdown)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Aggregate LLM evaluation scores.")
     parser.add_argument("--markdown", action="store_true",
                         help="Output as markdown file")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--stream", action="store_true",
+                      help="Aggregate in chunks with bounded memory")
+    mode.add_argument("--incremental", action="store_true",
+                      help="Reuse cached partials for unchanged groups")
+    parser.add_argument("--chunksize", type=int, default=100_000,
+                        help="Rows per chunk in --stream mode")
+    add_bootstrap_arguments(parser)
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    if args.ci and (args.stream or args.incremental):
+        parser.error("--ci needs the full matrix; it cannot be combined with --stream "
+                     "or --incremental")
+    if args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+
+    with profiled(args):
+        run(args)
+
 
+def run(args):
+    """Load the matrix in the mode ``args`` selects and print or write the reports."""
     repo_root = Path(__file__).resolve().parent.parent
     csv_path = repo_root / "results" / "tables" / "scoring_matrix.csv"
 
@@ -179,29 +192,54 @@ def main():
         print(f"Error: {csv_path} not found.")
         sys.exit(1)
 
-    df = load_scores(str(csv_path))
+    if args.stream:
+        with stage("stream"):
+            acc = stream_scores(csv_path, chunksize=args.chunksize)
+        has_data = acc.any_scored
+    elif args.incremental:
+        df = load_scores(csv_path)
+        with stage("incremental"):
+            *reports, has_data, (recomputed, total) = incremental_reports(csv_path, df)
+        print(f"Recomputed {recomputed} of {total} groups", file=sys.stderr)
+    else:
+        cube = load_cube(csv_path)
+        enc = cube.encoded
+        has_data = enc.scored.any()
 
     # Check if any scores exist
-    has_data = False
-    for dim in DIMENSIONS:
-        if any(v != "" and v != "nan" for v in df[dim]):
-            has_data = True
-            break
-
     if not has_data:
         print("No scores have been entered yet. Fill in scoring_matrix.csv and re-run.")
         sys.exit(0)
 
-    first_correct = first_fully_correct(df)
-    steps_ranked = hardest_step(df)
-    failures = common_failures_per_step(df)
-
-    output = format_output(first_correct, steps_ranked, failures, as_markdown=args.markdown)
+    if args.stream:
+        first_correct = acc.first_fully_correct()
+        steps_ranked = acc.hardest_step()
+        failures = acc.common_failures_per_step()
+    elif args.incremental:
+        first_correct, steps_ranked, failures = reports
+    else:
+        with stage("first_fully_correct"):
+            first_correct = first_fully_correct(enc)
+        with stage("hardest_step"):
+            steps_ranked = hardest_step(enc)
+        with stage("common_failures_per_step"):
+            failures = common_failures_per_step(enc)
+
+    intervals = None
+    if args.ci:
+        cis = bootstrap_composites(cube, args.resamples, args.level, args.seed)
+        intervals = step_intervals(cube, cis)
+
+    with stage("format"):
+        output = format_output(first_correct, steps_ranked, failures, as_markdown=args.markdown,
+                               intervals=intervals, level=args.level)
     print(output)
 
     if args.markdown:
         md_path = repo_root / "evaluations" / "summary_generated.md"
-        md_path.write_text(output)
+        with stage("write markdown"):
+            md_path.write_text(output)
+        record_output(md_path)
         print(f"\nMarkdown summary written to {md_path}")
 
 
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Benchmark the analysis scripts on synthetic scoring matrices.
+
+For every requested size a seeded synthetic matrix (see scoring.synthetic)
+is written to a temporary CSV, and each stage is timed:
+- load_scores (plain parse, cold binary cache, warm binary cache), validate_scores
+- first_fully_correct, hardest_step, common_failures_per_step
+- load_and_score, build_matrix
+- plot_heatmap, plot_family_radars, plot_step_difficulty, plot_version_timeline
+
+Each benchmark reports the best and median of --repeat timed runs plus
+the peak traced memory (tracemalloc) of one extra run. Results are
+written as JSON together with the commit and library versions, so runs
+can be compared across commits with --compare.
+
+Usage:
+    python scripts/benchmark.py [--sizes 1e3,1e4,1e5] [--repeat N] [--seed N]
+                                [--models N] [--only NAME,...] [--output PATH]
+                                [--compare PATH]
+
+Options:
+    --sizes     Comma-separated row counts (default: 1e3,1e4,1e5,1e6)
+    --repeat    Timed runs per benchmark (default: 3)
+    --seed      Seed for the synthetic matrix (default: 0)
+    --models    Number of models in the synthetic matrix (default: 21)
+    --only      Run only benchmarks whose name contains one of these strings
+    --output    Where to write the JSON results
+                (default: results/benchmarks/benchmark_<commit>.json)
+    --compare   Earlier results file to print speed-ups against
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import aggregate_scores  # noqa: E402
+import generate_heatmap  # noqa: E402
+import generate_radar  # noqa: E402
+from scoring import ScoreCube, load_cube, load_scores  # noqa: E402
+from scoring.cache import cache_dir_for  # noqa: E402
+from scoring.synthetic import write_synthetic_csv  # noqa: E402
+from scoring.validate import validate_scores  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = REPO_ROOT / "results" / "benchmarks"
+DEFAULT_SIZES = [10**3, 10**4, 10**5, 10**6]
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def environment() -> dict:
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def clear_cache(csv_path: Path):
+    cache = cache_dir_for(csv_path)
+    if cache.exists():
+        for path in cache.iterdir():
+            path.unlink()
+
+
+def measure(func, setup=None, repeat: int = 3) -> dict:
+    """Time ``func(*setup())`` ``repeat`` times, then trace one run's peak memory.
+
+    Anything the benchmarked function prints is discarded.
+    """
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    times = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        gc.collect()
+        with quiet:
+            start = time.perf_counter()
+            func(*args)
+        times.append(time.perf_counter() - start)
+
+    args = setup() if setup else ()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with quiet:
+            func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "best_s": min(times),
+        "median_s": statistics.median(times),
+        "runs_s": times,
+        "peak_bytes": peak,
+    }
+
+
+def benchmarks(csv_path: Path, out_dir: Path) -> dict:
+    """{name: (func, setup)} for the matrix at ``csv_path``."""
+    df = load_scores(csv_path)
+
+    def fresh_cube():
+        return (ScoreCube(df),)
+
+    def warm_cube():
+        cube = ScoreCube(df)
+        for view in ("model_step_matrix", "step_composites", "model_composites",
+                     "family_dimension_means"):
+            getattr(cube, view)
+        return (cube,)
+
+    def heatmap_matrix():
+        return generate_heatmap.build_matrix(warm_cube()[0])
+
+    def uncached():
+        clear_cache(csv_path)
+        return ()
+
+    def load_and_score():
+        load_cube.cache_clear()
+        generate_radar.load_and_score(csv_path)
+
+    return {
+        "load_scores[parse]": (lambda: load_scores(csv_path, use_cache=False), None),
+        "load_scores[cold cache]": (lambda: load_scores(csv_path), uncached),
+        "load_scores[warm cache]": (lambda: load_scores(csv_path), None),
+        "validate_scores": (lambda: validate_scores(df, known_models=None,
+                                                    allow_replicates=True), None),
+        "first_fully_correct": (aggregate_scores.first_fully_correct, lambda: (df,)),
+        "hardest_step": (aggregate_scores.hardest_step, lambda: (df,)),
+        "common_failures_per_step": (aggregate_scores.common_failures_per_step,
+                                     lambda: (df,)),
+        "load_and_score": (load_and_score, None),
+        "build_matrix": (generate_heatmap.build_matrix, fresh_cube),
+        "plot_heatmap": (lambda m, y, x: generate_heatmap.plot_heatmap(
+            m, y, x, str(out_dir / "heatmap.png")), heatmap_matrix),
+        "plot_family_radars": (lambda cube: generate_radar.plot_family_radars(
+            cube, str(out_dir / "radar.png")), warm_cube),
+        "plot_step_difficulty": (lambda cube: generate_radar.plot_step_difficulty(
+            cube, str(out_dir / "steps.png")), warm_cube),
+        "plot_version_timeline": (lambda cube: generate_radar.plot_version_timeline(
+            cube, str(out_dir / "timeline.png")), warm_cube),
+    }
+
+
+def run_size(n_rows: int, args, work_dir: Path) -> dict:
+    csv_path = work_dir / f"synthetic_{n_rows}.csv"
+    start = time.perf_counter()
+    write_synthetic_csv(csv_path, n_rows, seed=args.seed, n_models=args.models)
+    generate_seconds = time.perf_counter() - start
+    print(f"\n== {n_rows:,} rows ({csv_path.stat().st_size / 1e6:.1f} MB, "
+          f"generated in {generate_seconds:.2f}s)")
+
+    results = {}
+    for name, (func, setup) in benchmarks(csv_path, work_dir).items():
+        if args.only and not any(part in name for part in args.only):
+            continue
+        result = measure(func, setup, repeat=args.repeat)
+        results[name] = result
+        print(f"  {name:<28} {result['best_s']:>9.4f}s  "
+              f"{result['peak_bytes'] / 2**20:>9.1f} MiB")
+
+    csv_bytes = csv_path.stat().st_size
+    csv_path.unlink()
+    clear_cache(csv_path)
+    return {
+        "rows": n_rows,
+        "csv_bytes": csv_bytes,
+        "generate_s": generate_seconds,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "benchmarks": results,
+    }
+
+
+def compare(current: dict, baseline: dict):
+    """Print best-time ratios of ``current`` against ``baseline``."""
+    before = {(run["rows"], name): bench["best_s"]
+              for run in baseline["runs"] for name, bench in run["benchmarks"].items()}
+    print(f"\nCompared with {baseline['environment']['commit']} (speed-up = before / now)")
+    print(f"{'Rows':>10}  {'Benchmark':<28} {'Before':>9} {'Now':>9} {'Speed-up':>9}")
+    for run in current["runs"]:
+        for name, bench in run["benchmarks"].items():
+            old = before.get((run["rows"], name))
+            if old is None:
+                continue
+            print(f"{run['rows']:>10,}  {name:<28} {old:>8.4f}s {bench['best_s']:>8.4f}s "
+                  f"{old / bench['best_s']:>8.2f}x")
+
+
+def parse_sizes(text: str) -> list:
+    return [int(float(part)) for part in text.split(",") if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis scripts.")
+    parser.add_argument("--sizes", type=parse_sizes, default=DEFAULT_SIZES,
+                        help="Comma-separated row counts, e.g. 1e3,1e5,1e7")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic matrix")
+    parser.add_argument("--models", type=int, default=21,
+                        help="Number of models in the synthetic matrix")
+    parser.add_argument("--only", type=lambda s: s.split(","), default=None,
+                        help="Run only benchmarks whose name contains one of these strings")
+    parser.add_argument("--output", type=Path, default=None, help="JSON results path")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        try:
+            baseline = json.loads(args.compare.read_text())
+        except (OSError, ValueError) as exc:
+            print(f"Error: cannot read {args.compare}: {exc}")
+            sys.exit(1)
+
+    report = {
+        "environment": environment(),
+        "settings": {"sizes": args.sizes, "repeat": args.repeat, "seed": args.seed,
+                     "models": args.models, "only": args.only},
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="scoring-bench-") as tmp:
+        for n_rows in args.sizes:
+            report["runs"].append(run_size(n_rows, args, Path(tmp)))
+
+    output = args.output or RESULTS_DIR / f"benchmark_{report['environment']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+
+    if baseline:
+        compare(report, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Build every figure and the generated summary in one run.
+
+Loads and scores results/tables/scoring_matrix.csv once, then renders
+each artifact on a process pool (matplotlib Agg backend):
+- results/figures/scoring_heatmap.png
+- results/figures/family_radar.png
+- results/figures/step_difficulty.png
+- results/figures/version_timeline.png
+- evaluations/summary_generated.md
+- the "Error compounding" section of evaluations/summary.md
+- the evaluations/by_model and evaluations/by_step pages (see generate_pages.py)
+
+With --shards, the per-rater shards are first merged into the matrix
+(see merge_shards.py). The matrix is validated first (see scoring.validate); if any row breaks
+the schema, the problems are listed and nothing is built.
+
+Figures whose slice of the score cube is unchanged since the last build
+are skipped (see scoring.depends); the summary is only rewritten when its
+text changes.
+
+Usage:
+    python scripts/build.py [--jobs N] [--force] [--no-validate] [--allow-replicates]
+                            [--any-model] [--shards [DIR]] [--policy POLICY]
+
+Options:
+    --jobs         Number of worker processes (default: one per artifact, capped at CPU count)
+    --force        Rebuild every artifact even if it is up to date
+    --no-validate  Build even if the matrix fails validation
+    --allow-replicates
+                   Accept several rows per (model, step), e.g. replicate conversations
+    --any-model    Do not check models against scoring.engine.KNOWN_MODELS
+    --shards       Merge the shards in DIR (default: results/tables/shards) into
+                   scoring_matrix.csv before building
+    --policy       Conflict policy for --shards (default: error; see merge_shards.py)
+
+Exits non-zero if the shard merge or validation fails, or any artifact fails to build.
+"""
+
+import argparse
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import aggregate_scores  # noqa: E402
+import error_compounding  # noqa: E402
+import generate_heatmap  # noqa: E402
+import generate_pages  # noqa: E402
+import generate_radar  # noqa: E402
+import merge_shards  # noqa: E402
+from scoring import ScoreCube, load_cube  # noqa: E402
+from scoring.shards import POLICIES  # noqa: E402
+from scoring.validate import (  # noqa: E402
+    add_validation_arguments,
+    validate_scores,
+    validation_options,
+)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CSV_PATH = REPO_ROOT / "results" / "tables" / "scoring_matrix.csv"
+FIGURES = REPO_ROOT / "results" / "figures"
+SUMMARY_PATH = REPO_ROOT / "evaluations" / "summary_generated.md"
+EVALUATION_SUMMARY = REPO_ROOT / "evaluations" / "summary.md"
+
+MAX_ISSUES = 50
+
+# Set in each worker by _init_worker
+_CUBE = None
+
+
+def write_summary(cube: ScoreCube, output_path: Path, force: bool = False) -> bool:
+    text = aggregate_scores.summarize(cube, as_markdown=True)
+    if not force and output_path.exists() and output_path.read_text() == text:
+        print(f"Up to date: {output_path}")
+        return False
+    output_path.write_text(text)
+    print(f"Markdown summary written to {output_path}")
+    return True
+
+
+ARTIFACTS = {
+    "scoring_heatmap.png": (generate_heatmap.render, FIGURES / "scoring_heatmap.png"),
+    "family_radar.png": (generate_radar.render_family_radar, FIGURES / "family_radar.png"),
+    "step_difficulty.png": (generate_radar.render_step_difficulty,
+                            FIGURES / "step_difficulty.png"),
+    "version_timeline.png": (generate_radar.render_version_timeline,
+                             FIGURES / "version_timeline.png"),
+    "summary_generated.md": (write_summary, SUMMARY_PATH),
+    "summary.md": (error_compounding.update_summary, EVALUATION_SUMMARY),
+    "by_model/": (generate_pages.render_model_pages, generate_pages.BY_MODEL),
+    "by_step/": (generate_pages.render_step_pages, generate_pages.BY_STEP),
+}
+
+
+def warm_views(cube: ScoreCube) -> ScoreCube:
+    """Compute every cached view so workers receive them ready-made."""
+    for view in ("values", "missing", "row_composite", "model_step_matrix",
+                 "step_composites", "model_composites", "family_dimension_means",
+                 "model_position", "rows_by_model", "rows_by_step"):
+        getattr(cube, view)
+    return cube
+
+
+def _init_worker(cube: ScoreCube):
+    global _CUBE
+    _CUBE = cube
+
+
+def _build_artifact(name: str, force: bool):
+    """Build one artifact.
+
+    Returns (name, seconds, built, error traceback or None); ``built`` is
+    False when the artifact was already up to date.
+    """
+    render, output_path = ARTIFACTS[name]
+    start = time.perf_counter()
+    built, error = False, None
+    try:
+        built = render(_CUBE, output_path, force=force)
+    except Exception:
+        error = traceback.format_exc()
+    return name, time.perf_counter() - start, built, error
+
+
+def build_all(cube: ScoreCube, names=None, jobs=None, force: bool = False) -> dict:
+    """Build ``names`` (default: all artifacts) in parallel.
+
+    Returns ``{name: (seconds, built, error)}``.
+    """
+    names = list(names or ARTIFACTS)
+    jobs = jobs or min(len(names), os.cpu_count() or 1)
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(warm_views(cube),)) as pool:
+        futures = {pool.submit(_build_artifact, name, force): name for name in names}
+        for future in as_completed(futures):
+            try:
+                name, seconds, built, error = future.result()
+            except Exception:
+                # The worker itself died (e.g. BrokenProcessPool)
+                name, seconds, built = futures[future], float("nan"), False
+                error = traceback.format_exc()
+            results[name] = (seconds, built, error)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build all figures and the summary.")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Number of worker processes")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild every artifact even if it is up to date")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="Build even if the matrix fails validation")
+    add_validation_arguments(parser)
+    parser.add_argument("--shards", nargs="?", type=Path, const=merge_shards.SHARD_DIR,
+                        default=None, help="Merge the shards in DIR before building")
+    parser.add_argument("--policy", choices=POLICIES, default="error",
+                        help="Conflict policy for --shards")
+    args = parser.parse_args()
+
+    if args.shards is not None:
+        if not merge_shards.merge(args.shards, CSV_PATH, policy=args.policy, jobs=args.jobs,
+                                  known_models=validation_options(args)["known_models"]):
+            sys.exit(1)
+        print()
+
+    if not CSV_PATH.exists():
+        print(f"Error: {CSV_PATH} not found.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    cube = load_cube(CSV_PATH)
+    load_seconds = time.perf_counter() - start
+
+    validate_seconds = 0.0
+    if not args.no_validate:
+        validate_start = time.perf_counter()
+        report = validate_scores(cube.df, **validation_options(args))
+        validate_seconds = time.perf_counter() - validate_start
+        if not report.ok:
+            print(report.format(max_issues=MAX_ISSUES), file=sys.stderr)
+            print("\nFix the matrix (see scripts/validate_scores.py), or pass --allow-replicates,"
+                  " --any-model or --no-validate.",
+                  file=sys.stderr)
+            sys.exit(1)
+
+    results = build_all(cube, jobs=args.jobs, force=args.force)
+    total_seconds = time.perf_counter() - start
+
+    print(f"\n{'Artifact':<24} {'Time':>8}  Status")
+    print(f"{'(load + score)':<24} {load_seconds:>7.2f}s  ok")
+    if not args.no_validate:
+        print(f"{'(validate)':<24} {validate_seconds:>7.2f}s  ok")
+    for name in ARTIFACTS:
+        seconds, built, error = results[name]
+        status = "FAILED" if error else ("ok" if built else "up to date")
+        print(f"{name:<24} {seconds:>7.2f}s  {status}")
+    print(f"{'total (wall clock)':<24} {total_seconds:>7.2f}s")
+
+    failed = [name for name in ARTIFACTS if results[name][2]]
+    for name in failed:
+        print(f"\n--- {name} ---\n{results[name][2]}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Draft output_compatibility codes from the dataflow between steps.
+
+Builds the produced/consumed file graph of every conversation under
+responses/<family>/<version>/ from its shell commands and flags the
+mismatches the rubric lists: path mismatches, BAM/SAM where FASTQ is
+expected, gzipped input a tool cannot read and BAMs used without a .bai
+index (see scoring.dataflow). A conversation is a transcript with every
+step under step headings, or the step_0N files of one directory, so
+replicate runs of a version are checked separately. Each is checked in
+one linear pass; conversations are spread over a process pool.
+
+Every step with commands gets a proposed P/F code in the
+scoring_matrix.csv schema (other dimensions blank) with the reasons in
+notes, for a rater to confirm.
+
+Usage:
+    python scripts/check_dataflow.py [--family NAME] [--version NAME] [--jobs N]
+                                     [--root DIR] [--output PATH] [--mismatches PATH]
+                                     [--max-mismatches N] [--profile] [--profile-json PATH]
+                                     [--profile-stats PATH]
+
+Options:
+    --family          Only this family (directory or scoring-matrix name)
+    --version         Only this version
+    --jobs            Worker processes (default: CPU count)
+    --root            Transcript tree (default: responses/)
+    --output          Draft rows (default: results/tables/drafts/dataflow.csv)
+    --mismatches      Also write every mismatch to PATH as CSV
+    --max-mismatches  Mismatches to print (default: 50; 0 prints all)
+    --profile         Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                      Also write the breakdown as JSON / cProfile stats to PATH
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from scoring.corpus import conversations, prompt_steps, read_turns
+from scoring.dataflow import check_conversation
+from scoring.engine import DIMENSIONS
+from scoring.instrument import add_profile_arguments, count, profiled, record_output, stage, timed
+from scoring.validate import KEY_COLUMNS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESPONSES_DIR = REPO_ROOT / "responses"
+PROMPTS_DIR = REPO_ROOT / "prompts"
+OUTPUT_PATH = REPO_ROOT / "results" / "tables" / "drafts" / "dataflow.csv"
+COLUMNS = KEY_COLUMNS + DIMENSIONS + ["notes"]
+MISMATCH_COLUMNS = ["model_family", "model_version", "conversation", "step", "consumer_step",
+                    "kind", "line", "path", "reason"]
+MAX_MISMATCHES = 50
+
+_STEPS = None
+
+
+def _init_worker(steps):
+    global _STEPS
+    _STEPS = steps
+
+
+def _check(conversation):
+    """(draft rows, mismatch rows) of one conversation."""
+    label, family, version, paths = conversation
+    turns = []
+    for path in paths:
+        turns.extend(read_turns(path, _STEPS)[1])
+    flow = check_conversation(turns)
+    rows = []
+    for step in sorted(set(flow.steps) | {m.step for m in flow.mismatches}):
+        if step not in _STEPS:
+            continue
+        reasons = flow.reasons(step)
+        rows.append({"model_family": family, "model_version": version, "step_number": step,
+                     "step_name": _STEPS[step], "tool_selection": "", "parameter_accuracy": "",
+                     "output_compatibility": flow.code(step), "scientific_validity": "",
+                     "executability": "",
+                     "notes": f"draft ({label}): " + ("; ".join(reasons) or "no mismatch found")})
+    mismatches = [(family, version, label, m.step, m.consumer, m.kind, m.line, m.path, m.reason)
+                  for m in flow.mismatches]
+    return rows, mismatches, len(flow.edges)
+
+
+@timed("check dataflow")
+def check_all(tasks: list, steps: dict, jobs: int = None):
+    """Draft rows and mismatches of every conversation in ``tasks``."""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(steps,)) as pool:
+            results = list(pool.map(_check, tasks, chunksize=chunksize))
+    else:
+        _init_worker(steps)
+        results = [_check(task) for task in tasks]
+    count("conversations", len(tasks))
+    count("dataflow_edges", sum(edges for _, _, edges in results))
+    drafts = pd.DataFrame([row for rows, _, _ in results for row in rows], columns=COLUMNS)
+    mismatches = pd.DataFrame([m for _, found, _ in results for m in found],
+                              columns=MISMATCH_COLUMNS)
+    return drafts, mismatches
+
+
+def format_summary(n_conversations: int, drafts: pd.DataFrame, mismatches: pd.DataFrame,
+                   max_mismatches: int = None) -> str:
+    codes = Counter(drafts["output_compatibility"])
+    lines = [f"Checked {n_conversations} conversation(s): {len(drafts)} step(s), "
+             f"{codes['P']} P, {codes['F']} F."]
+    if mismatches.empty:
+        lines.append("No mismatches.")
+        return "\n".join(lines)
+    kinds = mismatches["kind"].value_counts()
+    lines.append(f"{len(mismatches)} mismatch(es): "
+                 + ", ".join(f"{kind} {n}" for kind, n in kinds.items()))
+    shown = mismatches if max_mismatches is None else mismatches.head(max_mismatches)
+    for row in shown.itertuples(index=False):
+        lines.append(f"  {row.conversation} step {row.step} [{row.kind}]: {row.reason}")
+    if len(shown) < len(mismatches):
+        lines.append(f"  … and {len(mismatches) - len(shown)} more")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the dataflow between steps.")
+    parser.add_argument("--family", default=None, help="Only this family")
+    parser.add_argument("--version", default=None, help="Only this version")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes")
+    parser.add_argument("--root", type=Path, default=RESPONSES_DIR, help="Transcript tree")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Draft rows")
+    parser.add_argument("--mismatches", type=Path, default=None,
+                        help="Also write every mismatch to PATH as CSV")
+    parser.add_argument("--max-mismatches", type=int, default=MAX_MISMATCHES,
+                        help="Mismatches to print (0 prints all)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.root.is_dir():
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+    steps = prompt_steps(PROMPTS_DIR)
+    tasks = conversations(args.root, steps, args.family, args.version)
+    if not tasks:
+        print("No matching conversations.")
+        sys.exit(1)
+
+    with profiled(args):
+        drafts, mismatches = check_all(tasks, steps, jobs=args.jobs)
+        print(format_summary(len(tasks), drafts, mismatches, args.max_mismatches or None))
+        if args.mismatches:
+            mismatches.to_csv(args.mismatches, index=False)
+            record_output(args.mismatches)
+            print(f"Mismatches written to {args.mismatches}")
+        if drafts.empty:
+            return
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with stage("write csv"):
+            drafts.to_csv(args.output, index=False)
+        record_output(args.output)
+        print(f"Draft rows written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
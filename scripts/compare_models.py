@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Compare model versions pairwise and rank them globally.
+
+Reads results/tables/scoring_matrix.csv and reports:
+- A Bradley–Terry ranking fitted to per-step wins between model versions
+- Paired permutation tests on per-step composites for every pair of
+  versions, with multiple-testing correction (see scoring.compare)
+
+Usage:
+    python scripts/compare_models.py [--markdown] [--correction {bh,holm}] [--alpha P]
+                                     [--permutations N] [--seed N] [--all-pairs]
+                                     [--profile] [--profile-json PATH] [--profile-stats PATH]
+
+Options:
+    --markdown      Also write the report to evaluations/model_comparison_generated.md
+    --correction    bh (Benjamini–Hochberg, default) or holm
+    --alpha         Significance level for the adjusted p-values (default: 0.05)
+    --permutations  Sampled sign patterns when there are too many steps to
+                    enumerate them all (default: 10000)
+    --seed          Seed for sampled sign patterns (default: 0)
+    --all-pairs     List every pair, not only the significant ones
+    --profile       Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                    Also write the breakdown as JSON / cProfile stats to PATH
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from scoring import ScoreCube, load_cube
+from scoring.compare import (
+    CORRECTIONS,
+    DEFAULT_PERMUTATIONS,
+    BradleyTerry,
+    PairwiseTests,
+    bradley_terry,
+    pairwise_tests,
+)
+from scoring.instrument import add_profile_arguments, profiled, record_output, stage
+
+CORRECTION_LABELS = {"bh": "Benjamini–Hochberg", "holm": "Holm"}
+
+
+def model_name(model) -> str:
+    family, version = model
+    return f"{family}/{version}"
+
+
+def format_report(cube: ScoreCube, ranking: BradleyTerry, tests: PairwiseTests,
+                  alpha: float = 0.05, all_pairs: bool = False,
+                  as_markdown: bool = False) -> str:
+    lines = []
+    if as_markdown:
+        lines.append("# Model Comparison\n")
+        lines.append("*Auto-generated from `scoring_matrix.csv`*\n")
+
+    lines.append("\n## Global Ranking (Bradley–Terry on per-step wins)\n")
+    lines.append("| Rank | Model | Strength | Avg Score | Steps won |")
+    lines.append("|:-----|:------|:---------|:----------|:----------|")
+    games = ranking.wins + ranking.wins.T
+    for rank, i in enumerate(ranking.order, 1):
+        avg = cube.model_composites[i]
+        avg_str = f"{avg:.2f}" if not np.isnan(avg) else "no data"
+        won = ranking.wins[i].sum()
+        lines.append(f"| {rank} | {model_name(cube.models[i])} | {ranking.strength[i]:.3f} "
+                     f"| {avg_str} | {won:g} of {games[i].sum():g} |")
+
+    test_kind = "exact" if tests.exact else f"{tests.n_permutations} sampled sign patterns"
+    label = CORRECTION_LABELS[tests.correction]
+    significant = tests.p_adjusted < alpha
+    shown = np.flatnonzero(~np.isnan(tests.p_value) if all_pairs else significant)
+    shown = shown[np.lexsort((-np.abs(tests.mean_diff[shown]), tests.p_adjusted[shown]))]
+
+    lines.append("\n## Pairwise Differences (paired permutation test on per-step composites)\n")
+    lines.append(f"{len(tests.first)} pairs, {test_kind}; {label}-adjusted p < {alpha:g}: "
+                 f"{int(significant.sum())} significant.\n")
+    if len(shown):
+        lines.append("| Model A | Model B | Steps | Mean diff (A − B) | p | Adjusted p |")
+        lines.append("|:--------|:--------|:------|:------------------|:--|:-----------|")
+        for k in shown:
+            # List the higher-scoring model first
+            a, b = tests.first[k], tests.second[k]
+            if tests.mean_diff[k] < 0:
+                a, b = b, a
+            lines.append(f"| {model_name(cube.models[a])} | {model_name(cube.models[b])} "
+                         f"| {tests.n_steps[k]} | {abs(tests.mean_diff[k]):+.3f} "
+                         f"| {tests.p_value[k]:.4f} | {tests.p_adjusted[k]:.4f} |")
+    elif tests.exact:
+        min_p = 2 / tests.n_permutations
+        lines.append(f"No pair is significant. With {cube.model_step_matrix.shape[1]} steps "
+                     f"the smallest attainable p-value is {min_p:.4f}.")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pairwise tests and global model ranking.")
+    parser.add_argument("--markdown", action="store_true",
+                        help="Also write evaluations/model_comparison_generated.md")
+    parser.add_argument("--correction", choices=CORRECTIONS, default="bh",
+                        help="Multiple-testing correction")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="Significance level for adjusted p-values")
+    parser.add_argument("--permutations", type=int, default=DEFAULT_PERMUTATIONS,
+                        help="Sampled sign patterns when exact enumeration is too large")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for sampled sign patterns")
+    parser.add_argument("--all-pairs", action="store_true",
+                        help="List every pair, not only the significant ones")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parent.parent
+    csv_path = repo_root / "results" / "tables" / "scoring_matrix.csv"
+
+    if not csv_path.exists():
+        print(f"Error: {csv_path} not found.")
+        sys.exit(1)
+
+    with profiled(args):
+        cube = load_cube(csv_path)
+        if np.all(np.isnan(cube.model_step_matrix)):
+            print("No scores have been entered yet. Fill in scoring_matrix.csv and re-run.")
+            sys.exit(0)
+
+        matrix = cube.model_step_matrix
+        ranking = bradley_terry(matrix)
+        tests = pairwise_tests(matrix, correction=args.correction,
+                               n_permutations=args.permutations, seed=args.seed)
+
+        with stage("format"):
+            output = format_report(cube, ranking, tests, alpha=args.alpha,
+                                   all_pairs=args.all_pairs, as_markdown=args.markdown)
+        print(output)
+
+        if args.markdown:
+            md_path = repo_root / "evaluations" / "model_comparison_generated.md"
+            md_path.write_text(output + "\n")
+            record_output(md_path)
+            print(f"\nMarkdown report written to {md_path}")
+
+
+if __name__ == "__main__":
+    main()
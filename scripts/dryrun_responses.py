@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Draft executability codes by dry-running the commands of every response.
+
+Each conversation under responses/<family>/<version>/ (as grouped by
+check_dataflow.py) is executed step by step in its own temporary
+workspace, with stub executables standing in for dorado, NanoPlot,
+chopper, minimap2, samtools, kraken2, flye, metabat2 and the other tools
+(see scoring.dryrun and scoring.stubs). The stubs check options and
+argument counts and write small, correctly formatted FASTQ/BAM/FASTA
+outputs, so later steps run against real files. Nothing is run through a
+shell and every path is kept inside the workspace.
+
+Conversations run concurrently on a thread pool (the work is waiting on
+stub processes); one still running after --timeout seconds is stopped,
+the step it was in counts as not running and later steps are left
+unscored. Every step with commands gets a proposed R/M/N code in the
+scoring_matrix.csv schema (other dimensions blank) with the failure trace
+in notes, for a rater to confirm.
+
+Usage:
+    python scripts/dryrun_responses.py [--family NAME] [--version NAME] [--jobs N]
+                                       [--timeout SECONDS] [--root DIR] [--output PATH]
+                                       [--traces PATH] [--max-failures N] [--profile]
+                                       [--profile-json PATH] [--profile-stats PATH]
+
+Options:
+    --family        Only this family (directory or scoring-matrix name)
+    --version       Only this version
+    --jobs          Conversations run at once (default: 4 per CPU)
+    --timeout       Seconds allowed per conversation (default: 60)
+    --root          Transcript tree (default: responses/)
+    --output        Draft rows (default: results/tables/drafts/executability.csv)
+    --traces        Also write every failure to PATH as CSV
+    --max-failures  Failures to print (default: 50; 0 prints all)
+    --profile       Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                    Also write the breakdown as JSON / cProfile stats to PATH
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from scoring.corpus import conversations, prompt_steps, read_turns
+from scoring.dryrun import TIMEOUT, dry_run, install_stubs
+from scoring.engine import DIMENSIONS
+from scoring.instrument import add_profile_arguments, count, profiled, record_output, stage, timed
+from scoring.validate import KEY_COLUMNS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESPONSES_DIR = REPO_ROOT / "responses"
+PROMPTS_DIR = REPO_ROOT / "prompts"
+OUTPUT_PATH = REPO_ROOT / "results" / "tables" / "drafts" / "executability.csv"
+COLUMNS = KEY_COLUMNS + DIMENSIONS + ["notes"]
+TRACE_COLUMNS = ["model_family", "model_version", "conversation", "step", "line", "command",
+                 "kind", "severity", "message"]
+MAX_FAILURES = 50
+
+
+def _run(conversation, steps: dict, bin_dir: Path, timeout: float, workdir: Path):
+    """(draft rows, failure rows, timed out) of one conversation."""
+    label, family, version, paths = conversation
+    turns = []
+    for path in paths:
+        turns.extend(read_turns(path, steps)[1])
+    run = dry_run(turns, bin_dir, timeout=timeout, workdir=workdir)
+    rows = []
+    for step in sorted(set(run.commands) | {f.step for f in run.failures}):
+        if step not in steps:
+            continue
+        trace = run.trace(step)
+        rows.append({"model_family": family, "model_version": version, "step_number": step,
+                     "step_name": steps[step], "tool_selection": "", "parameter_accuracy": "",
+                     "output_compatibility": "", "scientific_validity": "",
+                     "executability": run.code(step),
+                     "notes": f"draft ({label}): " + ("; ".join(trace) or "ran")})
+    failures = [(family, version, label, f.step, f.line, f.command, f.kind, f.severity,
+                 f.message) for f in run.failures]
+    return rows, failures, run.timed_out
+
+
+@timed("dry run")
+def run_all(tasks: list, steps: dict, jobs: int = None, timeout: float = TIMEOUT):
+    """Draft rows and failures of every conversation in ``tasks``, in task order."""
+    jobs = jobs or 4 * (os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory(prefix="dryrun-") as tmp:
+        bin_dir = install_stubs(Path(tmp) / "bin")
+        workdir = Path(tmp)
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(lambda task: _run(task, steps, bin_dir, timeout, workdir),
+                                    tasks))
+    count("conversations", len(tasks))
+    count("timed_out", sum(timed_out for _, _, timed_out in results))
+    drafts = pd.DataFrame([row for rows, _, _ in results for row in rows], columns=COLUMNS)
+    failures = pd.DataFrame([f for _, found, _ in results for f in found],
+                            columns=TRACE_COLUMNS)
+    return drafts, failures
+
+
+def format_summary(n_conversations: int, drafts: pd.DataFrame, failures: pd.DataFrame,
+                   max_failures: int = None) -> str:
+    codes = Counter(drafts["executability"])
+    lines = [f"Dry-ran {n_conversations} conversation(s): {len(drafts)} step(s), "
+             f"{codes['R']} R, {codes['M']} M, {codes['N']} N."]
+    if failures.empty:
+        lines.append("No failures.")
+        return "\n".join(lines)
+    kinds = failures["kind"].value_counts()
+    lines.append(f"{len(failures)} failure(s): "
+                 + ", ".join(f"{kind} {n}" for kind, n in kinds.items()))
+    shown = failures if max_failures is None else failures.head(max_failures)
+    for row in shown.itertuples(index=False):
+        lines.append(f"  {row.conversation} step {row.step} line {row.line} "
+                     f"[{row.severity} {row.kind}] {row.command}: {row.message}")
+    if len(shown) < len(failures):
+        lines.append(f"  … and {len(failures) - len(shown)} more")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dry-run the commands of every response.")
+    parser.add_argument("--family", default=None, help="Only this family")
+    parser.add_argument("--version", default=None, help="Only this version")
+    parser.add_argument("--jobs", type=int, default=None, help="Conversations run at once")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT,
+                        help="Seconds allowed per conversation")
+    parser.add_argument("--root", type=Path, default=RESPONSES_DIR, help="Transcript tree")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Draft rows")
+    parser.add_argument("--traces", type=Path, default=None,
+                        help="Also write every failure to PATH as CSV")
+    parser.add_argument("--max-failures", type=int, default=MAX_FAILURES,
+                        help="Failures to print (0 prints all)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.root.is_dir():
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+    if args.timeout <= 0:
+        print("Error: --timeout must be positive.")
+        sys.exit(1)
+    steps = prompt_steps(PROMPTS_DIR)
+    tasks = conversations(args.root, steps, args.family, args.version)
+    if not tasks:
+        print("No matching conversations.")
+        sys.exit(1)
+
+    with profiled(args):
+        drafts, failures = run_all(tasks, steps, jobs=args.jobs, timeout=args.timeout)
+        print(format_summary(len(tasks), drafts, failures, args.max_failures or None))
+        if args.traces:
+            failures.to_csv(args.traces, index=False)
+            record_output(args.traces)
+            print(f"Failures written to {args.traces}")
+        if drafts.empty:
+            return
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with stage("write csv"):
+            drafts.to_csv(args.output, index=False)
+        record_output(args.output)
+        print(f"Draft rows written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
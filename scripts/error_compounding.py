@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Measure how failures at one pipeline step carry into the next.
+
+Reads results/tables/scoring_matrix.csv, orders every conversation by
+step (see scoring.compounding) and reports:
+- P(fail at step N+1 | fail at step N) against P(fail at N+1 | pass at N),
+  per dimension and per step transition
+- Which dimensions fail at N+1 after a given dimension failed at N
+- The distribution of cascade lengths (runs of consecutive failed steps)
+  and the cascades that last until the final step
+
+Usage:
+    python scripts/error_compounding.py [--partial] [--update-summary]
+                                        [--profile] [--profile-json PATH] [--profile-stats PATH]
+
+Options:
+    --partial         Count partially correct codes (A, P, Q, M) as failures too
+    --update-summary  Write the report into the "Error compounding" section
+                      of evaluations/summary.md
+    --profile         Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                      Also write the breakdown as JSON / cProfile stats to PATH
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from scoring import ScoreCube, load_cube
+from scoring.compounding import ANY, STATE_DIMENSIONS, Compounding, error_compounding
+from scoring.instrument import add_profile_arguments, profiled, record_output, stage
+
+SECTION_HEADING = "### Error compounding"
+MAX_CASCADES = 10
+
+
+def percent(p: float) -> str:
+    return f"{p:.0%}" if not np.isnan(p) else "–"
+
+
+def ratio(a: float, b: float) -> str:
+    if np.isnan(a) or np.isnan(b):
+        return "–"
+    return f"{a / b:.1f}×" if b > 0 else "∞"
+
+
+def conversation_name(cube: ScoreCube, result: Compounding, conv: int) -> str:
+    model, replicate = result.conversations[conv]
+    family, version = cube.models[model]
+    name = f"{family}/{version}"
+    if result.conversations[:, 1].max() > 0:
+        name += f" #{replicate + 1}"
+    return name
+
+
+def format_report(cube: ScoreCube, result: Compounding) -> str:
+    steps = result.steps
+    n_steps = len(steps)
+    any_dim = STATE_DIMENSIONS.index(ANY)
+    failing = ("every code short of fully correct" if result.partial
+               else "a code scoring 0 (I, F or N)")
+    lines = [f"*Auto-generated by `scripts/error_compounding.py` from `scoring_matrix.csv`. "
+             f"A step fails on a dimension with {failing}; \"any\" fails when any dimension "
+             f"does.*\n"]
+
+    if n_steps < 2 or not result.transitions.sum():
+        lines.append("Not enough consecutive scored steps to measure error compounding.")
+        return "\n".join(lines)
+
+    totals = result.pair_totals()
+    after_fail, after_pass = result.conditional(totals)
+    n_models = len(np.unique(result.conversations[:, 0]))
+    n_replicates = int(result.conversations[:, 1].max()) + 1
+    replicates = f" × up to {n_replicates} replicates" if n_replicates > 1 else ""
+    lines.append(f"Across {result.n_conversations} conversations ({n_models} models"
+                 f"{replicates}), a failed step was followed by another failed step "
+                 f"{percent(after_fail[any_dim])} of the time, against "
+                 f"{percent(after_pass[any_dim])} after a step that passed "
+                 f"({ratio(after_fail[any_dim], after_pass[any_dim])} as likely).\n")
+
+    lines.append("| Dimension | P(fail N+1 \\| fail N) | P(fail N+1 \\| pass N) | Ratio "
+                 "| Failures followed |")
+    lines.append("|:----------|:---------------------|:---------------------|:------"
+                 "|:------------------|")
+    for d, dim in enumerate(STATE_DIMENSIONS):
+        failed = totals[d, 1].sum()
+        lines.append(f"| {dim} | {percent(after_fail[d])} | {percent(after_pass[d])} "
+                     f"| {ratio(after_fail[d], after_pass[d])} | {failed} |")
+
+    step_fail, step_pass = result.conditional()
+    lines.append("\n**By step transition (any dimension)**\n")
+    lines.append("| Transition | P(fail N+1 \\| fail N) | P(fail N+1 \\| pass N) | Failed at N |")
+    lines.append("|:-----------|:---------------------|:---------------------|:------------|")
+    for s in range(n_steps - 1):
+        failed = result.transitions[any_dim, s, 1].sum()
+        observed = result.transitions[any_dim, s].sum()
+        lines.append(f"| {steps[s]} → {steps[s + 1]} | {percent(step_fail[any_dim, s])} "
+                     f"| {percent(step_pass[any_dim, s])} | {failed} of {observed} |")
+
+    cross = result.cross_conditional()
+    dims = STATE_DIMENSIONS[:any_dim]
+    lines.append("\n**Failure at N (row) → failure at N+1 (column)**\n")
+    lines.append("| Failed at N | " + " | ".join(dims) + " |")
+    lines.append("|:------------|" + "|".join(":---" for _ in dims) + "|")
+    for d, dim in enumerate(dims):
+        lines.append(f"| {dim} | " + " | ".join(percent(p) for p in cross[d, :any_dim]) + " |")
+
+    lengths = range(1, n_steps + 1)
+    lines.append("\n**Cascade lengths (runs of consecutive failed steps)**\n")
+    lines.append("| Dimension | " + " | ".join(str(n) for n in lengths) + " | Mean |")
+    lines.append("|:----------|" + "|".join(":--" for _ in lengths) + "|:-----|")
+    for d, dim in enumerate(STATE_DIMENSIONS):
+        runs = result.run_lengths[d, 1:]
+        mean = (runs * np.arange(1, n_steps + 1)).sum() / runs.sum() if runs.sum() else np.nan
+        mean_str = f"{mean:.2f}" if not np.isnan(mean) else "–"
+        lines.append(f"| {dim} | " + " | ".join(str(n) for n in runs) + f" | {mean_str} |")
+
+    run_dim, run_conv, run_start, run_length = result.runs.T
+    to_end = np.flatnonzero((run_dim == any_dim) & (run_start + run_length == n_steps)
+                            & (run_length > 1))
+    to_end = to_end[np.lexsort((run_start[to_end], -run_length[to_end]))]
+    lines.append(f"\n**Cascades lasting to step {steps[-1]} (any dimension)**\n")
+    if not len(to_end):
+        lines.append(f"No conversation failed two or more consecutive steps through step "
+                     f"{steps[-1]}.")
+    for k in to_end[:MAX_CASCADES]:
+        lines.append(f"- {conversation_name(cube, result, run_conv[k])}: steps "
+                     f"{steps[run_start[k]]}–{steps[-1]} ({run_length[k]} steps)")
+    if len(to_end) > MAX_CASCADES:
+        lines.append(f"- … and {len(to_end) - MAX_CASCADES} more")
+    return "\n".join(lines)
+
+
+def replace_section(text: str, body: str, heading: str = SECTION_HEADING) -> str:
+    """Replace everything between ``heading`` and the next heading with ``body``."""
+    pattern = re.compile(rf"^{re.escape(heading)}[ \t]*\n.*?(?=^#{{1,3}} |\Z)",
+                         re.MULTILINE | re.DOTALL)
+    if not pattern.search(text):
+        raise ValueError(f"{heading!r} section not found")
+    return pattern.sub(lambda _: f"{heading}\n\n{body}\n\n", text, count=1)
+
+
+def update_summary(cube: ScoreCube, output_path: Path, force: bool = False) -> bool:
+    """Fill the "Error compounding" section of ``output_path`` from ``cube``."""
+    old = output_path.read_text()
+    new = replace_section(old, format_report(cube, error_compounding(cube)))
+    if not force and new == old:
+        print(f"Up to date: {output_path}")
+        return False
+    output_path.write_text(new)
+    record_output(output_path)
+    print(f"Error compounding section written to {output_path}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step-to-step error compounding analysis.")
+    parser.add_argument("--partial", action="store_true",
+                        help="Count partially correct codes as failures too")
+    parser.add_argument("--update-summary", action="store_true",
+                        help="Write the report into evaluations/summary.md")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parent.parent
+    csv_path = repo_root / "results" / "tables" / "scoring_matrix.csv"
+    summary_path = repo_root / "evaluations" / "summary.md"
+
+    if not csv_path.exists():
+        print(f"Error: {csv_path} not found.")
+        sys.exit(1)
+    if args.update_summary and args.partial:
+        parser.error("--update-summary always uses the default failure definition; "
+                     "drop --partial")
+
+    with profiled(args):
+        cube = load_cube(csv_path)
+        if not cube.encoded.scored.any():
+            print("No scores have been entered yet. Fill in scoring_matrix.csv and re-run.")
+            sys.exit(0)
+
+        result = error_compounding(cube, partial=args.partial)
+        with stage("format"):
+            output = format_report(cube, result)
+        print(output)
+
+        if args.update_summary:
+            print()
+            update_summary(cube, summary_path)
+
+
+if __name__ == "__main__":
+    main()
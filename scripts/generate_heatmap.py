@@ -7,88 +7,52 @@ Reads results/tables/scoring_matrix.csv and produces a heatmap with:
 - Y-axis: model versions (grouped by family)
 - Color: composite score (green = correct, yellow = partial, red = incorrect)
 
+Large model lists are split into pages of at most --rows-per-page models
+(and --cols-per-page steps), written as scoring_heatmap_p01.png, ...; a
+matrix that fits on one page is written to scoring_heatmap.png.
+
 Usage:
-    python scripts/generate_heatmap.py
+    python scripts/generate_heatmap.py [--force] [--all-models]
+                                       [--rows-per-page N] [--cols-per-page N]
+                                       [--ci [--resamples N] [--level P] [--seed N]]
+                                       [--profile] [--profile-json PATH] [--profile-stats PATH]
+
+Options:
+    --force          Re-render even if the data behind the heatmap is unchanged
+    --all-models     Also show models that are not in scoring.engine.MODEL_ORDER
+    --rows-per-page  Maximum models per page (default: 60)
+    --cols-per-page  Maximum steps per page (default: 40)
+    --ci             Print a bootstrap confidence interval under each score
+    --resamples      Bootstrap resamples for --ci (default: 2000)
+    --level          Confidence level for --ci (default: 0.95)
+    --seed           Bootstrap seed for --ci (default: 0)
+    --profile        Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                     Also write the breakdown as JSON / cProfile stats to PATH
 """
 
+import argparse
 import sys
 from pathlib import Path
 
-import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
+from matplotlib.collections import PathCollection
+from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.font_manager import FontProperties
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
+
+from scoring import ScoreCube, load_cube, render_if_stale
+from scoring.bootstrap import CompositeCIs, add_bootstrap_arguments, bootstrap_composites
+from scoring.depends import fingerprint_path
+from scoring.engine import MODEL_LABELS, MODEL_ORDER, STEP_LABELS
+from scoring.instrument import (add_profile_arguments, count, profiled, record_output, stage,
+                                timed)
 
 # --- Configuration ---
 
-SCORE_MAP = {
-    "tool_selection": {"C": 1.0, "A": 0.5, "I": 0.0},
-    "parameter_accuracy": {"C": 1.0, "P": 0.5, "I": 0.0},
-    "output_compatibility": {"P": 1.0, "F": 0.0},
-    "scientific_validity": {"S": 1.0, "Q": 0.5, "I": 0.0},
-    "executability": {"R": 1.0, "M": 0.5, "N": 0.0},
-}
-
-DIMENSIONS = list(SCORE_MAP.keys())
-
-STEP_LABELS = {
-    1: "Basecalling",
-    2: "QC",
-    3: "Host\nDepletion",
-    4: "Taxonomy",
-    5: "Assembly",
-    6: "Binning",
-    7: "Annotation",
-}
-
-MODEL_ORDER = [
-    ("openai", "gpt4o"),
-    ("openai", "o1_preview"),
-    ("openai", "o1_mini"),
-    ("openai", "o1"),
-    ("openai", "o1_pro"),
-    ("openai", "o3_mini"),
-    ("openai", "o3_high"),
-    ("openai", "o4_mini"),
-    ("openai", "gpt5"),
-    ("claude", "sonnet_3.5"),
-    ("claude", "sonnet_4"),
-    ("claude", "sonnet_4.5"),
-    ("claude", "haiku_4.5"),
-    ("claude", "opus_4.5"),
-    ("claude", "opus_4.6"),
-    ("gemini", "2.0_flash"),
-    ("gemini", "2.5_pro_preview"),
-    ("gemini", "2.5_flash"),
-    ("gemini", "2.5_pro_stable"),
-    ("gemini", "3_pro"),
-    ("gemini", "3_flash"),
-]
-
-MODEL_LABELS = {
-    ("openai", "gpt4o"): "GPT-4o",
-    ("openai", "o1_preview"): "o1-preview",
-    ("openai", "o1_mini"): "o1-mini",
-    ("openai", "o1"): "o1",
-    ("openai", "o1_pro"): "o1-pro",
-    ("openai", "o3_mini"): "o3-mini",
-    ("openai", "o3_high"): "o3 (high)",
-    ("openai", "o4_mini"): "o4-mini",
-    ("openai", "gpt5"): "GPT-5",
-    ("claude", "sonnet_3.5"): "Sonnet 3.5",
-    ("claude", "sonnet_4"): "Sonnet 4",
-    ("claude", "sonnet_4.5"): "Sonnet 4.5",
-    ("claude", "haiku_4.5"): "Haiku 4.5",
-    ("claude", "opus_4.5"): "Opus 4.5",
-    ("claude", "opus_4.6"): "Opus 4.6",
-    ("gemini", "2.0_flash"): "2.0 Flash",
-    ("gemini", "2.5_pro_preview"): "2.5 Pro Prev",
-    ("gemini", "2.5_flash"): "2.5 Flash",
-    ("gemini", "2.5_pro_stable"): "2.5 Pro",
-    ("gemini", "3_pro"): "3 Pro",
-    ("gemini", "3_flash"): "3 Flash",
-}
-
 FAMILY_COLORS = {
     "openai": "#e8e8e8",
     "claude": "#f0f0f0",
@@ -96,54 +60,126 @@ FAMILY_COLORS = {
 }
 
 
-def load_scores(csv_path: str) -> pd.DataFrame:
-    """Load scoring matrix, skipping rows with no scores."""
-    df = pd.read_csv(csv_path)
-    return df
-
+ROWS_PER_PAGE = 60
+COLS_PER_PAGE = 40
 
-def compute_composite(row: pd.Series):
-    """Compute mean numeric score across all dimensions. Returns None if any dimension is missing."""
-    values = []
-    for dim in DIMENSIONS:
-        raw = row.get(dim)
-        if pd.isna(raw) or str(raw).strip() == "":
-            return None
-        score = SCORE_MAP[dim].get(str(raw).strip().upper())
-        if score is None:
-            return None
-        values.append(score)
-    return np.mean(values) if values else None
 
+def heatmap_models(cube: ScoreCube, include_all: bool = False) -> list:
+    """MODEL_ORDER, optionally followed by the cube's other models in CSV order."""
+    if not include_all:
+        return list(MODEL_ORDER)
+    known = set(MODEL_ORDER)
+    return list(MODEL_ORDER) + [m for m in cube.models if m not in known]
 
-def build_matrix(df: pd.DataFrame):
-    """Build 2D score matrix (models × steps)."""
-    steps = sorted(df["step_number"].unique())
-    n_models = len(MODEL_ORDER)
-    n_steps = len(steps)
 
-    matrix = np.full((n_models, n_steps), np.nan)
+@timed("build_matrix")
+def build_matrix(cube: ScoreCube, models=None):
+    """Build 2D score matrix (models × steps) from the shared score cube.
 
-    for i, (family, version) in enumerate(MODEL_ORDER):
-        subset = df[(df["model_family"] == family) & (df["model_version"] == version)]
-        for _, row in subset.iterrows():
-            step_idx = steps.index(row["step_number"])
-            score = compute_composite(row)
-            if score is not None:
-                matrix[i, step_idx] = score
+    Rows are gathered from ``cube.model_step_matrix`` in one indexing
+    operation; models absent from the cube stay NaN.
+    """
+    models = MODEL_ORDER if models is None else models
+    matrix = gather_rows(cube, models, cube.model_step_matrix)
 
-    y_labels = [MODEL_LABELS.get(m, f"{m[0]}/{m[1]}") for m in MODEL_ORDER]
-    x_labels = [STEP_LABELS.get(s, f"Step {s}") for s in steps]
+    y_labels = [MODEL_LABELS.get(m, f"{m[0]}/{m[1]}") for m in models]
+    x_labels = [STEP_LABELS.get(s, f"Step {s}") for s in cube.steps]
 
     return matrix, y_labels, x_labels
 
 
-def plot_heatmap(matrix, y_labels, x_labels, output_path):
-    """Generate and save the heatmap."""
-    fig, ax = plt.subplots(figsize=(10, 14))
+def gather_rows(cube: ScoreCube, models, table: np.ndarray) -> np.ndarray:
+    """Rows of a (cube model × step) ``table`` for ``models``; NaN if absent."""
+    positions = np.array([cube.model_position.get(m, -1) for m in models], dtype=np.int64)
+    found = positions >= 0
+    matrix = np.full((len(models), table.shape[1]), np.nan)
+    matrix[found] = table[positions[found]]
+    return matrix
+
+
+def interval_matrices(cube: ScoreCube, cis: CompositeCIs, models=None):
+    """(low, high) bootstrap bounds laid out like ``build_matrix``."""
+    models = MODEL_ORDER if models is None else models
+    return gather_rows(cube, models, cis.cell.low), gather_rows(cube, models, cis.cell.high)
+
+
+def family_spans(families) -> list:
+    """[(family, first_row, last_row), ...] for runs of equal family labels."""
+    families = np.asarray(families, dtype=object)
+    if not len(families):
+        return []
+    starts = np.flatnonzero(np.r_[True, families[1:] != families[:-1]])
+    ends = np.r_[starts[1:] - 1, len(families) - 1]
+    return [(families[s], s, e) for s, e in zip(starts, ends)]
+
+
+def text_collection(ax, labels, colors, offsets, fontsize, weight="bold"):
+    """Draw many short labels as one PathCollection.
+
+    Each distinct label is converted to a centred glyph path once; labels
+    share those paths and are placed via data-space ``offsets``, so the
+    cost is a single artist regardless of the number of labels.
+    """
+    glyphs = {}
+    prop, plain = FontProperties(weight=weight), FontProperties()
+
+    def glyph(text):
+        if text not in glyphs:
+            path = TextPath((0, 0), text, size=fontsize, prop=plain if text == "—" else prop)
+            ext = path.get_extents()
+            glyphs[text] = path.transformed(
+                Affine2D().translate(-(ext.x0 + ext.x1) / 2, -(ext.y0 + ext.y1) / 2))
+        return glyphs[text]
+
+    collection = PathCollection(
+        [glyph(text) for text in labels],
+        offsets=offsets,
+        offset_transform=ax.transData,
+        # Glyph paths are in points; scale to pixels at the output dpi
+        transform=Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans,
+        facecolors=colors,
+        edgecolors="none",
+    )
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+
+def cell_labels(ax, matrix, low=None, high=None, fontsize=9):
+    """Write each cell's score, and its interval if ``low``/``high`` are given."""
+    missing = np.isnan(matrix)
+    labels = np.where(missing, "—", np.char.mod("%.1f", np.nan_to_num(matrix)))
+    colors = np.where(missing, "#999", np.where(matrix < 0.4, "white", "black"))
+    rows, cols = np.indices(matrix.shape)
+    offsets = np.column_stack([cols.ravel(), rows.ravel()]).astype(float)
+    if low is None:
+        return [text_collection(ax, labels.ravel(), colors.ravel(), offsets, fontsize)]
+
+    # Score above, [low–high] below (rows grow downwards)
+    shown = ~missing.ravel()
+    intervals = np.char.add(np.char.add(np.char.mod("[%.2f", np.nan_to_num(low)), "–"),
+                            np.char.mod("%.2f]", np.nan_to_num(high))).ravel()[shown]
+    return [
+        text_collection(ax, labels.ravel(), colors.ravel(), offsets - [0, 0.15], fontsize),
+        text_collection(ax, intervals, colors.ravel()[shown], offsets[shown] + [0, 0.22],
+                        fontsize * 0.6, weight="normal"),
+    ]
+
+
+@timed("plot_heatmap")
+def plot_heatmap(matrix, y_labels, x_labels, output_path, families=None, title_suffix="",
+                 intervals=None):
+    """Generate and save the heatmap.
+
+    The figure height grows with the number of rows; ``families`` gives the
+    family of each row (default: MODEL_ORDER). ``intervals`` is an optional
+    (low, high) pair of matrices printed under each score.
+    """
+    if families is None:
+        families = [m[0] for m in MODEL_ORDER]
+    n_rows, n_cols = matrix.shape
+    fig, ax = plt.subplots(figsize=(max(10, 1.1 * n_cols + 2.5), max(6, 0.55 * n_rows + 2.5)))
 
     # Custom colormap: red → yellow → green
-    from matplotlib.colors import LinearSegmentedColormap
     colors_list = ["#e74c3c", "#f39c12", "#2ecc71"]
     cmap = LinearSegmentedColormap.from_list("score", colors_list, N=256)
     cmap.set_bad(color="#f5f5f5")  # light gray for missing data
@@ -160,40 +196,24 @@ def plot_heatmap(matrix, y_labels, x_labels, output_path):
     ax.set_yticklabels(y_labels, fontsize=9)
 
     # Family group labels on the right
-    families = [m[0] for m in MODEL_ORDER]
-    prev_family = None
-    family_spans = []
-    start = 0
-    for i, f in enumerate(families):
-        if f != prev_family:
-            if prev_family is not None:
-                family_spans.append((prev_family, start, i - 1))
-            start = i
-            prev_family = f
-    family_spans.append((prev_family, start, len(families) - 1))
-
+    spans = family_spans(families)
     ax2 = ax.twinx()
     ax2.set_ylim(ax.get_ylim())
-    ax2.set_yticks([(s + e) / 2 for _, s, e in family_spans])
-    ax2.set_yticklabels([f.capitalize() for f, _, _ in family_spans], fontsize=10,
+    ax2.set_yticks([(s + e) / 2 for _, s, e in spans])
+    ax2.set_yticklabels([f.capitalize() for f, _, _ in spans], fontsize=10,
                         fontweight="bold")
 
-    # Grid
-    for i in range(len(y_labels) + 1):
-        ax.axhline(i - 0.5, color="white", linewidth=1.5)
-    for j in range(len(x_labels) + 1):
-        ax.axvline(j - 0.5, color="white", linewidth=1.5)
+    # Grid: white minor-tick gridlines between cells
+    ax.set_xticks(np.arange(n_cols + 1) - 0.5, minor=True)
+    ax.set_yticks(np.arange(n_rows + 1) - 0.5, minor=True)
+    ax.grid(which="minor", color="white", linewidth=1.5)
+    ax.grid(which="major", visible=False)
+    ax.tick_params(which="minor", length=0)
 
     # Score text in cells
-    for i in range(matrix.shape[0]):
-        for j in range(matrix.shape[1]):
-            val = matrix[i, j]
-            if np.isnan(val):
-                ax.text(j, i, "—", ha="center", va="center", fontsize=9, color="#999")
-            else:
-                text_color = "white" if val < 0.4 else ("black" if val > 0.7 else "black")
-                ax.text(j, i, f"{val:.1f}", ha="center", va="center", fontsize=9,
-                        fontweight="bold", color=text_color)
+    with stage("cell labels"):
+        cell_labels(ax, matrix, *(intervals or ()))
+    count("cells_rendered", matrix.size)
 
     # Legend
     legend_patches = [
@@ -205,18 +225,95 @@ def plot_heatmap(matrix, y_labels, x_labels, output_path):
     ax.legend(handles=legend_patches, loc="upper left", bbox_to_anchor=(0, -0.08),
               ncol=4, fontsize=8, frameon=False)
 
-    ax.set_title("LLM Nanopore Metagenomics Pipeline Evaluation", fontsize=13,
+    ax.set_title("LLM Nanopore Metagenomics Pipeline Evaluation" + title_suffix, fontsize=13,
                  fontweight="bold", pad=15)
     ax.set_xlabel("Pipeline Step", fontsize=10, labelpad=10)
-
-    plt.tight_layout()
-    fig.savefig(output_path, dpi=200, bbox_inches="tight", facecolor="white")
+    if intervals is not None:
+        ax.text(1, -0.08, "[ ] bootstrap CI of the cell composite", transform=ax.transAxes,
+                ha="right", va="top", fontsize=7, color="#666")
+
+    with stage("tight_layout"):
+        plt.tight_layout()
+    with stage("savefig"):
+        fig.savefig(output_path, dpi=200, bbox_inches="tight", facecolor="white")
+    record_output(output_path)
     print(f"Heatmap saved to {output_path}")
     plt.close()
 
 
+def page_tiles(n_rows: int, n_cols: int, rows_per_page: int, cols_per_page: int) -> list:
+    """Row/column slices covering the matrix in pages of bounded size."""
+    return [(slice(r, min(r + rows_per_page, n_rows)), slice(c, min(c + cols_per_page, n_cols)))
+            for r in range(0, max(n_rows, 1), rows_per_page)
+            for c in range(0, max(n_cols, 1), cols_per_page)]
+
+
+def page_path(output_path: Path, page: int) -> Path:
+    return output_path.with_name(f"{output_path.stem}_p{page:02d}{output_path.suffix}")
+
+
+def render(cube: ScoreCube, output_path, force: bool = False, include_all: bool = False,
+           rows_per_page: int = ROWS_PER_PAGE, cols_per_page: int = COLS_PER_PAGE,
+           cis: CompositeCIs = None) -> bool:
+    """Render the heatmap pages whose slice of the model × step matrix changed.
+
+    Pass ``cis`` (see ``scoring.bootstrap``) to print cell intervals.
+    Returns True if any page was rendered.
+    """
+    output_path = Path(output_path)
+    models = heatmap_models(cube, include_all)
+    matrix, y_labels, x_labels = build_matrix(cube, models)
+    families = [m[0] for m in models]
+    low, high = interval_matrices(cube, cis, models) if cis is not None else (None, None)
+
+    # Check if there is any data to plot
+    if np.all(np.isnan(matrix)):
+        print("No scores found in the matrix. Generating empty heatmap template.")
+
+    tiles = page_tiles(len(models), len(x_labels), rows_per_page, cols_per_page)
+    written = []
+    built = False
+    for page, (rows, cols) in enumerate(tiles, 1):
+        path = output_path if len(tiles) == 1 else page_path(output_path, page)
+        suffix = "" if len(tiles) == 1 else f" (page {page}/{len(tiles)})"
+        intervals = None if cis is None else (low[rows, cols], high[rows, cols])
+        tile = (matrix[rows, cols], y_labels[rows], x_labels[cols], families[rows], suffix,
+                intervals)
+        built |= render_if_stale(path, tile, lambda tile=tile, path=path: plot_heatmap(
+            tile[0], tile[1], tile[2], str(path), families=tile[3], title_suffix=tile[4],
+            intervals=tile[5]), sources=[__file__], force=force)
+        written.append(path)
+
+    # Drop pages left over from a previous, longer model list, and the
+    # unpaged figure once the output is split into pages
+    stale = [path for path in output_path.parent.glob(
+        f"{output_path.stem}_p[0-9][0-9]*{output_path.suffix}") if path not in written]
+    if output_path not in written:
+        stale.append(output_path)
+    for path in stale:
+        path.unlink(missing_ok=True)
+        fingerprint_path(path).unlink(missing_ok=True)
+    return built
+
+
 def main():
-    repo_root = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Generate the scoring heatmap.")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-render even if the data is unchanged")
+    parser.add_argument("--all-models", action="store_true",
+                        help="Also show models not listed in MODEL_ORDER")
+    parser.add_argument("--rows-per-page", type=int, default=ROWS_PER_PAGE,
+                        help="Maximum models per page")
+    parser.add_argument("--cols-per-page", type=int, default=COLS_PER_PAGE,
+                        help="Maximum steps per page")
+    add_bootstrap_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.rows_per_page < 1 or args.cols_per_page < 1:
+        print("Error: --rows-per-page and --cols-per-page must be at least 1.")
+        sys.exit(1)
+
+    repo_root =Path(__file__).resolve().parent.parent
     csv_path = repo_root / "results" / "tables" / "scoring_matrix.csv"
     output_path = repo_root / "results" / "figures" / "scoring_heatmap.png"
 
@@ -224,14 +321,11 @@ def main():
         print(f"Error: {csv_path} not found.")
         sys.exit(1)
 
-    df = load_scores(str(csv_path))
-    matrix, y_labels, x_labels = build_matrix(df)
-
-    # Check if there is any data to plot
-    if np.all(np.isnan(matrix)):
-        print("No scores found in the matrix. Generating empty heatmap template.")
-
-    plot_heatmap(matrix, y_labels, x_labels, str(output_path))
+    with profiled(args):
+        cube = load_cube(csv_path)
+        cis = bootstrap_composites(cube, args.resamples, args.level, args.seed) if args.ci else None
+        render(cube, output_path, force=args.force, include_all=args.all_models,
+               rows_per_page=args.rows_per_page, cols_per_page=args.cols_per_page, cis=cis)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Write one evaluation page per model version and per pipeline step.
+
+Reads results/tables/scoring_matrix.csv into a single score cube and uses
+its per-model and per-step row indexes (built once, see ScoreCube) so that
+each page only touches its own rows. Produces:
+- evaluations/by_model/<family>_<version>.md — codes per step, composite
+  scores, failure codes, notes excerpts, a per-step score chart and a
+  dimension radar
+- evaluations/by_step/<number>_<name>.md — codes per model, dimension
+  means, failure codes, notes excerpts and a per-model score chart
+- an index.md in each directory linking the pages
+
+Charts go to a figures/ directory next to the pages and are only redrawn
+when their data changes (see scoring.depends); pages are only rewritten
+when their text changes. Pages are written on a process pool, and each
+process builds every chart template once and only swaps the data in for
+each page (see scoring.series).
+
+Usage:
+    python scripts/generate_pages.py [--models | --steps] [--jobs N] [--force]
+                                     [--profile] [--profile-json PATH] [--profile-stats PATH]
+
+Options:
+    --models   Only write the by_model pages
+    --steps    Only write the by_step pages
+    --jobs     Worker processes (default: CPU count)
+    --force    Rewrite every page and chart even if it is up to date
+    --profile  Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+               Also write the breakdown as JSON / cProfile stats to PATH
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from generate_radar import DIM_LABELS, FAMILY_STYLES  # noqa: E402
+from scoring import DIMENSIONS, ScoreCube, load_cube, render_if_stale  # noqa: E402
+from scoring.instrument import (add_profile_arguments, count, profiled,  # noqa: E402
+                                record_output, stage)
+from scoring.series import BarSeries, RadarSeries, template  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CSV_PATH = REPO_ROOT / "results" / "tables" / "scoring_matrix.csv"
+BY_MODEL = REPO_ROOT / "evaluations" / "by_model"
+BY_STEP = REPO_ROOT / "evaluations" / "by_step"
+NOTE_CHARS = 300
+OTHER_COLOR = "#94a3b8"
+RADAR_COLOR = "#6366f1"
+SOURCES = [__file__, Path(__file__).resolve().parent / "scoring" / "series.py"]
+
+HEADER = "*Auto-generated by `scripts/generate_pages.py` from `scoring_matrix.csv`.*\n"
+
+# Set in each worker by _init_worker
+_CUBE = None
+
+
+def model_slug(family: str, version: str) -> str:
+    return f"{family}_{version}"
+
+
+def step_slug(cube: ScoreCube, s: int) -> str:
+    return f"{cube.steps[s]}_{cube.step_names[s]}"
+
+
+def fmt(value: float) -> str:
+    return f"{value:.2f}" if not np.isnan(value) else "–"
+
+
+def excerpt(text, limit: int = NOTE_CHARS) -> str:
+    if pd.isna(text):
+        return ""
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def score_color(score: float) -> str:
+    """Same thresholds as the step difficulty chart."""
+    if score >= 0.85:
+        return "#10b981"
+    if score >= 0.7:
+        return "#f59e0b"
+    return "#ef4444"
+
+
+def row_codes(cube: ScoreCube, rows: np.ndarray) -> np.ndarray:
+    """(rows × dimension) letter codes, '' where unscored."""
+    enc = cube.encoded
+    letters = np.empty((len(rows), len(DIMENSIONS)), dtype=object)
+    for j in range(len(DIMENSIONS)):
+        letters[:, j] = np.append(enc.alphabets[j], "")[enc.codes[rows, j]]
+    return letters
+
+
+def failure_codes(cube: ScoreCube, rows: np.ndarray) -> list:
+    """Per dimension: "I ×3, A ×1" for the non-correct codes among ``rows``."""
+    enc = cube.encoded
+    lines = []
+    for j, dim in enumerate(DIMENSIONS):
+        failing = enc.scored[rows, j] & ~enc.correct[rows, j]
+        counts = np.bincount(enc.codes[rows[failing], j], minlength=len(enc.alphabets[j]))
+        order = np.argsort(-counts, kind="stable")
+        codes = ", ".join(f"{enc.alphabets[j][c]} ×{counts[c]}" for c in order if counts[c])
+        lines.append(f"| {dim} | {codes or 'none'} |")
+    return lines
+
+
+def notes(cube: ScoreCube, rows: np.ndarray) -> list:
+    if "notes" not in cube.df.columns:
+        return []
+    return [excerpt(text) for text in cube.df["notes"].array.take(rows)]
+
+
+def score_table(cube: ScoreCube, rows: np.ndarray, labels: list) -> list:
+    lines = ["| " + " | ".join(["", *DIMENSIONS, "Composite"]) + " |",
+             "|:--" + "|:-:" * len(DIMENSIONS) + "|--:|"]
+    codes = row_codes(cube, rows)
+    composites = cube.row_composite[rows]
+    for label, row_codes_, composite in zip(labels, codes, composites):
+        cells = [label, *(code or "·" for code in row_codes_), fmt(composite)]
+        lines.append("| " + " | ".join(cells) + " |")
+    return lines
+
+
+def write_if_changed(path: Path, text: str, force: bool = False) -> bool:
+    if not force and path.exists() and path.read_text() == text:
+        return False
+    path.write_text(text)
+    record_output(path)
+    return True
+
+
+def model_page(cube: ScoreCube, m: int, slug: str) -> str:
+    enc = cube.encoded
+    family, version = cube.models[m]
+    rows = cube.rows_by_model[m]
+    rows = rows[np.argsort(enc.step_index[rows], kind="stable")]
+    composite = cube.model_composites[m]
+    rank = int((cube.model_composites > composite).sum()) + 1
+    correct = (enc.scored[rows].all(axis=1) & enc.correct[rows].all(axis=1)).sum()
+
+    labels = [f"{cube.steps[s]}. {cube.step_names[s]}" for s in enc.step_index[rows]]
+    lines = [f"# {family} / {version}\n", HEADER,
+             f"Composite score **{fmt(composite)}** (rank {rank} of {len(cube.models)} models); "
+             f"{correct} of {len(rows)} steps fully correct.\n",
+             f"![Composite score per step](figures/{slug}.png) "
+             f"![Mean score per dimension](figures/{slug}_radar.png)\n",
+             "## Scores\n", *score_table(cube, rows, labels),
+             "\n## Failure codes\n", "| Dimension | Codes |", "|:--|:--|",
+             *failure_codes(cube, rows), "\n## Notes\n"]
+    lines += [f"- **{label}:** {note}" for label, note in zip(labels, notes(cube, rows)) if note]
+    return "\n".join(lines) + "\n"
+
+
+def step_page(cube: ScoreCube, s: int, figure: str) -> str:
+    enc = cube.encoded
+    rows = cube.rows_by_step[s]
+    composite = cube.step_composites[s]
+    rank = int((cube.step_composites < composite).sum()) + 1
+    correct = (enc.scored[rows].all(axis=1) & enc.correct[rows].all(axis=1)).sum()
+    values = enc.values[rows]
+    known = (~np.isnan(values)).sum(axis=0)
+    means = np.where(known > 0, np.nansum(values, axis=0) / np.maximum(known, 1), np.nan)
+    fully = enc.correct[rows].sum(axis=0) / max(len(rows), 1)
+
+    labels = [f"{cube.models[m][0]}/{cube.models[m][1]}" for m in enc.model_index[rows]]
+    lines = [f"# Step {cube.steps[s]}: {cube.step_names[s]}\n", HEADER,
+             f"Mean composite score **{fmt(composite)}** (difficulty rank {rank} of "
+             f"{len(cube.steps)}, hardest first); {correct} of {len(rows)} model responses "
+             f"fully correct.\n",
+             f"![Composite score per model]({figure})\n",
+             "## Dimensions\n", "| Dimension | Mean score | Fully correct |", "|:--|--:|--:|"]
+    lines += [f"| {dim} | {fmt(mean)} | {share:.0%} |"
+              for dim, mean, share in zip(DIMENSIONS, means, fully)]
+    lines += ["\n## Scores\n", *score_table(cube, rows, labels),
+              "\n## Failure codes\n", "| Dimension | Codes |", "|:--|:--|",
+              *failure_codes(cube, rows), "\n## Notes\n"]
+    lines += [f"- **{label}:** {note}" for label, note in zip(labels, notes(cube, rows)) if note]
+    return "\n".join(lines) + "\n"
+
+
+def render_model(cube: ScoreCube, m: int, output_dir: Path, force: bool = False) -> bool:
+    family, version = cube.models[m]
+    slug = model_slug(family, version)
+    labels = [f"{step}. {name}" for step, name in zip(cube.steps, cube.step_names)]
+    scores = cube.model_step_matrix[m]
+    bars = output_dir / "figures" / f"{slug}.png"
+    drawn = render_if_stale(
+        bars, [labels, scores],
+        lambda: template(("model bars", tuple(labels)),
+                         lambda: BarSeries(labels, "Composite score")).draw(
+            scores, [score_color(x) for x in scores], f"{family}/{version}", bars),
+        sources=SOURCES, force=force, quiet=True)
+    means = cube.model_dimension_means[m]
+    color = FAMILY_STYLES.get(family, {}).get("color", RADAR_COLOR)
+    radar = output_dir / "figures" / f"{slug}_radar.png"
+    drawn |= render_if_stale(
+        radar, [means, color],
+        lambda: template("radar", lambda: RadarSeries(DIM_LABELS)).draw(
+            means, color, f"{family}/{version}", radar),
+        sources=SOURCES, force=force, quiet=True)
+    written = write_if_changed(output_dir / f"{slug}.md", model_page(cube, m, slug), force)
+    return drawn or written
+
+
+def render_step(cube: ScoreCube, s: int, output_dir: Path, force: bool = False) -> bool:
+    slug = step_slug(cube, s)
+    figure = output_dir / "figures" / f"{slug}.png"
+    labels = [f"{family}/{version}" for family, version in cube.models]
+    scores = cube.model_step_matrix[:, s]
+    colors = [FAMILY_STYLES.get(family, {}).get("color", OTHER_COLOR)
+              for family, _ in cube.models]
+    drawn = render_if_stale(
+        figure, [labels, scores, colors],
+        lambda: template(("step bars", tuple(labels)),
+                         lambda: BarSeries(labels, "Composite score")).draw(
+            scores, colors, f"Step {cube.steps[s]}: {cube.step_names[s]}", figure),
+        sources=SOURCES, force=force, quiet=True)
+    written = write_if_changed(output_dir / f"{slug}.md",
+                               step_page(cube, s, f"figures/{slug}.png"), force)
+    return drawn or written
+
+
+def model_index(cube: ScoreCube) -> str:
+    lines = ["# Evaluations by model\n", HEADER, "| Model | Composite | Page |", "|:--|--:|:--|"]
+    for m, (family, version) in enumerate(cube.models):
+        slug = model_slug(family, version)
+        lines.append(f"| {family}/{version} | {fmt(cube.model_composites[m])} "
+                     f"| [{slug}.md]({slug}.md) |")
+    return "\n".join(lines) + "\n"
+
+
+def step_index(cube: ScoreCube) -> str:
+    lines = ["# Evaluations by step\n", HEADER, "| Step | Composite | Page |", "|:--|--:|:--|"]
+    for s, (step, name) in enumerate(zip(cube.steps, cube.step_names)):
+        slug = step_slug(cube, s)
+        lines.append(f"| {step}. {name} | {fmt(cube.step_composites[s])} "
+                     f"| [{slug}.md]({slug}.md) |")
+    return "\n".join(lines) + "\n"
+
+
+RENDERERS = {"model": (render_model, model_index), "step": (render_step, step_index)}
+
+
+def _init_worker(cube: ScoreCube):
+    global _CUBE
+    _CUBE = cube
+
+
+def _render_page(kind: str, index: int, output_dir: Path, force: bool) -> bool:
+    return RENDERERS[kind][0](_CUBE, index, output_dir, force)
+
+
+def render_pages(cube: ScoreCube, targets: dict, force: bool = False, jobs: int = None) -> int:
+    """Write every page of ``targets`` ({"model" | "step": output_dir}).
+
+    Returns the number of pages written or redrawn.
+    """
+    tasks = []
+    for kind, output_dir in targets.items():
+        (output_dir / "figures").mkdir(parents=True, exist_ok=True)
+        n_pages = len(cube.models) if kind == "model" else len(cube.steps)
+        tasks += [(kind, i, output_dir, force) for i in range(n_pages)]
+    # Build the group indexes and views before they are shipped to workers
+    for view in ("rows_by_model", "rows_by_step", "row_composite", "model_step_matrix",
+                 "model_composites", "step_composites", "model_dimension_means"):
+        getattr(cube, view)
+
+    jobs = jobs or os.cpu_count() or 1
+    with stage("pages"):
+        if jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(cube,)) as pool:
+                built = list(pool.map(_render_page, *zip(*tasks),
+                                      chunksize=max(1, len(tasks) // (4 * jobs))))
+        else:
+            built = [RENDERERS[kind][0](cube, i, output_dir, force)
+                     for kind, i, output_dir, force in tasks]
+    count("pages", len(tasks))
+
+    for kind, output_dir in targets.items():
+        built.append(write_if_changed(output_dir / "index.md", RENDERERS[kind][1](cube), force))
+    return sum(built)
+
+
+def render_model_pages(cube: ScoreCube, output_dir, force: bool = False) -> bool:
+    """build.py entry point: every by_model page, in the calling process."""
+    return render_pages(cube, {"model": Path(output_dir)}, force=force, jobs=1) > 0
+
+
+def render_step_pages(cube: ScoreCube, output_dir, force: bool = False) -> bool:
+    """build.py entry point: every by_step page, in the calling process."""
+    return render_pages(cube, {"step": Path(output_dir)}, force=force, jobs=1) > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write per-model and per-step pages.")
+    only = parser.add_mutually_exclusive_group()
+    only.add_argument("--models", action="store_true", help="Only write the by_model pages")
+    only.add_argument("--steps", action="store_true", help="Only write the by_step pages")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes")
+    parser.add_argument("--force", action="store_true",
+                        help="Rewrite every page and chart even if it is up to date")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if not CSV_PATH.exists():
+        print(f"Error: {CSV_PATH} not found.")
+        sys.exit(1)
+
+    targets = {}
+    if not args.steps:
+        targets["model"] = BY_MODEL
+    if not args.models:
+        targets["step"] = BY_STEP
+
+    with profiled(args):
+        cube = load_cube(CSV_PATH)
+        if not cube.encoded.n_rows:
+            print("No scores have been entered yet. Fill in scoring_matrix.csv and re-run.")
+            sys.exit(0)
+        written = render_pages(cube, targets, force=args.force, jobs=args.jobs)
+    for output_dir in targets.values():
+        print(f"Pages in {output_dir}")
+    print(f"{written} page(s) or chart(s) written, the rest up to date.")
+
+
+if __name__ == "__main__":
+    main()
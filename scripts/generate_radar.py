@@ -8,26 +8,36 @@ Produces:
 3. Step difficulty radar chart
 
 Usage:
-    python scripts/generate_radar.py
+    python scripts/generate_radar.py [--force] [--ci [--resamples N] [--level P] [--seed N]]
+                                     [--profile] [--profile-json PATH] [--profile-stats PATH]
+
+Options:
+    --force    Re-render every chart even if the data behind it is unchanged
+    --ci       Draw bootstrap confidence intervals on the step difficulty
+               bars and the version timeline
+    --resamples, --level, --seed
+               Bootstrap resamples (default: 2000), confidence level
+               (default: 0.95) and seed (default: 0) for --ci
+    --profile  Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+               Also write the breakdown as JSON / cProfile stats to PATH
 """
 
+import argparse
 import sys
 from pathlib import Path
 
 import numpy as np
-import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.patches import FancyBboxPatch
 
-SCORE_MAP = {
-    "tool_selection": {"C": 1.0, "A": 0.5, "I": 0.0},
-    "parameter_accuracy": {"C": 1.0, "P": 0.5, "I": 0.0},
-    "output_compatibility": {"P": 1.0, "F": 0.0},
-    "scientific_validity": {"S": 1.0, "Q": 0.5, "I": 0.0},
-    "executability": {"R": 1.0, "M": 0.5, "N": 0.0},
-}
+from scoring import DIMENSIONS, ScoreCube, load_cube, render_if_stale
+from scoring.bootstrap import CompositeCIs, add_bootstrap_arguments, bootstrap_composites
+from scoring.engine import MODEL_ORDER, SHORT_MODEL_LABELS
+from scoring.instrument import (add_profile_arguments, count, profiled, record_output, stage,
+                                timed)
 
-DIMENSIONS = list(SCORE_MAP.keys())
 DIM_LABELS = ["Tool\nSelection", "Parameter\nAccuracy", "Output\nCompat.", "Scientific\nValidity", "Execut-\nability"]
 
 FAMILY_STYLES = {
@@ -36,12 +46,13 @@ FAMILY_STYLES = {
     "gemini": {"color": "#f43f5e", "label": "Gemini"},
 }
 
+# Charted versions of each family, in release order
+VERSION_ORDER = {family: [version for fam, version in MODEL_ORDER if fam == family]
+                 for family in FAMILY_STYLES}
+
 
-def load_and_score(csv_path: str) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
-    for dim in DIMENSIONS:
-        df[f"{dim}_num"] = df[dim].map(SCORE_MAP[dim])
-    return df
+def load_and_score(csv_path: str) -> ScoreCube:
+    return load_cube(csv_path)
 
 
 def radar_chart(ax, values_list, labels, colors, title):
@@ -69,53 +80,48 @@ def radar_chart(ax, values_list, labels, colors, title):
     ax.legend(loc="upper right", bbox_to_anchor=(1.35, 1.1), fontsize=7, frameon=False)
 
 
-def plot_family_radars(df: pd.DataFrame, output_path: str):
+@timed("plot_family_radars")
+def plot_family_radars(cube: ScoreCube, output_path: str):
     """Radar chart: average score per dimension per model family."""
     fig, axes = plt.subplots(1, 3, figsize=(14, 5), subplot_kw={"projection": "polar"})
 
     for idx, (family, style) in enumerate(FAMILY_STYLES.items()):
-        fam_df = df[df["model_family"] == family]
-        versions = fam_df["model_version"].unique()
+        versions, means = cube.family_dimension_means.get(family, ([], np.empty((0, len(DIMENSIONS)))))
 
-        values_list = []
-        labels = []
         n = len(versions)
-        cmap = plt.cm.get_cmap("viridis", max(n, 2))
+        cmap = matplotlib.colormaps["viridis"].resampled(max(n, 2))
 
-        for i, ver in enumerate(versions):
-            ver_df = fam_df[fam_df["model_version"] == ver]
-            means = np.array([ver_df[f"{d}_num"].mean() for d in DIMENSIONS])
-            values_list.append(means)
-            labels.append(ver.replace("_", " "))
+        values_list = list(means)
+        labels = [ver.replace("_", " ") for ver in versions]
 
         colors = [cmap(i / max(n - 1, 1)) for i in range(n)]
         radar_chart(axes[idx], values_list, labels, colors, style["label"])
+        count("cells_rendered", means.size)
 
-    plt.tight_layout()
-    fig.savefig(output_path, dpi=200, bbox_inches="tight", facecolor="white")
+    with stage("tight_layout"):
+        plt.tight_layout()
+    with stage("savefig"):
+        fig.savefig(output_path, dpi=200, bbox_inches="tight", facecolor="white")
+    record_output(output_path)
     print(f"Family radars saved to {output_path}")
     plt.close()
 
 
-def plot_step_difficulty(df: pd.DataFrame, output_path: str):
-    """Horizontal bar chart: average composite score per step, color-coded."""
+@timed("plot_step_difficulty")
+def plot_step_difficulty(cube: ScoreCube, output_path: str, cis: CompositeCIs = None):
+    """Horizontal bar chart: average composite score per step, color-coded.
+
+    With ``cis``, each bar gets its bootstrap interval as an error bar.
+    """
     fig, ax = plt.subplots(figsize=(8, 5))
 
-    steps = sorted(df["step_number"].unique())
+    steps = list(cube.steps)
     step_names = {
         1: "Basecalling", 2: "QC", 3: "Host Depletion",
         4: "Taxonomy", 5: "Assembly", 6: "Binning", 7: "Annotation"
     }
 
-    scores = []
-    for s in steps:
-        sdf = df[df["step_number"] == s]
-        vals = []
-        for _, row in sdf.iterrows():
-            row_scores = [row.get(f"{d}_num") for d in DIMENSIONS]
-            if all(v is not None and not np.isnan(v) for v in row_scores):
-                vals.append(np.mean(row_scores))
-        scores.append(np.mean(vals) if vals else 0)
+    scores = np.nan_to_num(cube.step_composites, nan=0.0).tolist()
 
     colors = []
     for s in scores:
@@ -127,7 +133,13 @@ def plot_step_difficulty(df: pd.DataFrame, output_path: str):
             colors.append("#ef4444")
 
     y_pos = np.arange(len(steps))
-    bars = ax.barh(y_pos, scores, color=colors, height=0.6, edgecolor="white", linewidth=0.5)
+    xerr = None
+    if cis is not None:
+        estimate = np.nan_to_num(cis.step.estimate)
+        xerr = np.nan_to_num([estimate - cis.step.low, cis.step.high - estimate])
+    bars = ax.barh(y_pos, scores, color=colors, height=0.6, edgecolor="white", linewidth=0.5,
+                   xerr=xerr, error_kw={"ecolor": "#334155", "capsize": 3, "elinewidth": 1})
+    count("cells_rendered", len(scores))
 
     ax.set_yticks(y_pos)
     ax.set_yticklabels([f"{s}. {step_names.get(s, '')}" for s in steps], fontsize=9)
@@ -136,8 +148,11 @@ def plot_step_difficulty(df: pd.DataFrame, output_path: str):
     ax.set_title("Step Difficulty Ranking", fontsize=12, fontweight="bold", color="#1e293b", pad=12)
     ax.invert_yaxis()
 
-    for bar, score in zip(bars, scores):
-        ax.text(bar.get_width() + 0.02, bar.get_y() + bar.get_height() / 2,
+    label_x = [bar.get_width() for bar in bars]
+    if xerr is not None:
+        label_x = np.add(label_x, xerr[1])
+    for bar, x, score in zip(bars, label_x, scores):
+        ax.text(x + 0.02, bar.get_y() + bar.get_height() / 2,
                 f"{score:.2f}", va="center", fontsize=8, fontweight="bold", color="#334155")
 
     ax.spines["top"].set_visible(False)
@@ -145,54 +160,47 @@ def plot_step_difficulty(df: pd.DataFrame, output_path: str):
     ax.spines["bottom"].set_color("#e2e8f0")
     ax.spines["left"].set_color("#e2e8f0")
 
-    plt.tight_layout()
-    fig.savefig(output_path, dpi=200, bbox_inches="tight", facecolor="white")
+    with stage("tight_layout"):
+        plt.tight_layout()
+    with stage("savefig"):
+        fig.savefig(output_path, dpi=200, bbox_inches="tight", facecolor="white")
+    record_output(output_path)
     print(f"Step difficulty chart saved to {output_path}")
     plt.close()
 
 
-def plot_version_timeline(df: pd.DataFrame, output_path: str):
-    """Line chart: composite score over model versions (chronological) per family."""
-    fig, ax = plt.subplots(figsize=(12, 5))
+@timed("plot_version_timeline")
+def plot_version_timeline(cube: ScoreCube, output_path: str, cis: CompositeCIs = None):
+    """Line chart: composite score over model versions (chronological) per family.
 
-    version_order = {
-        "openai": ["gpt4o", "o1_preview", "o1_mini", "o1", "o1_pro", "o3_mini", "o3_high", "o4_mini", "gpt5"],
-        "claude": ["sonnet_3.5", "sonnet_4", "sonnet_4.5", "haiku_4.5", "opus_4.5", "opus_4.6"],
-        "gemini": ["2.0_flash", "2.5_pro_preview", "2.5_flash", "2.5_pro_stable", "3_pro", "3_flash"],
-    }
-
-    version_labels = {
-        "gpt4o": "GPT-4o", "o1_preview": "o1-prev", "o1_mini": "o1-mini", "o1": "o1",
-        "o1_pro": "o1-pro", "o3_mini": "o3-mini", "o3_high": "o3", "o4_mini": "o4-mini", "gpt5": "GPT-5",
-        "sonnet_3.5": "S3.5", "sonnet_4": "S4", "sonnet_4.5": "S4.5",
-        "haiku_4.5": "H4.5", "opus_4.5": "Op4.5", "opus_4.6": "Op4.6",
-        "2.0_flash": "2.0F", "2.5_pro_preview": "2.5PP", "2.5_flash": "2.5F",
-        "2.5_pro_stable": "2.5P", "3_pro": "3P", "3_flash": "3F",
-    }
+    With ``cis``, each line gets a shaded bootstrap interval band.
+    """
+    fig, ax = plt.subplots(figsize=(12, 5))
 
     for family, style in FAMILY_STYLES.items():
-        versions = version_order.get(family, [])
+        versions = VERSION_ORDER.get(family, [])
         x_vals = []
         y_vals = []
+        positions = []
         for i, ver in enumerate(versions):
-            ver_df = df[(df["model_family"] == family) & (df["model_version"] == ver)]
-            if len(ver_df) == 0:
+            pos = cube.model_position.get((family, ver))
+            if pos is None or np.isnan(cube.model_composites[pos]):
                 continue
-            scores = []
-            for _, row in ver_df.iterrows():
-                row_scores = [row.get(f"{d}_num") for d in DIMENSIONS]
-                if all(v is not None and not np.isnan(v) for v in row_scores):
-                    scores.append(np.mean(row_scores))
-            if scores:
-                x_vals.append(i)
-                y_vals.append(np.mean(scores))
+            x_vals.append(i)
+            y_vals.append(cube.model_composites[pos])
+            positions.append(pos)
 
         ax.plot(x_vals, y_vals, "o-", color=style["color"], linewidth=2, markersize=6,
                 label=style["label"], zorder=3)
+        count("cells_rendered", len(y_vals))
+        if cis is not None and positions:
+            ax.fill_between(x_vals, cis.model.low[positions], cis.model.high[positions],
+                            color=style["color"], alpha=0.15, linewidth=0, zorder=2)
 
         # Label last point
         if x_vals and y_vals:
-            ax.annotate(version_labels.get(versions[x_vals[-1]], versions[x_vals[-1]]),
+            last = versions[x_vals[-1]]
+            ax.annotate(SHORT_MODEL_LABELS.get((family, last), last),
                         (x_vals[-1], y_vals[-1]), textcoords="offset points",
                         xytext=(8, 4), fontsize=7, color=style["color"], fontweight="bold")
 
@@ -213,13 +221,73 @@ def plot_version_timeline(df: pd.DataFrame, output_path: str):
     ax.spines["left"].set_color("#e2e8f0")
     ax.grid(True, alpha=0.15)
 
-    plt.tight_layout()
-    fig.savefig(output_path, dpi=200, bbox_inches="tight", facecolor="white")
+    with stage("tight_layout"):
+        plt.tight_layout()
+    with stage("savefig"):
+        fig.savefig(output_path, dpi=200, bbox_inches="tight", facecolor="white")
+    record_output(output_path)
     print(f"Timeline chart saved to {output_path}")
     plt.close()
 
 
+def family_radar_inputs(cube: ScoreCube):
+    """Slice of the cube drawn by plot_family_radars."""
+    empty = ([], np.empty((0, len(DIMENSIONS))))
+    return [(family, *cube.family_dimension_means.get(family, empty))
+            for family in FAMILY_STYLES]
+
+
+def step_difficulty_inputs(cube: ScoreCube, cis: CompositeCIs = None):
+    """Slice of the cube drawn by plot_step_difficulty."""
+    inputs = [cube.steps, cube.step_composites]
+    if cis is not None:
+        inputs += [cis.step.low, cis.step.high]
+    return inputs
+
+
+def version_timeline_inputs(cube: ScoreCube, cis: CompositeCIs = None):
+    """Slice of the cube drawn by plot_version_timeline."""
+    tables = [cube.model_composites]
+    if cis is not None:
+        tables += [cis.model.low, cis.model.high]
+    inputs = []
+    for family in FAMILY_STYLES:
+        positions = [cube.model_position.get((family, ver))
+                     for ver in VERSION_ORDER.get(family, [])]
+        for table in tables:
+            inputs.append(np.array([np.nan if pos is None else table[pos]
+                                    for pos in positions]))
+    return inputs
+
+
+def render_family_radar(cube: ScoreCube, output_path, force: bool = False) -> bool:
+    return render_if_stale(output_path, family_radar_inputs(cube),
+                           lambda: plot_family_radars(cube, str(output_path)),
+                           sources=[__file__], force=force)
+
+
+def render_step_difficulty(cube: ScoreCube, output_path, force: bool = False,
+                           cis: CompositeCIs = None) -> bool:
+    return render_if_stale(output_path, step_difficulty_inputs(cube, cis),
+                           lambda: plot_step_difficulty(cube, str(output_path), cis),
+                           sources=[__file__], force=force)
+
+
+def render_version_timeline(cube: ScoreCube, output_path, force: bool = False,
+                            cis: CompositeCIs = None) -> bool:
+    return render_if_stale(output_path, version_timeline_inputs(cube, cis),
+                           lambda: plot_version_timeline(cube, str(output_path), cis),
+                           sources=[__file__], force=force)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate radar, difficulty and timeline charts.")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-render even if the data is unchanged")
+    add_bootstrap_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
     repo_root = Path(__file__).resolve().parent.parent
     csv_path = repo_root / "results" / "tables" / "scoring_matrix.csv"
     figs = repo_root / "results" / "figures"
@@ -228,11 +296,13 @@ def main():
         print(f"Error: {csv_path} not found.")
         sys.exit(1)
 
-    df = load_and_score(str(csv_path))
+    with profiled(args):
+        cube = load_and_score(str(csv_path))
+        cis = bootstrap_composites(cube, args.resamples, args.level, args.seed) if args.ci else None
 
-    plot_family_radars(df, str(figs / "family_radar.png"))
-    plot_step_difficulty(df, str(figs / "step_difficulty.png"))
-    plot_version_timeline(df, str(figs / "version_timeline.png"))
+        render_family_radar(cube, figs / "family_radar.png", force=args.force)
+        render_step_difficulty(cube, figs / "step_difficulty.png", force=args.force, cis=cis)
+        render_version_timeline(cube, figs / "version_timeline.png", force=args.force, cis=cis)
 
 
 if __name__ == "__main__":
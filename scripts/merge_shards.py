@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Merge per-rater scoring-matrix shards into results/tables/scoring_matrix.csv.
+
+Reads every *.csv in the shard directory in parallel, deduplicates rows by
+(model_family, model_version, step_number) and resolves conflicting codes
+with --policy (see scoring.shards). Conflicts are listed, and the merged
+matrix is validated (see scoring.validate) before it is written. The
+output is only rewritten when its content changes, so caches and figure
+fingerprints stay valid.
+
+Usage:
+    python scripts/merge_shards.py [DIR] [--policy POLICY] [--jobs N] [--output PATH]
+                                   [--conflicts PATH] [--max-conflicts N] [--any-model]
+                                   [--profile] [--profile-json PATH] [--profile-stats PATH]
+
+Options:
+    DIR              Shard directory (default: results/tables/shards)
+    --policy         error (default), first, last, lowest, highest or majority;
+                     with error, any conflict stops the merge
+    --jobs           Worker processes (default: one per shard, capped at CPU count)
+    --output         Merged matrix (default: results/tables/scoring_matrix.csv)
+    --conflicts      Also write every conflict to PATH as CSV
+    --max-conflicts  Conflicts to print (default: 50; 0 prints all)
+    --any-model      Do not check models against scoring.engine.KNOWN_MODELS,
+                     e.g. when a shard adds a new model version
+    --profile        Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                     Also write the breakdown as JSON / cProfile stats to PATH
+
+Exits 1 if the merge fails (conflicts under --policy error, or an invalid
+merged matrix).
+"""
+
+import argparse
+import sys
+from itertools import groupby
+from operator import attrgetter
+from pathlib import Path
+
+from scoring.instrument import add_profile_arguments, profiled, record_output, stage
+from scoring.shards import POLICIES, MergedScores, load_shards, shard_paths
+from scoring.engine import KNOWN_MODELS
+from scoring.validate import validate_scores
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SHARD_DIR = REPO_ROOT / "results" / "tables" / "shards"
+OUTPUT_PATH = REPO_ROOT / "results" / "tables" / "scoring_matrix.csv"
+MAX_CONFLICTS = 50
+
+
+def format_conflicts(merged: MergedScores, max_conflicts: int = None) -> str:
+    lines = [f"Merged {len(merged.shards)} shard(s): {merged.rows_read} rows -> "
+             f"{len(merged.table)} (model, step) rows."]
+    if not merged.n_conflicts:
+        lines.append("No conflicting scores.")
+        return "\n".join(lines)
+    action = "not resolved" if merged.policy == "error" else f"resolved by '{merged.policy}'"
+    lines.append(f"{merged.n_conflicts} conflicting score(s), {action}:")
+    cell = ["dimension", "model_family", "model_version", "step_number"]
+    shown = 0
+    for (dim, family, version, step), rows in groupby(
+            merged.conflicts.itertuples(index=False), key=attrgetter(*cell)):
+        if max_conflicts is not None and shown == max_conflicts:
+            break
+        rows = list(rows)
+        codes = "; ".join(f"{row.shard}: {row.code}" for row in rows)
+        resolved = "" if merged.policy == "error" else f" -> {rows[0].resolved}"
+        lines.append(f"  {family}/{version} step {step} {dim}: {codes}{resolved}")
+        shown += 1
+    if shown < merged.n_conflicts:
+        lines.append(f"  … and {merged.n_conflicts - shown} more")
+    return "\n".join(lines)
+
+
+def merge(shard_dir: Path, output_path: Path, policy: str = "error", jobs: int = None,
+          conflicts_path: Path = None, max_conflicts: int = MAX_CONFLICTS,
+          known_models=KNOWN_MODELS) -> bool:
+    """Merge ``shard_dir`` into ``output_path``; returns False if the merge failed.
+
+    ``known_models`` is passed to ``validate_scores`` (None accepts any model).
+    """
+    merged = load_shards(shard_dir, policy=policy, jobs=jobs)
+    print(format_conflicts(merged, max_conflicts or None))
+    if conflicts_path:
+        merged.conflicts.to_csv(conflicts_path, index=False)
+        record_output(conflicts_path)
+        print(f"Conflicts written to {conflicts_path}")
+    if not merged.ok:
+        print("Resolve the conflicts in the shards or choose a --policy; nothing written.")
+        return False
+
+    report = validate_scores(merged.table, known_models=known_models)
+    if not report.ok:
+        print(report.format(max_issues=max_conflicts or None))
+        print("Merged matrix is invalid; nothing written.")
+        if report.issues["problem"].str.startswith("unknown model").any():
+            print("Pass --any-model to accept model versions not in KNOWN_MODELS.")
+        return False
+
+    with stage("write csv"):
+        text = merged.table.to_csv(index=False)
+    if output_path.exists() and output_path.read_text() == text:
+        print(f"Up to date: {output_path}")
+        return True
+    output_path.write_text(text)
+    record_output(output_path)
+    print(f"Merged matrix written to {output_path}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge scoring-matrix shards.")
+    parser.add_argument("shard_dir", nargs="?", type=Path, default=SHARD_DIR,
+                        help="Shard directory")
+    parser.add_argument("--policy", choices=POLICIES, default="error",
+                        help="How to resolve conflicting codes")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Merged matrix")
+    parser.add_argument("--conflicts", type=Path, default=None,
+                        help="Also write every conflict to PATH as CSV")
+    parser.add_argument("--max-conflicts", type=int, default=MAX_CONFLICTS,
+                        help="Conflicts to print (0 prints all)")
+    parser.add_argument("--any-model", action="store_true",
+                        help="Do not check models against KNOWN_MODELS")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.shard_dir.is_dir():
+        print(f"Error: {args.shard_dir} is not a directory.")
+        sys.exit(1)
+    if not shard_paths(args.shard_dir):
+        print(f"Error: no *.csv shards in {args.shard_dir}.")
+        sys.exit(1)
+
+    with profiled(args):
+        ok = merge(args.shard_dir, args.output, policy=args.policy, jobs=args.jobs,
+                   conflicts_path=args.conflicts, max_conflicts=args.max_conflicts,
+                   known_models=None if args.any_model else KNOWN_MODELS)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Draft tool_selection and parameter_accuracy codes from the responses.
+
+Pulls the shell code blocks out of each conversation under
+responses/<family>/<version>/ (as grouped by check_dataflow.py, so every
+run<k>/ replicate is scored on its own), parses the tool invocations
+(dorado, kraken2, flye, minimap2, ...) and matches them against a lookup
+table compiled once from methodology/pipeline_reference.md and the Tool
+Selection rubric in methodology/scoring_criteria.md (see
+scoring.prescore). Conversations are processed in parallel.
+
+The drafts are written in the scoring_matrix.csv schema with the other
+three dimensions left blank and the reasons in notes ("draft (<run>): ..."),
+so a rater can confirm or correct them and add the file to
+results/tables/shards/ for merge_shards.py.
+
+Usage:
+    python scripts/prescore_responses.py [--family NAME] [--version NAME] [--new-only]
+                                         [--jobs N] [--root DIR] [--output PATH]
+                                         [--show-reference] [--profile] [--profile-json PATH]
+                                         [--profile-stats PATH]
+
+Options:
+    --family          Only this family (directory or scoring-matrix name, e.g. chatgpt or openai)
+    --version         Only this version
+    --new-only        Skip versions that already have rows in scoring_matrix.csv
+    --jobs            Worker processes (default: one per conversation, capped at CPU count)
+    --root            Transcript tree (default: responses/)
+    --output          Draft rows (default: results/tables/drafts/prescore.csv)
+    --show-reference  Print the compiled lookup table and exit
+    --profile         Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                      Also write the breakdown as JSON / cProfile stats to PATH
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from scoring.corpus import conversations, prompt_steps, read_turns
+from scoring.engine import DIMENSIONS
+from scoring.instrument import add_profile_arguments, count, profiled, record_output, stage, timed
+from scoring.prescore import compile_reference, prescore_turns
+from scoring.validate import KEY_COLUMNS
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESPONSES_DIR = REPO_ROOT / "responses"
+PROMPTS_DIR = REPO_ROOT / "prompts"
+REFERENCE_PATH = REPO_ROOT / "methodology" / "pipeline_reference.md"
+CRITERIA_PATH = REPO_ROOT / "methodology" / "scoring_criteria.md"
+CSV_PATH = REPO_ROOT / "results" / "tables" / "scoring_matrix.csv"
+OUTPUT_PATH = REPO_ROOT / "results" / "tables" / "drafts" / "prescore.csv"
+COLUMNS = KEY_COLUMNS + DIMENSIONS + ["notes"]
+
+_TABLE = None
+_STEPS = None
+
+
+def _init_worker(table, steps):
+    global _TABLE, _STEPS
+    _TABLE, _STEPS = table, steps
+
+
+def _score_conversation(conversation) -> list:
+    """Draft rows of one conversation."""
+    label, family, version, paths = conversation
+    turns = []
+    for path in paths:
+        turns.extend(read_turns(path, _STEPS)[1])
+    rows = []
+    for step, draft in prescore_turns(_TABLE, turns).items():
+        rows.append({"model_family": family, "model_version": version, "step_number": step,
+                     "step_name": _STEPS[step], "tool_selection": draft.tool_selection,
+                     "parameter_accuracy": draft.parameter_accuracy,
+                     "output_compatibility": "", "scientific_validity": "", "executability": "",
+                     "notes": draft.notes.replace("draft:", f"draft ({label}):", 1)})
+    return rows
+
+
+@timed("prescore")
+def prescore_conversations(tasks: list, table, steps: dict, jobs: int = None) -> pd.DataFrame:
+    """Draft rows of every conversation in ``tasks``, in task order."""
+    jobs = jobs or min(len(tasks), os.cpu_count() or 1)
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(table, steps)) as pool:
+            results = list(pool.map(_score_conversation, tasks))
+    else:
+        _init_worker(table, steps)
+        results = [_score_conversation(task) for task in tasks]
+    count("conversations", len(tasks))
+    return pd.DataFrame([row for rows in results for row in rows], columns=COLUMNS)
+
+
+def scored_versions(csv_path: Path) -> set:
+    if not csv_path.exists():
+        return set()
+    df = pd.read_csv(csv_path, usecols=["model_family", "model_version"])
+    return set(df.itertuples(index=False, name=None))
+
+
+def format_reference(table) -> str:
+    lines = []
+    for step, ref in table.steps.items():
+        lines.append(f"Step {step}: {ref.title}")
+        for code, tools in (("C", ref.validated), ("A", ref.acceptable), ("I", ref.incorrect)):
+            if tools:
+                lines.append(f"  {code}: {', '.join(sorted(tools))}")
+        for rule in ref.rules:
+            lines.append(f"  expects {rule.describe()}")
+    lines.append(f"Incorrect at other steps: {', '.join(sorted(table.rubric_incorrect))}")
+    return "\n".join(lines)
+
+
+def format_summary(n_conversations: int, drafts: pd.DataFrame) -> str:
+    if drafts.empty:
+        return "No responses to pre-score."
+    lines = [f"{len(drafts)} draft row(s) for {n_conversations} conversation(s) of "
+             f"{len(drafts.groupby(['model_family', 'model_version']))} version(s)."]
+    for dim in ("tool_selection", "parameter_accuracy"):
+        counts = drafts[dim].replace("", "blank").value_counts()
+        lines.append(f"  {dim}: " + ", ".join(f"{code} {n}" for code, n in counts.items()))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-score responses from their commands.")
+    parser.add_argument("--family", default=None, help="Only this family")
+    parser.add_argument("--version", default=None, help="Only this version")
+    parser.add_argument("--new-only", action="store_true",
+                        help="Skip versions already in scoring_matrix.csv")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes")
+    parser.add_argument("--root", type=Path, default=RESPONSES_DIR, help="Transcript tree")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Draft rows")
+    parser.add_argument("--show-reference", action="store_true",
+                        help="Print the compiled lookup table and exit")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profiled(args):
+        table = compile_reference(REFERENCE_PATH, CRITERIA_PATH)
+        if args.show_reference:
+            print(format_reference(table))
+            return
+        if not args.root.is_dir():
+            print(f"Error: {args.root} is not a directory.")
+            sys.exit(1)
+        steps = prompt_steps(PROMPTS_DIR)
+        tasks = conversations(args.root, steps, args.family, args.version)
+        if args.new_only:
+            scored = scored_versions(CSV_PATH)
+            tasks = [task for task in tasks if task[1:3] not in scored]
+        if not tasks:
+            print("No matching conversations.")
+            sys.exit(1)
+
+        drafts = prescore_conversations(tasks, table, steps, jobs=args.jobs)
+        print(format_summary(len(tasks), drafts))
+        if drafts.empty:
+            return
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with stage("write csv"):
+            drafts.to_csv(args.output, index=False)
+        record_output(args.output)
+        print(f"Draft rows written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
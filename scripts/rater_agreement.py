@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Inter-rater agreement between per-rater scoring-matrix shards.
+
+Every *.csv in the shard directory is one rater's scores (file name =
+rater). Rows are matched by (model_family, model_version, step_number) and
+every score dimension is compared as a nominal code (see scoring.agreement).
+Reported, per dimension:
+- observed agreement, mean pairwise Cohen's kappa, Fleiss' kappa and
+  Krippendorff's alpha, overall, per step and per model family
+- Cohen's kappa of every pair of raters
+- the rows with the most disagreeing rater pairs, with every rater's codes,
+  for adjudication
+
+Usage:
+    python scripts/rater_agreement.py [DIR] [--top N] [--jobs N] [--disputed PATH]
+                                      [--profile] [--profile-json PATH] [--profile-stats PATH]
+
+Options:
+    DIR         Shard directory (default: results/tables/shards)
+    --top       Most disputed rows to print (default: 20; 0 prints none)
+    --jobs      Worker processes for reading shards (default: one per shard,
+                capped at CPU count)
+    --disputed  Also write every row with any disagreement to PATH as CSV,
+                most disputed first
+    --profile   Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                Also write the breakdown as JSON / cProfile stats to PATH
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scoring.agreement import ALPHABETS, Agreement, AgreementTable, agreement, load_ratings
+from scoring.engine import DIMENSIONS
+from scoring.instrument import add_profile_arguments, profiled, record_output, stage
+from scoring.shards import shard_paths
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SHARD_DIR = REPO_ROOT / "results" / "tables" / "shards"
+TOP = 20
+
+
+def fmt(value: float) -> str:
+    return f"{value:.2f}" if not np.isnan(value) else "–"
+
+
+def format_table(title: str, table: AgreementTable) -> list:
+    lines = [f"\n{title}"]
+    width = max(len(label) for label in table.labels + ["all"])
+    header = f"  {'':<{width}}  " + "  ".join(f"{dim:>29}" for dim in DIMENSIONS)
+    lines.append(header)
+    lines.append(f"  {'':<{width}}  " + "  ".join(
+        f"{'n':>4} {'obs':>5} {'cohen':>5} {'fleiss':>6} {'alpha':>5}" for _ in DIMENSIONS))
+    for g, label in enumerate(table.labels):
+        cells = [f"{int(table.items[j, g]):>4} {fmt(table.observed[j, g]):>5} "
+                 f"{fmt(table.cohen[j, g]):>5} {fmt(table.fleiss[j, g]):>6} "
+                 f"{fmt(table.alpha[j, g]):>5}" for j in range(len(DIMENSIONS))]
+        lines.append(f"  {label:<{width}}  " + "  ".join(cells))
+    return lines
+
+
+def format_pairs(result: Agreement) -> list:
+    raters = result.ratings.raters
+    lines = ["\nCohen's kappa per rater pair (items coded by both)"]
+    width = max(len(f"{raters[a]} / {raters[b]}") for a, b in result.pairs)
+    lines.append(f"  {'':<{width}}  " + "  ".join(f"{dim:>29}" for dim in DIMENSIONS))
+    for p, (a, b) in enumerate(result.pairs):
+        cells = [f"{fmt(result.pair_kappa[j, p]):>21} ({int(result.pair_items[j, p]):>5})"
+                 for j in range(len(DIMENSIONS))]
+        lines.append(f"  {f'{raters[a]} / {raters[b]}':<{width}}  " + "  ".join(cells))
+    return lines
+
+
+def rater_codes(result: Agreement, item: int, j: int) -> str:
+    codes = result.ratings.codes[item, :, j]
+    return " ".join(ALPHABETS[j][c] if c >= 0 else "·" for c in codes)
+
+
+def disputed_frame(result: Agreement, items: np.ndarray) -> pd.DataFrame:
+    """One row per disputed item with every rater's code per dimension."""
+    frame = result.ratings.items.iloc[items].reset_index(drop=True)
+    frame["disagreeing_pairs"] = result.disagreement[items].astype(int)
+    for j, dim in enumerate(DIMENSIONS):
+        frame[dim] = [rater_codes(result, item, j) for item in items]
+    return frame
+
+
+def format_disputed(result: Agreement, top: int) -> list:
+    items = result.most_disputed(top)
+    n_disputed = int((result.disagreement > 0).sum())
+    lines = [f"\n{n_disputed} row(s) with disagreement; most disputed first "
+             f"(codes in rater order: {', '.join(result.ratings.raters)}; · = not rated)"]
+    for item in items:
+        row = result.ratings.items.iloc[item]
+        codes = "  ".join(f"{dim}: {rater_codes(result, item, j)}"
+                          for j, dim in enumerate(DIMENSIONS))
+        lines.append(f"  {row.model_family}/{row.model_version} step {row.step_number} "
+                     f"[{int(result.disagreement[item])}]  {codes}")
+    if len(items) < n_disputed:
+        lines.append(f"  … and {n_disputed - len(items)} more")
+    return lines
+
+
+def format_report(result: Agreement, top: int = TOP) -> str:
+    ratings = result.ratings
+    lines = [f"{len(ratings.raters)} rater(s) over {len(ratings.items)} (model, step) rows.",
+             "n = rows coded by at least two raters; obs = observed agreement; "
+             "cohen = mean pairwise Cohen's kappa; alpha = Krippendorff's alpha (nominal)."]
+    lines += format_table("Overall", result.overall)
+    lines += format_table("By step", result.by_step)
+    lines += format_table("By model family", result.by_family)
+    lines += format_pairs(result)
+    if top:
+        lines += format_disputed(result, top)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inter-rater agreement between shards.")
+    parser.add_argument("shard_dir", nargs="?", type=Path, default=SHARD_DIR,
+                        help="Shard directory")
+    parser.add_argument("--top", type=int, default=TOP, help="Most disputed rows to print")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes")
+    parser.add_argument("--disputed", type=Path, default=None,
+                        help="Also write every row with any disagreement to PATH as CSV")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.shard_dir.is_dir():
+        print(f"Error: {args.shard_dir} is not a directory.")
+        sys.exit(1)
+    paths = shard_paths(args.shard_dir)
+    if len(paths) < 2:
+        print(f"Error: need at least two *.csv shards (one per rater) in {args.shard_dir}.")
+        sys.exit(1)
+
+    with profiled(args):
+        result = agreement(load_ratings(args.shard_dir, jobs=args.jobs))
+        with stage("report"):
+            print(format_report(result, args.top))
+        if args.disputed:
+            frame = disputed_frame(result, result.most_disputed(len(result.disagreement)))
+            frame.to_csv(args.disputed, index=False)
+            record_output(args.disputed)
+            print(f"\nDisputed rows written to {args.disputed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Run the sequential prompts against the configured models.
+
+Every (model, replicate) pair is one conversation: prompts/step_01 ...
+step_07 sent in order, each with the full history (see
+methodology/evaluation_framework.md). Conversations run concurrently on
+one asyncio loop, bounded per backend by its rate limit and in-flight
+cap, with transient failures retried (see scoring.runner). Answers are
+written to responses/<family>/<version>/run<k>/step_0N_<name>.md with a
+checkpoint after every step, so an interrupted run picks up where it
+stopped when started again.
+
+The models and backends come from a JSON config (format in
+scoring.runner). With --stub, a local stub server (scoring.stub_server) is
+started and every model is routed to it through the backend of its
+family (chatgpt -> openai, claude -> anthropic, gemini -> gemini); without
+--config the models are the version directories already under
+responses/. --serve runs the stub server on its own, for a config whose
+base_url points at it.
+
+Usage:
+    python scripts/run_prompts.py --config PATH [--family NAME] [--version NAME]
+                                  [--replicates N] [--root DIR] [--prompts DIR]
+                                  [--retries N] [--restart] [--list] [--profile]
+    python scripts/run_prompts.py --stub --root DIR [--stub-latency S] [--stub-error-rate P] ...
+    python scripts/run_prompts.py --serve PORT [--stub-latency S] [--stub-error-rate P]
+
+Options:
+    --config           Backends and models (JSON)
+    --family           Only this family (directory name, e.g. chatgpt)
+    --version          Only this version
+    --replicates       Conversations per model (default: 1)
+    --root             Where transcripts go (default: responses/)
+    --prompts          Prompt files (default: prompts/)
+    --retries          Retries of a transient failure (default: 5)
+    --restart          Ignore checkpoints and start every conversation over
+    --list             Show the conversations and how far each got, then exit
+    --stub             Route every model to an in-process stub server
+    --serve            Run the stub server on PORT until interrupted
+    --stub-latency     Mean seconds the stub takes per answer (default: 0)
+    --stub-error-rate  Share of stub requests that fail with 429/503 (default: 0)
+    --concurrency      Requests in flight per backend with --stub (default: 64)
+    --profile          Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                       Also write the breakdown as JSON / cProfile stats to PATH
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from scoring.instrument import add_profile_arguments, count, profiled, stage
+from scoring.runner import (
+    BACKOFF,
+    CHECKPOINT,
+    RETRIES,
+    Checkpoint,
+    Conversation,
+    load_prompts,
+    make_backend,
+    run_all,
+)
+from scoring.stub_server import StubServer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESPONSES_DIR = REPO_ROOT / "responses"
+PROMPTS_DIR = REPO_ROOT / "prompts"
+# Backend kind the stub uses for each family directory
+STUB_KINDS = {"chatgpt": "openai", "openai": "openai", "claude": "anthropic", "gemini": "gemini"}
+
+
+def config_models(config: dict) -> list:
+    """(family, version, backend name, model id) of every configured model."""
+    return [(entry["family"], entry["version"], entry["backend"], entry.get("model",
+                                                                            entry["version"]))
+            for entry in config.get("models", [])]
+
+
+def existing_models(root: Path) -> list:
+    """Every responses/<family>/<version>/ directory, as a model to run."""
+    return [(family.name, version.name, STUB_KINDS.get(family.name, "openai"), version.name)
+            for family in sorted(root.iterdir()) if family.is_dir()
+            for version in sorted(family.iterdir()) if version.is_dir()]
+
+
+def plan(models: list, backends: dict, replicates: int, family: str = None,
+         version: str = None) -> list:
+    return [Conversation(family=fam, version=ver, replicate=k, backend=backends[name], model=model)
+            for fam, ver, name, model in models
+            if (family is None or fam == family) and (version is None or ver == version)
+            for k in range(1, replicates + 1)]
+
+
+def format_progress(conversations: list, prompts: list, root: Path) -> str:
+    lines = []
+    for conversation in conversations:
+        directory = conversation.directory(root)
+        checkpoint = Checkpoint.load(directory / CHECKPOINT)
+        done = checkpoint.completed(prompts, directory)
+        error = (f"  (failed at step {checkpoint.error['step']}: {checkpoint.error['message']})"
+                 if checkpoint.error else "")
+        lines.append(f"{conversation.label:40s} {conversation.backend.name}:{conversation.model}"
+                     f"  {done}/{len(prompts)} steps{error}")
+    return "\n".join(lines)
+
+
+def format_summary(outcomes: list, elapsed: float, server: StubServer = None) -> str:
+    ran = [o for o in outcomes if o.resumed_at]
+    resumed = sum(1 for o in ran if o.resumed_at > 1)
+    failed = [o for o in outcomes if o.error]
+    written = sum(o.written for o in outcomes)
+    lines = [f"{len(outcomes)} conversation(s): {len(ran)} run ({resumed} resumed), "
+             f"{len(outcomes) - len(ran)} already complete, {len(failed)} failed.",
+             f"{written} step(s) written, {sum(o.retries for o in outcomes)} retried request(s), "
+             f"in {elapsed:.1f}s ({written / elapsed if elapsed else 0:.1f} steps/s)."]
+    if server is not None:
+        lines.append(f"Stub server: {server.requests} request(s), {server.errors} injected "
+                     f"error(s), peak {server.peak} at once.")
+    for outcome in failed:
+        lines.append(f"  {outcome.label} step {outcome.failed_step}: {outcome.error}")
+    return "\n".join(lines)
+
+
+async def run(args, conversations: list, prompts: list, server: StubServer = None):
+    start = time.monotonic()
+    if server is not None:
+        await server.start()
+        for conversation in conversations:
+            conversation.backend.base_url = server.url(conversation.backend.kind)
+    try:
+        outcomes = await run_all(conversations, prompts, args.root, restart=args.restart,
+                                 retries=args.retries,
+                                 backoff=0.05 if server is not None else BACKOFF)
+    finally:
+        if server is not None:
+            await server.close()
+    return outcomes, time.monotonic() - start
+
+
+async def serve(args):
+    server = await StubServer(port=args.serve, latency=args.stub_latency,
+                              error_rate=args.stub_error_rate).start()
+    print(f"Stub server on port {server.port}: OpenAI at {server.url('openai')}, "
+          f"Anthropic at {server.url('anthropic')}, Gemini at {server.url('gemini')}")
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the sequential prompts against models.")
+    parser.add_argument("--config", type=Path, default=None, help="Backends and models (JSON)")
+    parser.add_argument("--family", default=None, help="Only this family")
+    parser.add_argument("--version", default=None, help="Only this version")
+    parser.add_argument("--replicates", type=int, default=1, help="Conversations per model")
+    parser.add_argument("--root", type=Path, default=RESPONSES_DIR, help="Transcript tree")
+    parser.add_argument("--prompts", type=Path, default=PROMPTS_DIR, help="Prompt files")
+    parser.add_argument("--retries", type=int, default=RETRIES,
+                        help="Retries of a transient failure")
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoints")
+    parser.add_argument("--list", action="store_true",
+                        help="Show the conversations and their progress, then exit")
+    parser.add_argument("--stub", action="store_true",
+                        help="Route every model to an in-process stub server")
+    parser.add_argument("--serve", type=int, default=None, metavar="PORT",
+                        help="Run the stub server on PORT")
+    parser.add_argument("--stub-latency", type=float, default=0.0,
+                        help="Mean seconds per stub answer")
+    parser.add_argument("--stub-error-rate", type=float, default=0.0,
+                        help="Share of stub requests that fail")
+    parser.add_argument("--concurrency", type=int, default=64,
+                        help="Requests in flight per backend with --stub")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        try:
+            asyncio.run(serve(args))
+        except KeyboardInterrupt:
+            pass
+        return
+    if not args.stub and args.config is None:
+        print("Error: pass --config (or --stub to run offline).")
+        sys.exit(1)
+    if args.stub and args.root.resolve() == RESPONSES_DIR.resolve():
+        print("Error: --stub writes canned answers; pass --root to keep them out of responses/.")
+        sys.exit(1)
+    if args.replicates < 1:
+        print("Error: --replicates must be at least 1.")
+        sys.exit(1)
+    prompts = load_prompts(args.prompts)
+    if not prompts:
+        print(f"Error: no step_*.md prompts in {args.prompts}.")
+        sys.exit(1)
+
+    try:
+        config = json.loads(args.config.read_text()) if args.config else {}
+    except (OSError, ValueError) as exc:
+        print(f"Error: cannot read {args.config}: {exc}")
+        sys.exit(1)
+    if args.stub:
+        models = [(family, version, STUB_KINDS.get(family, "openai"), model)
+                  for family, version, _, model in config_models(config)] \
+            if args.config else existing_models(RESPONSES_DIR)
+        settings = {kind: {"kind": kind, "rate": 0, "concurrency": args.concurrency,
+                           "timeout": 60.0} for kind in set(STUB_KINDS.values())}
+    else:
+        models = config_models(config)
+        settings = config.get("backends", {})
+    try:
+        backends = {name: make_backend(name, entry) for name, entry in settings.items()}
+    except (ValueError, TypeError, ImportError, AttributeError) as exc:
+        print(f"Error: bad backend in {args.config}: {exc}")
+        sys.exit(1)
+    missing = sorted({name for _, _, name, _ in models} - set(backends))
+    if missing:
+        print(f"Error: models use undefined backend(s): {', '.join(missing)}")
+        sys.exit(1)
+    conversations = plan(models, backends, args.replicates, args.family, args.version)
+    if not conversations:
+        print("No matching models.")
+        sys.exit(1)
+    if args.list:
+        print(format_progress(conversations, prompts, args.root))
+        return
+    if not args.stub:
+        unset = sorted({c.backend.api_key_env for c in conversations
+                        if c.backend.api_key_env and not c.backend.api_key})
+        if unset:
+            print(f"Error: API key variable(s) not set: {', '.join(unset)}")
+            sys.exit(1)
+
+    with profiled(args):
+        server = StubServer(latency=args.stub_latency, error_rate=args.stub_error_rate) \
+            if args.stub else None
+        with stage("conversations"):
+            outcomes, elapsed = asyncio.run(run(args, conversations, prompts, server))
+        count("conversations", len(conversations))
+        print(format_summary(outcomes, elapsed, server))
+    if any(outcome.error for outcome in outcomes):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Shared scoring core for the analysis scripts in ``scripts/``."""
+
+from .cache import cache_dir_for, load_cached_table
+from .cube import ScoreCube, load_cube, load_scores, parse_scores
+from .depends import fingerprint, render_if_stale
+from .engine import (
+    DIMENSIONS,
+    FULLY_CORRECT,
+    SCORE_MAP,
+    EncodedScores,
+    encode_scores,
+    failure_counts,
+    group_mean,
+    row_composites,
+)
+from .incremental import incremental_reports, state_path_for
+from .stream import ScoreAccumulator, stream_scores
+
+__all__ = [
+    "DIMENSIONS",
+    "FULLY_CORRECT",
+    "SCORE_MAP",
+    "EncodedScores",
+    "ScoreAccumulator",
+    "ScoreCube",
+    "cache_dir_for",
+    "encode_scores",
+    "failure_counts",
+    "fingerprint",
+    "group_mean",
+    "incremental_reports",
+    "load_cached_table",
+    "load_cube",
+    "load_scores",
+    "parse_scores",
+    "render_if_stale",
+    "row_composites",
+    "state_path_for",
+    "stream_scores",
+]
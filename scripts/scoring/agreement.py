@@ -0,0 +1,264 @@
+"""
+Inter-rater agreement for rows scored by several raters.
+
+Each rater's scores are one shard (see scoring.shards); an item is a
+(model_family, model_version, step_number) key and is usable once at least
+two raters coded it. Codes are nominal categories in ``SCORE_MAP`` order;
+blank or unknown codes count as not rated.
+
+Everything is computed from contingency tensors without looping over
+items:
+
+- the (item × category) count matrix ``n`` gives Fleiss' kappa (with a
+  varying number of raters per item) and, through the per-item coincidence
+  matrices ``(n nᵀ - diag n) / (m - 1)``, Krippendorff's nominal alpha;
+- (group × rater pair × category × category) tables, read off the Gram
+  matrix ``XᵀX`` of the one-hot (item × rater·category) matrix, give
+  Cohen's kappa for every pair of raters in one matrix product per group.
+  Groups report the mean over rater pairs (Light's kappa).
+
+Groups are the whole matrix, each step and each family. Items are ranked
+for adjudication by the number of disagreeing rater pairs summed over the
+dimensions.
+"""
+
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .engine import DIMENSIONS, SCORE_MAP
+from .instrument import count, stage, timed
+from .shards import group_keys, read_shards
+
+ALPHABETS = [list(SCORE_MAP[dim]) for dim in DIMENSIONS]
+# Upper bound on the one-hot block built per matrix product
+DEFAULT_BATCH_BYTES = 64 << 20
+
+
+@dataclass
+class Ratings:
+    """Codes of every rater for every item, as indices into ``ALPHABETS``."""
+
+    items: pd.DataFrame    # model_family, model_version, step_number per item
+    raters: list           # rater names (shard file stems)
+    codes: np.ndarray      # (item × rater × dimension) int8, -1 where not rated
+
+
+@dataclass
+class AgreementTable:
+    """Agreement statistics per dimension (rows) and group (columns)."""
+
+    labels: list
+    items: np.ndarray      # items coded by at least two raters
+    observed: np.ndarray   # mean share of agreeing rater pairs per item
+    cohen: np.ndarray      # mean pairwise Cohen's kappa
+    fleiss: np.ndarray
+    alpha: np.ndarray      # Krippendorff's alpha, nominal
+
+
+@dataclass
+class Agreement:
+    ratings: Ratings
+    overall: AgreementTable
+    by_step: AgreementTable
+    by_family: AgreementTable
+    pairs: np.ndarray        # (pairs × 2) rater indices
+    pair_kappa: np.ndarray   # (dimension × pair) Cohen's kappa over all items
+    pair_items: np.ndarray   # (dimension × pair) items both raters coded
+    disagreement: np.ndarray  # (item,) disagreeing rater pairs over all dimensions
+
+    def most_disputed(self, n: int = 20) -> np.ndarray:
+        """Indices of the ``n`` items with the most disagreement, worst first."""
+        disputed = np.flatnonzero(self.disagreement > 0)
+        order = np.argsort(-self.disagreement[disputed], kind="stable")
+        return disputed[order[:n]]
+
+
+@timed("rating tensor")
+def rating_tensor(df: pd.DataFrame, rater_of: np.ndarray, raters: list) -> Ratings:
+    """Place every row's codes at (item, rater); a rater's first row per item wins."""
+    key, n_items = group_keys(df)
+    n_raters = len(raters)
+    _, first = np.unique(key * n_raters + rater_of, return_index=True)
+    key, rater_of = key[first], rater_of[first]
+
+    codes = np.full((n_items, n_raters, len(DIMENSIONS)), -1, dtype=np.int8)
+    for j, dim in enumerate(DIMENSIONS):
+        column = df[dim].array[first]
+        lookup = {code: k for k, code in enumerate(ALPHABETS[j])}
+        index = np.array([lookup.get(str(c).strip().upper(), -1)
+                          for c in column.categories] + [-1], dtype=np.int8)
+        codes[key, rater_of, j] = index[column.codes]
+
+    _, item_row = np.unique(key, return_index=True)
+    rows = first[item_row]
+    items = pd.DataFrame({
+        "model_family": np.asarray(df["model_family"].array.take(rows), dtype=object),
+        "model_version": np.asarray(df["model_version"].array.take(rows), dtype=object),
+        "step_number": df["step_number"].to_numpy()[rows],
+    })
+    count("items", n_items)
+    return Ratings(items=items, raters=list(raters), codes=codes)
+
+
+def load_ratings(directory, jobs: int = None) -> Ratings:
+    """Ratings from a directory of per-rater shards."""
+    df, shard_of, paths = read_shards(directory, jobs)
+    return rating_tensor(df, shard_of, [path.stem for path in paths])
+
+
+def _group_sum(values: np.ndarray, group: np.ndarray, n_groups: int) -> np.ndarray:
+    """Sum the rows of a (items × features) array per group."""
+    return np.stack([np.bincount(group, weights=values[:, f], minlength=n_groups)
+                     for f in range(values.shape[1])], axis=1)
+
+
+def _divide(num, den):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den != 0, num / np.where(den != 0, den, 1), np.nan)
+
+
+def category_counts(codes: np.ndarray, n_categories: int) -> np.ndarray:
+    """(item × category) number of raters choosing each category."""
+    item, rater = np.nonzero(codes >= 0)
+    flat = item * n_categories + codes[item, rater]
+    return np.bincount(flat, minlength=len(codes) * n_categories).reshape(
+        len(codes), n_categories).astype(np.float64)
+
+
+def fleiss_alpha(n: np.ndarray, group: np.ndarray, n_groups: int):
+    """Observed agreement, Fleiss' kappa and Krippendorff's alpha per group.
+
+    ``n`` is the (item × category) count matrix; items with fewer than two
+    ratings are ignored.
+    """
+    m = n.sum(axis=1)
+    usable = m >= 2
+    n, m, group = n[usable], m[usable], group[usable]
+    items = np.bincount(group, minlength=n_groups)
+
+    # Fleiss: mean per-item pairwise agreement against pooled category shares
+    p_item = ((n ** 2).sum(axis=1) - m) / (m * (m - 1))
+    observed = _divide(np.bincount(group, weights=p_item, minlength=n_groups), items)
+    totals = _group_sum(n, group, n_groups)
+    shares = _divide(totals, totals.sum(axis=1, keepdims=True))
+    expected = (shares ** 2).sum(axis=1)
+    fleiss = _divide(observed - expected, 1 - expected)
+
+    # Krippendorff: coincidence matrix per group
+    k = n.shape[1]
+    coincidence = (n[:, :, None] * n[:, None, :]
+                   - n[:, :, None] * np.eye(k)[None]) / (m - 1)[:, None, None]
+    o = _group_sum(coincidence.reshape(len(n), k * k), group, n_groups).reshape(n_groups, k, k)
+    marginals = o.sum(axis=2)
+    total = marginals.sum(axis=1)
+    disagree = o.sum(axis=(1, 2)) - np.trace(o, axis1=1, axis2=2)
+    expected_disagree = total ** 2 - (marginals ** 2).sum(axis=1)
+    alpha = 1 - _divide((total - 1) * disagree, expected_disagree)
+    return items, observed, fleiss, alpha
+
+
+def cohen_tables(codes: np.ndarray, group: np.ndarray, n_groups: int, n_categories: int,
+                 batch_bytes: int = DEFAULT_BATCH_BYTES):
+    """Rater pairs and their (group × pair × category × category) contingency tables.
+
+    With ``X`` the (item × rater·category) one-hot matrix of a group, ``XᵀX``
+    holds the table of every rater pair at once.
+    """
+    n_items, n_raters = codes.shape
+    k = n_categories
+    width = n_raters * k
+    gram = np.zeros((n_groups, width, width))
+    order = np.argsort(group, kind="stable")
+    bounds = np.searchsorted(group[order], np.arange(n_groups + 1))
+    rows = max(1, batch_bytes // (width * 8))
+    for g in range(n_groups):
+        members = order[bounds[g]:bounds[g + 1]]
+        for start in range(0, len(members), rows):
+            block = codes[members[start:start + rows]]
+            item, rater = np.nonzero(block >= 0)
+            onehot = np.zeros((len(block), width))
+            onehot[item, rater * k + block[item, rater]] = 1
+            gram[g] += onehot.T @ onehot
+    first, second = np.triu_indices(n_raters, k=1)
+    gram = gram.reshape(n_groups, n_raters, k, n_raters, k)
+    tables = gram[:, first, :, second, :].transpose(1, 0, 2, 3)  # pairs move to the front
+    return np.stack([first, second], axis=1), np.rint(tables).astype(np.int64)
+
+
+def cohen_kappa(tables: np.ndarray):
+    """Cohen's kappa and item count of every (..., k, k) contingency table."""
+    total = tables.sum(axis=(-2, -1)).astype(np.float64)
+    agree = np.trace(tables, axis1=-2, axis2=-1)
+    expected = (tables.sum(axis=-1) * tables.sum(axis=-2)).sum(axis=-1)
+    po = _divide(agree, total)
+    pe = _divide(expected, total ** 2)
+    return _divide(po - pe, 1 - pe), total
+
+
+def _table(counts: list, tables: list, item_group: np.ndarray, cell_group: np.ndarray,
+           labels: list) -> AgreementTable:
+    """Statistics per group from per-dimension counts and (cell × pair) Cohen tables."""
+    n_groups = len(labels)
+    shape = (len(DIMENSIONS), n_groups)
+    items, observed, cohen, fleiss, alpha = (np.full(shape, np.nan) for _ in range(5))
+    for j in range(len(DIMENSIONS)):
+        items[j], observed[j], fleiss[j], alpha[j] = fleiss_alpha(counts[j], item_group,
+                                                                  n_groups)
+        if not tables[j].shape[1]:
+            continue
+        summed = np.zeros((n_groups,) + tables[j].shape[1:], dtype=np.int64)
+        np.add.at(summed, cell_group, tables[j])
+        kappa, total = cohen_kappa(summed)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # groups without any pair
+            cohen[j] = np.nanmean(np.where(total > 0, kappa, np.nan), axis=1)
+    return AgreementTable(labels=labels, items=items, observed=observed, cohen=cohen,
+                          fleiss=fleiss, alpha=alpha)
+
+
+@timed("agreement")
+def agreement(ratings: Ratings, batch_bytes: int = DEFAULT_BATCH_BYTES) -> Agreement:
+    items = ratings.items
+    n_items = len(items)
+    steps, step_group = np.unique(items["step_number"].to_numpy(), return_inverse=True)
+    families, family_group = np.unique(items["model_family"].to_numpy(dtype=str),
+                                       return_inverse=True)
+    step_group, family_group = step_group.ravel(), family_group.ravel()
+    # Cohen tables are built once per (step, family) cell and summed per grouping
+    n_families = len(families)
+    n_cells = len(steps) * n_families
+    cell = step_group * n_families + family_group
+
+    counts, tables = [], []
+    with stage("contingency tables"):
+        for j in range(len(DIMENSIONS)):
+            k = len(ALPHABETS[j])
+            counts.append(category_counts(ratings.codes[:, :, j], k))
+            pairs, cell_tables = cohen_tables(ratings.codes[:, :, j], cell, n_cells, k,
+                                              batch_bytes)
+            tables.append(cell_tables)
+
+    cells = np.arange(n_cells)
+    overall = _table(counts, tables, np.zeros(n_items, dtype=np.int64),
+                     np.zeros(n_cells, dtype=np.int64), ["all"])
+    by_step = _table(counts, tables, step_group, cells // n_families,
+                     [str(s) for s in steps])
+    by_family = _table(counts, tables, family_group, cells % n_families,
+                       [str(f) for f in families])
+
+    n_dims = len(DIMENSIONS)
+    pair_kappa = np.full((n_dims, len(pairs)), np.nan)
+    pair_items = np.zeros((n_dims, len(pairs)))
+    # Disagreeing rater pairs per item: (m² - Σ n²) / 2, summed over dimensions
+    disagreement = np.zeros(n_items)
+    for j in range(n_dims):
+        pair_kappa[j], pair_items[j] = cohen_kappa(tables[j].sum(axis=0))
+        n = counts[j]
+        disagreement += (n.sum(axis=1) ** 2 - (n ** 2).sum(axis=1)) / 2
+
+    return Agreement(ratings=ratings, overall=overall, by_step=by_step, by_family=by_family,
+                     pairs=pairs, pair_kappa=pair_kappa, pair_items=pair_items,
+                     disagreement=disagreement)
@@ -0,0 +1,140 @@
+"""
+Vectorized bootstrap confidence intervals for composite scores.
+
+Replicate rows are resampled with replacement within each (model, step)
+cell, so every resample keeps the design of the matrix (the same cells
+with the same number of replicates) and only the replicate outcomes vary.
+All resamples of a batch are drawn at once as a (resamples × rows) index
+matrix; cell sums are reduced with ``np.add.reduceat`` and then rolled up
+to model, step and family sums, so one pass yields CIs for every group.
+
+Cells with a single usable replicate contribute no variance; with one
+replicate everywhere all intervals collapse onto the point estimate.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import group_mean
+from .instrument import count, timed
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_LEVEL = 0.95
+# Upper bound on the per-batch index/value matrices
+DEFAULT_BATCH_BYTES = 64 << 20
+
+
+@dataclass
+class GroupCI:
+    """Point estimates and percentile intervals for one grouping."""
+
+    estimate: np.ndarray
+    low: np.ndarray
+    high: np.ndarray
+    count: np.ndarray     # usable rows behind each estimate
+
+
+@dataclass
+class CompositeCIs:
+    """Bootstrap CIs of the mean row composite at every level of the cube."""
+
+    level: float
+    n_resamples: int
+    families: list        # family names, in order of first appearance
+    family: GroupCI
+    model: GroupCI        # aligned with cube.models
+    step: GroupCI         # aligned with cube.steps
+    cell: GroupCI         # (model × step), aligned with cube.model_step_matrix
+
+
+def _interval(samples: np.ndarray, estimate: np.ndarray, counts: np.ndarray,
+              level: float) -> GroupCI:
+    alpha = (1 - level) / 2
+    low, high = np.quantile(samples, [alpha, 1 - alpha], axis=0)
+    return GroupCI(estimate=estimate, low=low, high=high, count=counts)
+
+
+def add_bootstrap_arguments(parser):
+    parser.add_argument("--ci", action="store_true",
+                        help="Show bootstrap confidence intervals")
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES,
+                        help="Bootstrap resamples for --ci")
+    parser.add_argument("--level", type=float, default=DEFAULT_LEVEL,
+                        help="Confidence level for --ci")
+    parser.add_argument("--seed", type=int, default=0, help="Bootstrap seed for --ci")
+
+
+@timed("bootstrap")
+def bootstrap_composites(cube, n_resamples: int = DEFAULT_RESAMPLES,
+                         level: float = DEFAULT_LEVEL, seed: int = 0,
+                         batch_bytes: int = DEFAULT_BATCH_BYTES) -> CompositeCIs:
+    """Percentile bootstrap CIs for family, model, step and cell composites.
+
+    Results depend only on ``seed``, not on ``batch_bytes``.
+    """
+    n_models, n_steps = len(cube.models), len(cube.steps)
+    n_cells = n_models * n_steps
+
+    composite = cube.row_composite
+    usable = ~np.isnan(composite)
+    cell = cube.cell_index[usable]
+    order = np.argsort(cell, kind="stable")
+    values = composite[usable][order]
+    cell = cell[order]
+
+    counts = np.bincount(cell, minlength=n_cells)
+    starts = np.cumsum(counts) - counts
+    filled = np.flatnonzero(counts)
+    row_start, row_count = starts[cell], counts[cell]
+
+    families = list(dict.fromkeys(family for family, _ in cube.models))
+    family_of = np.array([families.index(family) for family, _ in cube.models], dtype=np.int64)
+    membership = np.zeros((n_models, len(families)))
+    membership[np.arange(n_models), family_of] = 1.0
+
+    cell_counts = counts.reshape(n_models, n_steps)
+    model_counts = cell_counts.sum(axis=1)
+    step_counts = cell_counts.sum(axis=0)
+    family_counts = np.bincount(family_of, weights=model_counts,
+                                minlength=len(families)).astype(np.int64)
+
+    rng = np.random.default_rng(seed)
+    n_rows = len(values)
+    batch = max(1, min(n_resamples, batch_bytes // max(24 * n_rows, 1)))
+    cell_means = np.empty((n_resamples, n_cells))
+    model_means = np.empty((n_resamples, n_models))
+    step_means = np.empty((n_resamples, n_steps))
+    family_means = np.empty((n_resamples, len(families)))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for b0 in range(0, n_resamples, batch):
+            b1 = min(b0 + batch, n_resamples)
+            # Row r of a resample is replaced by a random row of the same cell
+            index = row_start + (rng.random((b1 - b0, n_rows)) * row_count).astype(np.int64)
+            sums = np.zeros((b1 - b0, n_cells))
+            if n_rows:
+                sums[:, filled] = np.add.reduceat(values[index], starts[filled], axis=1)
+            sums = sums.reshape(b1 - b0, n_models, n_steps)
+
+            cell_means[b0:b1] = (sums / cell_counts).reshape(b1 - b0, n_cells)
+            model_sums = sums.sum(axis=2)
+            model_means[b0:b1] = model_sums / model_counts
+            step_means[b0:b1] = sums.sum(axis=1) / step_counts
+            family_means[b0:b1] = (model_sums @ membership) / family_counts
+    count("bootstrap_resamples", n_resamples)
+
+    family_estimate = group_mean(family_of[cube.encoded.model_index[usable]],
+                                 composite[usable], len(families))
+    cell_ci = _interval(cell_means, cube.model_step_matrix.ravel(), counts, level)
+    shape = (n_models, n_steps)
+    return CompositeCIs(
+        level=level,
+        n_resamples=n_resamples,
+        families=families,
+        family=_interval(family_means, family_estimate, family_counts, level),
+        model=_interval(model_means, cube.model_composites, model_counts, level),
+        step=_interval(step_means, cube.step_composites, step_counts, level),
+        cell=GroupCI(cell_ci.estimate.reshape(shape), cell_ci.low.reshape(shape),
+                     cell_ci.high.reshape(shape), cell_ci.count.reshape(shape)),
+    )
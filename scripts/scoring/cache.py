@@ -0,0 +1,176 @@
+"""
+Binary columnar cache for the cleaned scoring matrix.
+
+The cleaned table is stored next to the CSV as a set of memory-mappable
+``.npy`` arrays: integer codes plus a category array for every text column,
+and the raw values for numeric columns. A JSON manifest records the CSV's
+size, mtime and SHA-256 digest. Later loads memory-map the arrays and skip
+CSV parsing entirely:
+
+- size and mtime match the manifest  -> reuse without hashing
+- only the mtime changed             -> hash the CSV; reuse if the digest matches
+- anything else, or an unreadable    -> rebuild from the CSV
+  manifest/array file
+
+As with git's index, an mtime that falls within ``RACY_WINDOW_NS`` of the
+cache write is not trusted on its own, since an edit in the same clock tick
+would leave it unchanged; such loads always compare the content hash.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .instrument import timed
+
+CACHE_VERSION = 1
+MANIFEST = "manifest.json"
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def cache_dir_for(csv_path: Path) -> Path:
+    """Sidecar directory holding the cache for ``csv_path``."""
+    return csv_path.parent / f".{csv_path.stem}.cache"
+
+
+@timed("hash csv")
+def content_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_manifest(cache_dir: Path):
+    try:
+        manifest = json.loads((cache_dir / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != CACHE_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(cache_dir: Path, manifest: dict):
+    tmp = cache_dir / f"{MANIFEST}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=1))
+    os.replace(tmp, cache_dir / MANIFEST)
+
+
+def to_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    """Return ``df`` with every text column converted to a categorical."""
+    out = {}
+    for name in df.columns:
+        col = df[name]
+        if pd.api.types.is_numeric_dtype(col):
+            out[name] = col
+        else:
+            codes, categories = pd.factorize(col)
+            out[name] = pd.Categorical.from_codes(codes.astype(np.int32),
+                                                  categories=categories)
+    return pd.DataFrame(out, index=pd.RangeIndex(len(df)))
+
+
+def _write_arrays(cache_dir: Path, df: pd.DataFrame) -> list:
+    columns = []
+    for i, name in enumerate(df.columns):
+        col = df[name]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            categories = np.asarray(col.cat.categories, dtype=str)
+            np.save(cache_dir / f"col{i}.codes.npy", col.cat.codes.to_numpy())
+            np.save(cache_dir / f"col{i}.categories.npy", categories)
+            columns.append({"name": name, "kind": "category"})
+        else:
+            np.save(cache_dir / f"col{i}.npy", col.to_numpy())
+            columns.append({"name": name, "kind": "numeric"})
+    return columns
+
+
+@timed("read cache")
+def _read_arrays(cache_dir: Path, manifest: dict):
+    """Memory-map the cached columns; None if any file is missing or corrupt."""
+    out = {}
+    try:
+        for i, spec in enumerate(manifest["columns"]):
+            if spec["kind"] == "category":
+                codes = np.load(cache_dir / f"col{i}.codes.npy", mmap_mode="r")
+                categories = np.load(cache_dir / f"col{i}.categories.npy")
+                if len(codes) and codes.max(initial=-1) >= len(categories):
+                    return None
+                out[spec["name"]] = pd.Categorical.from_codes(
+                    codes, categories=pd.Index(categories.astype(object)))
+            else:
+                out[spec["name"]] = np.load(cache_dir / f"col{i}.npy", mmap_mode="r")
+            if len(out[spec["name"]]) != manifest["n_rows"]:
+                return None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return pd.DataFrame(out, index=pd.RangeIndex(manifest["n_rows"]))
+
+
+@timed("write cache")
+def write_cache(csv_path: Path, df: pd.DataFrame, digest: str, stat: os.stat_result):
+    """Store a categorical table as the cache for ``csv_path``."""
+    cache_dir = cache_dir_for(csv_path)
+    cache_dir.mkdir(exist_ok=True)
+    # Drop the manifest first so a crash mid-write leaves no valid cache behind
+    (cache_dir / MANIFEST).unlink(missing_ok=True)
+    columns = _write_arrays(cache_dir, df)
+    _write_manifest(cache_dir, {
+        "version": CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest,
+        "written_ns": time.time_ns(),
+        "n_rows": len(df),
+        "columns": columns,
+    })
+
+
+def load_cached_table(csv_path, build) -> pd.DataFrame:
+    """Load the cleaned table for ``csv_path``, rebuilding the cache if stale.
+
+    ``build`` parses and cleans the CSV; it only runs on a cache miss, and
+    its result is stored category-typed so hits and misses return the same
+    table.
+    """
+    csv_path = Path(csv_path)
+    cache_dir = cache_dir_for(csv_path)
+    stat = csv_path.stat()
+    manifest = _read_manifest(cache_dir)
+    digest = None
+
+    if manifest is not None and manifest.get("size") == stat.st_size:
+        racy = stat.st_mtime_ns >= manifest.get("written_ns", 0) - RACY_WINDOW_NS
+        if manifest.get("mtime_ns") == stat.st_mtime_ns and not racy:
+            df = _read_arrays(cache_dir, manifest)
+            if df is not None:
+                return df
+        else:
+            digest = content_hash(csv_path)
+            if digest == manifest.get("sha256"):
+                df = _read_arrays(cache_dir, manifest)
+                if df is not None:
+                    manifest["mtime_ns"] = stat.st_mtime_ns
+                    manifest["written_ns"] = time.time_ns()
+                    try:
+                        _write_manifest(cache_dir, manifest)
+                    except OSError:
+                        pass
+                    return df
+
+    if digest is None:
+        digest = content_hash(csv_path)
+    df = to_columnar(build(csv_path))
+    try:
+        write_cache(csv_path, df, digest, stat)
+    except OSError:
+        # A read-only checkout still works, just without the cache
+        pass
+    return df
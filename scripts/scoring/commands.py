@@ -0,0 +1,318 @@
+"""
+Shell commands in model responses: fenced code blocks parsed into tool
+invocations.
+
+Only shell blocks are read (```` ```bash ````, ``sh``, ``shell``,
+``console``, ``zsh`` or no language, unless it is a box-drawing diagram);
+prompts (``$ ``) are stripped.
+Backslash continuations are joined, each line is tokenized with ``shlex``
+and split into commands at ``|``, ``||``, ``&&``, ``;`` and ``&``. Shell
+keywords (``for``/``do``/``done``...), ``sudo``/``time`` prefixes and
+``VAR=value`` assignments are dropped, and redirections are kept apart
+from the arguments. A line ``shlex`` cannot tokenize (unbalanced quotes)
+is reported instead of parsed.
+
+Flag values are told apart from positional arguments with the flag
+arities of the tool's interface in ``scoring.interfaces`` (``samtools
+view -b`` takes no value); flags without a spec take the next word unless
+it is a flag.
+
+Command names are normalised through ``TOOL_ALIASES`` (``guppy_basecaller``
+-> ``guppy``, ``metaflye`` -> ``flye``), which also lists every tool the
+pre-scorer recognises in prose.
+"""
+
+import re
+import shlex
+from dataclasses import dataclass, field
+
+from .interfaces import interface
+
+FENCE = re.compile(r"^\s*(```|~~~)\s*([\w+-]*)[^\n]*$")
+SHELL_LANGUAGES = {"", "bash", "sh", "shell", "console", "zsh", "shell-session"}
+OPERATORS = {"|", "||", "&&", ";", "&", ";;", "|&"}
+# Redirection operator -> stream it sets (None: duplicates a descriptor, ``2>&1``)
+REDIRECTS = {">": "stdout", ">>": "stdout", ">|": "stdout", "&>": "stdout", "&>>": "stdout",
+             "<": "stdin", ">&": None, "<&": None}
+KEYWORDS = {"for", "while", "until", "if", "elif", "case", "esac", "done", "fi", "function",
+            "select", "{", "}", "(", ")", "then", "do", "else", "in"}
+PREFIXES = {"do", "then", "else", "time", "sudo", "nohup", "exec", "command", "!", "{", "("}
+ASSIGNMENT = re.compile(r"^[A-Za-z_]\w*=")
+QUOTING = set("'\"\\#")
+PLAIN_TOKEN = re.compile(r"[;&|<>]+|[^\s;&|<>]+")
+
+# Command or display name (lower case) -> canonical tool
+TOOL_ALIASES = {
+    "guppy": "guppy", "guppy_basecaller": "guppy", "guppy_barcoder": "guppy",
+    "dorado": "dorado", "albacore": "albacore", "read_fast5_basecaller.py": "albacore",
+    "porechop": "porechop", "porechop_abi": "porechop", "nanofilt": "nanofilt",
+    "chopper": "chopper", "filtlong": "filtlong", "trimmomatic": "trimmomatic",
+    "cutadapt": "cutadapt", "fastp": "fastp",
+    "nanoplot": "nanoplot", "nanostat": "nanostat", "nanocomp": "nanocomp",
+    "pycoqc": "pycoqc", "minionqc": "minionqc", "fastqc": "fastqc", "multiqc": "multiqc",
+    "minimap2": "minimap2", "samtools": "samtools", "bowtie2": "bowtie2", "bwa": "bwa",
+    "bwa-mem2": "bwa", "hisat2": "hisat2",
+    "kraken2": "kraken2", "bracken": "bracken", "centrifuge": "centrifuge",
+    "diamond": "diamond", "megan": "megan", "metaphlan": "metaphlan",
+    "flye": "flye", "metaflye": "flye", "racon": "racon", "medaka": "medaka",
+    "medaka_consensus": "medaka", "wtdbg2": "wtdbg2", "canu": "canu", "megahit": "megahit",
+    "spades": "spades", "spades.py": "spades", "metaspades": "spades",
+    "metaspades.py": "spades",
+    "metawrap": "metawrap", "metabat2": "metabat2", "metabat": "metabat2",
+    "maxbin2": "maxbin2", "run_maxbin.pl": "maxbin2", "concoct": "concoct",
+    "semibin2": "semibin2", "semibin": "semibin2", "das_tool": "das_tool",
+    "checkm": "checkm", "checkm2": "checkm2", "gtdbtk": "gtdbtk",
+    "amrfinder": "amrfinderplus", "amrfinderplus": "amrfinderplus", "abricate": "abricate",
+    "rgi": "rgi", "seqkit": "seqkit", "seqtk": "seqtk", "prokka": "prokka",
+    "bakta": "bakta", "eggnog-mapper": "eggnog-mapper", "emapper.py": "eggnog-mapper",
+    "dram": "dram", "dram.py": "dram",
+}
+
+# Tools whose second word selects a subcommand (``dorado basecaller``)
+SUBCOMMAND_TOOLS = {"dorado", "metawrap", "checkm", "checkm2", "seqkit", "samtools", "medaka",
+                    "gtdbtk", "bakta", "semibin2", "diamond", "bwa", "dram", "megan"}
+SUBCOMMAND = re.compile(r"^[a-z][a-z0-9_-]*$")
+# Untagged blocks drawn with these are diagrams, not shell
+DIAGRAM_CHARS = set("│├└┌┐┘▼▲→←")
+
+DATA_SUFFIX = re.compile(
+    r"\.(fastq|fq|fasta|fa|fna|faa|ffn|bam|sam|cram|bai|paf|gfa|txt|tsv|csv|html|json|"
+    r"pod5|fast5|blow5|slow5|log|out|report|kreport|gz|bz2|zip|tar)$", re.IGNORECASE)
+
+
+@dataclass
+class Invocation:
+    """One simple command of a code block."""
+
+    tool: str            # canonical tool name, or the command itself if unknown
+    command: str         # command as written
+    subcommand: str      # e.g. "basecaller" for ``dorado basecaller``; "" if none
+    args: list           # arguments after the (sub)command, without redirections
+    line: int            # line of the command in the text it was parsed from
+    stdin: str = ""      # ``< path``
+    stdout: str = ""     # ``> path`` / ``>> path``
+    piped_in: bool = False   # reads the previous command's output through ``|``
+
+    @property
+    def known(self) -> bool:
+        return self.tool in TOOL_ALIASES.values()
+
+    def spec(self):
+        """Interface of the tool from ``scoring.interfaces``, or None if it has none."""
+        return interface(self.command.rsplit("/", 1)[-1], self.subcommand)
+
+    def split(self):
+        """``(options, positionals)``: {flag: value or None} and the other arguments.
+
+        Flags take as many words as the tool's spec gives them (a ``+``
+        flag takes one; any further words are positionals). A flag the spec
+        does not list, or of a tool without a spec, takes the next word
+        unless it is a flag.
+        """
+        spec = self.spec()
+        options, positionals, i = {}, [], 0
+        while i < len(self.args):
+            word = self.args[i]
+            if not is_flag(word):
+                positionals.append(word)
+            elif "=" in word and word.startswith("--"):
+                flag, value = word.split("=", 1)
+                options[flag] = value
+            else:
+                arity = _arity(spec, word)
+                has_value = i + 1 < len(self.args) and not is_flag(self.args[i + 1])
+                if has_value and arity != 0:
+                    options[word] = self.args[i + 1]
+                    i += 1
+                else:
+                    options[word] = None
+            i += 1
+        return options, positionals
+
+    def options(self) -> dict:
+        """{flag: value or None}; see ``split``."""
+        return self.split()[0]
+
+    def positionals(self) -> list:
+        """Arguments that are neither flags nor flag values."""
+        return self.split()[1]
+
+
+def _arity(spec, flag: str):
+    """Words ``flag`` takes per ``spec`` (0 or 1), or None if the spec does not list it."""
+    if spec is None:
+        return None
+    if flag in spec.flags:
+        return 0 if spec.flags[flag] == 0 else 1
+    if spec.clusters and not flag.startswith("--") and \
+            all(f"-{c}" in spec.flags for c in flag[1:]):
+        return _arity(spec, f"-{flag[-1]}")       # -bh: the last flag takes the value
+    return None
+
+
+@dataclass
+class ParsedBlock:
+    """Invocations of one code block plus the lines that could not be tokenized."""
+
+    language: str
+    line: int                                      # first line of the block's content
+    text: str
+    invocations: list = field(default_factory=list)
+    errors: list = field(default_factory=list)     # (line, message)
+
+
+def is_flag(word: str) -> bool:
+    return word.startswith("-") and len(word) > 1 and not _is_number(word)
+
+
+def _is_number(word: str) -> bool:
+    try:
+        float(word)
+    except ValueError:
+        return False
+    return True
+
+
+def is_path(word: str) -> bool:
+    """Whether ``word`` names a file or directory rather than a setting."""
+    return "/" in word or "$" in word or bool(DATA_SUFFIX.search(word))
+
+
+def canonical_tool(command: str) -> str:
+    name = command.rsplit("/", 1)[-1]
+    return TOOL_ALIASES.get(name.lower(), name)
+
+
+def code_blocks(text: str) -> list:
+    """(language, first content line, content) of every fenced block in ``text``."""
+    blocks, fence, language, start, lines = [], None, "", 0, []
+    for number, line in enumerate(text.splitlines(), 1):
+        match = FENCE.match(line)
+        if fence is None:
+            if match:
+                fence, language, start, lines = match.group(1), match.group(2).lower(), \
+                    number + 1, []
+        elif line.strip().startswith(fence):
+            blocks.append((language, start, "\n".join(lines)))
+            fence = None
+        else:
+            lines.append(line)
+    if fence is not None:                           # unterminated block runs to the end
+        blocks.append((language, start, "\n".join(lines)))
+    return blocks
+
+
+def logical_lines(text: str):
+    """(first line number, line) with backslash continuations joined."""
+    buffer, first = [], None
+    for number, line in enumerate(text.splitlines()):
+        stripped = line.strip()
+        if stripped.startswith("$ "):
+            stripped = stripped[2:]
+        if first is None:
+            first = number
+        if stripped.endswith("\\") and not stripped.endswith("\\\\"):
+            buffer.append(stripped[:-1])
+            continue
+        buffer.append(stripped)
+        yield first, " ".join(buffer)
+        buffer, first = [], None
+    if buffer:
+        yield first, " ".join(buffer)
+
+
+def tokenize(line: str) -> list:
+    if not QUOTING & set(line):
+        # nothing for shlex to interpret: same tokens, several times faster
+        return PLAIN_TOKEN.findall(line)
+    lexer = shlex.shlex(line, posix=True, punctuation_chars=";&|<>")
+    lexer.whitespace_split = True
+    return list(lexer)
+
+
+def _command(words: list, line: int, piped_in: bool):
+    """Invocation of one simple command, or None for keywords and empty commands."""
+    stdin = stdout = ""
+    args, i = [], 0
+    while i < len(words):
+        word = words[i]
+        if word in REDIRECTS:
+            target = words[i + 1] if i + 1 < len(words) else ""
+            if REDIRECTS[word] == "stdin":
+                stdin = target
+            elif REDIRECTS[word] == "stdout":
+                stdout = target
+            i += 2
+            continue
+        if len(word) == 1 and word.isdigit() and i + 1 < len(words) \
+                and words[i + 1] in REDIRECTS and words[i + 1] != "<":
+            # 2> log, 2>&1: another descriptor redirected, not an argument
+            if word == "1" and REDIRECTS[words[i + 1]] == "stdout":
+                stdout = words[i + 2] if i + 2 < len(words) else ""
+            i += 3
+            continue
+        args.append(word)
+        i += 1
+    while args and (args[0] in PREFIXES or ASSIGNMENT.match(args[0])):
+        args.pop(0)
+    if not args or args[0] in KEYWORDS:
+        return None
+    tool = canonical_tool(args[0])
+    subcommand = ""
+    if tool in SUBCOMMAND_TOOLS and len(args) > 1 and SUBCOMMAND.match(args[1]) \
+            and not is_path(args[1]):
+        subcommand = args[1]
+    rest = args[2:] if subcommand else args[1:]
+    return Invocation(tool=tool, command=args[0], subcommand=subcommand, args=rest, line=line,
+                      stdin=stdin, stdout=stdout, piped_in=piped_in)
+
+
+def parse_commands(text: str, first_line: int = 1):
+    """(invocations, errors) of a shell snippet; line numbers start at ``first_line``."""
+    invocations, errors = [], []
+    heredoc = None
+    for offset, line in logical_lines(text):
+        number = first_line + offset
+        if heredoc is not None:
+            if line == heredoc:
+                heredoc = None
+            continue
+        if not line or line.startswith("#"):
+            continue
+        try:
+            tokens = tokenize(line)
+        except ValueError as exc:
+            errors.append((number, str(exc)))
+            continue
+        if "<<" in tokens or "<<-" in tokens:
+            # the here-document body is data, not commands
+            at = tokens.index("<<" if "<<" in tokens else "<<-")
+            heredoc = tokens[at + 1] if at + 1 < len(tokens) else None
+            tokens = tokens[:at] + tokens[at + 2:]
+        words, piped = [], False
+        for token in tokens + [";"]:
+            if token in OPERATORS:
+                invocation = _command(words, number, piped)
+                if invocation is not None:
+                    invocations.append(invocation)
+                piped = token in ("|", "|&")
+                words = []
+            else:
+                words.append(token)
+    return invocations, errors
+
+
+def shell_blocks(text: str) -> list:
+    """(language, first content line, content) of the blocks that hold shell code."""
+    return [(language, start, content) for language, start, content in code_blocks(text)
+            if language in SHELL_LANGUAGES and (language or not DIAGRAM_CHARS & set(content))]
+
+
+def parse_blocks(text: str, first_line: int = 1) -> list:
+    """ParsedBlock for every shell code block in a response."""
+    parsed = []
+    for language, start, content in shell_blocks(text):
+        block = ParsedBlock(language=language, line=first_line + start - 1, text=content)
+        block.invocations, block.errors = parse_commands(content, block.line)
+        parsed.append(block)
+    return parsed
@@ -0,0 +1,181 @@
+"""
+Pairwise significance tests and a global ranking of model versions.
+
+Every pair of models is compared on its per-step composites
+(``cube.model_step_matrix``) with a paired sign-flip permutation test:
+under the null hypothesis each step's difference is equally likely to
+have either sign. The statistic is the summed difference over the steps
+both models were scored on. When the number of steps is small, all 2^S
+sign patterns are enumerated (an exact test); otherwise they are sampled.
+All pairs are tested at once: the (pairs × steps) difference matrix is
+multiplied by the (steps × patterns) sign matrix, in memory-bounded
+batches of pairs.
+
+p-values are corrected with Holm (family-wise error) or Benjamini–Hochberg
+(false discovery rate). The global ranking is a Bradley–Terry model fitted
+with the minorization–maximization iterations of Hunter (2004), where each
+step on which both models were scored is one comparison (ties count half).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .instrument import count, timed
+
+EXACT_MAX_STEPS = 16
+DEFAULT_PERMUTATIONS = 10_000
+DEFAULT_BATCH_BYTES = 64 << 20
+CORRECTIONS = ("holm", "bh")
+
+
+@dataclass
+class PairwiseTests:
+    """Paired permutation tests for every unordered pair of models."""
+
+    first: np.ndarray       # index into cube.models
+    second: np.ndarray      # index into cube.models
+    n_steps: np.ndarray     # steps both models were scored on
+    mean_diff: np.ndarray   # mean per-step composite of first minus second
+    p_value: np.ndarray     # two-sided, uncorrected
+    p_adjusted: np.ndarray
+    correction: str
+    exact: bool
+    n_permutations: int
+
+
+@dataclass
+class BradleyTerry:
+    """Bradley–Terry strengths (normalised to a geometric mean of 1)."""
+
+    strength: np.ndarray
+    wins: np.ndarray        # (model × model) comparisons won, ties as 0.5
+    iterations: int
+    converged: bool
+
+    @property
+    def order(self) -> np.ndarray:
+        """Model indices from strongest to weakest."""
+        return np.argsort(-self.strength, kind="stable")
+
+
+def sign_patterns(n_steps: int, n_permutations: int = DEFAULT_PERMUTATIONS, seed: int = 0):
+    """(steps × patterns) ±1 matrix and whether it enumerates every pattern."""
+    if n_steps <= EXACT_MAX_STEPS:
+        bits = (np.arange(2 ** n_steps)[None, :] >> np.arange(n_steps)[:, None]) & 1
+        return 1.0 - 2.0 * bits, True
+    rng = np.random.default_rng(seed)
+    signs = rng.integers(0, 2, size=(n_steps, n_permutations)) * 2.0 - 1.0
+    # Include the identity so the observed statistic is one of the draws
+    signs[:, 0] = 1.0
+    return signs, False
+
+
+def adjust_pvalues(p: np.ndarray, method: str = "bh") -> np.ndarray:
+    """Holm or Benjamini–Hochberg adjusted p-values (NaN entries are skipped)."""
+    if method not in CORRECTIONS:
+        raise ValueError(f"Unknown correction {method!r}; expected one of {CORRECTIONS}")
+    adjusted = np.full_like(p, np.nan, dtype=float)
+    valid = np.flatnonzero(~np.isnan(p))
+    m = len(valid)
+    if not m:
+        return adjusted
+    order = valid[np.argsort(p[valid], kind="stable")]
+    ranked = p[order]
+    if method == "holm":
+        scaled = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    else:
+        scaled = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    adjusted[order] = np.minimum(scaled, 1.0)
+    return adjusted
+
+
+@timed("pairwise tests")
+def pairwise_tests(matrix: np.ndarray, correction: str = "bh",
+                   n_permutations: int = DEFAULT_PERMUTATIONS, seed: int = 0,
+                   batch_bytes: int = DEFAULT_BATCH_BYTES) -> PairwiseTests:
+    """Sign-flip permutation tests between all rows of a (model × step) matrix."""
+    n_models, n_steps = matrix.shape
+    first, second = np.triu_indices(n_models, k=1)
+    signs, exact = sign_patterns(n_steps, n_permutations, seed)
+    n_patterns = signs.shape[1]
+
+    n_pairs = len(first)
+    n_common = np.empty(n_pairs, dtype=np.int64)
+    observed = np.empty(n_pairs)
+    p_value = np.empty(n_pairs)
+    batch = max(1, batch_bytes // (8 * max(n_patterns, n_steps)))
+    for b0 in range(0, n_pairs, batch):
+        b1 = min(b0 + batch, n_pairs)
+        diff = matrix[first[b0:b1]] - matrix[second[b0:b1]]
+        both = ~np.isnan(diff)
+        diff = np.where(both, diff, 0.0)
+        stats = diff @ signs
+        obs = diff.sum(axis=1)
+        # Tolerance keeps patterns that tie the observed statistic in the tail
+        tol = 1e-9 * np.maximum(np.abs(diff).sum(axis=1), 1.0)
+        extreme = np.abs(stats) >= (np.abs(obs) - tol)[:, None]
+        n_common[b0:b1] = both.sum(axis=1)
+        observed[b0:b1] = obs
+        p_value[b0:b1] = extreme.mean(axis=1)
+    count("pairs_tested", n_pairs)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_diff = np.where(n_common > 0, observed / np.maximum(n_common, 1), np.nan)
+    p_value[n_common == 0] = np.nan
+    return PairwiseTests(
+        first=first,
+        second=second,
+        n_steps=n_common,
+        mean_diff=mean_diff,
+        p_value=p_value,
+        p_adjusted=adjust_pvalues(p_value, correction),
+        correction=correction,
+        exact=exact,
+        n_permutations=n_patterns,
+    )
+
+
+def win_matrix(matrix: np.ndarray) -> np.ndarray:
+    """(model × model) number of steps on which row beats column; ties count half."""
+    a = matrix[:, None, :]
+    b = matrix[None, :, :]
+    both = ~(np.isnan(a) | np.isnan(b))
+    wins = ((a > b) & both).sum(axis=2) + 0.5 * ((a == b) & both).sum(axis=2)
+    np.fill_diagonal(wins, 0.0)
+    return wins
+
+
+@timed("bradley-terry")
+def bradley_terry(matrix: np.ndarray, max_iter: int = 1000, tol: float = 1e-10,
+                  prior: float = 0.1) -> BradleyTerry:
+    """Fit Bradley–Terry strengths to per-step wins between models.
+
+    ``prior`` adds that many virtual ties to every compared pair so that
+    models that never (or always) win still get a finite strength.
+    """
+    wins = win_matrix(matrix)
+    games = wins + wins.T
+    compared = games > 0
+    w = wins + prior / 2 * compared
+    n = games + prior * compared
+    total_wins = w.sum(axis=1)
+
+    strength = np.ones(len(matrix))
+    converged = False
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            denom = (n / (strength[:, None] + strength[None, :])).sum(axis=1)
+            updated = np.where(denom > 0, total_wins / denom, strength)
+        # Models with no comparisons keep strength 1; the rest are centred
+        updated = np.where(updated > 0, updated, np.nan)
+        updated /= np.exp(np.nanmean(np.log(updated)))
+        updated = np.nan_to_num(updated, nan=1.0)
+        change = np.max(np.abs(np.log(updated) - np.log(strength)))
+        strength = updated
+        if change < tol:
+            converged = True
+            break
+    return BradleyTerry(strength=strength, wins=wins, iterations=iterations,
+                        converged=converged)
@@ -0,0 +1,162 @@
+"""
+Step-to-step error compounding across conversations.
+
+Each model answers the steps in order within one conversation and is not
+corrected along the way, so a failure at step N can carry into step N+1.
+Replicate rows of a (model, step) cell are matched up by order: the k-th
+row of every cell of a model belongs to that model's k-th conversation.
+
+Every row is placed once into a dense (conversation × step × dimension)
+state array (-1 unscored, 0 passed, 1 failed), with a sixth "any" column
+that fails when any recognised dimension fails. Everything else is read
+off that array without looping over rows:
+
+- transition counts (dimension × step pair × state at N × state at N+1)
+  come from one ``np.bincount`` over adjacent step pairs;
+- the cross-dimension matrix (failure of one dimension at N against each
+  dimension at N+1) is a single matrix product;
+- cascades are maximal runs of consecutive failed steps, found from the
+  ``np.diff`` of the padded failure mask. An unscored step ends a run.
+
+A dimension fails when its code scores 0 (I, F or N); with
+``partial=True`` every code short of fully correct counts as a failure.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import DIMENSIONS
+from .instrument import count, timed
+
+ANY = "any"
+STATE_DIMENSIONS = DIMENSIONS + [ANY]
+
+
+@dataclass
+class Compounding:
+    """Failure transitions and cascades over the step-ordered conversations.
+
+    Dimension axes follow ``STATE_DIMENSIONS`` (the five dimensions, then
+    ``"any"``); step pair ``s`` is the transition from ``steps[s]`` to
+    ``steps[s + 1]``.
+    """
+
+    steps: np.ndarray
+    conversations: np.ndarray  # (conversation × 2): model index, replicate
+    transitions: np.ndarray    # (dimension × step pair × 2 × 2) counts, [state N, state N+1]
+    cross: np.ndarray          # (dimension × dimension) fail at N (row) and fail at N+1 (col)
+    cross_observed: np.ndarray  # (dimension × dimension) fail at N (row), col observed at N+1
+    run_lengths: np.ndarray    # (dimension × length 0..n_steps) run counts; length 0 unused
+    runs: np.ndarray           # (runs × 4): dimension, conversation, start step, length
+    partial: bool
+
+    @property
+    def n_conversations(self) -> int:
+        return len(self.conversations)
+
+    def pair_totals(self) -> np.ndarray:
+        """(dimension × 2 × 2) transition counts summed over step pairs."""
+        return self.transitions.sum(axis=1)
+
+    def conditional(self, totals: np.ndarray = None):
+        """P(fail at N+1 | fail at N) and P(fail at N+1 | pass at N).
+
+        Works on ``transitions`` (per step pair) or on ``pair_totals()``;
+        NaN where the condition never occurred.
+        """
+        counts = self.transitions if totals is None else totals
+        given = counts.sum(axis=-1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            after_fail = np.where(given[..., 1] > 0, counts[..., 1, 1] / given[..., 1], np.nan)
+            after_pass = np.where(given[..., 0] > 0, counts[..., 0, 1] / given[..., 0], np.nan)
+        return after_fail, after_pass
+
+    def cross_conditional(self) -> np.ndarray:
+        """P(column fails at N+1 | row fails at N)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.cross_observed > 0,
+                            self.cross / np.maximum(self.cross_observed, 1), np.nan)
+
+
+def conversation_index(enc):
+    """Conversation of every row and the (model, replicate) of each conversation.
+
+    Rows are ranked by position within their (model, step) cell; rank k of
+    model m is conversation ``m * n_replicates + k`` before compaction.
+    """
+    n_steps = len(enc.steps)
+    cell = enc.model_index * n_steps + enc.step_index
+    order = np.argsort(cell, kind="stable")
+    counts = np.bincount(cell, minlength=len(enc.models) * n_steps)
+    starts = np.cumsum(counts) - counts
+    replicate = np.empty(enc.n_rows, dtype=np.int64)
+    replicate[order] = np.arange(enc.n_rows) - starts[cell[order]]
+
+    n_replicates = int(counts.max()) if enc.n_rows else 0
+    key = enc.model_index * n_replicates + replicate
+    used, conversation = np.unique(key, return_inverse=True)
+    pairs = np.stack([used // max(n_replicates, 1), used % max(n_replicates, 1)], axis=1)
+    return conversation.ravel(), pairs
+
+
+def failure_states(enc, partial: bool = False) -> np.ndarray:
+    """(rows × state dimension) int8: -1 unscored, 0 passed, 1 failed."""
+    values = enc.values
+    known = ~np.isnan(values)
+    failed = (values < 1.0) if partial else (values == 0.0)
+    states = np.where(known, failed.astype(np.int8), np.int8(-1))
+    any_known = known.any(axis=1)
+    any_failed = (failed & known).any(axis=1)
+    combined = np.where(any_known, any_failed.astype(np.int8), np.int8(-1))
+    return np.column_stack([states, combined]).astype(np.int8)
+
+
+@timed("error compounding")
+def error_compounding(cube, partial: bool = False) -> Compounding:
+    enc = cube.encoded
+    n_steps = len(cube.steps)
+    n_dims = len(STATE_DIMENSIONS)
+
+    conversation, conversations = conversation_index(enc)
+    n_conv = len(conversations)
+    count("conversations", n_conv)
+
+    state = np.full((n_conv, n_steps, n_dims), -1, dtype=np.int8)
+    state[conversation, enc.step_index] = failure_states(enc, partial)
+
+    # Transition counts over adjacent step pairs
+    before, after = state[:, :-1], state[:, 1:]
+    both = (before >= 0) & (after >= 0)
+    conv_idx, pair_idx, dim_idx = np.nonzero(both)
+    keys = ((dim_idx * (n_steps - 1) + pair_idx) * 2 + before[both]) * 2 + after[both]
+    transitions = np.bincount(keys, minlength=n_dims * max(n_steps - 1, 0) * 4)
+    transitions = transitions.reshape(n_dims, max(n_steps - 1, 0), 2, 2)
+
+    # Cross-dimension: failure of row dimension at N, column dimension at N+1
+    failed_before = (before == 1).reshape(-1, n_dims).astype(np.float64)
+    failed_after = (after == 1).reshape(-1, n_dims).astype(np.float64)
+    observed_after = (after >= 0).reshape(-1, n_dims).astype(np.float64)
+    cross = failed_before.T @ failed_after
+    cross_observed = failed_before.T @ observed_after
+
+    # Cascades: runs of consecutive failed steps per (dimension, conversation)
+    failed = np.pad(np.moveaxis(state == 1, 2, 0), ((0, 0), (0, 0), (1, 1)))
+    edges = np.diff(failed.astype(np.int8), axis=2)
+    run_dim, run_conv, run_start = np.nonzero(edges == 1)
+    run_end = np.nonzero(edges == -1)[2]
+    lengths = run_end - run_start
+    run_lengths = np.bincount(run_dim * (n_steps + 1) + lengths,
+                              minlength=n_dims * (n_steps + 1)).reshape(n_dims, n_steps + 1)
+    count("failure_runs", len(lengths))
+
+    return Compounding(
+        steps=cube.steps,
+        conversations=conversations,
+        transitions=transitions,
+        cross=cross,
+        cross_observed=cross_observed,
+        run_lengths=run_lengths,
+        runs=np.stack([run_dim, run_conv, run_start, lengths], axis=1),
+        partial=partial,
+    )
@@ -0,0 +1,302 @@
+"""
+SQLite full-text index over the model transcripts in ``responses/``.
+
+Transcripts live in ``responses/<family>/<version>/`` (any depth below the
+version directory; ``*.md``, ``*.markdown`` and ``*.txt``). Each file is
+streamed once: its SHA-256 is computed while it is split into per-step
+turns, keyed by (family, version, step) with steps numbered as in
+``prompts/step_0N_<name>.md``:
+
+- a file whose name carries a step (``step_03.md``, ``step3_response.txt``)
+  is one turn of that step;
+- otherwise the file is split at step headings (``## Step 3``,
+  ``# Step 3: Host depletion``, ``**Step 3**``) for steps that have a
+  prompt; text before the first heading is kept as step 0.
+
+Turns go into a ``turns`` table (indexed by key) with an external-content
+FTS5 table kept in sync by triggers. Directory families are mapped to the
+scoring-matrix families through ``FAMILY_ALIASES`` (``chatgpt`` ->
+``openai``), so search results line up with ``scoring_matrix.csv``.
+
+Re-ingesting follows ``scoring.cache``: a file whose size and mtime match
+the database is skipped without reading it (unless the mtime is too close
+to the last ingest to be trusted); otherwise it is hashed and its turns
+are only replaced if the hash changed. Files that disappeared are dropped.
+"""
+
+import hashlib
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .cache import RACY_WINDOW_NS
+from .instrument import count, stage, timed
+
+SCHEMA_VERSION = 1
+SUFFIXES = {".md", ".markdown", ".txt"}
+FAMILY_ALIASES = {"chatgpt": "openai"}
+
+PROMPT_FILE = re.compile(r"step_0*(\d+)_(\w+)\.md$")
+FILE_STEP = re.compile(r"step[_\s-]*0*(\d+)", re.IGNORECASE)
+STEP_HEADING = re.compile(r"^\s{0,3}(?:#{1,6}\s*|\*\*\s*)step\s*0*(\d+)\b", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    family TEXT NOT NULL,
+    version TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    indexed_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    family TEXT NOT NULL,
+    version TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS turns_key ON turns (family, version, step);
+CREATE INDEX IF NOT EXISTS turns_path ON turns (path);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+    text, content='turns', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS turns_insert AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_delete AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts (turns_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+@dataclass
+class IngestStats:
+    scanned: int = 0
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    turns: int = 0
+    skipped: list = field(default_factory=list)   # paths outside <family>/<version>/
+
+
+@dataclass
+class Hit:
+    """Best-matching turn of one (family, version, step)."""
+
+    family: str
+    version: str
+    step: int
+    turns: int       # matching turns for the key
+    rank: float      # bm25 of the best turn (lower is better)
+    path: str
+    line: int
+    snippet: str
+
+
+def prompt_steps(prompts_dir) -> dict:
+    """{step number: name} from ``prompts/step_0N_<name>.md``."""
+    steps = {}
+    for path in Path(prompts_dir).glob("step_*.md"):
+        match = PROMPT_FILE.match(path.name)
+        if match:
+            steps[int(match.group(1))] = match.group(2)
+    return dict(sorted(steps.items()))
+
+
+def connect(db_path) -> sqlite3.Connection:
+    """Open the index, creating or recreating its schema as needed."""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript("DROP TABLE IF EXISTS turns_fts; DROP TABLE IF EXISTS turns; "
+                           "DROP TABLE IF EXISTS files;")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    return conn
+
+
+def transcript_paths(root) -> list:
+    """Transcript files under ``root``, sorted, skipping hidden files."""
+    root = Path(root)
+    return sorted(path for path in root.rglob("*")
+                  if path.is_file() and path.suffix.lower() in SUFFIXES
+                  and not any(part.startswith(".") for part in path.relative_to(root).parts))
+
+
+def conversations(root, steps: dict, family: str = None, version: str = None) -> list:
+    """(label, family, version, [paths]) of every conversation, in path order.
+
+    A conversation is one transcript file, or the per-step files
+    (``step_01.md`` ...) of one directory.
+    """
+    root = Path(root)
+    grouped = {}
+    for path in transcript_paths(root):
+        parts = path.relative_to(root).parts
+        if len(parts) < 3:
+            continue
+        name = FAMILY_ALIASES.get(parts[0], parts[0])
+        if family is not None and family not in (parts[0], name):
+            continue
+        if version is not None and parts[1] != version:
+            continue
+        match = FILE_STEP.search(path.stem)
+        per_step = match and int(match.group(1)) in steps
+        label = "/".join(parts[:-1] if per_step else parts)
+        grouped.setdefault((label, name, parts[1]), []).append(path)
+    return [(label, name, ver, paths) for (label, name, ver), paths in grouped.items()]
+
+
+def read_turns(path: Path, steps: dict):
+    """Stream ``path`` once: returns (sha256, [(step, first line, text), ...])."""
+    digest = hashlib.sha256()
+    match = FILE_STEP.search(path.stem)
+    file_step = int(match.group(1)) if match and int(match.group(1)) in steps else None
+    turns = []
+    step, start, lines = (file_step or 0), 1, []
+
+    def flush():
+        text = "".join(lines).strip()
+        if text:
+            turns.append((step, start, text))
+
+    with open(path, "rb") as fh:
+        for number, raw in enumerate(fh, 1):
+            digest.update(raw)
+            line = raw.decode("utf-8", errors="replace")
+            if file_step is None:
+                heading = STEP_HEADING.match(line)
+                if heading and int(heading.group(1)) in steps \
+                        and int(heading.group(1)) != step:
+                    flush()
+                    step, start, lines = int(heading.group(1)), number, []
+            lines.append(line)
+    flush()
+    return digest.hexdigest(), turns
+
+
+def _key(root: Path, path: Path):
+    """(relative path, family, version) or None outside <family>/<version>/."""
+    parts = path.relative_to(root).parts
+    if len(parts) < 3:
+        return None
+    family, version = parts[0], parts[1]
+    return "/".join(parts), FAMILY_ALIASES.get(family, family), version
+
+
+@timed("ingest")
+def ingest(root, db_path, steps: dict, rebuild: bool = False) -> IngestStats:
+    """Bring the index at ``db_path`` up to date with the transcripts in ``root``."""
+    root = Path(root)
+    conn = connect(db_path)
+    stats = IngestStats()
+    try:
+        with conn:
+            if rebuild:
+                conn.execute("DELETE FROM turns")
+                conn.execute("DELETE FROM files")
+            known = {row[0]: row[1:] for row in conn.execute(
+                "SELECT path, size, mtime_ns, sha256, indexed_ns FROM files")}
+            now = time.time_ns()
+            for path in transcript_paths(root):
+                key = _key(root, path)
+                if key is None:
+                    stats.skipped.append(path)
+                    continue
+                rel, family, version = key
+                stats.scanned += 1
+                stat = path.stat()
+                record = known.pop(rel, None)
+                if record is not None:
+                    size, mtime_ns, sha, indexed_ns = record
+                    if (size == stat.st_size and mtime_ns == stat.st_mtime_ns
+                            and stat.st_mtime_ns < indexed_ns - RACY_WINDOW_NS):
+                        stats.unchanged += 1
+                        continue
+                with stage("read transcripts"):
+                    sha256, turns = read_turns(path, steps)
+                if record is not None and record[2] == sha256:
+                    conn.execute("UPDATE files SET size = ?, mtime_ns = ?, indexed_ns = ? "
+                                 "WHERE path = ?", (stat.st_size, stat.st_mtime_ns, now, rel))
+                    stats.unchanged += 1
+                    continue
+                with stage("write index"):
+                    conn.execute("DELETE FROM turns WHERE path = ?", (rel,))
+                    conn.executemany(
+                        "INSERT INTO turns (path, family, version, step, line, text) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [(rel, family, version, step, line, text)
+                         for step, line, text in turns])
+                    conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 (rel, family, version, stat.st_size, stat.st_mtime_ns,
+                                  sha256, now))
+                stats.turns += len(turns)
+                if record is None:
+                    stats.added += 1
+                else:
+                    stats.updated += 1
+            for rel in known:
+                conn.execute("DELETE FROM turns WHERE path = ?", (rel,))
+                conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+            stats.removed = len(known)
+    finally:
+        conn.close()
+    count("transcripts_read", stats.added + stats.updated)
+    return stats
+
+
+def fts_query(text: str) -> str:
+    """Quote every word so plain text never trips the FTS5 query syntax."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+@timed("search")
+def search(db_path, query: str, step: int = None, family: str = None, version: str = None,
+           limit: int = 50, raw: bool = False) -> list:
+    """Keys whose turns match ``query``, best match first.
+
+    ``query`` is plain words (all must appear) unless ``raw`` passes it to
+    FTS5 unchanged (phrases, OR, NEAR, prefix*).
+    """
+    where, params = ["turns_fts MATCH ?"], [query if raw else fts_query(query)]
+    for column, value in (("step", step), ("family", family), ("version", version)):
+        if value is not None:
+            where.append(f"t.{column} = ?")
+            params.append(value)
+    # bm25() cannot be evaluated inside an aggregate: rank every turn in a
+    # materialized CTE (so it is not flattened into the GROUP BY), then keep
+    # the best turn per key (SQLite takes bare columns from the min() row)
+    sql = (
+        "WITH matches AS MATERIALIZED (SELECT t.family, t.version, t.step, t.path, t.line, "
+        "bm25(turns_fts) AS rank, snippet(turns_fts, 0, '[', ']', '…', 12) AS snippet "
+        "FROM turns_fts JOIN turns t ON t.id = turns_fts.rowid "
+        f"WHERE {' AND '.join(where)}) "
+        "SELECT family, version, step, count(*), min(rank), path, line, snippet "
+        "FROM matches GROUP BY family, version, step ORDER BY min(rank) LIMIT ?"
+    )
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(sql, params + [limit]).fetchall()
+    finally:
+        conn.close()
+    return [Hit(*row) for row in rows]
+
+
+def coverage(db_path) -> list:
+    """(family, version, step, turns) for every indexed key."""
+    conn = connect(db_path)
+    try:
+        return conn.execute("SELECT family, version, step, count(*) FROM turns "
+                            "GROUP BY family, version, step "
+                            "ORDER BY family, version, step").fetchall()
+    finally:
+        conn.close()
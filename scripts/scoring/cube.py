@@ -0,0 +1,167 @@
+"""
+Dense score cube shared by the report and figure scripts.
+
+``load_cube`` parses and scores ``scoring_matrix.csv`` once per process;
+every script then reads the same cached views instead of re-deriving
+composites from the DataFrame its own way.
+
+Missing cells are handled identically everywhere: a cell is missing when
+it is blank or holds a code outside ``SCORE_MAP``, and a row composite is
+only defined when all five dimensions carry a recognised code.
+"""
+
+from functools import cached_property, lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import load_cached_table
+from .engine import DIMENSIONS, encode_scores, group_mean, row_composites, split_by_group
+from .instrument import count, stage, timed
+
+
+def parse_scores(csv_path) -> pd.DataFrame:
+    """Read the scoring matrix and strip whitespace from score columns."""
+    with stage("read_csv"):
+        df = pd.read_csv(csv_path)
+    with stage("clean codes"):
+        for dim in DIMENSIONS:
+            df[dim] = df[dim].astype(str).str.strip().replace("nan", "").fillna("")
+    count("rows_parsed", len(df))
+    return df
+
+
+@timed("load_scores")
+def load_scores(csv_path, use_cache: bool = True) -> pd.DataFrame:
+    """Return the cleaned scoring matrix, via the binary cache by default.
+
+    Cached tables are category-typed; see ``scoring.cache``.
+    """
+    if not use_cache:
+        return parse_scores(csv_path)
+    return load_cached_table(csv_path, parse_scores)
+
+
+class ScoreCube:
+    """Scoring matrix parsed and scored once, with cached derived views.
+
+    ``values`` is a dense (model × step × dimension) array holding the mean
+    numeric score of the replicate rows in each cell, and ``missing`` marks
+    cells without any recognised code. Models are ordered by first
+    appearance in the CSV and steps by step number.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.encoded = encode_scores(df)
+
+    @property
+    def models(self) -> list:
+        return self.encoded.models
+
+    @property
+    def steps(self) -> np.ndarray:
+        return self.encoded.steps
+
+    @property
+    def step_names(self) -> list:
+        return self.encoded.step_names
+
+    @cached_property
+    def model_position(self) -> dict:
+        """Map (family, version) to its index along the model axis."""
+        return {model: i for i, model in enumerate(self.models)}
+
+    @cached_property
+    def rows_by_model(self) -> list:
+        """CSV row positions of every model, indexed like ``models``."""
+        return split_by_group(self.encoded.model_index, len(self.models))
+
+    @cached_property
+    def rows_by_step(self) -> list:
+        """CSV row positions of every step, indexed like ``steps``."""
+        return split_by_group(self.encoded.step_index, len(self.steps))
+
+    @cached_property
+    def cell_index(self) -> np.ndarray:
+        """Flat (model, step) cell index of every row."""
+        return self.encoded.model_index * len(self.steps) + self.encoded.step_index
+
+    @cached_property
+    @timed("cube values")
+    def values(self) -> np.ndarray:
+        enc = self.encoded
+        n_cells = len(self.models) * len(self.steps)
+        cube = np.empty((n_cells, len(DIMENSIONS)))
+        for j in range(len(DIMENSIONS)):
+            known = ~np.isnan(enc.values[:, j])
+            cube[:, j] = group_mean(self.cell_index[known], enc.values[known, j], n_cells)
+        return cube.reshape(len(self.models), len(self.steps), len(DIMENSIONS))
+
+    @cached_property
+    def missing(self) -> np.ndarray:
+        return np.isnan(self.values)
+
+    @cached_property
+    def row_composite(self) -> np.ndarray:
+        """Mean score per CSV row; NaN unless all dimensions are recognised."""
+        return row_composites(self.encoded)
+
+    @cached_property
+    def model_step_matrix(self) -> np.ndarray:
+        """(model × step) mean row composite; NaN for unscored cells."""
+        composite = self.row_composite
+        ok = ~np.isnan(composite)
+        n_cells = len(self.models) * len(self.steps)
+        matrix = group_mean(self.cell_index[ok], composite[ok], n_cells)
+        return matrix.reshape(len(self.models), len(self.steps))
+
+    @cached_property
+    def step_composites(self) -> np.ndarray:
+        """Mean row composite per step across all models."""
+        composite = self.row_composite
+        ok = ~np.isnan(composite)
+        return group_mean(self.encoded.step_index[ok], composite[ok], len(self.steps))
+
+    @cached_property
+    def model_composites(self) -> np.ndarray:
+        """Mean row composite per model across all steps."""
+        composite = self.row_composite
+        ok = ~np.isnan(composite)
+        return group_mean(self.encoded.model_index[ok], composite[ok], len(self.models))
+
+    @cached_property
+    def model_dimension_means(self) -> np.ndarray:
+        """(model × dimension) mean of the recognised codes in each column."""
+        enc = self.encoded
+        means = np.empty((len(self.models), len(DIMENSIONS)))
+        for j in range(len(DIMENSIONS)):
+            known = ~np.isnan(enc.values[:, j])
+            means[:, j] = group_mean(enc.model_index[known], enc.values[known, j],
+                                     len(self.models))
+        return means
+
+    @cached_property
+    def family_dimension_means(self) -> dict:
+        """family -> (versions, (version × dimension) means), in CSV order."""
+        result = {}
+        for i, (family, version) in enumerate(self.models):
+            versions, rows = result.setdefault(family, ([], []))
+            versions.append(version)
+            rows.append(i)
+        return {family: (versions, self.model_dimension_means[rows])
+                for family, (versions, rows) in result.items()}
+
+
+@lru_cache(maxsize=None)
+def _load_cube(csv_path: Path) -> ScoreCube:
+    return ScoreCube(load_scores(csv_path))
+
+
+def load_cube(csv_path) -> ScoreCube:
+    """Load and score ``csv_path`` once per process."""
+    return _load_cube(Path(csv_path).resolve())
+
+
+load_cube.cache_clear = _load_cube.cache_clear
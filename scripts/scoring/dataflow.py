@@ -0,0 +1,365 @@
+"""
+Produced/consumed file graph of a conversation and the output
+compatibility failures it reveals.
+
+A conversation is one transcript holding every step (split at step
+headings) or the per-step files of one directory (``step_01.md`` ...).
+Its shell commands (``scoring.commands``) are walked once, in step and
+line order, against a hash index of every output written so far (path ->
+producing step, tool and format). For each invocation:
+
+- outputs are ``> file``, output flags (``-o``, ``--out-dir``,
+  ``--report``...), implicit files (``samtools index x.bam`` writes
+  ``x.bam.bai``, ``gzip x`` writes ``x.gz``) and the directories made by
+  ``mkdir``. Their format is what the tool writes, not what the name
+  says: ``dorado basecaller > reads.fastq`` holds BAM unless
+  ``--emit-fastq`` is given, ``minimap2 -a`` writes SAM;
+- inputs are ``< file``, the previous command of a pipe and every other
+  path argument, except those of ``rm`` and ``touch``. An input under a
+  produced directory (``assembly/`` -> ``assembly/assembly.fasta``)
+  counts as produced, unless ``mkdir`` made it empty.
+
+Four kinds of mismatch are reported, as in the rubric:
+
+- ``path``: a later step reads a file no earlier command wrote (external
+  inputs are only expected at the first step with commands; references
+  and databases are recognised by flag, and FASTA files, ``.mmi``
+  indexes and directories also by name: ``GRCh38.fa``, ``kraken_db/``). Placeholders
+  (``$VAR``, ``<reads>``, ``/path/to``) that match nothing are skipped.
+  Inputs that are expected to exist are kept in ``Dataflow.sources``;
+- ``format``: BAM/SAM reaches a tool that reads FASTQ/FASTA, or FASTA a
+  tool that needs FASTQ;
+- ``gzip``: a ``.gz`` file reaches a tool that cannot read it (or any
+  tool through ``<``);
+- ``index``: a tool that needs an indexed BAM gets one without ``.bai``
+  (``samtools view`` only when a region follows the BAM, whatever its
+  value-less flags: ``samtools view -b -h x.bam chr1``).
+
+A mismatch counts against the step whose output is wrong: the producer
+of the file for format, gzip and index mismatches, and for path
+mismatches the latest earlier step that wrote data. Each index lookup is
+O(1) (O(depth) for the directory fallback), so a conversation is checked
+in time linear in its number of command arguments.
+"""
+
+import posixpath
+import re
+from dataclasses import dataclass, field
+
+from .commands import is_path, parse_blocks
+
+FASTQ, FASTA, BAM, SAM, DIR = "FASTQ", "FASTA", "BAM", "SAM", "DIR"
+SUFFIX_FORMATS = [
+    (re.compile(r"\.(fastq|fq)(\.gz)?$", re.I), FASTQ),
+    (re.compile(r"\.(fasta|fa|fna|fas|ffn)(\.gz)?$", re.I), FASTA),
+    (re.compile(r"\.bam$", re.I), BAM),
+    (re.compile(r"\.sam(\.gz)?$", re.I), SAM),
+    (re.compile(r"\.paf(\.gz)?$", re.I), "PAF"),
+    (re.compile(r"\.(bai|csi)$", re.I), "BAI"),
+    (re.compile(r"\.(pod5|fast5)$", re.I), "RAW"),
+]
+READ_FORMATS = {FASTQ, FASTA, BAM, SAM, "PAF"}
+
+OUTPUT_FLAGS = {"-o", "-O", "--output", "--out", "--out-dir", "--outdir", "-s", "--save_path",
+                "-S", "--report", "--classified-out", "--unclassified-out"}
+# Flags whose value is a reference or database, never a pipeline file
+REFERENCE_FLAGS = {"--db", "--ref", "--reference", "--database", "-x", "--index", "--config",
+                   "-r", "-m", "--model"}
+# Name tokens of a reference or database; only FASTA, .mmi and directory inputs are read as
+# such, so ``host_removed.fastq`` or ``genome_reads.fastq`` are still pipeline files
+REFERENCE_NAME = re.compile(r"(^|[_.-])(grch\d*|chm13\w*|hg\d\d|human|host|ref|reference|genome|"
+                            r"db|database|index)([_.-]|$)", re.I)
+PLACEHOLDER = re.compile(r"\$|<|>|path/to|your_|\.\.\.")
+
+# (tool, subcommand) -> format written to stdout
+STDOUT_FORMATS = {
+    ("dorado", "basecaller"): BAM, ("dorado", "duplex"): BAM, ("samtools", "sort"): BAM,
+    ("samtools", "fastq"): FASTQ, ("samtools", "fasta"): FASTA, ("nanofilt", ""): FASTQ,
+    ("chopper", ""): FASTQ, ("filtlong", ""): FASTQ, ("porechop", ""): FASTQ,
+    ("racon", ""): FASTA, ("seqkit", "fq2fa"): FASTA, ("seqkit", "seq"): FASTQ,
+    ("seqtk", "seq"): FASTQ,
+}
+# Tools that read FASTQ/FASTA but not BAM/SAM
+SEQUENCE_READERS = {"nanofilt", "chopper", "filtlong", "porechop", "kraken2", "flye", "minimap2",
+                    "seqkit", "seqtk", "metawrap", "amrfinderplus", "abricate", "medaka",
+                    "bowtie2", "bwa", "megahit", "spades", "canu", "wtdbg2", "centrifuge",
+                    "diamond", "prokka", "bakta", "metabat2", "checkm", "checkm2", "semibin2"}
+FASTQ_ONLY = {"nanofilt", "chopper", "filtlong"}
+# Tools that cannot read gzipped input (kraken2 v2.0.7 only with --gzip-compressed)
+NO_GZIP = {"nanofilt", "metawrap", "kraken2", "checkm", "prokka"}
+GZIP_FLAGS = {"--gzip-compressed"}
+GZIP_STDIN = {"chopper", "seqkit", "seqtk", "gzip", "gunzip", "zcat", "pigz"}
+# (tool, subcommand) -> position of the positional argument that is an output directory
+POSITIONAL_OUTPUTS = {("checkm", "lineage_wf"): -1, ("checkm", "taxonomy_wf"): -1,
+                      ("checkm", "tree"): -1, ("gtdbtk", "classify_wf"): -1}
+# Tools whose outputs are reports, never the next step's data
+# Commands whose path arguments are neither read nor written as data
+FILE_COMMANDS = {"rm", "touch"}
+REPORT_TOOLS = {"nanoplot", "nanostat", "nanocomp", "fastqc", "multiqc", "pycoqc", "minionqc"}
+# (tool, subcommand) that need a .bai next to their BAM input
+NEEDS_INDEX = {("samtools", "idxstats"), ("medaka", "consensus"), ("medaka", "inference"),
+               ("samtools", "view")}
+
+
+@dataclass
+class FileNode:
+    """A file or directory written by the conversation."""
+
+    path: str
+    step: int
+    tool: str
+    format: str        # what the tool writes; "" if unknown
+    gzip: bool
+
+
+@dataclass
+class Mismatch:
+    kind: str          # path, format, gzip or index
+    step: int          # step charged with the failure
+    consumer: int      # step reading the file
+    line: int
+    path: str
+    reason: str
+
+
+@dataclass
+class Dataflow:
+    """Produced/consumed graph of one conversation."""
+
+    files: dict = field(default_factory=dict)       # path -> FileNode
+    edges: list = field(default_factory=list)       # (path, producer step, consumer step, tool)
+    mismatches: list = field(default_factory=list)
+    steps: dict = field(default_factory=dict)       # step -> invocations
+    sources: dict = field(default_factory=dict)     # path -> FileNode of an expected input
+
+    def code(self, step: int) -> str:
+        """Proposed output_compatibility of ``step``: F, P, or "" without commands."""
+        if any(m.step == step for m in self.mismatches):
+            return "F"
+        return "P" if self.steps.get(step) else ""
+
+    def reasons(self, step: int) -> list:
+        return [m.reason for m in self.mismatches if m.step == step]
+
+
+def normalize(path: str) -> str:
+    path = re.sub(r"\$\{(\w+)\}", r"$\1", path)
+    normal = posixpath.normpath(path)
+    return normal + "/" if path.endswith("/") and normal != "/" else normal
+
+
+def suffix_format(path: str):
+    """(format, gzip) implied by the file name."""
+    gz = path.lower().endswith(".gz")
+    for pattern, fmt in SUFFIX_FORMATS:
+        if pattern.search(path):
+            return fmt, gz
+    return "", gz
+
+
+def _is_reference(flag: str, path: str) -> bool:
+    if flag in REFERENCE_FLAGS or path.lower().endswith(".mmi"):
+        return True
+    fmt, _ = suffix_format(path)
+    return fmt in (FASTA, "") and bool(REFERENCE_NAME.search(posixpath.basename(path.rstrip("/"))))
+
+
+def _stdout_format(inv) -> str:
+    options = inv.options()
+    if inv.tool == "dorado" and "--emit-fastq" in options:
+        return FASTQ
+    if inv.tool == "minimap2":
+        return SAM if any(re.match(r"^-\w*a\w*$", flag) for flag in options) else "PAF"
+    if inv.tool == "samtools" and inv.subcommand == "view":
+        return BAM if any(re.match(r"^-\w*b\w*$", flag) for flag in options) else SAM
+    return STDOUT_FORMATS.get((inv.tool, inv.subcommand), "")
+
+
+def _arguments(inv):
+    """(flag, path, is output) of every path argument of an invocation."""
+    options, positionals = inv.split()
+    for flag, value in options.items():
+        if value is not None and (flag in OUTPUT_FLAGS or is_path(value)):
+            yield flag, value, flag in OUTPUT_FLAGS
+    output_at = POSITIONAL_OUTPUTS.get((inv.tool, inv.subcommand))
+    if output_at is not None and positionals:
+        output_at %= len(positionals)
+    for index, word in enumerate(positionals):
+        if index == output_at:
+            yield "", word, True
+        elif is_path(word):
+            yield "", word, False
+
+
+class _Walker:
+    """Single pass over a conversation's invocations against the output index."""
+
+    def __init__(self):
+        self.flow = Dataflow()
+        self.by_name = {}           # basename -> latest FileNode with that name
+        self.latest = {}            # format -> latest FileNode of that format
+        self.first_step = None
+        self.data_steps = []        # steps that wrote data, in order
+
+    def produce(self, path: str, step: int, tool: str, fmt: str = None):
+        path = normalize(path)
+        name_fmt, gz = suffix_format(path)
+        node = FileNode(path=path, step=step, tool=tool, format=fmt or name_fmt, gzip=gz)
+        self.flow.files[path] = node
+        self.by_name[posixpath.basename(path.rstrip("/"))] = node
+        self.latest[node.format] = node
+        is_data = node.format in READ_FORMATS or (not node.format and tool not in REPORT_TOOLS)
+        if is_data and (not self.data_steps or self.data_steps[-1] != step):
+            self.data_steps.append(step)
+
+    def lookup(self, path: str):
+        """Node written at ``path`` or at one of its parent directories.
+
+        A directory made by ``mkdir`` holds nothing yet, so only the directory
+        itself counts as written, not files under it.
+        """
+        node = self.flow.files.get(path) or self.flow.files.get(path.rstrip("/") + "/")
+        if node is not None:
+            return node, True
+        parent = path.rstrip("/")
+        while "/" in parent:
+            parent = parent.rsplit("/", 1)[0]
+            for key in (parent + "/", parent):
+                node = self.flow.files.get(key)
+                if node is not None and node.format != DIR:
+                    return node, False
+        return None, False
+
+    def mismatch(self, kind, step, consumer, line, path, reason):
+        self.flow.mismatches.append(Mismatch(kind, step, consumer, line, path, reason))
+
+    def upstream(self, step: int) -> int:
+        earlier = [s for s in self.data_steps if s < step]
+        return earlier[-1] if earlier else max(step - 1, self.first_step)
+
+    def consume(self, inv, step: int, flag: str, path: str, fmt: str = None, gz: bool = None,
+                via_stdin: bool = False):
+        path = normalize(path)
+        node, exact = self.lookup(path)
+        name = " ".join(filter(None, [inv.command, inv.subcommand]))
+        if node is None:
+            name_fmt, name_gz = suffix_format(path)
+            external = step == self.first_step or _is_reference(flag, path)
+            missing = not external and name_fmt in READ_FORMATS | {""} and \
+                not PLACEHOLDER.search(path) and (name_fmt or path.endswith("/"))
+            if missing:
+                similar = self.by_name.get(posixpath.basename(path.rstrip("/")))
+                hint = (f"; step {similar.step} wrote {similar.path}" if similar
+                        else self._latest_hint(name_fmt))
+                self.mismatch("path", self.upstream(step), step, inv.line, path,
+                              f"step {step} {name} reads {path}, which no earlier "
+                              f"command writes{hint}")
+            else:
+                self.flow.sources.setdefault(
+                    path, FileNode(path=path, step=step, tool=inv.tool, format=name_fmt,
+                                   gzip=name_gz))
+            fmt, gz = fmt or name_fmt, name_gz if gz is None else gz
+            producer = None
+        else:
+            self.flow.edges.append((path, node.step, step, inv.tool))
+            producer = node
+            if exact:
+                fmt, gz = node.format, node.gzip
+            else:
+                fmt, gz = suffix_format(path)
+        self.check_format(inv, step, path, fmt, gz, producer, via_stdin)
+
+    def _latest_hint(self, fmt: str) -> str:
+        node = self.latest.get(fmt) if fmt else None
+        return f"; latest {fmt} written is {node.path} (step {node.step})" if node else ""
+
+    def check_format(self, inv, step, path, fmt, gz, producer, via_stdin):
+        charged = producer.step if producer else step
+        name = " ".join(filter(None, [inv.command, inv.subcommand]))
+        made = f" ({producer.tool} writes {fmt})" if producer and producer.format else ""
+        if fmt in (BAM, SAM) and inv.tool in SEQUENCE_READERS:
+            self.mismatch("format", charged, step, inv.line, path,
+                          f"step {step} {name} reads {path} as FASTQ/FASTA but it is {fmt}{made}")
+        elif fmt == FASTA and inv.tool in FASTQ_ONLY:
+            self.mismatch("format", charged, step, inv.line, path,
+                          f"step {step} {name} needs FASTQ but {path} is FASTA")
+        if gz and ((via_stdin and inv.tool not in GZIP_STDIN) or
+                   (inv.tool in NO_GZIP and not GZIP_FLAGS & set(inv.options()))):
+            self.mismatch("gzip", charged, step, inv.line, path,
+                          f"step {step} {name} cannot read gzipped {path}")
+        if fmt == BAM and (inv.tool, inv.subcommand) in NEEDS_INDEX and producer is not None:
+            if inv.subcommand == "view" and not self._region(inv, path):
+                return
+            stem = path[:-4]
+            if not any(index in self.flow.files for index in
+                       (path + ".bai", stem + ".bai", path + ".csi")):
+                self.mismatch("index", charged, step, inv.line, path,
+                              f"step {step} {name} needs {path}.bai but no step indexes it")
+
+    @staticmethod
+    def _region(inv, path: str) -> bool:
+        """Whether ``samtools view`` is given a region after the BAM (needs an index).
+
+        Flags such as ``-b``/``-h`` take no value (see ``Invocation.split``),
+        so the BAM and region are both positionals.
+        """
+        positionals = inv.positionals()
+        return any(normalize(word) == path for word in positionals) and \
+            not is_path(positionals[-1])
+
+    def walk(self, step: int, invocations: list):
+        self.flow.steps.setdefault(step, []).extend(invocations)
+        if invocations and self.first_step is None:
+            self.first_step = step
+        pipe = None                   # (format, producing step) of the previous command
+        for inv in invocations:
+            if inv.piped_in and pipe is not None and pipe[0]:
+                self.check_format(inv, step, "(pipe)", pipe[0], False, None, False)
+            if inv.stdin:
+                self.consume(inv, step, "<", inv.stdin, via_stdin=True)
+            outputs = []
+            if inv.command == "mkdir":
+                for path in inv.positionals():
+                    self.produce(path.rstrip("/") + "/", step, inv.command, DIR)
+            elif inv.command not in FILE_COMMANDS:
+                for flag, path, is_output in _arguments(inv):
+                    if is_output:
+                        outputs.append(path)
+                    else:
+                        self.consume(inv, step, flag, path)
+            fmt = _stdout_format(inv)
+            if inv.stdout:
+                self.produce(inv.stdout, step, inv.tool, fmt)
+            for path in outputs:
+                self.produce(path, step, inv.tool)
+            self._implicit(inv, step)
+            pipe = (fmt, step) if not inv.stdout else None
+
+    def _implicit(self, inv, step: int):
+        positionals = [normalize(word) for word in inv.positionals() if is_path(word)]
+        if inv.tool == "samtools" and inv.subcommand == "index" and positionals:
+            self.produce(positionals[0] + ".bai", step, inv.tool, "BAI")
+        elif inv.tool == "samtools" and inv.subcommand == "sort" and "--write-index" in inv.options():
+            target = inv.options().get("-o") or inv.stdout
+            if target:
+                self.produce(normalize(target) + ".csi", step, inv.tool, "BAI")
+        elif inv.command in ("gzip", "pigz", "bgzip") and not inv.stdout:
+            for path in positionals:
+                node = self.flow.files.get(path)
+                self.produce(path + ".gz", step, inv.command, node.format if node else None)
+        elif inv.command in ("gunzip", "unpigz") and not inv.stdout:
+            for path in positionals:
+                self.produce(re.sub(r"\.gz$", "", path), step, inv.command)
+
+
+def check_conversation(turns: list) -> Dataflow:
+    """Dataflow of (step, first line, text) turns, in step order."""
+    by_step = {}
+    for step, line, text in turns:
+        if step > 0:
+            by_step.setdefault(step, []).extend(
+                inv for block in parse_blocks(text, line) for inv in block.invocations)
+    walker = _Walker()
+    for step in sorted(by_step):
+        walker.walk(step, by_step[step])
+    return walker.flow
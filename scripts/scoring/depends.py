@@ -0,0 +1,99 @@
+"""
+Make-style dependency tracking for rendered figures.
+
+Each figure declares the slice of the score cube it is drawn from. The
+SHA-256 fingerprint of that slice (plus the source file of the plotting
+code) is stored next to the output as ``<output>.fingerprint`` together
+with the output's size and mtime. When the fingerprint still matches and
+the output has not been replaced since (e.g. by a checkout), rendering is
+skipped.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+SUFFIX = ".fingerprint"
+
+
+def _update(digest, obj):
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        digest.update(f"nd:{arr.dtype.str}:{arr.shape}".encode())
+        if arr.dtype == object:
+            for item in arr.ravel():
+                _update(digest, item)
+        else:
+            digest.update(arr.tobytes())
+    elif isinstance(obj, (bytes, bytearray)):
+        digest.update(b"b:%d:" % len(obj))
+        digest.update(obj)
+    elif isinstance(obj, str):
+        data = obj.encode()
+        digest.update(b"s:%d:" % len(data))
+        digest.update(data)
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"l:%d:" % len(obj))
+        for item in obj:
+            _update(digest, item)
+    elif isinstance(obj, dict):
+        digest.update(b"d:%d:" % len(obj))
+        for key, value in obj.items():
+            _update(digest, key)
+            _update(digest, value)
+    else:
+        digest.update(f"r:{obj!r}".encode())
+
+
+def fingerprint(*inputs) -> str:
+    """Stable digest of arrays, strings and (nested) containers."""
+    digest = hashlib.sha256()
+    for obj in inputs:
+        _update(digest, obj)
+    return digest.hexdigest()
+
+
+def fingerprint_path(output_path) -> Path:
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + SUFFIX)
+
+
+def _output_stamp(output_path) -> list:
+    stat = Path(output_path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def up_to_date(output_path, digest: str) -> bool:
+    """True if ``output_path`` is unchanged since it was built from ``digest``."""
+    try:
+        recorded = json.loads(fingerprint_path(output_path).read_text())
+        return (recorded["digest"] == digest
+                and recorded["output"] == _output_stamp(output_path))
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+
+def mark_built(output_path, digest: str):
+    record = {"digest": digest, "output": _output_stamp(output_path)}
+    fingerprint_path(output_path).write_text(json.dumps(record) + "\n")
+
+
+def render_if_stale(output_path, inputs, render, sources=(), force: bool = False,
+                    quiet: bool = False) -> bool:
+    """Call ``render()`` unless ``output_path`` is up to date with ``inputs``.
+
+    ``sources`` are files (e.g. the plotting script) whose contents also
+    invalidate the output. Returns True if the output was rendered. With
+    ``quiet``, a skipped output is not reported (callers that render many
+    outputs print one summary instead).
+    """
+    digest = fingerprint(*inputs, *(Path(src).read_bytes() for src in sources))
+    if not force and up_to_date(output_path, digest):
+        if not quiet:
+            print(f"Up to date: {output_path}")
+        return False
+    render()
+    mark_built(output_path, digest)
+    return True
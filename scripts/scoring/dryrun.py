@@ -0,0 +1,474 @@
+"""
+Executability dry-run: a conversation's shell commands executed against
+stub tools in a throwaway workspace.
+
+Each conversation gets its own temporary directory. Its steps run in
+order in that directory, so step 3 reads the files steps 1 and 2 wrote.
+For every shell block:
+
+1. ``bash -n`` checks the syntax (unmatched quotes, ``do`` without
+   ``done``...). A block that does not parse is not run;
+2. variables are expanded as the shell would (``THREADS=8`` ... ``$THREADS``,
+   ``${OUT:-out}``, the first item of a ``for`` list). Command
+   substitutions stand for ``1``. A reference to a variable that was never
+   set is a failure;
+3. the commands (``scoring.commands``) are executed one by one, without a
+   shell: each runs the stub executable of its tool (``scoring.stubs``)
+   with pipes and ``<``/``>`` redirections wired up by this module. Paths
+   are rewritten to stay inside the workspace (``/data/x`` ->
+   ``_root/data/x``, ``~`` -> ``_home``), so nothing written by a response
+   can reach the host. Inputs the conversation is expected to bring
+   (``Dataflow.sources``: raw data of the first step, references,
+   databases, placeholders) are created on first use.
+
+Every failure has a kind, and the kind decides the proposed executability
+code of its step as in the rubric: ``N`` (does not run) for syntax errors,
+unknown options or subcommands, wrong argument counts, invalid values,
+missing required options, undefined variables and timeouts; ``M`` (minor
+fixes) for a misspelt option, variable or command name, a missing output
+directory (``mkdir -p``), a missing or wrongly formatted input; ``R`` when
+every command of the step ran.
+"""
+
+import difflib
+import fnmatch
+import glob
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import stubs
+from .commands import is_flag, parse_commands, shell_blocks
+from .dataflow import REFERENCE_FLAGS, FileNode, check_conversation, normalize
+
+SEVERITY = {
+    "syntax": "N", "unknown-option": "N", "unknown-subcommand": "N", "arity": "N",
+    "invalid-value": "N", "missing-option": "N", "undefined-variable": "N", "timeout": "N",
+    "option-typo": "M", "variable-typo": "M", "command-case": "M", "missing-directory": "M",
+    "missing-input": "M", "input-format": "M", "failed": "M",
+}
+TIMEOUT = 60.0
+
+# Commands handled here or with no effect on the files
+BUILTINS = {"cd", "export", "source", ".", "conda", "mamba", "module", "set", "unset", "shopt",
+            "trap", "exit", "return", "true", "false", ":", "wait", "ulimit", "alias",
+            "pushd", "popd", "[", "[[", "test", "read", "printf", "local", "declare",
+            "readonly", "eval", "shift"}
+VARIABLE = re.compile(r"(?<!\\)\$\{(#?)(\w+)(\[[^\]]*\])?(?:(:?[-=+?]|%%?|##?|//?)([^}]*))?\}|"
+                      r"(?<!\\)\$([A-Za-z_]\w*|[0-9@#?$!*-])")
+SUBSTITUTION = re.compile(r"\$\((?:[^()]|\([^()]*\))*\)|`[^`]*`")
+ASSIGNMENT = re.compile(r"^(?:export\s+|local\s+|readonly\s+|declare\s+(?:-\w+\s+)?)?"
+                        r"([A-Za-z_]\w*)=(\([^)]*\)|\"[^\"]*\"|'[^']*'|\S*)")
+FOR_LOOP = re.compile(r"^for\s+([A-Za-z_]\w*)\s+in\s+([^;]*)")
+READ = re.compile(r"\bread\s+(?:-\w+\s+(?:'[^']*'\s+|\"[^\"]*\"\s+)?)*((?:[A-Za-z_]\w*\s*)+)")
+SCHEDULER_VARIABLE = re.compile(r"^(SLURM|PBS|SGE|LSB|OMP)_")
+# Variables a shell or the user's session defines
+ENVIRONMENT = {"HOME": "~", "PWD": ".", "OLDPWD": ".", "USER": "user", "TMPDIR": "/tmp",
+               "SHELL": "/bin/bash", "PATH": "/usr/bin", "CONDA_PREFIX": "/opt/conda",
+               "RANDOM": "1", "LINENO": "1", "HOSTNAME": "host", "BASH_SOURCE": "script.sh"}
+SYNTAX_LINE = re.compile(r"line (\d+): (.*)")
+
+
+@dataclass
+class Failure:
+    step: int
+    line: int
+    command: str
+    kind: str
+    message: str
+
+    @property
+    def severity(self) -> str:
+        return SEVERITY.get(self.kind, "M")
+
+
+@dataclass
+class DryRun:
+    """Outcome of one conversation."""
+
+    failures: list = field(default_factory=list)
+    commands: dict = field(default_factory=dict)     # step -> commands executed
+    elapsed: float = 0.0
+    timed_out: bool = False
+
+    def code(self, step: int) -> str:
+        """Proposed executability of ``step``: N, M, R, or "" without commands."""
+        severities = {f.severity for f in self.failures if f.step == step}
+        if "N" in severities:
+            return "N"
+        if severities:
+            return "M"
+        return "R" if self.commands.get(step) else ""
+
+    def trace(self, step: int) -> list:
+        return [f"line {f.line} {f.command}: {f.message}" for f in self.failures if f.step == step]
+
+
+def install_stubs(directory) -> Path:
+    """Write an executable stub per known tool and utility into ``directory``."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    module_dir = Path(stubs.__file__).resolve().parent
+    for name in [*stubs.SPECS, *stubs.UTILITIES, "_generic"]:
+        target = f"sys.argv[1], sys.argv[2:]" if name == "_generic" else f"{name!r}, sys.argv[1:]"
+        path = directory / name
+        path.write_text(f"#!{sys.executable} -S\n"
+                        "import sys\n"
+                        f"sys.path.insert(0, {str(module_dir)!r})\n"
+                        "from stubs import main\n"
+                        f"sys.exit(main({target}))\n")
+        path.chmod(0o755)
+    return directory
+
+
+class _Shell:
+    """Variable state of a conversation and the expansion of its lines."""
+
+    def __init__(self, resolve=None):
+        self.variables = dict(ENVIRONMENT)
+        self.resolve = resolve      # glob -> matching paths, once the files exist
+
+    def expand(self, content: str, first_line: int, failures: list, step: int) -> str:
+        """``content`` with variables expanded, line for line."""
+        return "\n".join(self.expand_line(line, first_line + offset, failures, step)
+                         for offset, line in enumerate(content.splitlines()))
+
+    def expand_line(self, line: str, number: int, failures: list, step: int) -> str:
+        if line.lstrip().startswith("#"):
+            return line
+        parts = re.split(r"('[^']*')", line)
+        for i in range(0, len(parts), 2):
+            parts[i] = SUBSTITUTION.sub("1", parts[i])
+            parts[i] = VARIABLE.sub(lambda match: self._value(match, number, failures, step),
+                                    parts[i])
+        line = "".join(parts)
+        self._define(line)
+        return line
+
+    @staticmethod
+    def loops_over_files(line: str) -> bool:
+        """Whether ``line`` starts a ``for`` loop over a glob."""
+        match = FOR_LOOP.match(line.strip())
+        return bool(match) and any(c in match.group(2) for c in "*?[")
+
+    def _value(self, match, line: int, failures: list, step: int) -> str:
+        length, name, index, operator, default, plain = match.groups()
+        name = name or plain
+        if name in self.variables:
+            return _expand(self.variables[name], length, operator, default)
+        if name.isdigit() or name in "@#?$!*-":
+            return "0" if name in "#?" else "1"
+        if SCHEDULER_VARIABLE.match(name):
+            return "1"
+        if operator and operator.lstrip(":") in "-=+":
+            if operator.lstrip(":") == "=":
+                self.variables[name] = default
+            return "" if operator.lstrip(":") == "+" else default
+        defined = [n for n in self.variables if n not in ENVIRONMENT]
+        close = [n for n in defined if sorted(n) == sorted(name)] or \
+            difflib.get_close_matches(name, defined, n=1, cutoff=0.8)
+        if close:
+            failures.append(Failure(step, line, f"${name}", "variable-typo",
+                                    f"${name} is not set (did you mean ${close[0]}?)"))
+            # Go on with the intended value, so the typo is not also reported as a
+            # missing flag value (``-t $THREDS``)
+            return _expand(self.variables[close[0]], length, operator, default)
+        failures.append(Failure(step, line, f"${name}", "undefined-variable",
+                                f"${name} is never set"))
+        return ""
+
+    def _define(self, line: str):
+        for statement in re.split(r"\s*(?:;|&&|\|\|)\s*", line.strip()):
+            statement = re.sub(r"^(?:do|then|else)\s+", "", statement)
+            match = ASSIGNMENT.match(statement)
+            if match:
+                value = match.group(2).strip("\"'")
+                if value.startswith("("):
+                    value = (value.strip("()").split() or [""])[0].strip("\"'")
+                self.variables[match.group(1)] = value
+                continue
+            match = FOR_LOOP.match(statement)
+            if match:
+                items = match.group(2).split()
+                first = items[0].strip("\"'") if items else ""
+                if self.resolve and any(c in first for c in "*?["):
+                    first = (self.resolve(first) or [first])[0]
+                brace = re.match(r"\{(\d+)\.\.", first)
+                self.variables[match.group(1)] = brace.group(1) if brace else first
+                continue
+            match = READ.search(statement)
+            if match:
+                for name in match.group(1).split():
+                    self.variables.setdefault(name, name)
+
+
+class _Workspace:
+    """Commands of one conversation executed against the stubs."""
+
+    def __init__(self, root: Path, bin_dir: Path, sources: dict, deadline: float):
+        self.root = root
+        self.cwd = root
+        self.bin_dir = bin_dir
+        self.sources = sources
+        self.deadline = deadline
+        self.stub_names = {path.name.lower(): path.name for path in bin_dir.iterdir()}
+        for name in ("_root/tmp", "_home", "_outside"):
+            (root / name).mkdir(parents=True, exist_ok=True)
+        self.env = {"PATH": str(bin_dir), "HOME": str(root / "_home"), "LC_ALL": "C",
+                    "TMPDIR": str(root / "_root" / "tmp")}
+
+    def map(self, word: str) -> str:
+        """``word`` rewritten so that, as a path, it stays inside the workspace."""
+        if "://" in word:
+            return word
+        if word.startswith("~"):
+            target = self.root / "_home" / word[1:].lstrip("/")
+        elif word.startswith("/"):
+            target = self.root / "_root" / word.lstrip("/")
+        elif "/" in word or word == "..":
+            target = Path(os.path.normpath(self.cwd / word))
+        else:
+            return word
+        target = Path(os.path.normpath(target))
+        if target != self.root and self.root not in target.parents:
+            target = self.root / "_outside" / target.name
+        mapped = os.path.relpath(target, self.cwd)
+        return mapped + "/" if word.endswith("/") and not mapped.endswith("/") else mapped
+
+    def argument(self, word: str) -> list:
+        if is_flag(word) and "=" in word:
+            flag, value = word.split("=", 1)
+            self.seed(value)
+            return [f"{flag}={self.map(value)}"]
+        self.seed(word)
+        mapped = self.map(word)
+        if not is_flag(mapped):
+            return self.glob(mapped) or [mapped]
+        return [mapped]
+
+    def glob(self, pattern: str) -> list:
+        """Workspace paths matching ``pattern``; [] if none or not a pattern."""
+        if not any(c in pattern for c in "*?["):
+            return []
+        return sorted(glob.glob(self.map(pattern), root_dir=self.cwd))
+
+    def seed(self, word: str):
+        """Create an expected input the first time a command names it."""
+        node = self.sources.get(normalize(word)) if word and not is_flag(word) else None
+        if node is None or any(c in word for c in "*?["):
+            return
+        target = self.cwd / self.map(word)
+        if target.exists():
+            return
+        if word.endswith("/") or not Path(word).suffix:
+            target.mkdir(parents=True, exist_ok=True)
+            if node.tool in ("dorado", "guppy"):
+                (target / "reads.pod5").write_bytes(stubs.placeholder(stubs.RAW))
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(stubs.placeholder(node.format or stubs.suffix_format(word),
+                                                 str(target)))
+
+    def run(self, inv, step: int, piped: bytes, failures: list) -> bytes:
+        """Execute one invocation; returns what it wrote to stdout."""
+        name = inv.command.rsplit("/", 1)[-1]
+        label = " ".join(filter(None, [name, inv.subcommand]))
+
+        def fail(kind, message):
+            failures.append(Failure(step, inv.line, label, kind, message))
+
+        if name == "cd":
+            target = self.cwd / self.map(inv.args[0]) if inv.args else self.root
+            if not target.is_dir():
+                fail("missing-directory", f"cd: {inv.args[0]}: no such directory")
+            else:
+                self.cwd = Path(os.path.normpath(target))
+            return b""
+        if name in BUILTINS:
+            return b""
+        if name in self.stub_names.values():
+            argv = [str(self.bin_dir / name)]
+        elif name.lower() in self.stub_names and name.lower() != "_generic":
+            fail("command-case", f"{name}: command not found (did you mean "
+                                 f"{self.stub_names[name.lower()]}?)")
+            argv = [str(self.bin_dir / self.stub_names[name.lower()])]
+        else:
+            argv = [str(self.bin_dir / "_generic"), name]
+        raw = [inv.subcommand] + inv.args if inv.subcommand else inv.args
+        for word in raw:
+            argv.extend(self.argument(word))
+        stdin = piped if inv.piped_in else b""
+        if inv.stdin:
+            self.seed(inv.stdin)
+            source = self.cwd / (self.glob(inv.stdin) or [self.map(inv.stdin)])[0]
+            if not source.is_file():
+                fail("missing-input", f"{inv.stdin}: no such file")
+                return b""
+            stdin = source.read_bytes()
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(argv, 0)
+        result = subprocess.run(argv, input=stdin, capture_output=True, cwd=self.cwd,
+                                env=self.env, timeout=remaining)
+        reported = False
+        for line in result.stderr.decode(errors="replace").splitlines():
+            if line.startswith("dryrun "):
+                kind, _, message = line[len("dryrun "):].partition(": ")
+                fail(kind, message)
+                reported = True
+        if result.returncode and not reported:
+            lines = result.stderr.decode(errors="replace").strip().splitlines()
+            fail("failed", lines[-1] if lines else f"exit status {result.returncode}")
+        if inv.stdout:
+            target = self.cwd / (self.glob(inv.stdout) or [self.map(inv.stdout)])[0]
+            if not target.parent.is_dir():
+                fail("missing-directory", f"cannot write {inv.stdout}: no directory "
+                                          f"{os.path.dirname(inv.stdout)}/")
+                target.parent.mkdir(parents=True, exist_ok=True)
+            if not target.is_dir():
+                target.write_bytes(result.stdout)
+            return b""
+        return result.stdout
+
+
+def check_syntax(content: str, bash: str, timeout: float):
+    """(line offset, message) of the first syntax error in ``content``, or None."""
+    try:
+        result = subprocess.run([bash, "-n"], input=content.encode(), capture_output=True,
+                                timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+    if result.returncode == 0:
+        return None
+    for line in result.stderr.decode(errors="replace").splitlines():
+        match = SYNTAX_LINE.search(line)
+        if match:
+            return int(match.group(1)) - 1, match.group(2)
+    return 0, result.stderr.decode(errors="replace").strip() or "syntax error"
+
+
+def dry_run(turns: list, bin_dir, timeout: float = TIMEOUT, workdir=None) -> DryRun:
+    """Dry-run of (step, first line, text) turns, in step order."""
+    start = time.monotonic()
+    run = DryRun()
+    bash = shutil.which("bash")
+    blocks = []                           # (step, first line, content, syntax error)
+    for step, line, text in sorted((turn for turn in turns if turn[0] > 0),
+                                   key=lambda turn: turn[0]):
+        for _, first, content in shell_blocks(text):
+            block_line = line + first - 1
+            error = check_syntax(content, bash, timeout) if bash else None
+            blocks.append((step, block_line, content, error))
+    sources = expected_inputs(blocks)
+
+    with tempfile.TemporaryDirectory(prefix="dryrun-", dir=workdir) as tmp:
+        workspace = _Workspace(Path(tmp).resolve(), Path(bin_dir).resolve(), sources,
+                               start + timeout)
+        # expanded again as the commands run, so loops over globs see the files written so far
+        shell = _Shell(resolve=workspace.glob)
+        try:
+            for step, line, content, error in blocks:
+                if error is not None:
+                    run.failures.append(Failure(step, line + error[0], "bash", "syntax",
+                                                error[1]))
+                for first, segment in _segments(content, line):
+                    invocations, errors = parse_commands(
+                        "\n".join(shell.expand_line(text, first + offset, run.failures, step)
+                                  for offset, text in enumerate(segment)), first)
+                    if not bash:
+                        run.failures.extend(Failure(step, number, "shell", "syntax", message)
+                                            for number, message in errors)
+                    if error is not None or (errors and not bash):
+                        continue
+                    piped = b""
+                    for inv in invocations:
+                        piped = workspace.run(inv, step, piped, run.failures)
+                        run.commands[step] = run.commands.get(step, 0) + 1
+        except subprocess.TimeoutExpired:
+            run.timed_out = True
+            run.failures.append(Failure(step, line, "dry-run", "timeout",
+                                        f"conversation did not finish within {timeout:g}s"))
+    run.elapsed = time.monotonic() - start
+    return run
+
+
+def _segments(content: str, first_line: int):
+    """(first line, lines) of a block cut before every loop over a glob.
+
+    The commands above such a loop run before it is expanded, so the glob
+    matches the files they wrote.
+    """
+    lines, start = content.splitlines(), 0
+    for i, line in enumerate(lines):
+        if i > start and _Shell.loops_over_files(line) and not lines[i - 1].endswith("\\"):
+            yield first_line + start, lines[start:i]
+            start = i
+    yield first_line + start, lines[start:]
+
+
+def expected_inputs(blocks: list) -> dict:
+    """Dataflow sources of the blocks plus the references and databases they name."""
+    shell = _Shell()
+    expanded = [(step, line - 1, "```bash\n" + shell.expand(content, line, [], step) + "\n```")
+                for step, line, content, _ in blocks]
+    flow = check_conversation(expanded)
+    sources = dict(flow.sources)
+    for invocations in flow.steps.values():
+        for inv in invocations:
+            for flag, value in inv.options().items():
+                if flag in REFERENCE_FLAGS and value and not _number(value) and \
+                        normalize(value) not in flow.files:
+                    sources.setdefault(normalize(value), FileNode(path=normalize(value), step=0,
+                                                                  tool=inv.tool, format="",
+                                                                  gzip=False))
+    return sources
+
+
+def _expand(value: str, length, operator, default) -> str:
+    """A set variable's ``${#name}``, ``${name%pattern}``... or plain value."""
+    if operator and operator[0] in "%#/":
+        return _trim(value, operator, default)
+    return str(len(value)) if length else value
+
+
+def _trim(value: str, operator: str, pattern: str) -> str:
+    """``${value%pattern}`` and the other pattern expansions."""
+    if operator[0] == "/":
+        old, _, new = pattern.partition("/")
+        if not old:
+            return value
+        start = 0
+        while start < len(value):
+            match = next(((i, j) for i in range(start, len(value))
+                          for j in range(len(value), i, -1)
+                          if fnmatch.fnmatchcase(value[i:j], old)), None)
+            if match is None:
+                break
+            i, j = match
+            value = value[:i] + new + value[j:]
+            if operator == "/":
+                break
+            start = i + len(new)
+        return value
+    cuts = range(len(value) + 1)
+    if operator[0] == "%":
+        cuts = cuts if operator == "%%" else reversed(cuts)
+        for i in cuts:
+            if fnmatch.fnmatchcase(value[i:], pattern):
+                return value[:i]
+    else:
+        cuts = reversed(cuts) if operator == "##" else cuts
+        for i in cuts:
+            if fnmatch.fnmatchcase(value[:i], pattern):
+                return value[i:]
+    return value
+
+
+def _number(word: str) -> bool:
+    return bool(re.fullmatch(r"[\d.]+[kKmMgG]?", word))
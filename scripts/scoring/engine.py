@@ -0,0 +1,242 @@
+"""
+Vectorized scoring engine shared by the analysis scripts.
+
+Encodes the letter codes of every scoring dimension once into integer and
+float arrays (row × dimension) together with model and step group indices,
+so that reports can be computed with bincount/groupby reductions instead of
+walking the DataFrame row by row.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .instrument import count, timed
+
+SCORE_MAP = {
+    "tool_selection": {"C": 1.0, "A": 0.5, "I": 0.0},
+    "parameter_accuracy": {"C": 1.0, "P": 0.5, "I": 0.0},
+    "output_compatibility": {"P": 1.0, "F": 0.0},
+    "scientific_validity": {"S": 1.0, "Q": 0.5, "I": 0.0},
+    "executability": {"R": 1.0, "M": 0.5, "N": 0.0},
+}
+
+FULLY_CORRECT = {
+    "tool_selection": "C",
+    "parameter_accuracy": "C",
+    "output_compatibility": "P",
+    "scientific_validity": "S",
+    "executability": "R",
+}
+
+DIMENSIONS = list(SCORE_MAP.keys())
+
+# step_number -> step_name, as in prompts/step_0N_<name>.md
+STEP_NAMES = {
+    1: "basecalling",
+    2: "quality_control",
+    3: "host_depletion",
+    4: "taxonomic_classification",
+    5: "assembly",
+    6: "binning",
+    7: "functional_annotation",
+}
+
+STEP_LABELS = {
+    1: "Basecalling",
+    2: "QC",
+    3: "Host\nDepletion",
+    4: "Taxonomy",
+    5: "Assembly",
+    6: "Binning",
+    7: "Annotation",
+}
+
+# (model_family, model_version) of the charted models, in release order within each family
+MODEL_ORDER = [
+    ("openai", v) for v in ["gpt4o", "o1_preview", "o1_mini", "o1", "o1_pro", "o3_mini",
+                            "o3_high", "o4_mini", "gpt5"]
+] + [
+    ("claude", v) for v in ["sonnet_3.5", "sonnet_4", "sonnet_4.5", "haiku_4.5", "opus_4.5",
+                            "opus_4.6"]
+] + [
+    ("gemini", v) for v in ["2.0_flash", "2.5_pro_preview", "2.5_flash", "2.5_pro_stable",
+                            "3_pro", "3_flash"]
+]
+
+# Every model the scoring matrix may hold: the charted ones and those left off the charts
+KNOWN_MODELS = MODEL_ORDER + [
+    ("openai", "chatgpt_deep_research"),
+    ("claude", "sonnet_4.6"),
+    ("claude", "deep_research"),
+    ("gemini", "3.1_pro"),
+    ("google", "gemini_deep_research"),
+    ("deepseek", "v3"),
+    ("zhipu", "glm_5"),
+]
+
+# Chart labels of the models: full (heatmap rows) and short (timeline annotations)
+MODEL_LABELS = {
+    ("openai", "gpt4o"): "GPT-4o",
+    ("openai", "o1_preview"): "o1-preview",
+    ("openai", "o1_mini"): "o1-mini",
+    ("openai", "o1"): "o1",
+    ("openai", "o1_pro"): "o1-pro",
+    ("openai", "o3_mini"): "o3-mini",
+    ("openai", "o3_high"): "o3 (high)",
+    ("openai", "o4_mini"): "o4-mini",
+    ("openai", "gpt5"): "GPT-5",
+    ("claude", "sonnet_3.5"): "Sonnet 3.5",
+    ("claude", "sonnet_4"): "Sonnet 4",
+    ("claude", "sonnet_4.5"): "Sonnet 4.5",
+    ("claude", "haiku_4.5"): "Haiku 4.5",
+    ("claude", "opus_4.5"): "Opus 4.5",
+    ("claude", "opus_4.6"): "Opus 4.6",
+    ("gemini", "2.0_flash"): "2.0 Flash",
+    ("gemini", "2.5_pro_preview"): "2.5 Pro Prev",
+    ("gemini", "2.5_flash"): "2.5 Flash",
+    ("gemini", "2.5_pro_stable"): "2.5 Pro",
+    ("gemini", "3_pro"): "3 Pro",
+    ("gemini", "3_flash"): "3 Flash",
+}
+
+SHORT_MODEL_LABELS = {
+    ("openai", "gpt4o"): "GPT-4o", ("openai", "o1_preview"): "o1-prev",
+    ("openai", "o1_mini"): "o1-mini", ("openai", "o1"): "o1", ("openai", "o1_pro"): "o1-pro",
+    ("openai", "o3_mini"): "o3-mini", ("openai", "o3_high"): "o3",
+    ("openai", "o4_mini"): "o4-mini", ("openai", "gpt5"): "GPT-5",
+    ("claude", "sonnet_3.5"): "S3.5", ("claude", "sonnet_4"): "S4",
+    ("claude", "sonnet_4.5"): "S4.5", ("claude", "haiku_4.5"): "H4.5",
+    ("claude", "opus_4.5"): "Op4.5", ("claude", "opus_4.6"): "Op4.6",
+    ("gemini", "2.0_flash"): "2.0F", ("gemini", "2.5_pro_preview"): "2.5PP",
+    ("gemini", "2.5_flash"): "2.5F", ("gemini", "2.5_pro_stable"): "2.5P",
+    ("gemini", "3_pro"): "3P", ("gemini", "3_flash"): "3F",
+}
+
+
+@dataclass
+class EncodedScores:
+    """Scoring matrix encoded once as NumPy arrays.
+
+    All 2-D arrays are (rows, dimensions) with columns in ``DIMENSIONS``
+    order and rows in the order of the source DataFrame.
+    """
+
+    codes: np.ndarray         # int32 index into alphabets[dim]; -1 where unscored
+    alphabets: list           # per dimension: upper-cased codes in order of first appearance
+    values: np.ndarray        # float64 SCORE_MAP value; NaN where unscored or unknown code
+    scored: np.ndarray        # bool, cell is non-empty
+    correct: np.ndarray       # bool, cell matches FULLY_CORRECT
+    model_index: np.ndarray   # int64 index into models
+    models: list              # (family, version) in order of first appearance
+    step_index: np.ndarray    # int64 index into steps
+    steps: np.ndarray         # sorted unique step numbers
+    step_names: list          # step_name of the first row seen for each step
+
+    @property
+    def n_rows(self) -> int:
+        return self.codes.shape[0]
+
+
+def _clean_codes(column: pd.Series) -> pd.Series:
+    """Return the column as stripped strings with missing cells as ''."""
+    cleaned = column.astype(str).str.strip().replace("nan", "")
+    return cleaned.fillna("")
+
+
+@timed("encode")
+def encode_scores(df: pd.DataFrame) -> EncodedScores:
+    """Encode each dimension's letter codes into row × dimension arrays."""
+    n_rows, n_dims = len(df), len(DIMENSIONS)
+    count("rows_processed", n_rows)
+    codes = np.full((n_rows, n_dims), -1, dtype=np.int32)
+    values = np.full((n_rows, n_dims), np.nan)
+    scored = np.zeros((n_rows, n_dims), dtype=bool)
+    correct = np.zeros((n_rows, n_dims), dtype=bool)
+    alphabets = []
+
+    for j, dim in enumerate(DIMENSIONS):
+        raw = _clean_codes(df[dim])
+        upper = raw.str.upper()
+        scored[:, j] = (raw != "").to_numpy()
+        col_codes, uniques = pd.factorize(upper.where(scored[:, j]))
+        codes[:, j] = col_codes
+        alphabets.append(np.asarray(uniques, dtype=object))
+        values[:, j] = upper.map(SCORE_MAP[dim]).to_numpy(dtype=float, na_value=np.nan)
+        correct[:, j] = (upper == FULLY_CORRECT[dim]).to_numpy()
+
+    model_index = (df.groupby(["model_family", "model_version"], sort=False, observed=True)
+                   .ngroup().to_numpy(dtype=np.int64))
+    _, first_model_row = np.unique(model_index, return_index=True)
+    families = df["model_family"].to_numpy()
+    versions = df["model_version"].to_numpy()
+    models = list(zip(families[first_model_row], versions[first_model_row]))
+
+    steps, first_step_row, step_index = np.unique(
+        df["step_number"].to_numpy(), return_index=True, return_inverse=True)
+    step_names = df["step_name"].to_numpy()[first_step_row].tolist()
+
+    return EncodedScores(
+        codes=codes,
+        alphabets=alphabets,
+        values=values,
+        scored=scored,
+        correct=correct,
+        model_index=model_index,
+        models=models,
+        step_index=step_index.astype(np.int64).ravel(),
+        steps=steps,
+        step_names=step_names,
+    )
+
+
+def row_composites(enc: EncodedScores) -> np.ndarray:
+    """Mean dimension score per row; NaN unless every code is recognised."""
+    return enc.values.mean(axis=1)
+
+
+def group_mean(index: np.ndarray, weights: np.ndarray, n_groups: int) -> np.ndarray:
+    """Mean of ``weights`` per group index; NaN for empty groups.
+
+    ``np.bincount`` accumulates in row order, so the sums are bit-identical
+    to a sequential Python ``sum`` over the same rows.
+    """
+    sums = np.bincount(index, weights=weights, minlength=n_groups)
+    counts = np.bincount(index, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def split_by_group(index: np.ndarray, n_groups: int) -> list:
+    """Row positions of every group, in row order, from one stable sort."""
+    order = np.argsort(index, kind="stable")
+    bounds = np.searchsorted(index[order], np.arange(1, n_groups))
+    return np.split(order, bounds)
+
+
+def failure_counts(enc: EncodedScores, dim_idx: int, group_index=None, n_groups=None):
+    """Count non-correct codes of one dimension per step.
+
+    Returns ``(counts, first_seen)``, both shaped (steps, alphabet), where
+    ``first_seen`` is the first row position of each code within the step
+    (``n_rows`` when absent), used to break ties the way ``Counter`` does.
+    Pass ``group_index``/``n_groups`` to group rows by something other than
+    the step.
+    """
+    if group_index is None:
+        group_index, n_groups = enc.step_index, len(enc.steps)
+    alphabet = enc.alphabets[dim_idx]
+    n_codes = max(len(alphabet), 1)
+
+    eligible = enc.scored[:, dim_idx] & ~enc.correct[:, dim_idx]
+    if len(alphabet):
+        eligible &= (alphabet != "NAN")[np.maximum(enc.codes[:, dim_idx], 0)]
+    rows = np.flatnonzero(eligible)
+    keys = group_index[rows] * n_codes + enc.codes[rows, dim_idx]
+
+    counts = np.bincount(keys, minlength=n_groups * n_codes)
+    first_seen = np.full(n_groups * n_codes, enc.n_rows, dtype=np.int64)
+    unique_keys, first_pos = np.unique(keys, return_index=True)
+    first_seen[unique_keys] = rows[first_pos]
+    return counts.reshape(n_groups, n_codes), first_seen.reshape(n_groups, n_codes)
@@ -0,0 +1,233 @@
+"""
+Incremental re-aggregation of the summary reports.
+
+A JSON state file next to the binary cache stores, for every
+(model_family, model_version, step_number) group, a content hash of the
+group's rows and the group's partial aggregates. On each run the group
+hashes are recomputed in one vectorized pass; only groups whose hash
+changed (or that are new) are re-encoded, and the first-fully-correct
+table, step ranking and failure counts are rebuilt from the partials.
+
+Partials record the within-group ordinal of each failure code's first
+occurrence, which is mapped back to a file position at report time, so
+Counter-style tie-breaking still follows the current row order.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import cache_dir_for
+from .engine import DIMENSIONS, encode_scores, failure_counts, row_composites
+from .instrument import count, stage, timed
+
+STATE_VERSION = 1
+STATE_FILE = "incremental.json"
+GROUP_KEYS = ["model_family", "model_version", "step_number"]
+
+
+def state_path_for(csv_path: Path) -> Path:
+    return cache_dir_for(Path(csv_path)) / STATE_FILE
+
+
+def _group_key(family, version, step_num) -> str:
+    return f"{family}\x1f{version}\x1f{step_num}"
+
+
+def load_state(path: Path) -> dict:
+    """Return ``{group_key: partial}``; empty if the file is missing or stale."""
+    try:
+        state = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+        return {}
+    return state.get("groups", {})
+
+
+def save_state(path: Path, groups: dict):
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"version": STATE_VERSION, "groups": groups}))
+    os.replace(tmp, path)
+
+
+@timed("group hashes")
+def group_rows(df: pd.DataFrame):
+    """Group rows by (family, version, step).
+
+    Returns ``(group_id, keys, ordinal, hashes)``: the group of every row,
+    the group keys in order of first appearance, each row's position within
+    its group and an order-sensitive content hash per group.
+    """
+    grouped = df.groupby(GROUP_KEYS, sort=False, observed=True)
+    group_id = grouped.ngroup().to_numpy(dtype=np.int64)
+    ordinal = grouped.cumcount().to_numpy(dtype=np.int64)
+    _, first_row = np.unique(group_id, return_index=True)
+    keys = [_group_key(*df[GROUP_KEYS].iloc[i]) for i in first_row]
+
+    row_hash = pd.util.hash_pandas_object(df[GROUP_KEYS + ["step_name"] + DIMENSIONS],
+                                          index=False).to_numpy()
+    row_hash = row_hash ^ pd.util.hash_array(ordinal.astype(np.uint64))
+    hashes = np.zeros(len(keys), dtype=np.uint64)
+    np.add.at(hashes, group_id, row_hash)
+    return group_id, keys, ordinal, [f"{h:016x}" for h in hashes.tolist()]
+
+
+@timed("recompute partials")
+def compute_partials(df: pd.DataFrame, ordinal: np.ndarray) -> dict:
+    """Partial aggregates for every (family, version, step) group in ``df``."""
+    enc = encode_scores(df)
+    n_steps = len(enc.steps)
+    n_cells = len(enc.models) * n_steps
+    cell = enc.model_index * n_steps + enc.step_index
+
+    row_ok = enc.scored.all(axis=1) & enc.correct.all(axis=1)
+    failing = np.bincount(cell, weights=~row_ok, minlength=n_cells)
+    scored = np.bincount(cell, weights=enc.scored.any(axis=1), minlength=n_cells)
+    n_rows = np.bincount(cell, minlength=n_cells)
+
+    composite = row_composites(enc)
+    usable = ~np.isnan(composite)
+    half_points = np.rint(composite[usable] * 2 * len(DIMENSIONS))
+    points = np.bincount(cell[usable], weights=half_points, minlength=n_cells)
+    n_usable = np.bincount(cell[usable], minlength=n_cells)
+
+    first_row = np.full(n_cells, enc.n_rows, dtype=np.int64)
+    unique_cells, first_pos = np.unique(cell, return_index=True)
+    first_row[unique_cells] = first_pos
+    step_names = df["step_name"].to_numpy()
+
+    fails = [failure_counts(enc, j, cell, n_cells) for j in range(len(DIMENSIONS))]
+
+    partials = {}
+    for c in np.flatnonzero(n_rows):
+        family, version = enc.models[c // n_steps]
+        step_num = int(enc.steps[c % n_steps])
+        failures = {}
+        for j, dim in enumerate(DIMENSIONS):
+            counts, first_seen = fails[j]
+            present = np.flatnonzero(counts[c])
+            if len(present):
+                failures[dim] = [[str(enc.alphabets[j][k]), int(counts[c, k]),
+                                  int(ordinal[first_seen[c, k]])] for k in present]
+        partials[_group_key(family, version, step_num)] = {
+            "family": str(family),
+            "version": str(version),
+            "step": step_num,
+            "step_name": str(step_names[first_row[c]]),
+            "scored": bool(scored[c]),
+            "ok": bool(failing[c] == 0),
+            "points": int(points[c]),
+            "usable": int(n_usable[c]),
+            "failures": failures,
+        }
+    return partials
+
+
+def update_partials(df: pd.DataFrame, previous: dict):
+    """Refresh ``previous`` partials for the groups whose rows changed.
+
+    Returns ``(groups, group_id, keys, recomputed)`` where ``groups`` maps
+    each current group key to its partial (with its content hash).
+    """
+    group_id, keys, ordinal, hashes = group_rows(df)
+    groups = {}
+    changed = []
+    for g, (key, digest) in enumerate(zip(keys, hashes)):
+        cached = previous.get(key)
+        if cached is not None and cached.get("hash") == digest:
+            groups[key] = cached
+        else:
+            changed.append(g)
+
+    if changed:
+        rows = np.flatnonzero(np.isin(group_id, changed))
+        fresh = compute_partials(df.iloc[rows], ordinal[rows])
+        for g in changed:
+            groups[keys[g]] = dict(fresh[keys[g]], hash=hashes[g])
+    return groups, group_id, keys, len(changed)
+
+
+@timed("reports from partials")
+def reports_from_partials(groups: dict, group_id: np.ndarray, keys: list):
+    """Rebuild the three summary reports from per-group partials.
+
+    ``group_id``/``keys`` describe the current row order and are used to
+    resolve "first seen" ordering exactly as the in-memory reports do.
+    """
+    order = np.argsort(group_id, kind="stable")
+    starts = np.searchsorted(group_id[order], np.arange(len(keys)))
+
+    model_ok = {}
+    step_first = {}
+    step_totals = {}
+    step_failures = {}
+    for g, key in enumerate(keys):
+        part = groups[key]
+        model = (part["family"], part["version"])
+        model_ok[model] = model_ok.get(model, True) and part["ok"]
+
+        step_num = part["step"]
+        first = int(order[starts[g]])
+        if step_num not in step_first or first < step_first[step_num][0]:
+            step_first[step_num] = (first, part["step_name"])
+        totals = step_totals.setdefault(step_num, [0, 0])
+        totals[0] += part["points"]
+        totals[1] += part["usable"]
+
+        for dim, entries in part["failures"].items():
+            codes = step_failures.setdefault(step_num, {}).setdefault(dim, {})
+            for code, count, first_ordinal in entries:
+                position = int(order[starts[g] + first_ordinal])
+                total, seen = codes.get(code, (0, position))
+                codes[code] = (total + count, min(seen, position))
+
+    first_correct = {}
+    for (family, version), ok in model_ok.items():
+        first_correct.setdefault(family, None)
+        if first_correct[family] is None and ok:
+            first_correct[family] = version
+
+    step_scores = []
+    for step_num in sorted(step_first):
+        points, count = step_totals[step_num]
+        avg = points / (2 * len(DIMENSIONS) * count) if count else float("nan")
+        step_scores.append((step_num, step_first[step_num][1], avg))
+    steps_ranked = sorted(step_scores, key=lambda x: x[2])
+
+    failures = {}
+    for step_num in sorted(step_first):
+        failures[step_num] = {}
+        for dim in DIMENSIONS:
+            codes = step_failures.get(step_num, {}).get(dim)
+            if codes:
+                code, (count, _) = min(codes.items(), key=lambda kv: (-kv[1][0], kv[1][1]))
+                failures[step_num][dim] = f"{code} ({count}×)"
+
+    return first_correct, steps_ranked, failures
+
+
+def incremental_reports(csv_path, df: pd.DataFrame):
+    """Reports for ``df`` (loaded from ``csv_path``) using the saved partials.
+
+    Returns ``(first_correct, steps_ranked, failures, has_data, stats)``
+    where ``stats`` is ``(recomputed_groups, total_groups)``.
+    """
+    path = state_path_for(csv_path)
+    previous = load_state(path)
+    groups, group_id, keys, recomputed = update_partials(df, previous)
+    count("groups_recomputed", recomputed)
+    if recomputed or len(groups) != len(previous):
+        try:
+            with stage("save state"):
+                save_state(path, groups)
+        except OSError:
+            pass
+    has_data = any(part["scored"] for part in groups.values())
+    reports = reports_from_partials(groups, group_id, keys)
+    return (*reports, has_data, (recomputed, len(groups)))
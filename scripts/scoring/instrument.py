@@ -0,0 +1,139 @@
+"""
+Lightweight per-stage timing and counters shared by the scripts.
+
+Wrap a stage with ``with stage("name"):`` or ``@timed("name")``; stages opened inside another
+stage are recorded under ``"outer/inner"``. Counters such as rows
+processed, cells rendered and bytes written are bumped with ``count``.
+Recording is always on and costs two ``perf_counter`` calls per stage, so
+the library code can stay instrumented; scripts only decide whether to
+report it.
+
+Scripts add ``--profile``, ``--profile-json`` and ``--profile-stats`` via
+``add_profile_arguments`` and run their body inside ``profiled(args)``,
+which prints the stage breakdown to stderr and writes the requested dumps.
+"""
+
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+# "outer/inner" -> [calls, total seconds], in order of first entry
+_STAGES = {}
+_COUNTERS = {}
+_ACTIVE = []
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as ``name`` (nested under any open stage)."""
+    _ACTIVE.append(name)
+    # Registered on entry so stages are listed in the order they first open
+    entry = _STAGES.setdefault("/".join(_ACTIVE), [0, 0.0])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry[1] += time.perf_counter() - start
+        entry[0] += 1
+        _ACTIVE.pop()
+
+
+def timed(name: str):
+    """Decorator: run every call of the function as stage ``name``."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name: str, n=1):
+    """Add ``n`` to counter ``name``."""
+    _COUNTERS[name] = _COUNTERS.get(name, 0) + n
+
+
+def record_output(path):
+    """Count a written file towards ``bytes_written``."""
+    try:
+        count("bytes_written", os.path.getsize(path))
+    except OSError:
+        pass
+
+
+def reset():
+    _STAGES.clear()
+    _COUNTERS.clear()
+
+
+def snapshot(wall_seconds=None) -> dict:
+    """Recorded stages and counters as a JSON-serialisable dict."""
+    return {
+        "wall_s": wall_seconds,
+        "stages": {key: {"calls": calls, "total_s": total}
+                   for key, (calls, total) in _STAGES.items()},
+        "counters": dict(_COUNTERS),
+    }
+
+
+def format_breakdown(report: dict) -> str:
+    """Stage tree with call counts and share of wall time, then counters."""
+    wall = report["wall_s"] or sum(s["total_s"] for k, s in report["stages"].items()
+                                   if "/" not in k)
+    lines = [f"{'Stage':<44} {'Calls':>6} {'Time':>10} {'Share':>7}"]
+    for key in report["stages"]:
+        entry = report["stages"][key]
+        depth = key.count("/")
+        name = "  " * depth + key.rsplit("/", 1)[-1]
+        share = 100 * entry["total_s"] / wall if wall else 0.0
+        lines.append(f"{name:<44} {entry['calls']:>6} {entry['total_s']:>9.4f}s {share:>6.1f}%")
+    lines.append(f"{'(wall clock)':<44} {'':>6} {wall:>9.4f}s")
+    if report["counters"]:
+        lines.append("")
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f"{name:<44} {value:>17,}")
+    return "\n".join(lines)
+
+
+def add_profile_arguments(parser):
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a per-stage timing breakdown to stderr")
+    parser.add_argument("--profile-json", type=Path, default=None, metavar="PATH",
+                        help="Also write the breakdown as JSON (implies --profile)")
+    parser.add_argument("--profile-stats", type=Path, default=None, metavar="PATH",
+                        help="Also write cProfile stats (implies --profile)")
+
+
+@contextmanager
+def profiled(args):
+    """Run the enclosed block and report it as requested by ``args``."""
+    enabled = args.profile or args.profile_json or args.profile_stats
+    if not enabled:
+        yield
+        return
+
+    profiler = cProfile.Profile() if args.profile_stats else None
+    reset()
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        report = snapshot(time.perf_counter() - start)
+        report["script"] = Path(sys.argv[0]).name
+        print("\n" + format_breakdown(report), file=sys.stderr)
+        if args.profile_json:
+            args.profile_json.write_text(json.dumps(report, indent=2) + "\n")
+            print(f"Profile written to {args.profile_json}", file=sys.stderr)
+        if profiler:
+            profiler.dump_stats(args.profile_stats)
+            print(f"cProfile stats written to {args.profile_stats}", file=sys.stderr)
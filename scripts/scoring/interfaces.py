@@ -0,0 +1,206 @@
+"""
+Flag tables of the tool interfaces known to the dry-run.
+
+Each (sub)command lists its flags as ``-x/--long:arity`` items: arity 0
+(a switch), 1 (takes a value) or ``+`` (one or more values); the first
+spelling is the canonical one. ``clusters`` marks getopt-style tools
+where ``-bh`` is ``-b -h``.
+
+``scoring.commands`` reads the arities to tell flag values from
+positional arguments; ``scoring.stubs`` adds the rest of each interface
+(positional count, inputs, outputs) to check command lines. The stub
+executables import this module on their own, so it imports nothing.
+"""
+
+
+class Interface:
+    """Flags of one (sub)command."""
+
+    def __init__(self, flags: str, clusters=False):
+        self.flags = {}                      # flag -> arity (0, 1 or "+")
+        self.canonical = {}                  # flag -> first spelling, for required groups
+        for item in flags.split():
+            names, arity = item.rsplit(":", 1)
+            spellings = names.split("/")
+            for name in spellings:
+                self.flags[name] = arity if arity == "+" else int(arity)
+                self.canonical[name] = spellings[0]
+        self.clusters = clusters             # getopt-style -ab clusters of short flags
+
+
+# Command -> Interface, or subcommand -> Interface for tools with subcommands
+INTERFACES = {
+    "dorado": {
+        "basecaller": Interface(
+            "-x/--device:1 -r/--recursive:0 --emit-fastq:0 --emit-sam:0 --emit-moves:0 "
+            "--min-qscore:1 -b/--batchsize:1 -c/--chunksize:1 --overlap:1 -o/--output-dir:1 "
+            "--kit-name:1 --sample-sheet:1 --trim:1 --no-trim:0 --barcode-both-ends:0 "
+            "--modified-bases:+ --modified-bases-models:1 --modified-bases-threshold:1 "
+            "--reference:1 --mm2-opts:1 --read-ids:1 -l:1 -n/--max-reads:1 --resume-from:1 "
+            "--estimate-poly-a:0 --models-directory:1 -v/--verbose:0 -h/--help:0"),
+        "demux": Interface(
+            "--kit-name:1 -o/--output-dir:1 --emit-fastq:0 --emit-summary:0 --no-classify:0 "
+            "--barcode-both-ends:0 --no-trim:0 --sort-bam:0 -t/--threads:1 -r/--recursive:0 "
+            "--sample-sheet:1 -v/--verbose:0 -h/--help:0"),
+        "trim": Interface(
+            "-t/--threads:1 -k/--sequencing-kit:1 --primer-sequences:1 --emit-fastq:0 "
+            "--no-trim-primers:0 -n/--max-reads:1 -v/--verbose:0 -h/--help:0"),
+        "aligner": Interface(
+            "-t/--threads:1 -o/--output-dir:1 --mm2-opts:1 -k:1 -w:1 -I:1 --bed-file:1 "
+            "--emit-summary:0 -r/--recursive:0 -v/--verbose:0 -h/--help:0"),
+        "download": Interface(
+            "--model:1 --directory:1 --models-directory:1 --list:0 -v/--verbose:0 -h/--help:0"),
+        "summary": Interface("-s/--separator:1 -r/--recursive:0 -v/--verbose:0 -h/--help:0"),
+    },
+    "guppy_basecaller": Interface(
+        "-i/--input_path:1 -s/--save_path:1 -c/--config:1 --flowcell:1 --kit:1 -x/--device:1 "
+        "--compress_fastq:0 -r/--recursive:0 --min_qscore:1 --num_callers:1 "
+        "--gpu_runners_per_device:1 --cpu_threads_per_caller:1 --chunks_per_runner:1 "
+        "--chunk_size:1 --disable_pings:0 --trim_adapters:0 --barcode_kits:1 "
+        "--records_per_fastq:1 -q:1 --detect_barcodes:0 --enable_trim_barcodes:0 --calib_detect:0 "
+        "--do_read_splitting:0 --model_file:1 -d/--data_path:1 --bam_out:0 --fast5_out:0 "
+        "--disable_qscore_filtering:0 --print_workflows:0 -v/--version:0 -h/--help:0"),
+    "porechop": Interface(
+        "-i/--input:1 -o/--output:1 --format:1 -v/--verbosity:1 -t/--threads:1 -b/--barcode_dir:1 "
+        "--barcode_threshold:1 --barcode_diff:1 --require_two_barcodes:0 --untrimmed:0 "
+        "--discard_unassigned:0 --adapter_threshold:1 --check_reads:1 --scoring_scheme:1 "
+        "--end_size:1 --min_trim_size:1 --extra_end_trim:1 --end_threshold:1 --no_split:0 "
+        "--discard_middle:0 --middle_threshold:1 --extra_middle_trim_good_side:1 "
+        "--extra_middle_trim_bad_side:1 --min_split_read_size:1 -h/--help:0 --version:0"),
+    "NanoFilt": Interface(
+        "-q/--quality:1 -l/--length:1 --maxlength:1 --headcrop:1 --tailcrop:1 -s/--summary:1 "
+        "--readtype:1 --minGC:1 --maxGC:1 --logfile:1 -h/--help:0 -v/--version:0"),
+    "chopper": Interface(
+        "-q/--quality:1 --maxqual:1 -l/--minlength:1 --maxlength:1 --headcrop:1 --tailcrop:1 "
+        "-t/--threads:1 -c/--contam:1 --inverse:0 --mingc:1 --maxgc:1 -i/--input:1 "
+        "--trim-approach:1 --cutoff:1 -h/--help:0 -V/--version:0"),
+    "NanoPlot": Interface(
+        "-t/--threads:1 -o/--outdir:1 -p/--prefix:1 --tsv_stats:0 --info_in_report:0 --verbose:0 "
+        "--store:0 --raw:0 --huge:0 --maxlength:1 --minlength:1 --drop_outliers:0 --downsample:1 "
+        "--loglength:0 --percentqual:0 --alength:0 --minqual:1 --runtime_until:1 --readtype:1 "
+        "--barcoded:0 --no_supplementary:0 -c/--color:1 -cm/--colormap:1 -f/--format:+ --plots:+ "
+        "--legacy:+ --listcolors:0 --listcolormaps:0 --no-N50:0 --N50:0 --title:1 --font_scale:1 "
+        "--dpi:1 --hide_stats:0 --fastq:+ --fasta:+ --fastq_rich:+ --fastq_minimal:+ --summary:+ "
+        "--bam:+ --ubam:+ --cram:+ --pickle:1 --feather:+ -h/--help:0 -v/--version:0"),
+    "NanoStat": Interface(
+        "--fastq:+ --fasta:+ --summary:+ --bam:+ -o/--outdir:1 -n/--name:1 -p/--prefix:1 "
+        "-t/--threads:1 --tsv:0 --barcoded:0 --readtype:1 -h/--help:0 -v/--version:0"),
+    "minimap2": Interface(
+        "-x:1 -a:0 -t:1 -o:1 -c:0 -d:1 -k:1 -w:1 -H:0 -I:1 -N:1 -p:1 -L:0 -R:1 -Y:0 -y:0 -K:1 "
+        "-2:0 -F:1 -r:1 -g:1 -G:1 -f:1 -u:1 -z:1 -s:1 -A:1 -B:1 -O:1 -E:1 -X:0 -P:0 -m:1 -n:1 "
+        "-M:1 -Q:0 -j:1 -U:1 -C:1 -e:1 -v:1 -V/--version:0 -h/--help:0 --secondary:1 --MD:0 "
+        "--cs:0 --ds:0 --eqx:0 --split-prefix:1 --sam-hit-only:0 --paf-no-hit:0 --for-only:0 "
+        "--rev-only:0 --junc-bed:1 --seed:1 --heap-sort:1 --no-kalloc:0 --print-qname:0 "
+        "--max-qlen:1 --lj-min-ratio:1 --score-N:1 --no-end-flt:0 --hard-mask-level:0 "
+        "--mask-len:1 --max-chain-skip:1 --max-chain-iter:1 --chain-gap-scale:1 --q-occ-frac:1",
+        clusters=True),
+    "samtools": {
+        "view": Interface(
+            "-b:0 -C:0 -1:0 -u:0 -h:0 -H:0 -c:0 -o:1 -U:1 -t:1 -L:1 -r:1 -R:1 -d:1 -D:1 -q:1 -l:1 "
+            "-m:1 -f:1 -F:1 -G:1 -s:1 -M:0 -x:1 -B:0 -S:0 -T:1 -@:1 -O:1 -e:1 -N:1 -P:0 -X:0 -?:0 "
+            "--reference:1 --threads:1 --output-fmt:1 --input-fmt-option:1 --write-index:0 "
+            "--remove-tag:1 --keep-tag:1 --rf:1 --excl-flags:1 --require-flags:1 --min-MQ:1 "
+            "--no-PG:0",
+            clusters=True),
+        "sort": Interface(
+            "-o:1 -O:1 -T:1 -@:1 -m:1 -n:0 -t:1 -l:1 -u:0 -M:0 -K:1 --threads:1 --write-index:0 "
+            "--output-fmt:1 --no-PG:0",
+            clusters=True),
+        "index": Interface("-b:0 -c:0 -m:1 -@:1 -o:1 --threads:1", clusters=True),
+        "fastq": Interface(
+            "-f:1 -F:1 -G:1 -0:1 -1:1 -2:1 -s:1 -o:1 -n:0 -N:0 -O:0 -t:0 -T:1 -@:1 -c:1 -i:0 "
+            "--reference:1 --threads:1 --rf:1",
+            clusters=True),
+        "fasta": Interface(
+            "-f:1 -F:1 -G:1 -0:1 -1:1 -2:1 -s:1 -o:1 -n:0 -N:0 -@:1 --threads:1",
+            clusters=True),
+        "flagstat": Interface("-@:1 -O:1 --threads:1 --output-fmt:1"),
+        "idxstats": Interface("-@:1 --threads:1"),
+        "depth": Interface(
+            "-a:0 -aa:0 -b:1 -f:1 -H:0 -l:1 -m:1 -o:1 -q:1 -Q:1 -r:1 -@:1 -J:0 -s:0 --threads:1"),
+        "coverage": Interface(
+            "-o:1 -m:0 -A:0 -w:1 -r:1 -b:1 -q:1 -Q:1 -l:1 -d:1 --ff:1 --rf:1 -@:1 --threads:1"),
+        "merge": Interface(
+            "-o:1 -@:1 -f:0 -n:0 -t:1 -r:0 -u:0 -1:0 -l:1 -c:0 -p:0 -s:1 -b:1 --threads:1 "
+            "--write-index:0 --no-PG:0",
+            clusters=True),
+        "faidx": Interface("-o:1 -n:1 -c:0 -i:0 --fai-idx:1 --length:1 -r:1"),
+    },
+    "kraken2": Interface(
+        "--db:1 --threads:1 --quick:0 --unclassified-out:1 --classified-out:1 --output:1 "
+        "--confidence:1 --minimum-base-quality:1 --report:1 --use-mpa-style:0 "
+        "--report-zero-counts:0 --report-minimizer-data:0 --memory-mapping:0 --paired:0 "
+        "--use-names:0 --gzip-compressed:0 --bzip2-compressed:0 --minimum-hit-groups:1 --help:0 "
+        "--version:0"),
+    "flye": Interface(
+        "--nano-raw:+ --nano-corr:+ --nano-hq:+ --pacbio-raw:+ --pacbio-corr:+ --pacbio-hifi:+ "
+        "--subassemblies:+ -g/--genome-size:1 -o/--out-dir:1 -t/--threads:1 -i/--iterations:1 "
+        "-m/--min-overlap:1 --asm-coverage:1 --hifi-error:1 --read-error:1 --extra-params:1 "
+        "--meta:0 --keep-haplotypes:0 --no-alt-contigs:0 --scaffold:0 --trestle:0 "
+        "--polish-target:1 --resume:0 --resume-from:1 --stop-after:1 --debug:0 --plasmids:0 "
+        "-v/--version:0 -h/--help:0"),
+    "racon": Interface(
+        "-u/--include-unpolished:0 -f/--fragment-correction:0 -w/--window-length:1 "
+        "-q/--quality-threshold:1 -e/--error-threshold:1 --no-trimming:0 -m/--match:1 "
+        "-x/--mismatch:1 -g/--gap:1 -t/--threads:1 -c/--cudapoa-batches:1 "
+        "-b/--cuda-banded-alignment:0 --cudaaligner-batches:1 --version:0 -h/--help:0"),
+    "medaka_consensus": Interface("-i:1 -d:1 -o:1 -m:1 -t:1 -b:1 -f:0 -x:0 -g:0 -r:1 -q:0 -h:0"),
+    "metabat2": Interface(
+        "-i/--inFile:1 -o/--outFile:1 -a/--abdFile:1 -m/--minContig:1 --maxP:1 --minS:1 "
+        "--maxEdges:1 --pTNF:1 --noAdd:0 --cvExt:0 -x/--minCV:1 --minCVSum:1 -s/--minClsSize:1 "
+        "-t/--numThreads:1 -l/--onlyLabel:0 --saveCls:0 --unbinned:0 --seed:1 -d/--debug:0 "
+        "-v/--verbose:0 -h/--help:0"),
+    "jgi_summarize_bam_contig_depths": Interface(
+        "--outputDepth:1 --percentIdentity:1 --pairedContigs:1 --referenceFasta:1 "
+        "--noIntraDepthVariance:0 --showDepth:0 --minMapQual:1 -h:0"),
+    "metawrap": {
+        "binning": Interface(
+            "-a:1 -o:1 -t:1 -m:1 -l:1 --metabat2:0 --metabat1:0 --maxbin2:0 --concoct:0 "
+            "--universal:0 --run-checkm:0 --single-end:0 --interleaved:0 -h:0"),
+        "bin_refinement": Interface(
+            "-o:1 -t:1 -m:1 -c:1 -x:1 -A:1 -B:1 -C:1 --skip-refinement:0 --skip-checkm:0 "
+            "--skip-consolidation:0 --keep-ambiguous:0 --remove-ambiguous:0 --quick:0 -h:0"),
+    },
+    "checkm": {
+        "lineage_wf": Interface(
+            "-x/--extension:1 -t/--threads:1 -r/--reduced_tree:0 --pplacer_threads:1 -f/--file:1 "
+            "--tab_table:0 -q/--quiet:0 --tmpdir:1 --ali:0 --nt:0 -g/--genes:0 -u/--unique:1 "
+            "-m/--multi:1 --individual_markers:0 --skip_adj_correction:0 "
+            "--skip_pseudogene_correction:0 --aai_strain:1 -a/--alignment_file:1 --force_domain:0 "
+            "--no_refinement:0 -h/--help:0"),
+        "qa": Interface(
+            "-o/--out_format:1 -f/--file:1 --tab_table:0 -t/--threads:1 -e/--exclude_markers:1 "
+            "--individual_markers:0 --skip_adj_correction:0 --skip_pseudogene_correction:0 "
+            "--aai_strain:1 -a/--alignment_file:1 --ignore_thresholds:0 -q/--quiet:0 --tmpdir:1 "
+            "-h/--help:0"),
+    },
+    "checkm2": {
+        "predict": Interface(
+            "-i/--input:+ -o/--output-directory:1 -x/--extension:1 -t/--threads:1 "
+            "--database_path:1 --force:0 --lowmem:0 --general:0 --specific:0 --allmodels:0 "
+            "--genes:0 --remove_intermediates:0 --quiet:0 --tmpdir:1 -h/--help:0"),
+    },
+    "seqkit": {
+        "fq2fa": Interface("-o/--out-file:1 -j/--threads:1 -w/--line-width:1 -h/--help:0"),
+    },
+    "amrfinder": Interface(
+        "-n/--nucleotide:1 -p/--protein:1 -g/--gff:1 -O/--organism:1 -o/--output:1 --threads:1 "
+        "--plus:0 -u/--update:0 -d/--database:1 -i/--ident_min:1 -c/--coverage_min:1 --name:1 "
+        "--mutation_all:1 --nucleotide_output:1 --protein_output:1 --nucleotide_flank5_output:1 "
+        "--nucleotide_flank5_size:1 -a/--annotation_format:1 --report_common:0 --print_node:0 "
+        "-q/--quiet:0 -l/--list_organisms:0 --debug:0 -h/--help:0 --version:0"),
+    "abricate": Interface(
+        "--db:1 --minid:1 --mincov:1 --threads:1 --nopath:0 --csv:0 --quiet:0 --summary:0 "
+        "--list:0 --datadir:1 --setupdb:0 --check:0 --noheader:0 --fofn:1 --version:0 --help:0 "
+        "--debug:0"),
+    "fastqc": Interface(
+        "-o/--outdir:1 -t/--threads:1 -f/--format:1 --extract:0 --noextract:0 -q/--quiet:0 "
+        "--nogroup:0 --casava:0 --nano:0 -c/--contaminants:1 -a/--adapters:1 -l/--limits:1 "
+        "-k/--kmers:1 -d/--dir:1 --svg:0 --memory:1 -h/--help:0 -v/--version:0"),
+}
+
+
+def interface(command: str, subcommand: str = None):
+    """Interface of ``command`` (``subcommand``), or None if it has none."""
+    entry = INTERFACES.get(command)
+    return entry.get(subcommand) if isinstance(entry, dict) else entry
@@ -0,0 +1,364 @@
+"""
+Draft tool_selection and parameter_accuracy codes from the commands in
+model responses.
+
+The lookup table is compiled once from the methodology documents:
+
+- ``pipeline_reference.md``, per ``## Step N`` section: tools named in the
+  parameter table are validated (each table row with tools is a role, e.g.
+  basecaller, adapter trimmer, length filter); tools in "Acceptable" or
+  "Benchmarked alternatives" bullets are acceptable unless the bullet
+  calls them incorrect; tools in "Common LLM errors" bullets are incorrect
+  unless the bullet calls them acceptable. The step's ``bash`` blocks give
+  the expected parameters of each (tool, subcommand): flags with a setting
+  (``NanoFilt -q 8``, ``--config ..._hac.cfg``), flags that must be
+  present (``--meta``, ``--nano-hq``) and positional settings such as the
+  Dorado model. Thread counts and input/output paths are not checked.
+  Inline flags in the table (```-x map-ont`` for minimap2``) add rules too.
+- ``scoring_criteria.md``: tools the Tool Selection rubric calls incorrect
+  (short-read, discontinued or isolate-only tools) are incorrect at every
+  step that does not list them itself.
+
+A step's codes are then proposed from the shell blocks of its turns, the
+way the hand-scored matrix relates the two dimensions:
+
+- tool_selection is I if any invoked tool is incorrect for the step, else
+  C if a validated tool is invoked, else A if an acceptable one is, else
+  blank (no step tool in the code);
+- parameter_accuracy is I when tool_selection is I; otherwise C (A
+  tools: P) when every check passes or the step has no reference
+  parameters, P when a check fails, and I for acceptable tools failing
+  more than half of their checks.
+
+Tools of other steps and unrecognised commands are ignored. Notes list
+the tools with their codes, failed checks and validated roles with no
+command, for the rater confirming the draft.
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .commands import TOOL_ALIASES, code_blocks, is_path, parse_blocks, parse_commands
+from .instrument import count, timed
+
+STEP_SECTION = re.compile(r"^##\s+Step\s+(\d+):\s*(.+)$", re.MULTILINE)
+NEXT_SECTION = re.compile(r"^## ", re.MULTILINE)
+TABLE_ROW = re.compile(r"^\|([^|]*)\|([^|]*)\|\s*$")
+LABEL = re.compile(r"^\*\*(.+?)\*\*")
+BULLET = re.compile(r"^\s*[-*]\s+(.*)$")
+WORD = re.compile(r"[A-Za-z][\w.+-]*[\w+]|[A-Za-z]")
+INLINE_CODE = re.compile(r"`([^`]+)`")
+SHORT_CLUSTER = re.compile(r"^-[A-Za-z]{2,3}$")
+
+# Flags that only size the run or name its inputs and outputs
+GENERIC_FLAGS = {"-t", "--threads", "--device", "-j", "--jobs", "-p", "--cpus"}
+IO_FLAGS = {"-i", "-o", "-s", "-a", "-A", "-B", "-C", "-n", "--input", "--output", "--out-dir",
+            "--outdir", "--report", "--save_path"}
+# Long/short spellings of the same flag, per tool
+FLAG_ALIASES = {
+    "nanofilt": {"--quality": "-q", "--length": "-l"},
+    "guppy": {"-c": "--config"},
+    "checkm": {"--extension": "-x"},
+    "minimap2": {"--preset": "-x"},
+}
+
+
+@dataclass
+class ParameterRule:
+    """Expected setting of one flag (or positional, flag ``""``) of a (tool, subcommand)."""
+
+    tool: str
+    subcommand: str
+    flag: str
+    values: tuple       # accepted values; empty = the flag only has to be present
+
+    def describe(self) -> str:
+        command = " ".join(filter(None, [self.tool, self.subcommand]))
+        setting = " | ".join(self.values)
+        return f"{command} {self.flag} {setting}".strip() if self.flag else f"{command} {setting}"
+
+
+@dataclass
+class StepReference:
+    step: int
+    title: str
+    validated: set = field(default_factory=set)
+    acceptable: set = field(default_factory=set)
+    incorrect: set = field(default_factory=set)
+    roles: list = field(default_factory=list)     # (label, set of validated tools)
+    rules: list = field(default_factory=list)     # ParameterRule
+
+
+@dataclass
+class ReferenceTable:
+    """Per-step lookup compiled from the methodology documents."""
+
+    steps: dict                                    # step -> StepReference
+    rubric_incorrect: set
+
+    def classify(self, step: int, tool: str) -> str:
+        """C / A / I for ``tool`` at ``step``; "" if it is not judged there."""
+        ref = self.steps[step]
+        if tool in ref.validated:
+            return "C"
+        if tool in ref.acceptable:
+            return "A"
+        if tool in ref.incorrect:
+            return "I"
+        if any(tool in other.validated or tool in other.acceptable
+               for other in self.steps.values()):
+            return ""                              # belongs to another step
+        return "I" if tool in self.rubric_incorrect else ""
+
+    def rules_for(self, step: int) -> dict:
+        """{(tool, subcommand): [ParameterRule, ...]} for ``step``."""
+        grouped = {}
+        for rule in self.steps[step].rules:
+            grouped.setdefault((rule.tool, rule.subcommand), []).append(rule)
+        return grouped
+
+
+@dataclass
+class Draft:
+    """Proposed codes for one (family, version, step)."""
+
+    tool_selection: str
+    parameter_accuracy: str
+    notes: str
+    invocations: int
+
+
+def mentioned_tools(text: str) -> list:
+    """Known tools named in prose, in order of first mention."""
+    tools = []
+    for word in WORD.findall(text):
+        tool = TOOL_ALIASES.get(word.lower())
+        if tool and tool not in tools:
+            tools.append(tool)
+    return tools
+
+
+def _flag(tool: str, flag: str) -> str:
+    return FLAG_ALIASES.get(tool, {}).get(flag, flag)
+
+
+def _options(inv) -> dict:
+    """Options of an invocation under their canonical names, short clusters split.
+
+    ``minimap2 -ax map-ont`` sets ``-a`` and ``-x map-ont``.
+    """
+    options = {}
+    for flag, value in inv.options().items():
+        if SHORT_CLUSTER.match(flag):
+            options.update({f"-{letter}": None for letter in flag[1:-1]})
+            options[f"-{flag[-1]}"] = value
+        options[_flag(inv.tool, flag)] = value
+    return options
+
+
+def _setting(value: str) -> str:
+    """Comparable form of a value: numbers as floats, words in lower case."""
+    try:
+        return repr(float(value))
+    except ValueError:
+        return value.lower()
+
+
+def _command_rules(invocations: list, tools: set) -> list:
+    rules = []
+    for inv in invocations:
+        if inv.tool not in tools:
+            continue
+        for flag, value in inv.options().items():
+            flag = _flag(inv.tool, flag)
+            if flag in GENERIC_FLAGS or flag in IO_FLAGS:
+                continue
+            values = () if value is None or is_path(value) else (value,)
+            rules.append(ParameterRule(inv.tool, inv.subcommand, flag, values))
+        for value in inv.positionals():
+            if not is_path(value):
+                rules.append(ParameterRule(inv.tool, inv.subcommand, "", (value,)))
+    return _merge_rules(rules)
+
+
+def _table_rules(cell: str) -> list:
+    """Rules from inline flags in a table cell naming a tool (```-x map-ont`` for minimap2``)."""
+    tools = mentioned_tools(INLINE_CODE.sub(" ", cell))
+    rules = []
+    for code in INLINE_CODE.findall(cell):
+        if code.startswith("-") and len(tools) == 1:
+            invocations, _ = parse_commands(f"{tools[0]} {code}")
+            rules.extend(_command_rules(invocations, set(tools)))
+    return rules
+
+
+def parse_step(step: int, title: str, text: str) -> StepReference:
+    """Lookup entries of one ``## Step N`` section of the pipeline reference."""
+    ref = StepReference(step=step, title=title.strip())
+    label, roles = "", {}
+    for line in text.splitlines():
+        row = TABLE_ROW.match(line.strip())
+        if row:
+            name, value = row.group(1).strip().strip("*"), row.group(2).strip()
+            if name == "Parameter" or not value.strip(":-"):
+                continue                           # header or separator row
+            if name:
+                label = name                       # a blank name continues the row above
+            tools = mentioned_tools(INLINE_CODE.sub(" ", value))
+            if tools:
+                roles.setdefault(label, set()).update(tools)
+                ref.validated.update(tools)
+            ref.rules.extend(_table_rules(value))
+            continue
+        heading = LABEL.match(line.strip())
+        if heading:
+            label = heading.group(1)
+            continue
+        bullet = BULLET.match(line)
+        if not bullet:
+            continue
+        text_lower = bullet.group(1).lower()
+        tools = set(mentioned_tools(bullet.group(1)))
+        if "alternative" in label.lower():
+            (ref.incorrect if "incorrect" in text_lower else ref.acceptable).update(tools)
+        elif "error" in label.lower():
+            (ref.acceptable if "acceptable" in text_lower else ref.incorrect).update(tools)
+    ref.acceptable -= ref.validated
+    ref.incorrect -= ref.validated | ref.acceptable
+    for label, tools in roles.items():
+        # "Basecalling model (Guppy/Dorado)" restates the basecaller role
+        if not any(tools & seen for _, seen in ref.roles):
+            ref.roles.append((label, tools))
+    for language, start, content in code_blocks(text):
+        if language == "bash":
+            invocations, _ = parse_commands(content, start)
+            ref.rules.extend(_command_rules(invocations, ref.validated))
+    ref.rules = _merge_rules(ref.rules)
+    return ref
+
+
+def _merge_rules(rules: list) -> list:
+    """One rule per (tool, subcommand, flag), accepting every value seen for it."""
+    merged = {}
+    for rule in rules:
+        merged.setdefault((rule.tool, rule.subcommand, rule.flag), set()).update(rule.values)
+    return [ParameterRule(tool, sub, flag, tuple(sorted(values)))
+            for (tool, sub, flag), values in merged.items()]
+
+
+def rubric_incorrect(criteria_text: str) -> set:
+    """Tools the Tool Selection rubric names as incorrect or as failure patterns."""
+    match = re.search(r"^## 1\. Tool Selection$(.*?)^## ", criteria_text, re.MULTILINE | re.DOTALL)
+    if not match:
+        return set()
+    tools = set()
+    for line in match.group(1).splitlines():
+        if line.startswith("| **Incorrect**") or BULLET.match(line):
+            tools.update(mentioned_tools(line))
+    return tools
+
+
+@timed("compile reference")
+def compile_reference(reference_path, criteria_path=None) -> ReferenceTable:
+    """Build the lookup table from ``pipeline_reference.md`` (and the rubric)."""
+    text = Path(reference_path).read_text()
+    steps = {}
+    for match in STEP_SECTION.finditer(text):
+        # a section runs to the next "## " heading (the next step or the data-flow summary)
+        end = NEXT_SECTION.search(text, match.end())
+        body = text[match.end():end.start() if end else len(text)]
+        steps[int(match.group(1))] = parse_step(int(match.group(1)), match.group(2), body)
+    incorrect = rubric_incorrect(Path(criteria_path).read_text()) if criteria_path else set()
+    return ReferenceTable(steps=steps, rubric_incorrect=incorrect)
+
+
+def check_rules(rules: list, invocations: list) -> list:
+    """(rule, passed, what was found) for each rule, over every invocation of its command."""
+    results = []
+    for rule in rules:
+        found = []
+        passed = False
+        for inv in invocations:
+            if rule.flag:
+                options = _options(inv)
+                if rule.flag not in options:
+                    continue
+                value = options[rule.flag]
+                ok = not rule.values or (value is not None and _setting(value) in
+                                         {_setting(v) for v in rule.values})
+                found.append(f"{rule.flag} {value}" if value is not None else rule.flag)
+            else:
+                settings = [value for value in inv.positionals() if not is_path(value)]
+                ok = any(_setting(value) in {_setting(v) for v in rule.values}
+                         for value in settings)
+                found.extend(settings)
+            passed = passed or ok
+        results.append((rule, passed, found))
+    return results
+
+
+def _failure(rule: ParameterRule, found: list) -> str:
+    command = " ".join(filter(None, [rule.tool, rule.subcommand]))
+    expected = " | ".join(rule.values)
+    if not found:
+        what = rule.flag or "setting"
+        return f"{command} {what} missing" + (f" (expected {expected})" if expected else "")
+    return f"{command} {found[0]} (expected {rule.flag + ' ' if rule.flag else ''}{expected})"
+
+
+def prescore(table: ReferenceTable, step: int, blocks: list) -> Draft:
+    """Proposed codes for one step from its turns' parsed shell blocks."""
+    invocations = [inv for block in blocks for inv in block.invocations if inv.known]
+    classes = {}
+    for inv in invocations:
+        code = table.classify(step, inv.tool)
+        if code:
+            classes.setdefault(inv.tool, code)
+    codes = set(classes.values())
+    selection = next((code for code in ("I", "C", "A") if code in codes), "")
+
+    notes = [", ".join(f"{tool} {code}" for tool, code in classes.items())] if classes else []
+    rules = table.rules_for(step)
+    checks = []
+    for (tool, sub), tool_rules in rules.items():
+        used = [inv for inv in invocations if inv.tool == tool and inv.subcommand == sub]
+        if used:
+            checks.extend(check_rules(tool_rules, used))
+    failed = [(rule, found) for rule, passed, found in checks if not passed]
+    notes.extend(_failure(rule, found) for rule, found in failed)
+
+    if not selection:
+        accuracy = ""
+    elif selection == "I":
+        accuracy = "I"
+    elif not failed:
+        accuracy = "C" if selection == "C" else "P"
+    elif selection == "A" and len(failed) * 2 > len(checks):
+        accuracy = "I"
+    else:
+        accuracy = "P"
+
+    if selection:
+        used = set(classes)
+        notes.extend(f"no {' or '.join(sorted(tools))} ({label})"
+                     for label, tools in table.steps[step].roles if not tools & used)
+        if not rules:
+            notes.append("no reference parameters")
+    elif invocations:
+        notes.append("no step tool in the code")
+    else:
+        notes.append("no shell commands")
+    count("invocations_parsed", len(invocations))
+    return Draft(tool_selection=selection, parameter_accuracy=accuracy,
+                 notes="draft: " + "; ".join(notes), invocations=len(invocations))
+
+
+def prescore_turns(table: ReferenceTable, turns: list) -> dict:
+    """{step: Draft} from (step, first line, text) turns of one model version."""
+    blocks = {}
+    for step, line, text in turns:
+        if step in table.steps:
+            blocks.setdefault(step, []).extend(parse_blocks(text, line))
+    return {step: prescore(table, step, step_blocks)
+            for step, step_blocks in sorted(blocks.items())}
@@ -0,0 +1,450 @@
+"""
+Asynchronous runner for the sequential prompting protocol.
+
+Each conversation sends ``prompts/step_01`` ... ``step_07`` to one model
+in order, every prompt carrying the full history of the previous turns
+(methodology/evaluation_framework.md: single thread, no correction).
+Conversations of different models and replicates run concurrently on one
+event loop; within a conversation a step starts only once the previous
+answer is on disk.
+
+Backends are classes keyed by ``kind`` in ``BACKENDS`` (OpenAI-compatible
+chat completions, Anthropic messages, Gemini generateContent); a config
+may also name any ``module:Class`` subclass of ``Backend``. Every backend
+instance has its own token-bucket rate limit (requests per second, burst)
+and a cap on requests in flight, shared by all conversations routed to
+it. Requests are plain HTTP/1.1 over asyncio streams, so no client
+library is needed and thousands of conversations can wait on one loop.
+
+Failed requests are retried with exponential backoff and jitter (or the
+server's ``Retry-After``) when the status or error is transient (429,
+5xx, timeouts, dropped connections); other errors stop the conversation,
+since later steps depend on the missing answer.
+
+Transcripts go to ``<root>/<family>/<version>/run<k>/step_0N_<name>.md``,
+one file per answer, which ``scoring.corpus`` and the draft scorers read
+as one conversation per run directory. A ``.checkpoint.json`` next to them
+records the steps completed, with the hash of each prompt; both are
+replaced atomically after every step. A rerun resumes each conversation
+after its last completed step, rebuilding the history from the files, and
+redoes a step (and everything after it) whose prompt text changed.
+
+Config (JSON)::
+
+    {"backends": {"openai": {"kind": "openai", "base_url": "https://api.openai.com/v1",
+                             "api_key_env": "OPENAI_API_KEY", "rate": 2, "concurrency": 8}},
+     "models": [{"family": "chatgpt", "version": "gpt5", "backend": "openai",
+                 "model": "gpt-5"}]}
+"""
+
+import abc
+import asyncio
+import contextlib
+import hashlib
+import importlib
+import json
+import os
+import random
+import re
+import ssl
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+from .corpus import PROMPT_FILE
+from .instrument import count
+
+CHECKPOINT = ".checkpoint.json"
+PROMPT_SECTION = re.compile(r"^##\s+Prompt Text\s*$(.*?)(?=^##\s|\Z)", re.MULTILINE | re.DOTALL)
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504, 529}
+RETRIES = 5
+BACKOFF = 1.0           # seconds before the first retry, doubled on each further one
+MAX_BACKOFF = 60.0
+
+_SSL_CONTEXT = None
+
+
+@dataclass
+class Prompt:
+    step: int
+    name: str            # e.g. "basecalling", from step_01_basecalling.md
+    text: str
+
+    @property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.text.encode()).hexdigest()
+
+    @property
+    def filename(self) -> str:
+        return f"step_{self.step:02d}_{self.name}.md"
+
+
+def load_prompts(prompts_dir) -> list:
+    """Prompts of ``prompts/step_0N_<name>.md`` in step order.
+
+    The prompt is the ``## Prompt Text`` section with its blockquote
+    markers removed; a file without that section is sent whole.
+    """
+    prompts = []
+    for path in sorted(Path(prompts_dir).glob("step_*.md")):
+        match = PROMPT_FILE.search(path.name)
+        if not match:
+            continue
+        text = path.read_text()
+        section = PROMPT_SECTION.search(text)
+        if section:
+            text = "\n".join(re.sub(r"^\s*>\s?", "", line)
+                             for line in section.group(1).strip().splitlines())
+        prompts.append(Prompt(step=int(match.group(1)), name=match.group(2), text=text.strip()))
+    return sorted(prompts, key=lambda prompt: prompt.step)
+
+
+class BackendError(Exception):
+    """A request that failed; ``retryable`` if sending it again may succeed."""
+
+    def __init__(self, message: str, status: int = None, retryable: bool = False,
+                 retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token bucket: ``rate`` requests per second, bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self.updated is not None:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens, self.updated = 1.0, loop.time()
+            self.tokens -= 1
+
+
+async def http_post(url: str, headers: dict, payload: bytes, timeout: float):
+    """(status, lower-cased headers, body) of an HTTP/1.1 POST."""
+    global _SSL_CONTEXT
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    if secure and _SSL_CONTEXT is None:
+        _SSL_CONTEXT = ssl.create_default_context()
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or (443 if secure else 80),
+            ssl=_SSL_CONTEXT if secure else None)
+        try:
+            head = [f"POST {target} HTTP/1.1", f"Host: {parts.netloc}",
+                    "Content-Type: application/json", f"Content-Length: {len(payload)}",
+                    "Connection: close", *(f"{key}: {value}" for key, value in headers.items())]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+            await writer.drain()
+            return await reader.read()
+        finally:
+            writer.close()
+            with contextlib.suppress(OSError, ssl.SSLError):
+                await writer.wait_closed()
+
+    raw = await asyncio.wait_for(exchange(), timeout)
+    head, _, body = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        status = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        raise BackendError(f"malformed response from {parts.netloc}", retryable=True)
+    response_headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(":")
+        response_headers[key.strip().lower()] = value.strip()
+    if response_headers.get("transfer-encoding", "").lower() == "chunked":
+        body = _dechunk(body)
+    return status, response_headers, body
+
+
+def _dechunk(body: bytes) -> bytes:
+    chunks = []
+    while body:
+        size_line, _, body = body.partition(b"\r\n")
+        size = int(size_line.split(b";")[0] or b"0", 16)
+        if size == 0:
+            break
+        chunks.append(body[:size])
+        body = body[size + 2:]
+    return b"".join(chunks)
+
+
+class Backend(abc.ABC):
+    """An HTTP chat API. Subclasses map a conversation to the provider's JSON.
+
+    ``messages`` is the conversation so far as [{"role": "user" or
+    "assistant", "content": text}], ending with the prompt to answer.
+    """
+
+    kind = ""
+    base_url = ""
+
+    def __init__(self, name: str, base_url: str = None, api_key_env: str = None,
+                 rate: float = 1.0, burst: int = 1, concurrency: int = 4,
+                 timeout: float = 600.0, max_tokens: int = 8192):
+        self.name = name
+        self.base_url = (base_url or self.base_url).rstrip("/")
+        self.api_key_env = api_key_env
+        self.limiter = RateLimiter(rate, burst)
+        self.slots = asyncio.Semaphore(concurrency)
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+
+    @property
+    def api_key(self) -> str:
+        return os.environ.get(self.api_key_env, "") if self.api_key_env else ""
+
+    @abc.abstractmethod
+    def request(self, model: str, messages: list):
+        """(path under base_url, headers, JSON payload)."""
+
+    @abc.abstractmethod
+    def parse(self, payload: dict) -> str:
+        """Answer text of a successful response."""
+
+    async def complete(self, model: str, messages: list) -> str:
+        path, headers, payload = self.request(model, messages)
+        async with self.slots:
+            await self.limiter.acquire()
+            count("requests")
+            status, response_headers, body = await http_post(
+                self.base_url + path, headers, json.dumps(payload).encode(), self.timeout)
+        if status != 200:
+            retry_after = response_headers.get("retry-after")
+            raise BackendError(f"HTTP {status}: {body[:200].decode(errors='replace')}",
+                               status=status, retryable=status in RETRY_STATUS,
+                               retry_after=float(retry_after) if retry_after and
+                               retry_after.replace(".", "", 1).isdigit() else None)
+        try:
+            return self.parse(json.loads(body))
+        except (ValueError, KeyError, IndexError, TypeError) as exc:
+            raise BackendError(f"unexpected response: {exc!r}") from exc
+
+
+class OpenAIBackend(Backend):
+    """OpenAI chat completions, and the local servers that mimic them."""
+
+    kind = "openai"
+    base_url = "https://api.openai.com/v1"
+
+    def request(self, model, messages):
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        return "/chat/completions", headers, {"model": model, "messages": messages}
+
+    def parse(self, payload):
+        return payload["choices"][0]["message"]["content"]
+
+
+class AnthropicBackend(Backend):
+    kind = "anthropic"
+    base_url = "https://api.anthropic.com"
+
+    def request(self, model, messages):
+        headers = {"x-api-key": self.api_key, "anthropic-version": "2023-06-01"}
+        return "/v1/messages", headers, {"model": model, "max_tokens": self.max_tokens,
+                                         "messages": messages}
+
+    def parse(self, payload):
+        return "".join(block["text"] for block in payload["content"]
+                       if block.get("type") == "text")
+
+
+class GeminiBackend(Backend):
+    kind = "gemini"
+    base_url = "https://generativelanguage.googleapis.com/v1beta"
+
+    def request(self, model, messages):
+        contents = [{"role": "model" if message["role"] == "assistant" else "user",
+                     "parts": [{"text": message["content"]}]} for message in messages]
+        headers = {"x-goog-api-key": self.api_key} if self.api_key else {}
+        return f"/models/{quote(model)}:generateContent", headers, {"contents": contents}
+
+    def parse(self, payload):
+        return "".join(part.get("text", "")
+                       for part in payload["candidates"][0]["content"]["parts"])
+
+
+BACKENDS = {cls.kind: cls for cls in (OpenAIBackend, AnthropicBackend, GeminiBackend)}
+
+
+def make_backend(name: str, settings: dict) -> Backend:
+    """Backend ``name`` from its config entry; ``kind`` is a BACKENDS key or module:Class."""
+    settings = dict(settings)
+    kind = settings.pop("kind", name)
+    if kind in BACKENDS:
+        cls = BACKENDS[kind]
+    elif ":" in kind:
+        module, _, attribute = kind.partition(":")
+        cls = getattr(importlib.import_module(module), attribute)
+        if not (isinstance(cls, type) and issubclass(cls, Backend)):
+            raise ValueError(f"{kind} is not a Backend subclass")
+    else:
+        raise ValueError(f"unknown backend kind {kind!r} (known: {', '.join(BACKENDS)})")
+    return cls(name, **settings)
+
+
+@dataclass
+class Conversation:
+    family: str          # directory under the root, e.g. chatgpt
+    version: str
+    replicate: int
+    backend: Backend
+    model: str           # model id sent to the backend
+
+    @property
+    def label(self) -> str:
+        return f"{self.family}/{self.version}/run{self.replicate}"
+
+    def directory(self, root: Path) -> Path:
+        return Path(root) / self.family / self.version / f"run{self.replicate}"
+
+
+@dataclass
+class Outcome:
+    """What one conversation did in this run."""
+
+    label: str
+    resumed_at: int = 0           # first step sent (0: nothing left to do)
+    written: int = 0              # steps answered in this run
+    retries: int = 0
+    error: str = ""
+    failed_step: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class Checkpoint:
+    model: str = ""
+    backend: str = ""
+    steps: dict = field(default_factory=dict)     # "step" -> {prompt_sha256, file, ...}
+    error: dict = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path):
+        if not path.exists():
+            return cls()
+        try:
+            data = json.loads(path.read_text())
+        except ValueError:
+            return cls()
+        return cls(model=data.get("model", ""), backend=data.get("backend", ""),
+                   steps=data.get("steps", {}), error=data.get("error", {}))
+
+    def save(self, path: Path):
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"model": self.model, "backend": self.backend,
+                                   "steps": self.steps, "error": self.error}, indent=1) + "\n")
+        os.replace(tmp, path)
+
+    def completed(self, prompts: list, directory: Path) -> int:
+        """Steps already answered: the longest prefix whose prompts are unchanged."""
+        done = 0
+        for prompt in prompts:
+            entry = self.steps.get(str(prompt.step))
+            if not entry or entry.get("prompt_sha256") != prompt.sha256 or \
+                    not (directory / entry.get("file", prompt.filename)).is_file():
+                break
+            done += 1
+        return done
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+async def send(backend: Backend, model: str, messages: list, retries: int = RETRIES,
+               backoff: float = BACKOFF):
+    """(answer, retries used), retrying transient failures with backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return await backend.complete(model, messages), attempt
+        except BackendError as exc:
+            if not exc.retryable or attempt == retries:
+                raise
+            delay = exc.retry_after
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+            if attempt == retries:
+                raise BackendError(f"{type(exc).__name__}: {exc}") from exc
+            delay = None
+        count("retries")
+        if delay is None:
+            delay = min(MAX_BACKOFF, backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+        await asyncio.sleep(delay)
+
+
+async def run_conversation(conversation: Conversation, prompts: list, root: Path,
+                           restart: bool = False, retries: int = RETRIES,
+                           backoff: float = BACKOFF) -> Outcome:
+    """Send the prompts not yet answered, in order, checkpointing after each."""
+    start = time.monotonic()
+    outcome = Outcome(label=conversation.label)
+    directory = conversation.directory(root)
+    directory.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = directory / CHECKPOINT
+    checkpoint = Checkpoint() if restart else Checkpoint.load(checkpoint_path)
+    if checkpoint.model and checkpoint.model != conversation.model:
+        checkpoint = Checkpoint()              # a different model: start over
+    done = checkpoint.completed(prompts, directory)
+    checkpoint.model, checkpoint.backend = conversation.model, conversation.backend.name
+    checkpoint.steps = {str(p.step): checkpoint.steps[str(p.step)] for p in prompts[:done]}
+    checkpoint.error = {}
+
+    messages = []
+    for prompt in prompts[:done]:
+        messages += [{"role": "user", "content": prompt.text},
+                     {"role": "assistant", "content": (directory / prompt.filename).read_text()}]
+    for prompt in prompts[done:]:
+        outcome.resumed_at = outcome.resumed_at or prompt.step
+        messages.append({"role": "user", "content": prompt.text})
+        sent = time.monotonic()
+        try:
+            answer, used = await send(conversation.backend, conversation.model, messages,
+                                      retries, backoff)
+        except BackendError as exc:
+            outcome.error, outcome.failed_step = str(exc), prompt.step
+            checkpoint.error = {"step": prompt.step, "message": str(exc),
+                                "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+            checkpoint.save(checkpoint_path)
+            break
+        outcome.retries += used
+        _write_atomic(directory / prompt.filename, answer.rstrip("\n") + "\n")
+        checkpoint.steps[str(prompt.step)] = {
+            "prompt_sha256": prompt.sha256, "file": prompt.filename, "attempts": used + 1,
+            "seconds": round(time.monotonic() - sent, 3),
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+        checkpoint.save(checkpoint_path)
+        messages.append({"role": "assistant", "content": answer})
+        outcome.written += 1
+        count("steps_written")
+    outcome.elapsed = time.monotonic() - start
+    return outcome
+
+
+async def run_all(conversations: list, prompts: list, root: Path, restart: bool = False,
+                  retries: int = RETRIES, backoff: float = BACKOFF) -> list:
+    """Outcomes of every conversation, run concurrently, in input order."""
+    return await asyncio.gather(*(run_conversation(conversation, prompts, root, restart,
+                                                   retries, backoff)
+                                  for conversation in conversations))
@@ -0,0 +1,119 @@
+"""
+Sensitivity of the reports to how the five dimensions are weighted.
+
+Composites elsewhere are unweighted means of the dimension scores. Here a
+batch of weight vectors drawn uniformly from the simplex (plus the equal
+weights and each single dimension) is evaluated at once:
+
+- step composites for every weight vector are one matrix product of the
+  per-step dimension sums (over rows with all five codes recognised) with
+  the (dimension × weight) matrix, so at equal weights they equal the
+  ``hardest_step`` averages;
+- cell composites are ``cube.values @ weights``, from which the first
+  version per family whose weighted composite reaches ``threshold`` on
+  every step is found for all weight vectors together.
+
+Because ``first_fully_correct`` requires every code to be fully correct,
+it does not depend on weights at all; the threshold variant is what can
+move, and is reported instead.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import DIMENSIONS
+from .instrument import count, timed
+
+DEFAULT_SAMPLES = 5000
+DEFAULT_THRESHOLD = 0.9
+
+
+@dataclass
+class Sensitivity:
+    """Step rankings and first-passing versions across weight vectors.
+
+    Column 0 of every weight-indexed array is the equal-weight baseline,
+    columns 1..5 put all weight on one dimension (``DIMENSIONS`` order).
+    """
+
+    weights: np.ndarray          # (weights × dimensions), rows sum to 1
+    step_scores: np.ndarray      # (steps × weights) weighted step composites
+    step_ranks: np.ndarray       # (steps × weights) 1 = hardest
+    kendall_tau: np.ndarray      # (weights,) agreement with the baseline ranking
+    first_passing: dict          # family -> (weights,) model index, -1 if none
+    threshold: float
+
+    @property
+    def hardest_share(self) -> np.ndarray:
+        """Share of weight vectors under which each step is the hardest."""
+        return (self.step_ranks == 1).mean(axis=1)
+
+    @property
+    def same_ranking_share(self) -> float:
+        """Share of weight vectors that reproduce the baseline ranking exactly."""
+        return float((self.step_ranks == self.step_ranks[:, :1]).all(axis=0).mean())
+
+
+def simplex_weights(n_samples: int, seed: int = 0) -> np.ndarray:
+    """Equal weights, the simplex vertices, then uniform Dirichlet samples."""
+    n_dims = len(DIMENSIONS)
+    rng = np.random.default_rng(seed)
+    return np.vstack([np.full(n_dims, 1 / n_dims), np.eye(n_dims),
+                      rng.dirichlet(np.ones(n_dims), size=n_samples)])
+
+
+def rank_columns(scores: np.ndarray) -> np.ndarray:
+    """Rank each column ascending (1 = lowest); NaN sorts last, ties by position."""
+    order = np.argsort(np.where(np.isnan(scores), np.inf, scores), axis=0, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, len(scores) + 1)[:, None], axis=0)
+    return ranks
+
+
+def kendall_tau(ranks: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Kendall's tau between every column of ``ranks`` and ``reference``."""
+    i, j = np.triu_indices(len(reference), k=1)
+    if not len(i):
+        return np.ones(ranks.shape[1])
+    agree = np.sign(ranks[i] - ranks[j]) * np.sign(reference[i] - reference[j])[:, None]
+    return agree.mean(axis=0)
+
+
+@timed("weight sensitivity")
+def weight_sensitivity(cube, n_samples: int = DEFAULT_SAMPLES, seed: int = 0,
+                       threshold: float = DEFAULT_THRESHOLD) -> Sensitivity:
+    weights = simplex_weights(n_samples, seed)
+    enc = cube.encoded
+    n_steps = len(cube.steps)
+    count("weight_vectors", len(weights))
+
+    # Step composites: per-step dimension sums over fully scored rows, times weights
+    usable = ~np.isnan(enc.values).any(axis=1)
+    step = enc.step_index[usable]
+    dim_sums = np.stack([np.bincount(step, weights=enc.values[usable, j], minlength=n_steps)
+                         for j in range(len(DIMENSIONS))], axis=1)
+    n_rows = np.bincount(step, minlength=n_steps)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        step_scores = (dim_sums @ weights.T) / n_rows[:, None]
+    step_ranks = rank_columns(step_scores)
+
+    # First version per family whose every step reaches the threshold
+    cell_scores = cube.values @ weights.T                   # model × step × weight
+    complete = ~cube.missing.any(axis=(1, 2))
+    passing = (cell_scores >= threshold - 1e-12).all(axis=1) & complete[:, None]
+    families = np.array([family for family, _ in cube.models], dtype=object)
+    first_passing = {}
+    for family in dict.fromkeys(families):
+        rows = np.flatnonzero(families == family)
+        hit = passing[rows]
+        first_passing[family] = np.where(hit.any(axis=0), rows[hit.argmax(axis=0)], -1)
+
+    return Sensitivity(
+        weights=weights,
+        step_scores=step_scores,
+        step_ranks=step_ranks,
+        kendall_tau=kendall_tau(step_ranks, step_ranks[:, 0]),
+        first_passing=first_passing,
+        threshold=threshold,
+    )
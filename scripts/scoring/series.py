@@ -0,0 +1,121 @@
+"""
+Figure series: one chart template redrawn for many entities.
+
+Creating a matplotlib figure, its axes, ticks and labels costs far more
+than drawing a handful of bars, so per-entity charts (one per model, one
+per step) are drawn from a template built once per process. Each
+``draw`` only updates the data artists (``set_width``/``set_data``/
+``set_xy``) and the title, then saves the figure. Layout is computed once
+when the template is built, and figures are written straight from the Agg
+canvas: ``savefig`` would draw every figure twice (once more to redo the
+layout), which roughly doubles the cost of a small chart.
+
+``template`` keeps one series per key and process, so worker processes
+each build their templates on first use and reuse them for every entity
+they are given.
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from .instrument import count, record_output, stage
+
+_TEMPLATES = {}
+
+
+def template(key, factory):
+    """The series built by ``factory()`` for ``key``, built once per process."""
+    series = _TEMPLATES.get(key)
+    if series is None:
+        with stage("build template"):
+            series = _TEMPLATES[key] = factory()
+    return series
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.2f}" if not np.isnan(value) else "–"
+
+
+class FigureSeries:
+    """Base template: a figure saved once per entity."""
+
+    def __init__(self, fig):
+        self.fig = fig
+        fig.patch.set_facecolor("white")
+
+    def save(self, output_path):
+        with stage("savefig"):
+            self.fig.canvas.print_png(output_path)
+        record_output(output_path)
+
+    def close(self):
+        plt.close(self.fig)
+
+
+class BarSeries(FigureSeries):
+    """Horizontal 0–1 score bars over a fixed list of labels."""
+
+    def __init__(self, labels: list, xlabel: str, dpi: int = 150):
+        height = 0.35 * len(labels) + 1.2
+        fig, ax = plt.subplots(figsize=(7, height), dpi=dpi)
+        super().__init__(fig)
+        y_pos = np.arange(len(labels))
+        self.bars = ax.barh(y_pos, np.zeros(len(labels)), height=0.6, edgecolor="white",
+                            linewidth=0.5).patches
+        self.values = [ax.text(0.02, y, "", va="center", fontsize=7, fontweight="bold",
+                               color="#334155") for y in y_pos]
+        ax.set_yticks(y_pos)
+        ax.set_yticklabels(labels, fontsize=8)
+        ax.set_xlim(0, 1.1)
+        ax.set_xlabel(xlabel, fontsize=8)
+        self.title = ax.set_title(" ", fontsize=10, fontweight="bold", color="#1e293b", pad=8)
+        ax.invert_yaxis()
+        for side in ("top", "right"):
+            ax.spines[side].set_visible(False)
+        for side in ("bottom", "left"):
+            ax.spines[side].set_color("#e2e8f0")
+        fig.tight_layout()
+
+    def draw(self, scores: np.ndarray, colors: list, title: str, output_path):
+        for bar, text, score, color in zip(self.bars, self.values, scores, colors):
+            width = 0.0 if np.isnan(score) else score
+            bar.set_width(width)
+            bar.set_facecolor(color)
+            text.set_x(width + 0.02)
+            text.set_text(_fmt(score))
+        self.title.set_text(title)
+        count("cells_rendered", len(self.bars))
+        self.save(output_path)
+
+
+class RadarSeries(FigureSeries):
+    """One filled polygon on polar axes with a fixed set of spokes."""
+
+    def __init__(self, spoke_labels: list, dpi: int = 150):
+        fig, ax = plt.subplots(figsize=(4, 4), dpi=dpi, subplot_kw={"projection": "polar"})
+        super().__init__(fig)
+        angles = np.linspace(0, 2 * np.pi, len(spoke_labels), endpoint=False)
+        self.angles = np.append(angles, angles[:1])
+        ax.set_theta_offset(np.pi / 2)
+        ax.set_theta_direction(-1)
+        ax.set_rlabel_position(0)
+        ax.set_xticks(angles)
+        ax.set_xticklabels(spoke_labels, fontsize=7, fontweight="500")
+        ax.set_ylim(0, 1.05)
+        ax.set_yticks([0.25, 0.5, 0.75, 1.0])
+        ax.set_yticklabels(["0.25", "0.50", "0.75", "1.00"], fontsize=6, color="#94a3b8")
+        zeros = np.zeros(len(self.angles))
+        (self.line,) = ax.plot(self.angles, zeros, "o-", linewidth=1.8, markersize=4)
+        (self.area,) = ax.fill(self.angles, zeros, alpha=0.12)
+        self.title = ax.set_title(" ", fontsize=10, fontweight="bold", pad=18, color="#1e293b")
+        fig.tight_layout()
+
+    def draw(self, values: np.ndarray, color: str, title: str, output_path):
+        closed = np.append(np.nan_to_num(values), np.nan_to_num(values[:1]))
+        self.line.set_data(self.angles, closed)
+        self.line.set_color(color)
+        self.area.set_xy(np.column_stack([self.angles, closed]))
+        self.area.set_facecolor(color)
+        self.title.set_text(title)
+        count("cells_rendered", len(values))
+        self.save(output_path)
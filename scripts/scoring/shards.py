@@ -0,0 +1,278 @@
+"""
+Merge a directory of scoring-matrix shards, one per rater or machine.
+
+Every ``*.csv`` in the directory must follow the ``scoring_matrix.csv``
+schema. Shards are read on a process pool through ``load_scores`` (so each
+keeps its own binary cache) and come back as categorical columns. The
+merged table is built column by column: the union of every shard's
+categories is computed once, each shard's codes are remapped through a
+lookup array and written into one preallocated code array, so no
+intermediate concatenated frame is materialised.
+
+Rows are then deduplicated by (model_family, model_version, step_number),
+in shard order (sorted file names) and row order within a shard. For
+each score dimension, blank cells never conflict: a code scored in only
+one shard fills the cell. Two different codes for the same key are a
+conflict, resolved by ``policy``:
+
+- ``error``     keep the first code but report the merge as failed
+- ``first``     the code from the earliest shard
+- ``last``      the code from the latest shard
+- ``lowest``    the lowest-scoring code (conservative)
+- ``highest``   the highest-scoring code
+- ``majority``  the most frequent code; ties go to the lowest score
+
+step_name and notes are taken from the first row of each key that has
+them.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cube import load_scores
+from .engine import DIMENSIONS, SCORE_MAP
+from .instrument import count, timed
+
+POLICIES = ("error", "first", "last", "lowest", "highest", "majority")
+CONFLICT_COLUMNS = ["model_family", "model_version", "step_number", "dimension", "shard",
+                    "code", "resolved"]
+
+
+@dataclass
+class MergedScores:
+    """Deduplicated table plus every conflicting (key, dimension)."""
+
+    table: pd.DataFrame     # categorical, one row per key, in order of first appearance
+    shards: list            # shard paths, in merge order
+    rows_read: int
+    conflicts: pd.DataFrame  # CONFLICT_COLUMNS, one row per shard code of a conflicting cell
+    n_conflicts: int        # conflicting (key, dimension) cells
+    policy: str
+
+    @property
+    def ok(self) -> bool:
+        return self.policy != "error" or not self.n_conflicts
+
+
+def shard_paths(directory) -> list:
+    """The ``*.csv`` shards of ``directory``, sorted by name."""
+    return sorted(Path(directory).glob("*.csv"))
+
+
+def _read_shard(path: Path) -> dict:
+    """Load one shard as {column: (codes, categories)}, step_number as an array."""
+    df = load_scores(path)
+    columns = {}
+    for name in df.columns:
+        col = df[name]
+        if name == "step_number":
+            columns[name] = col.to_numpy()
+        elif isinstance(col.dtype, pd.CategoricalDtype):
+            columns[name] = (col.cat.codes.to_numpy(),
+                             np.asarray(col.cat.categories, dtype=object))
+        else:
+            # e.g. a notes column left entirely empty is parsed as float NaN
+            codes, uniques = pd.factorize(col.astype(object))
+            columns[name] = (codes.astype(np.int32), np.asarray(uniques, dtype=object))
+    return columns
+
+
+def _codes(part) -> np.ndarray:
+    return part[0] if isinstance(part, tuple) else part
+
+
+def _concat_column(parts: list, n_rows: int):
+    """Concatenate one column of every shard into a single array or Categorical."""
+    if not isinstance(parts[0], tuple):
+        return np.concatenate(parts)
+    categories = pd.Index(np.concatenate([cats for _, cats in parts])).unique()
+    codes = np.empty(n_rows, dtype=np.int32)
+    offset = 0
+    for shard_codes, shard_cats in parts:
+        # Trailing -1 keeps missing cells missing
+        lookup = np.append(categories.get_indexer(shard_cats), -1).astype(np.int32)
+        codes[offset:offset + len(shard_codes)] = lookup[shard_codes]
+        offset += len(shard_codes)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+@timed("concat shards")
+def concat_shards(shards: list) -> pd.DataFrame:
+    """One categorical-typed table from the column dicts of ``_read_shard``."""
+    names = list(shards[0])
+    for k, shard in enumerate(shards[1:], 1):
+        if list(shard) != names:
+            raise ValueError(f"shard {k} has columns {list(shard)}, expected {names}")
+    n_rows = sum(len(_codes(shard[names[0]])) for shard in shards)
+    data = {name: _concat_column([shard[name] for shard in shards], n_rows)
+            for name in names}
+    return pd.DataFrame(data, index=pd.RangeIndex(n_rows))
+
+
+def group_keys(df: pd.DataFrame):
+    """Key id of every row, numbered in order of first appearance."""
+    family = df["model_family"].cat.codes.to_numpy().astype(np.int64)
+    version = df["model_version"].cat.codes.to_numpy().astype(np.int64)
+    _, step = np.unique(df["step_number"].to_numpy(), return_inverse=True)
+    n_versions = len(df["model_version"].cat.categories) + 1
+    n_steps = int(step.max()) + 1 if len(step) else 1
+    raw = ((family + 1) * n_versions + (version + 1)) * n_steps + step.ravel()
+    _, first, inverse = np.unique(raw, return_index=True, return_inverse=True)
+    # Renumber so keys follow the first row that carries them
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(len(first))
+    return rank[inverse.ravel()], len(first)
+
+
+def _resolve(key: np.ndarray, n_keys: int, codes: np.ndarray, scores: np.ndarray,
+             policy: str):
+    """Row chosen for every key (-1 if none scored) and the keys in conflict."""
+    scored = np.flatnonzero(codes >= 0)
+    k, c = key[scored], codes[scored]
+    position = scored.astype(np.float64)
+    if policy in ("error", "first"):
+        rank = (position,)
+    elif policy == "last":
+        rank = (-position,)
+    elif policy == "lowest":
+        rank = (position, scores[scored])
+    elif policy == "highest":
+        rank = (position, -scores[scored])
+    else:  # majority, ties to the lowest score, then the earliest row
+        n_codes = int(codes.max()) + 1
+        votes = np.bincount(k * n_codes + c, minlength=n_keys * n_codes)[k * n_codes + c]
+        rank = (position, scores[scored], -votes)
+    order = np.lexsort(rank + (k,))
+    sorted_keys, sorted_codes = k[order], c[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    chosen = np.full(n_keys, -1, dtype=np.int64)
+    if not len(starts):
+        return chosen, np.empty(0, dtype=np.int64)
+    chosen_keys = sorted_keys[starts]
+    chosen[chosen_keys] = scored[order[starts]]
+
+    # A key conflicts when it holds more than one distinct code
+    low = np.minimum.reduceat(sorted_codes, starts)
+    high = np.maximum.reduceat(sorted_codes, starts)
+    return chosen, chosen_keys[low != high]
+
+
+def _first_nonblank(key: np.ndarray, n_keys: int, column: pd.Categorical) -> np.ndarray:
+    """Row of the first non-blank value of ``column`` per key (first row if all blank)."""
+    blank = np.asarray(column.categories, dtype=object) == ""
+    codes = column.codes.astype(np.int64)
+    usable = (codes >= 0) & ~np.append(blank, True)[codes]
+    first = np.empty(n_keys, dtype=np.int64)
+    keys, rows = np.unique(key, return_index=True)
+    first[keys] = rows
+    pick = np.full(n_keys, -1, dtype=np.int64)
+    usable_rows = np.flatnonzero(usable)
+    keys, rows = np.unique(key[usable_rows], return_index=True)
+    pick[keys] = usable_rows[rows]
+    return np.where(pick >= 0, pick, first)
+
+
+@timed("deduplicate")
+def deduplicate(df: pd.DataFrame, shard_of: np.ndarray, shard_names: list,
+                policy: str = "error"):
+    """Collapse rows sharing a key; returns (table, conflicts, number of conflicts)."""
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}; expected one of {POLICIES}")
+    key, n_keys = group_keys(df)
+    base = _first_nonblank(key, n_keys, df["step_name"].array)
+    out = {}
+    for name in df.columns:
+        col = df[name]
+        if name in DIMENSIONS or name == "notes":
+            continue
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            out[name] = pd.Categorical.from_codes(col.cat.codes.to_numpy()[base],
+                                                  categories=col.cat.categories)
+        else:
+            out[name] = col.to_numpy()[base]
+
+    conflicts, n_conflicts = [], 0
+    for dim in DIMENSIONS:
+        col = df[dim].array
+        categories = np.asarray(col.categories, dtype=object)
+        # Blank cells carry no vote: treat the "" category like a missing value
+        lookup = np.where(categories == "", -1, np.arange(len(categories)))
+        codes = np.append(lookup, -1)[col.codes.astype(np.int64)]
+        value_of = np.array([SCORE_MAP[dim].get(str(c).upper(), np.nan) for c in categories])
+        scores = np.append(value_of, np.nan)[codes]
+        chosen, conflicting = _resolve(key, n_keys, codes, np.nan_to_num(scores, nan=-1.0),
+                                       policy)
+        blank = np.flatnonzero(categories == "")
+        blank_code = blank[0] if len(blank) else -1
+        out_codes = np.where(chosen >= 0, col.codes[np.maximum(chosen, 0)], blank_code)
+        out[dim] = pd.Categorical.from_codes(out_codes.astype(np.int32),
+                                             categories=col.categories)
+        if len(conflicting):
+            conflicts.append(_describe(dim, conflicting, key, codes, col, chosen,
+                                       shard_of, shard_names, df))
+            n_conflicts += len(conflicting)
+    if "notes" in df.columns:
+        notes = df["notes"].array
+        pick = _first_nonblank(key, n_keys, notes)
+        out["notes"] = pd.Categorical.from_codes(notes.codes[pick], categories=notes.categories)
+
+    table = pd.DataFrame({name: out[name] for name in df.columns}, index=pd.RangeIndex(n_keys))
+    count("conflicts", n_conflicts)
+    if conflicts:
+        conflicts = pd.concat(conflicts, ignore_index=True)
+    else:
+        conflicts = pd.DataFrame(columns=CONFLICT_COLUMNS)
+    return table, conflicts, n_conflicts
+
+
+def _describe(dim, conflicting, key, codes, column, chosen, shard_of, shard_names,
+              df) -> pd.DataFrame:
+    """One row per shard code of every conflicting key, grouped by key."""
+    in_conflict = np.zeros(len(chosen), dtype=bool)
+    in_conflict[conflicting] = True
+    rows = np.flatnonzero(in_conflict[key] & (codes >= 0))
+    rows = rows[np.argsort(key[rows], kind="stable")]
+    return pd.DataFrame({
+        "model_family": df["model_family"].array.take(rows),
+        "model_version": df["model_version"].array.take(rows),
+        "step_number": df["step_number"].to_numpy()[rows],
+        "dimension": dim,
+        "shard": pd.Categorical.from_codes(shard_of[rows], categories=shard_names),
+        "code": column.take(rows),
+        "resolved": column.take(chosen[key[rows]]),
+    })
+
+
+@timed("read shards")
+def read_shards(directory, jobs: int = None):
+    """Concatenated table of every shard, the shard of each row and the shard paths."""
+    paths = shard_paths(directory)
+    if not paths:
+        raise FileNotFoundError(f"no *.csv shards in {directory}")
+    count("shards", len(paths))
+    jobs = jobs or min(len(paths), os.cpu_count() or 1)
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            shards = list(pool.map(_read_shard, paths))
+    else:
+        shards = [_read_shard(path) for path in paths]
+
+    df = concat_shards(shards)
+    shard_of = np.repeat(np.arange(len(shards)),
+                         [len(_codes(next(iter(shard.values())))) for shard in shards])
+    return df, shard_of, paths
+
+
+@timed("load shards")
+def load_shards(directory, policy: str = "error", jobs: int = None) -> MergedScores:
+    """Load, concatenate and deduplicate every shard in ``directory``."""
+    df, shard_of, paths = read_shards(directory, jobs)
+    table, conflicts, n_conflicts = deduplicate(df, shard_of, [path.name for path in paths],
+                                                policy)
+    return MergedScores(table=table, shards=paths, rows_read=len(df), conflicts=conflicts,
+                        n_conflicts=n_conflicts, policy=policy)
@@ -0,0 +1,132 @@
+"""
+Bounded-memory streaming aggregation of the scoring matrix.
+
+``stream_scores`` reads the CSV in chunks, encodes each chunk with
+``encode_scores`` and folds it into a ``ScoreAccumulator``. The accumulator
+only holds per-model, per-step and per-code partials, so memory is bounded
+by the number of distinct models, steps and codes rather than by rows, and
+accumulators built from different chunks or files can be merged.
+
+Step composites are accumulated as integer half-points, which makes the
+partial sums exact and independent of chunking and merge order.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .engine import DIMENSIONS, encode_scores, failure_counts, row_composites
+from .instrument import stage
+
+KEY_COLUMNS = ["model_family", "model_version", "step_number", "step_name"]
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class ScoreAccumulator:
+    """Mergeable partial aggregates behind the three summary reports."""
+
+    def __init__(self):
+        self.any_scored = False
+        # (family, version) -> every row so far fully scored and correct
+        self.model_ok = {}
+        self.step_names = {}
+        # step -> [half-point total, usable rows]
+        self.step_points = {}
+        # step -> dimension -> Counter of failure codes, in first-seen order
+        self.failures = {}
+
+    def update(self, df: pd.DataFrame):
+        """Fold one chunk of the scoring matrix into the partials."""
+        if len(df) == 0:
+            return
+        enc = encode_scores(df)
+        self.any_scored |= bool(enc.scored.any())
+
+        row_ok = enc.scored.all(axis=1) & enc.correct.all(axis=1)
+        failing = np.bincount(enc.model_index, weights=~row_ok, minlength=len(enc.models))
+        for model, n_failing in zip(enc.models, failing):
+            self.model_ok[model] = self.model_ok.get(model, True) and n_failing == 0
+
+        composite = row_composites(enc)
+        usable = ~np.isnan(composite)
+        half_points = np.rint(composite[usable] * 2 * len(DIMENSIONS)).astype(np.int64)
+        points = np.bincount(enc.step_index[usable], weights=half_points,
+                             minlength=len(enc.steps))
+        counts = np.bincount(enc.step_index[usable], minlength=len(enc.steps))
+        for s, step_num in enumerate(enc.steps.tolist()):
+            self.step_names.setdefault(step_num, enc.step_names[s])
+            totals = self.step_points.setdefault(step_num, [0, 0])
+            totals[0] += int(points[s])
+            totals[1] += int(counts[s])
+
+        for j, dim in enumerate(DIMENSIONS):
+            code_counts, first_seen = failure_counts(enc, j)
+            for s, step_num in enumerate(enc.steps.tolist()):
+                present = np.flatnonzero(code_counts[s])
+                if not len(present):
+                    continue
+                ordered = present[np.argsort(first_seen[s, present], kind="stable")]
+                counter = self.failures.setdefault(step_num, {}).setdefault(dim, Counter())
+                for c in ordered:
+                    counter[enc.alphabets[j][c]] += int(code_counts[s, c])
+
+    def merge(self, other: "ScoreAccumulator") -> "ScoreAccumulator":
+        """Fold ``other`` (covering later rows) into this accumulator."""
+        self.any_scored |= other.any_scored
+        for model, ok in other.model_ok.items():
+            self.model_ok[model] = self.model_ok.get(model, True) and ok
+        for step_num, name in other.step_names.items():
+            self.step_names.setdefault(step_num, name)
+        for step_num, (points, count) in other.step_points.items():
+            totals = self.step_points.setdefault(step_num, [0, 0])
+            totals[0] += points
+            totals[1] += count
+        for step_num, dims in other.failures.items():
+            for dim, counter in dims.items():
+                self.failures.setdefault(step_num, {}).setdefault(dim, Counter()).update(counter)
+        return self
+
+    def first_fully_correct(self) -> dict:
+        results = {}
+        for (family, version), ok in self.model_ok.items():
+            results.setdefault(family, None)
+            if results[family] is None and ok:
+                results[family] = version
+        return results
+
+    def hardest_step(self) -> list:
+        step_scores = []
+        for step_num in sorted(self.step_names):
+            points, count = self.step_points[step_num]
+            avg = points / (2 * len(DIMENSIONS) * count) if count else float("nan")
+            step_scores.append((step_num, self.step_names[step_num], avg))
+        return sorted(step_scores, key=lambda x: x[2])
+
+    def common_failures_per_step(self) -> dict:
+        results = {}
+        for step_num in sorted(self.step_names):
+            step_failures = {}
+            for dim in DIMENSIONS:
+                counter = self.failures.get(step_num, {}).get(dim)
+                if counter:
+                    code, n = counter.most_common(1)[0]
+                    step_failures[dim] = f"{code} ({n}×)"
+            results[step_num] = step_failures
+        return results
+
+
+def stream_scores(csv_path, chunksize: int = DEFAULT_CHUNKSIZE) -> ScoreAccumulator:
+    """Aggregate ``csv_path`` in a single chunked pass."""
+    acc = ScoreAccumulator()
+    dtypes = {dim: str for dim in DIMENSIONS}
+    with pd.read_csv(csv_path, usecols=KEY_COLUMNS + DIMENSIONS, dtype=dtypes,
+                     chunksize=chunksize) as reader:
+        while True:
+            with stage("read chunk"):
+                chunk = next(reader, None)
+            if chunk is None:
+                break
+            with stage("aggregate chunk"):
+                acc.update(chunk)
+    return acc
@@ -0,0 +1,138 @@
+"""
+Local HTTP stand-in for the model APIs, for running ``scoring.runner``
+offline.
+
+One asyncio server answers the three request shapes the runner's
+backends send: OpenAI chat completions (``POST .../chat/completions``),
+Anthropic messages (``POST .../v1/messages``) and Gemini
+(``POST .../models/<model>:generateContent``). The answer to the N-th
+user turn of a conversation is a canned step-N response with a bash block
+taken from the reference pipeline, so the transcripts it produces can be
+fed to the draft scorers (prescore, dataflow, dry-run) as well.
+
+``latency`` adds a random delay (uniform in 0..2x) to every answer and
+``error_rate`` makes that share of requests fail with 429 (with
+``Retry-After: 0``) or 503, to exercise rate limiting and retries. The
+server counts requests and the peak number handled at once.
+"""
+
+import asyncio
+import json
+import random
+import re
+
+CANNED = {
+    1: "dorado basecaller hac pod5/ --emit-fastq > basecalled.fastq\n"
+       "porechop -i basecalled.fastq -o trimmed.fastq --threads 8\n"
+       "chopper -q 10 -l 500 < trimmed.fastq > filtered.fastq",
+    2: "NanoPlot --fastq filtered.fastq -o nanoplot/ --threads 8",
+    3: "minimap2 -ax map-ont GRCh38.fa filtered.fastq | samtools fastq -f 4 - > host_depleted.fastq",
+    4: "kraken2 --db k2_standard --threads 8 --report kraken_report.txt \\\n"
+       "  --output kraken_output.txt host_depleted.fastq",
+    5: "flye --nano-hq host_depleted.fastq --meta --out-dir assembly/ --threads 8",
+    6: "metawrap binning -o binning/ -t 8 -a assembly/assembly.fasta --metabat2 host_depleted.fastq\n"
+       "checkm lineage_wf -x fa binning/metabat2_bins/ checkm/",
+    7: "amrfinder -n assembly/assembly.fasta -o amr_contigs.tsv --threads 8",
+}
+GEMINI_PATH = re.compile(r"/models/([^/:]+):generateContent$")
+
+
+class StubServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, seed: int = None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.active = 0
+        self.peak = 0
+        self._server = None
+
+    def url(self, kind: str) -> str:
+        """Base URL a backend of ``kind`` should be given."""
+        root = f"http://{self.host}:{self.port}"
+        return {"openai": f"{root}/v1", "gemini": f"{root}/v1beta"}.get(kind, root)
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            status, body, headers = await self._respond(reader)
+            head = [f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}",
+                    "Content-Type: application/json", f"Content-Length: {len(body)}",
+                    "Connection: close", *(f"{key}: {value}" for key, value in headers.items())]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.active -= 1
+            writer.close()
+
+    async def _respond(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            if key.strip().lower() == "content-length":
+                length = int(value)
+        body = await reader.readexactly(length) if length else b""
+        self.requests += 1
+        if len(request_line) < 2 or request_line[0] != "POST":
+            return 405, b'{"error": "POST only"}', {}
+        if self.latency:
+            await asyncio.sleep(self.random.uniform(0, 2 * self.latency))
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            if self.random.random() < 0.5:
+                return 429, b'{"error": "rate limited"}', {"Retry-After": "0"}
+            return 503, b'{"error": "overloaded"}', {}
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, b'{"error": "invalid JSON"}', {}
+        path = request_line[1].split("?", 1)[0]
+        gemini = GEMINI_PATH.search(path)
+        if path.endswith("/chat/completions"):
+            text = self._answer(payload.get("model", ""), payload.get("messages", []))
+            reply = {"object": "chat.completion", "model": payload.get("model", ""),
+                     "choices": [{"index": 0, "finish_reason": "stop",
+                                  "message": {"role": "assistant", "content": text}}]}
+        elif path.endswith("/v1/messages"):
+            text = self._answer(payload.get("model", ""), payload.get("messages", []))
+            reply = {"type": "message", "role": "assistant", "model": payload.get("model", ""),
+                     "stop_reason": "end_turn", "content": [{"type": "text", "text": text}]}
+        elif gemini:
+            turns = [{"role": turn.get("role")} for turn in payload.get("contents", [])]
+            text = self._answer(gemini.group(1), turns)
+            reply = {"candidates": [{"finishReason": "STOP",
+                                     "content": {"role": "model", "parts": [{"text": text}]}}]}
+        else:
+            return 404, json.dumps({"error": f"no route for {path}"}).encode(), {}
+        return 200, json.dumps(reply).encode(), {}
+
+    @staticmethod
+    def _answer(model: str, messages: list) -> str:
+        step = sum(1 for message in messages if message.get("role") == "user")
+        commands = CANNED.get(step, "echo 'no further steps'")
+        return (f"## Step {step}\n\nStub answer from {model or 'model'}: the commands for "
+                f"this step, building on the previous ones.\n\n```bash\n{commands}\n```\n")
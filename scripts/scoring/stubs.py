@@ -0,0 +1,591 @@
+"""
+Stub executables for the executability dry-run.
+
+Each stub stands in for one tool: it checks its command line against a
+spec of that tool's interface (subcommands, flags with their arity,
+allowed values, required flags, positional count), checks that its
+inputs exist and have the expected format, and writes small but
+correctly formatted outputs (FASTQ, FASTA, BAM, SAM, PAF, report
+directories) so later steps run against real files. Outputs are written
+even when a check fails, so one broken step does not cascade.
+
+A failed check is printed to stderr as ``dryrun <kind>: <message>`` and
+the stub exits with status 2; ``scoring.dryrun`` turns the kinds into
+executability codes. Commands without a spec run the generic stub, which
+accepts any arguments and only creates the files named by output flags.
+
+This module is executed directly by the generated stubs (``main(name,
+argv)``), next to ``scoring.interfaces``, and must only use the standard
+library. A stub starts once per
+command, so ``difflib`` and ``shutil`` are imported only where needed.
+"""
+
+import gzip
+import os
+import sys
+
+try:
+    from .interfaces import interface
+except ImportError:                          # run by a stub executable, outside the package
+    from interfaces import interface
+
+FASTQ, FASTA, BAM, SAM, PAF, RAW = "FASTQ", "FASTA", "BAM", "SAM", "PAF", "RAW"
+TEXT, DIR = "TEXT", "DIR"
+READS = (FASTQ, FASTA)
+
+PLACEHOLDERS = {
+    FASTQ: b"@read_1\nACGTACGTAC\n+\nIIIIIIIIII\n",
+    FASTA: b">contig_1\nACGTACGTACGTACGTACGT\n",
+    SAM: b"@HD\tVN:1.6\tSO:unsorted\n@SQ\tSN:contig_1\tLN:20\n"
+         b"read_1\t0\tcontig_1\t1\t60\t10M\t*\t0\t0\tACGTACGTAC\tIIIIIIIIII\n",
+    PAF: b"read_1\t10\t0\t10\t+\tcontig_1\t20\t0\t10\t10\t10\t60\n",
+    RAW: b"\x8bPOD\r\n\x1a\n",
+    TEXT: b"placeholder\n",
+}
+BAM_MAGIC = b"BAM\x01"
+
+
+class Spec:
+    """Command-line interface of one (sub)command: its flags (``scoring.interfaces``) and
+    what it reads and writes."""
+
+    def __init__(self, interface, positionals=(0, 0), choices=None, required=(), inputs=None,
+                 outputs=None, stdout=None, stdin=None, gzip_ok=True, files=None):
+        self.flags = interface.flags         # flag -> arity (0, 1 or "+")
+        self.canonical = interface.canonical  # flag -> first spelling, for required groups
+        self.clusters = interface.clusters   # getopt-style -ab clusters of short flags
+        self.positionals = positionals       # (min, max); max None = unbounded
+        self.choices = choices or {}         # flag -> allowed values
+        self.required = required             # groups of flags, one of each must be given
+        self.inputs = inputs or {}           # flag or positional index or "*" -> formats
+        self.outputs = outputs or {}         # flag or positional index -> format or DIR
+        self.stdout = stdout                 # format written to stdout (callable for options)
+        self.stdin = stdin                   # formats read from stdin without an input file
+        self.gzip_ok = gzip_ok
+        self.files = files or {}             # output flag -> files created inside that dir
+
+
+def _binners(options):
+    return {"metabat2_bins/bin.1.fa": FASTA} if "--metabat2" in options else {}
+
+
+SPECS = {
+    "dorado": {
+        "basecaller": Spec(
+            interface("dorado", "basecaller"),
+            positionals=(2, 2), inputs={1: (RAW, DIR)}, outputs={"-o": DIR},
+            stdout=lambda o: FASTQ if "--emit-fastq" in o else SAM if "--emit-sam" in o else BAM,
+            files={"-o": {"calls.bam": BAM}}),
+        "demux": Spec(
+            interface("dorado", "demux"),
+            positionals=(1, 1), inputs={0: (BAM, SAM, FASTQ, DIR)}, outputs={"-o": DIR},
+            required=(("-o", "--output-dir"),), files={"-o": {"barcode01.bam": BAM}}),
+        "trim": Spec(
+            interface("dorado", "trim"),
+            positionals=(1, 1), inputs={0: (BAM, SAM, FASTQ)},
+            stdout=lambda o: FASTQ if "--emit-fastq" in o else BAM),
+        "aligner": Spec(
+            interface("dorado", "aligner"),
+            positionals=(2, 2), inputs={0: (FASTA,), 1: (BAM, SAM, FASTQ, FASTA)},
+            outputs={"-o": DIR}, stdout=BAM),
+        "download": Spec(interface("dorado", "download"), outputs={"--directory": DIR}),
+        "summary": Spec(interface("dorado", "summary"),
+                        positionals=(1, 1), inputs={0: (BAM, SAM, DIR)}, stdout=TEXT),
+    },
+    "guppy_basecaller": Spec(
+        interface("guppy_basecaller"),
+        required=(("-i",), ("-s",)), inputs={"-i": (DIR,)}, outputs={"-s": DIR},
+        files={"-s": {"pass/fastq_runid_0.fastq": FASTQ, "sequencing_summary.txt": TEXT}}),
+    "porechop": Spec(
+        interface("porechop"),
+        required=(("-i",),), inputs={"-i": READS}, outputs={"-o": FASTQ, "-b": DIR},
+        stdout=lambda o: None if "-o" in o else FASTQ),
+    "NanoFilt": Spec(
+        interface("NanoFilt"),
+        positionals=(0, 1), inputs={0: (FASTQ,)}, stdin=(FASTQ,), stdout=FASTQ, gzip_ok=False),
+    "chopper": Spec(
+        interface("chopper"),
+        inputs={"-i": (FASTQ,)}, stdin=(FASTQ,), stdout=FASTQ),
+    "NanoPlot": Spec(
+        interface("NanoPlot"),
+        required=(("--fastq", "--fasta", "--fastq_rich", "--fastq_minimal", "--summary",
+                   "--bam", "--ubam", "--cram", "--pickle", "--feather"),),
+        inputs={"--fastq": (FASTQ,), "--fastq_rich": (FASTQ,), "--fastq_minimal": (FASTQ,),
+                "--fasta": (FASTA,), "--bam": (BAM,), "--ubam": (BAM,), "--summary": (TEXT,)},
+        outputs={"-o": DIR},
+        files={"-o": {"NanoPlot-report.html": TEXT, "NanoStats.txt": TEXT}}),
+    "NanoStat": Spec(
+        interface("NanoStat"),
+        required=(("--fastq", "--fasta", "--summary", "--bam"),),
+        inputs={"--fastq": (FASTQ,), "--fasta": (FASTA,), "--bam": (BAM,),
+                "--summary": (TEXT,)},
+        outputs={"-o": DIR}, stdout=lambda o: None if "-n" in o else TEXT),
+    "minimap2": Spec(
+        interface("minimap2"),
+        positionals=(1, None),
+        choices={"-x": ("map-ont", "map-pb", "map-hifi", "map-iclr", "lr:hq", "asm5", "asm10",
+                        "asm20", "ava-ont", "ava-pb", "splice", "splice:hq", "sr", "map10k",
+                        "splice:sr")},
+        inputs={"*": (FASTA, FASTQ, "MMI")}, outputs={"-o": lambda o: SAM if "-a" in o else PAF,
+                                                      "-d": "MMI"},
+        stdout=lambda o: None if "-o" in o or "-d" in o else SAM if "-a" in o else PAF),
+    "samtools": {
+        "view": Spec(
+            interface("samtools", "view"),
+            positionals=(1, None), inputs={0: (BAM, SAM, "CRAM")},
+            outputs={"-o": lambda o: BAM if "-b" in o else SAM},
+            stdout=lambda o: None if "-o" in o else BAM if "-b" in o else SAM),
+        "sort": Spec(interface("samtools", "sort"),
+                     positionals=(0, 1), inputs={0: (BAM, SAM)},
+                     stdin=(BAM, SAM), outputs={"-o": BAM},
+                     stdout=lambda o: None if "-o" in o else BAM),
+        "index": Spec(interface("samtools", "index"), positionals=(1, 2),
+                      inputs={0: (BAM,)}),
+        "fastq": Spec(interface("samtools", "fastq"),
+                      positionals=(0, 1), inputs={0: (BAM, SAM)},
+                      stdin=(BAM, SAM), outputs={"-o": FASTQ, "-0": FASTQ, "-1": FASTQ,
+                                                 "-2": FASTQ, "-s": FASTQ},
+                      stdout=lambda o: None if o.keys() & {"-o", "-0", "-1"} else FASTQ),
+        "fasta": Spec(interface("samtools", "fasta"),
+                      positionals=(0, 1), inputs={0: (BAM, SAM)},
+                      stdin=(BAM, SAM), outputs={"-o": FASTA, "-0": FASTA},
+                      stdout=lambda o: None if o.keys() & {"-o", "-0"} else FASTA),
+        "flagstat": Spec(interface("samtools", "flagstat"), positionals=(1, 1),
+                         inputs={0: (BAM, SAM)}, stdout=TEXT),
+        "idxstats": Spec(interface("samtools", "idxstats"), positionals=(1, 1),
+                         inputs={0: (BAM,)}, stdout=TEXT),
+        "depth": Spec(interface("samtools", "depth"), positionals=(0, None),
+                      inputs={"*": (BAM,)}, outputs={"-o": TEXT}, stdout=lambda o: None if "-o" in o else TEXT),
+        "coverage": Spec(interface("samtools", "coverage"), positionals=(0, None),
+                         inputs={"*": (BAM,)}, outputs={"-o": TEXT}, stdout=lambda o: None if "-o" in o else TEXT),
+        "merge": Spec(interface("samtools", "merge"), positionals=(1, None),
+                      inputs={"*": (BAM,)}, outputs={"-o": BAM}),
+        "faidx": Spec(interface("samtools", "faidx"),
+                      positionals=(1, None), inputs={0: (FASTA,)}, stdout=FASTA),
+    },
+    "kraken2": Spec(
+        interface("kraken2"),
+        positionals=(1, None), required=(("--db",),), inputs={"--db": (DIR,), "*": READS},
+        outputs={"--report": TEXT, "--output": TEXT, "--classified-out": FASTQ,
+                 "--unclassified-out": FASTQ},
+        stdout=lambda o: None if "--output" in o else TEXT, gzip_ok=False),
+    "flye": Spec(
+        interface("flye"),
+        required=(("--nano-raw", "--nano-corr", "--nano-hq", "--pacbio-raw", "--pacbio-corr",
+                   "--pacbio-hifi", "--subassemblies"), ("-o", "--out-dir")),
+        inputs={flag: READS for flag in ("--nano-raw", "--nano-corr", "--nano-hq",
+                                         "--pacbio-raw", "--pacbio-corr", "--pacbio-hifi")},
+        outputs={"-o": DIR},
+        files={"-o": {"assembly.fasta": FASTA, "assembly_info.txt": TEXT,
+                      "assembly_graph.gfa": TEXT}}),
+    "racon": Spec(
+        interface("racon"),
+        positionals=(3, 3), inputs={0: READS, 1: (PAF, SAM, "MHAP"), 2: (FASTA,)}, stdout=FASTA),
+    "medaka_consensus": Spec(
+        interface("medaka_consensus"),
+        required=(("-i",), ("-d",)), inputs={"-i": READS, "-d": (FASTA,)}, outputs={"-o": DIR},
+        files={"-o": {"consensus.fasta": FASTA}}),
+    "metabat2": Spec(
+        interface("metabat2"),
+        required=(("-i",), ("-o",)), inputs={"-i": (FASTA,), "-a": (TEXT,)},
+        outputs={"-o": "PREFIX"}),
+    "jgi_summarize_bam_contig_depths": Spec(
+        interface("jgi_summarize_bam_contig_depths"),
+        positionals=(1, None), inputs={"*": (BAM,)}, outputs={"--outputDepth": TEXT}),
+    "metawrap": {
+        "binning": Spec(
+            interface("metawrap", "binning"),
+            positionals=(1, None), required=(("-a",), ("-o",)),
+            inputs={"-a": (FASTA,), "*": (FASTQ,)}, outputs={"-o": DIR}, gzip_ok=False,
+            files={"-o": lambda o: {f"{name}_bins/bin.1.fa": FASTA
+                                    for name in ("metabat2", "maxbin2", "concoct", "metabat1")
+                                    if f"--{name}" in o}}),
+        "bin_refinement": Spec(
+            interface("metawrap", "bin_refinement"),
+            required=(("-o",), ("-A",)), inputs={"-A": (DIR,), "-B": (DIR,), "-C": (DIR,)},
+            outputs={"-o": DIR},
+            files={"-o": lambda o: {f"metawrap_{o.get('-c', '70')}_{o.get('-x', '10')}_bins/"
+                                    "bin.1.fa": FASTA}}),
+    },
+    "checkm": {
+        "lineage_wf": Spec(
+            interface("checkm", "lineage_wf"),
+            positionals=(2, 2), inputs={0: (DIR,)}, outputs={1: DIR, "-f": TEXT},
+            files={1: {"lineage.ms": TEXT}}),
+        "qa": Spec(interface("checkm", "qa"),
+                   positionals=(2, 2), inputs={0: (TEXT,), 1: (DIR,)}, stdout=TEXT),
+    },
+    "checkm2": {
+        "predict": Spec(
+            interface("checkm2", "predict"),
+            required=(("-i",), ("-o",)), inputs={"-i": (DIR, FASTA)}, outputs={"-o": DIR},
+            files={"-o": {"quality_report.tsv": TEXT}}),
+    },
+    "seqkit": {
+        "fq2fa": Spec(interface("seqkit", "fq2fa"),
+                      positionals=(0, None), inputs={"*": (FASTQ,)}, stdin=(FASTQ,),
+                      outputs={"-o": FASTA}, stdout=lambda o: None if "-o" in o else FASTA),
+    },
+    "amrfinder": Spec(
+        interface("amrfinder"),
+        required=(("-n", "-p", "-u", "-l"),), inputs={"-n": (FASTA,), "-p": (FASTA,)},
+        outputs={"-o": TEXT}, stdout=lambda o: None if "-o" in o else TEXT),
+    "abricate": Spec(
+        interface("abricate"),
+        positionals=(0, None),
+        choices={"--db": ("argannot", "card", "ecoh", "ecoli_vf", "megares", "ncbi",
+                          "plasmidfinder", "resfinder", "vfdb")},
+        inputs={"*": (FASTA, "GENBANK")}, stdout=TEXT),
+    "fastqc": Spec(
+        interface("fastqc"),
+        positionals=(1, None), inputs={"*": (FASTQ, BAM, SAM)}, outputs={"-o": "EXISTING_DIR"}),
+}
+
+# Stand-ins for the shell utilities a pipeline uses
+UTILITIES = ("mkdir", "cp", "mv", "rm", "cat", "echo", "ls", "head", "tail", "wc", "touch",
+             "ln", "gzip", "gunzip", "zcat", "pigz", "bgzip", "tar", "wget", "curl")
+
+
+def error(kind: str, message: str, errors: list):
+    errors.append(kind)
+    print(f"dryrun {kind}: {message}", file=sys.stderr)
+
+
+def sniff(data: bytes):
+    """(format, gzip) of file content."""
+    gz = data[:2] == b"\x1f\x8b"
+    if gz:
+        try:
+            data = gzip.decompress(data)
+        except (OSError, EOFError):
+            return "", True
+        if data.startswith(BAM_MAGIC):
+            return BAM, False
+    if data.startswith(b"@HD") or data.startswith(b"@SQ"):
+        return SAM, gz
+    if data.startswith(b"@"):
+        return FASTQ, gz
+    if data.startswith(b">"):
+        return FASTA, gz
+    if data.startswith(PLACEHOLDERS[RAW]) or data.startswith(b"\x89HDF"):
+        return RAW, gz
+    if b"\t" in data.split(b"\n", 1)[0] and data.count(b"\t") >= 11:
+        return PAF, gz
+    return TEXT, gz
+
+
+def placeholder(fmt: str, path: str = "") -> bytes:
+    if fmt == BAM:
+        return gzip.compress(BAM_MAGIC + PLACEHOLDERS[SAM])
+    data = PLACEHOLDERS.get(fmt, PLACEHOLDERS[TEXT])
+    return gzip.compress(data) if path.endswith(".gz") else data
+
+
+def suffix_format(path: str) -> str:
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    for suffixes, fmt in (((".fastq", ".fq"), FASTQ), ((".fasta", ".fa", ".fna", ".fas"), FASTA),
+                          ((".bam",), BAM), ((".sam",), SAM), ((".paf",), PAF),
+                          ((".pod5", ".fast5"), RAW)):
+        if name.endswith(suffixes):
+            return fmt
+    return TEXT
+
+
+def write(path: str, fmt: str, errors: list, create_parent: bool = False):
+    parent = os.path.dirname(path)
+    if parent and not os.path.isdir(parent):
+        if not create_parent:
+            error("missing-directory", f"cannot write {path}: no directory {parent}/", errors)
+        os.makedirs(parent, exist_ok=True)
+    if os.path.isdir(path):
+        return
+    with open(path, "wb") as fh:
+        fh.write(placeholder(fmt if fmt != TEXT else suffix_format(path), path))
+
+
+def make_dir(path: str, files: dict):
+    os.makedirs(path, exist_ok=True)
+    for name, fmt in files.items():
+        target = os.path.join(path, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as fh:
+            fh.write(placeholder(fmt, target))
+
+
+def check_input(path: str, formats: tuple, spec: Spec, errors: list):
+    if path == "-":
+        return
+    if not os.path.exists(path):
+        error("missing-input", f"{path}: no such file or directory", errors)
+        return
+    if os.path.isdir(path):
+        if DIR not in formats:
+            error("input-format", f"{path} is a directory", errors)
+        return
+    if formats == (DIR,):
+        error("input-format", f"{path} is not a directory", errors)
+        return
+    with open(path, "rb") as fh:
+        fmt, gz = sniff(fh.read(4096))
+    check_format(path, fmt, gz, formats, spec, errors)
+
+
+def check_format(what: str, fmt: str, gz: bool, formats: tuple, spec: Spec, errors: list):
+    if gz and not spec.gzip_ok:
+        error("input-format", f"{what} is gzip-compressed", errors)
+    known = [f for f in formats if f in (FASTQ, FASTA, BAM, SAM, PAF, RAW)]
+    if known and fmt in (FASTQ, FASTA, BAM, SAM, PAF, RAW) and fmt not in known:
+        error("input-format", f"{what} is {fmt}, expected {'/'.join(known)}", errors)
+
+
+def parse(spec: Spec, argv: list, errors: list):
+    """({flag: [values]}, positionals) of ``argv``, reporting interface errors."""
+    options, positionals, i = {}, [], 0
+
+    def take(flag, arity, inline=None):
+        nonlocal i
+        canonical = spec.canonical.get(flag, flag)
+        values = options.setdefault(canonical, [])
+        if arity == 0:
+            if inline is not None:
+                error("arity", f"option {flag} takes no value", errors)
+            return
+        if inline is not None:
+            values.append(inline)
+            return
+        if i + 1 >= len(argv) or (argv[i + 1].startswith("-") and not _number(argv[i + 1])
+                                  and argv[i + 1] != "-"):
+            error("arity", f"option {flag} requires a value", errors)
+            return
+        i += 1
+        values.append(argv[i])
+        if arity == "+":
+            while i + 1 < len(argv) and not (argv[i + 1].startswith("-") and argv[i + 1] != "-"):
+                i += 1
+                values.append(argv[i])
+
+    while i < len(argv):
+        word = argv[i]
+        if word == "--":
+            positionals.extend(argv[i + 1:])
+            break
+        if word.startswith("-") and word != "-" and not _number(word):
+            flag, _, inline = word.partition("=")
+            inline = inline if "=" in word and word.startswith("--") else None
+            if "=" in word and not word.startswith("--"):
+                flag = word
+            if flag in spec.flags:
+                take(flag, spec.flags[flag], inline)
+            elif spec.clusters and not word.startswith("--") and \
+                    all(f"-{c}" in spec.flags for c in word[1:]):
+                for c in word[1:-1]:
+                    take(f"-{c}", 0 if spec.flags[f"-{c}"] == 0 else spec.flags[f"-{c}"])
+                take(f"-{word[-1]}", spec.flags[f"-{word[-1]}"])
+            else:
+                close = _close(flag, spec.flags)
+                if close:
+                    error("option-typo", f"unrecognized option {flag} (did you mean {close[0]}?)",
+                          errors)
+                else:
+                    error("unknown-option", f"unrecognized option {flag}", errors)
+                # skip the value it was probably given, so it is not miscounted as positional
+                arity = spec.flags[close[0]] if close else (0 if "=" in word else 1)
+                if arity and i + 1 < len(argv) and not argv[i + 1].startswith("-") and \
+                        (close or not os.path.exists(argv[i + 1])):
+                    i += 1
+        else:
+            positionals.append(word)
+        i += 1
+    return options, positionals
+
+
+def _close(word: str, names) -> list:
+    import difflib
+    return difflib.get_close_matches(word, names, n=1, cutoff=0.8)
+
+
+def _number(word: str) -> bool:
+    try:
+        float(word)
+    except ValueError:
+        return False
+    return True
+
+
+def _resolve(value, options):
+    return value(options) if callable(value) else value
+
+
+def run_spec(spec: Spec, argv: list) -> int:
+    errors = []
+    options, positionals = parse(spec, argv, errors)
+    low, high = spec.positionals
+    if len(positionals) < low or (high is not None and len(positionals) > high):
+        expected = f"{low}" if low == high else f"{low}-{high if high is not None else 'n'}"
+        error("arity", f"expected {expected} positional argument(s), got {len(positionals)}",
+              errors)
+    for flag, allowed in spec.choices.items():
+        for value in options.get(flag, []):
+            if value not in allowed:
+                error("invalid-value", f"{flag} {value}: expected one of {', '.join(allowed)}",
+                      errors)
+    for group in spec.required:
+        if not any(spec.canonical.get(flag, flag) in options for flag in group):
+            error("missing-option", f"one of {' / '.join(group)} is required", errors)
+
+    def flag_values(flag):
+        return options.get(spec.canonical.get(flag, flag), [])
+
+    reads_stdin = True
+    for key, formats in spec.inputs.items():
+        if isinstance(key, str) and key != "*":
+            values = flag_values(key)
+        elif key == "*":
+            output_positions = {k for k in spec.outputs if isinstance(k, int)}
+            values = [v for n, v in enumerate(positionals) if n not in output_positions]
+        else:
+            values = positionals[key:key + 1] if key < len(positionals) else []
+        for value in values:
+            reads_stdin = reads_stdin and value == "-"
+            check_input(value, formats, spec, errors)
+    if spec.stdin and reads_stdin and not positionals and not any(
+            flag_values(k) for k in spec.inputs if isinstance(k, str) and k != "*"):
+        data = sys.stdin.buffer.read()
+        if not data:
+            error("missing-input", "no input on stdin", errors)
+        else:
+            fmt, gz = sniff(data[:4096])
+            check_format("stdin", fmt, gz, spec.stdin, spec, errors)
+
+    for key, fmt in spec.outputs.items():
+        values = flag_values(key) if isinstance(key, str) else positionals[key:key + 1]
+        fmt = _resolve(fmt, options)
+        files = _resolve(spec.files.get(key, {}), options)
+        for value in values[:1]:
+            if fmt == DIR:
+                make_dir(value, files)
+            elif fmt == "EXISTING_DIR":
+                if not os.path.isdir(value):
+                    error("missing-directory", f"output directory {value} does not exist",
+                          errors)
+            elif fmt == "PREFIX":
+                write(f"{value}.1.fa", FASTA, errors, create_parent=True)
+            else:
+                write(value, fmt, errors)
+    stdout = _resolve(spec.stdout, options)
+    if stdout:
+        sys.stdout.buffer.write(placeholder(stdout))
+    return 2 if errors else 0
+
+
+def run_utility(name: str, argv: list) -> int:
+    """Minimal file effects of the common shell utilities."""
+    words = [word for word in argv if not word.startswith("-")]
+    if name == "mkdir":
+        for path in words:
+            os.makedirs(path, exist_ok=True)
+    elif name in ("cp", "mv", "ln") and len(words) >= 2:
+        target = words[-1]
+        for source in words[:-1]:
+            if not os.path.exists(source):
+                print(f"dryrun missing-input: {source}: no such file or directory",
+                      file=sys.stderr)
+                return 2
+            dest = os.path.join(target, os.path.basename(source)) if os.path.isdir(target) \
+                else target
+            if os.path.isfile(source):
+                with open(source, "rb") as src, open(dest, "wb") as dst:
+                    dst.write(src.read())
+            else:
+                os.makedirs(dest, exist_ok=True)
+    elif name == "rm":
+        for path in words:
+            if os.path.isdir(path) and not os.path.islink(path):
+                if "-r" in argv or "-rf" in argv or "-fr" in argv:
+                    import shutil
+                    shutil.rmtree(path, ignore_errors=True)
+            elif os.path.lexists(path):
+                os.remove(path)
+    elif name == "touch":
+        for path in words:
+            open(path, "ab").close()
+    elif name in ("cat", "zcat", "head", "tail"):
+        for path in words:
+            if not os.path.exists(path) and not _number(path):
+                print(f"dryrun missing-input: {path}: no such file or directory",
+                      file=sys.stderr)
+                return 2
+            if os.path.isfile(path):
+                with open(path, "rb") as fh:
+                    data = fh.read()
+                if name == "zcat" or (data[:2] == b"\x1f\x8b" and "-c" not in argv):
+                    data = gzip.decompress(data) if data[:2] == b"\x1f\x8b" else data
+                sys.stdout.buffer.write(data)
+        if not words:
+            sys.stdout.buffer.write(sys.stdin.buffer.read())
+    elif name == "echo":
+        print(" ".join(argv))
+    elif name in ("gzip", "pigz", "bgzip"):
+        if "-c" in argv or "--stdout" in argv or not words:
+            data = open(words[0], "rb").read() if words else sys.stdin.buffer.read()
+            sys.stdout.buffer.write(gzip.compress(data))
+        else:
+            for path in words:
+                with open(path, "rb") as fh:
+                    data = fh.read()
+                with open(path + ".gz", "wb") as fh:
+                    fh.write(gzip.compress(data))
+                if "-k" not in argv:
+                    os.remove(path)
+    elif name == "gunzip":
+        for path in words:
+            with open(path, "rb") as fh:
+                data = gzip.decompress(fh.read())
+            if "-c" in argv:
+                sys.stdout.buffer.write(data)
+            else:
+                with open(path[:-3], "wb") as fh:
+                    fh.write(data)
+    elif name in ("wget", "curl"):
+        for flag in ("-O", "-o", "--output"):
+            if flag in argv and argv.index(flag) + 1 < len(argv):
+                write(argv[argv.index(flag) + 1], TEXT, [])
+    return 0
+
+
+def run_generic(argv: list) -> int:
+    """Unknown tool: accept anything, create the files named by output flags."""
+    for i, word in enumerate(argv[:-1]):
+        if word in ("-o", "--output", "--out", "-O", "--outdir", "--out-dir", "--output-dir"):
+            target = argv[i + 1]
+            if os.path.splitext(target)[1] or word in ("-o", "--output", "--out", "-O"):
+                write(target, suffix_format(target), [], create_parent=True)
+            else:
+                os.makedirs(target, exist_ok=True)
+    return 0
+
+
+def main(name: str, argv: list) -> int:
+    spec = SPECS.get(name)
+    if isinstance(spec, dict):
+        if not argv or argv[0] not in spec:
+            if argv and argv[0] in ("-h", "--help", "-v", "--version"):
+                return 0
+            close = _close(argv[0], spec) if argv else []
+            kind = "option-typo" if close else "unknown-subcommand"
+            hint = f" (did you mean {close[0]}?)" if close else ""
+            print(f"dryrun {kind}: {name}: unknown subcommand "
+                  f"{argv[0] if argv else '(none)'}{hint}", file=sys.stderr)
+            return 2
+        spec, argv = spec[argv[0]], argv[1:]
+    if spec is not None:
+        return run_spec(spec, argv)
+    if name in UTILITIES:
+        return run_utility(name, argv)
+    return run_generic(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1], sys.argv[2:]))
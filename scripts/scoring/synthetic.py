@@ -0,0 +1,114 @@
+"""
+Seeded generator for synthetic scoring matrices.
+
+Produces tables in the ``scoring_matrix.csv`` schema for benchmarks and
+scale tests. Each model gets a latent skill and each step a difficulty;
+the code of every dimension is drawn from the real alphabet in
+``SCORE_MAP`` with a probability of the best code that falls with
+``difficulty - skill``. Rows are laid out model → replicate → step, like
+repeated conversations, and a configurable fraction of cells are left
+blank or whole (model, step) groups are dropped.
+
+Output is deterministic for a given seed and chunk size.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from .engine import DIMENSIONS, MODEL_ORDER, SCORE_MAP, STEP_NAMES
+
+NOTES = [
+    "",
+    "Correct tool and flags",
+    "Wrong model name for chemistry",
+    "Missing index step before downstream use",
+    "Used short-read tool for nanopore data",
+    "Output path does not match next step",
+]
+
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def synthetic_models(n_models: int) -> list:
+    """``n_models`` (family, version) pairs: the real models, then made-up ones."""
+    models = list(MODEL_ORDER[:n_models])
+    families = ["openai", "claude", "gemini"]
+    k = 0
+    while len(models) < n_models:
+        models.append((families[k % len(families)], f"synthetic_{k // len(families):04d}"))
+        k += 1
+    return models
+
+
+def _draw_codes(rng, p_best: np.ndarray, dim: str) -> np.ndarray:
+    """Codes for one dimension: best with ``p_best``, else middle/worst evenly."""
+    alphabet = np.array(list(SCORE_MAP[dim]))
+    u = rng.random(len(p_best))
+    if len(alphabet) == 2:
+        return alphabet[(u >= p_best).astype(np.int8)]
+    idx = np.where(u < p_best, 0, np.where(u < p_best + (1 - p_best) / 2, 1, 2))
+    return alphabet[idx]
+
+
+def synthetic_chunks(n_rows: int, seed: int = 0, n_models: int = 21,
+                     missing_rate: float = 0.02, dropped_cells: float = 0.02,
+                     chunksize: int = DEFAULT_CHUNKSIZE):
+    """Yield a synthetic matrix of ``n_rows`` rows as DataFrames of ``chunksize`` rows.
+
+    The number of replicates per (model, step) cell follows from
+    ``n_rows`` and ``n_models``; the last replicate may be cut short.
+    """
+    rng = np.random.default_rng(seed)
+    models = synthetic_models(n_models)
+    skill = rng.normal(1.0, 1.0, n_models)
+    difficulty = np.linspace(-1.0, 1.5, len(STEP_NAMES)) + rng.normal(0, 0.25, len(STEP_NAMES))
+    dim_offset = rng.normal(0, 0.3, len(DIMENSIONS))
+    dropped = rng.random((n_models, len(STEP_NAMES))) < dropped_cells
+
+    n_steps = len(STEP_NAMES)
+    replicates = max(1, math.ceil(n_rows / (n_models * n_steps)))
+    families = pd.Categorical([f for f, _ in models])
+    versions = pd.Categorical([v for _, v in models])
+    step_numbers = np.array(list(STEP_NAMES))
+    step_names = pd.Categorical(list(STEP_NAMES.values()))
+
+    for c, start in enumerate(range(0, n_rows, chunksize)):
+        chunk_rng = np.random.default_rng([seed, c])
+        row = np.arange(start, min(start + chunksize, n_rows))
+        model = row // (replicates * n_steps)
+        step = row % n_steps
+
+        logit = skill[model] - difficulty[step]
+        data = {
+            "model_family": families.take(model),
+            "model_version": versions.take(model),
+            "step_number": step_numbers[step],
+            "step_name": step_names.take(step),
+        }
+        blank_row = dropped[model, step]
+        for j, dim in enumerate(DIMENSIONS):
+            noise = chunk_rng.normal(0, 0.5, len(row))
+            p_best = 1 / (1 + np.exp(-(logit + dim_offset[j] + noise)))
+            codes = _draw_codes(chunk_rng, p_best, dim)
+            blank = blank_row | (chunk_rng.random(len(row)) < missing_rate)
+            data[dim] = pd.Categorical(np.where(blank, "", codes),
+                                       categories=list(SCORE_MAP[dim]) + [""])
+        data["notes"] = pd.Categorical.from_codes(chunk_rng.integers(0, len(NOTES), len(row)),
+                                                  categories=NOTES)
+        yield pd.DataFrame(data)
+
+
+def synthetic_scores(n_rows: int, seed: int = 0, **kwargs) -> pd.DataFrame:
+    """Synthetic scoring matrix of ``n_rows`` rows (see ``synthetic_chunks``)."""
+    chunks = list(synthetic_chunks(n_rows, seed, **kwargs))
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_synthetic_csv(path, n_rows: int, seed: int = 0, **kwargs):
+    """Write a synthetic matrix to ``path`` one chunk at a time."""
+    for i, chunk in enumerate(synthetic_chunks(n_rows, seed, **kwargs)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
@@ -0,0 +1,247 @@
+"""
+Schema validation of the scoring matrix.
+
+Codes outside ``SCORE_MAP`` are otherwise treated as missing by every
+report, so a typo such as ``c`` for ``C`` or a ``P`` in the executability
+column silently drops a score. ``validate_scores`` checks the whole table
+in one vectorized pass and lists every offending (row, column):
+
+- score columns hold only their dimension's codes (or are blank)
+- step_number is one of ``scoring.engine.STEP_NAMES`` and step_name matches it
+- each (model_family, model_version, step_number) key occurs once
+- every (model_family, model_version) is in ``scoring.engine.KNOWN_MODELS``
+
+Each text column is factorized once (categorical columns from the binary
+cache already are), the checks run on the few distinct values, and the
+verdicts are broadcast back to rows through the integer codes.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .engine import DIMENSIONS, KNOWN_MODELS, SCORE_MAP, STEP_NAMES
+from .instrument import count, timed
+
+KEY_COLUMNS = ["model_family", "model_version", "step_number", "step_name"]
+REQUIRED_COLUMNS = KEY_COLUMNS + DIMENSIONS
+
+# Spreadsheet line of the first data row (line 1 is the header)
+FIRST_LINE = 2
+
+
+@dataclass
+class ValidationReport:
+    """Every problem found, one row per offending (line, column)."""
+
+    issues: pd.DataFrame    # line, column, value, problem; sorted by line
+    n_rows: int
+
+    @property
+    def ok(self) -> bool:
+        return self.issues.empty
+
+    def counts(self) -> pd.Series:
+        """Number of issues per problem."""
+        return self.issues["problem"].value_counts(sort=False)
+
+    def format(self, max_issues: int = None) -> str:
+        if self.ok:
+            return f"Scoring matrix OK ({self.n_rows} rows)."
+        lines = [f"Scoring matrix has {len(self.issues)} problem(s) in {self.n_rows} rows:"]
+        shown = self.issues if max_issues is None else self.issues.head(max_issues)
+        for line, column, value, problem in shown.itertuples(index=False):
+            lines.append(f"  line {line}, {column} = {value!r}: {problem}")
+        if len(shown) < len(self.issues):
+            lines.append(f"  … and {len(self.issues) - len(shown)} more")
+        return "\n".join(lines)
+
+
+def _factorize(column: pd.Series):
+    """Integer codes (-1 for missing) and the distinct values of ``column``."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy().astype(np.int64)
+        return codes, np.asarray(column.cat.categories, dtype=object)
+    codes, uniques = pd.factorize(column)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+class _Issues:
+    """Accumulates (row, column, value, problem) arrays from each check."""
+
+    def __init__(self):
+        self.parts = []
+
+    def add(self, rows: np.ndarray, column: str, values, problems):
+        if len(rows):
+            self.parts.append(pd.DataFrame({
+                "row": rows,
+                "column": column,
+                "value": values,
+                "problem": problems,
+            }))
+
+    def add_coded(self, codes: np.ndarray, uniques: np.ndarray, problem_of: np.ndarray,
+                  column: str):
+        """Flag rows whose value's entry in ``problem_of`` (per unique) is set."""
+        bad = np.flatnonzero(problem_of != "")
+        if not len(bad):
+            return
+        flagged = np.zeros(len(uniques) + 1, dtype=bool)
+        flagged[bad] = True
+        rows = np.flatnonzero(flagged[codes])  # codes of -1 hit the trailing False
+        self.add(rows, column, uniques[codes[rows]], problem_of[codes[rows]])
+
+    def frame(self) -> pd.DataFrame:
+        if not self.parts:
+            return pd.DataFrame({"line": pd.Series(dtype=np.int64),
+                                 "column": pd.Series(dtype=object),
+                                 "value": pd.Series(dtype=object),
+                                 "problem": pd.Series(dtype=object)})
+        issues = pd.concat(self.parts, ignore_index=True)
+        order = np.argsort(issues["row"].to_numpy(), kind="stable")
+        issues = issues.iloc[order].reset_index(drop=True)
+        issues.insert(0, "line", issues.pop("row") + FIRST_LINE)
+        return issues
+
+
+def _check_codes(issues: _Issues, df: pd.DataFrame, allow_blank: bool):
+    for dim in DIMENSIONS:
+        codes, uniques = _factorize(df[dim])
+        allowed = SCORE_MAP[dim]
+        problem_of = np.full(len(uniques), "", dtype=object)
+        for k, value in enumerate(uniques):
+            text = str(value).strip()
+            if text in allowed or (text == "" and allow_blank):
+                continue
+            if text == "":
+                problem_of[k] = "blank score"
+            elif text.upper() in allowed:
+                problem_of[k] = f"code must be upper case ({text.upper()})"
+            else:
+                problem_of[k] = f"not a {dim} code (allowed: {', '.join(allowed)})"
+        issues.add_coded(codes, uniques, problem_of, dim)
+        if not allow_blank and (codes < 0).any():
+            rows = np.flatnonzero(codes < 0)
+            issues.add(rows, dim, "", "blank score")
+
+
+def _check_steps(issues: _Issues, df: pd.DataFrame):
+    """Return int step numbers per row (-1 where invalid)."""
+    codes, uniques = _factorize(df["step_number"])
+    number_of = np.full(len(uniques) + 1, -1, dtype=np.int64)
+    problem_of = np.full(len(uniques), "", dtype=object)
+    for k, value in enumerate(uniques):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = np.nan
+        if number in STEP_NAMES:
+            number_of[k] = int(number)
+        else:
+            problem_of[k] = (f"unknown step (expected one of "
+                             f"{min(STEP_NAMES)}–{max(STEP_NAMES)})")
+    issues.add_coded(codes, uniques, problem_of, "step_number")
+    if (codes < 0).any():
+        issues.add(np.flatnonzero(codes < 0), "step_number", "", "missing step number")
+    steps = number_of[codes]
+
+    # step_name must match the step number: compare per distinct (number, name) pair
+    name_codes, names = _factorize(df["step_name"])
+    name_slots = len(names) + 1
+    valid = steps >= 0
+    pairs, inverse = np.unique(steps[valid] * name_slots + name_codes[valid] + 1,
+                               return_inverse=True)
+    problem_of = np.full(len(pairs), "", dtype=object)
+    pair_names = np.empty(len(pairs), dtype=object)
+    for k, p in enumerate(pairs):
+        number, slot = divmod(int(p), name_slots)
+        pair_names[k] = names[slot - 1] if slot else ""
+        expected = STEP_NAMES[number]
+        if str(pair_names[k]).strip() != expected:
+            problem_of[k] = f"step {number} is named {expected!r}"
+    inverse = inverse.ravel()
+    rows = np.flatnonzero(valid)
+    bad = problem_of[inverse] != ""
+    issues.add(rows[bad], "step_name", pair_names[inverse[bad]], problem_of[inverse[bad]])
+    return steps
+
+
+def _check_models(issues: _Issues, df: pd.DataFrame, steps: np.ndarray,
+                  known_models, allow_replicates: bool):
+    family_codes, families = _factorize(df["model_family"])
+    version_codes, versions = _factorize(df["model_version"])
+    for column, codes in (("model_family", family_codes), ("model_version", version_codes)):
+        if (codes < 0).any():
+            issues.add(np.flatnonzero(codes < 0), column, "", "missing model name")
+
+    n_versions = len(versions) + 1
+    model = (family_codes + 1) * n_versions + (version_codes + 1)
+    if known_models is not None:
+        known = set(known_models)
+        model_ids, inverse = np.unique(model, return_inverse=True)
+        problem_of = np.full(len(model_ids), "", dtype=object)
+        labels = np.empty(len(model_ids), dtype=object)
+        for k, m in enumerate(model_ids):
+            f, v = divmod(int(m), n_versions)
+            family = families[f - 1] if f else ""
+            version = versions[v - 1] if v else ""
+            labels[k] = f"{family}/{version}"
+            if f and v and (family, version) not in known:
+                problem_of[k] = "unknown model (not in scoring.engine.KNOWN_MODELS)"
+        inverse = inverse.ravel()
+        bad = np.flatnonzero(problem_of[inverse] != "")
+        issues.add(bad, "model_version", labels[inverse[bad]], problem_of[inverse[bad]])
+
+    if allow_replicates:
+        return
+    step_slots = max(STEP_NAMES) + 2
+    key = model * step_slots + (steps + 1)
+    # factorize numbers keys in order of first appearance, so a key's first
+    # row is where its code exceeds every earlier one
+    inverse, _ = pd.factorize(key)
+    first = np.flatnonzero(inverse > np.maximum.accumulate(np.r_[-1, inverse[:-1]]))
+    dup = np.flatnonzero((first[inverse] != np.arange(len(key))) & (steps >= 0))
+    # One message per duplicated key, broadcast to its rows
+    duplicated = np.flatnonzero(np.bincount(inverse[dup], minlength=len(first)))
+    problem_of = np.empty(len(first), dtype=object)
+    problem_of[duplicated] = [f"duplicate (model, step) key; first seen on line {r + FIRST_LINE}"
+                              for r in first[duplicated].tolist()]
+    issues.add(dup, "step_number", df["step_number"].to_numpy()[dup], problem_of[inverse[dup]])
+
+
+def add_validation_arguments(parser):
+    parser.add_argument("--allow-replicates", action="store_true",
+                        help="Accept several rows per (model, step)")
+    parser.add_argument("--any-model", action="store_true",
+                        help="Do not check models against KNOWN_MODELS")
+
+
+def validation_options(args) -> dict:
+    """``validate_scores`` keyword arguments for ``add_validation_arguments`` flags."""
+    return {"known_models": None if args.any_model else KNOWN_MODELS,
+            "allow_replicates": args.allow_replicates}
+
+
+@timed("validate")
+def validate_scores(df: pd.DataFrame, known_models=KNOWN_MODELS, allow_blank: bool = True,
+                    allow_replicates: bool = False) -> ValidationReport:
+    """Check every row of the scoring matrix; see the module docstring.
+
+    Pass ``known_models=None`` to accept any model, ``allow_blank=False`` to
+    require every score, and ``allow_replicates=True`` for matrices that
+    hold several rows (replicate conversations) per (model, step).
+    """
+    count("rows_validated", len(df))
+    issues = _Issues()
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    for column in missing:
+        issues.add(np.array([-1]), column, "", "missing column")
+    if missing:
+        return ValidationReport(issues=issues.frame(), n_rows=len(df))
+
+    _check_codes(issues, df, allow_blank)
+    steps = _check_steps(issues, df)
+    _check_models(issues, df, steps, known_models, allow_replicates)
+    return ValidationReport(issues=issues.frame(), n_rows=len(df))
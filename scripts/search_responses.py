@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Index the transcripts in responses/ and search them by step.
+
+Streams every transcript under responses/<family>/<version>/ into a local
+SQLite full-text index, split into per-step turns keyed by (family,
+version, step) with steps numbered as in prompts/ (see scoring.corpus).
+Only files whose content changed since the last run are re-read. With a
+QUERY, lists the (family, version, step) keys whose turns match it, best
+match first, with a snippet; e.g. which versions recommended FastQC at
+step 2:
+
+    python scripts/search_responses.py FastQC --step 2
+
+Without a QUERY, only updates the index and prints which steps of which
+versions are indexed.
+
+Usage:
+    python scripts/search_responses.py [QUERY] [--step N] [--family NAME] [--version NAME]
+                                       [--limit N] [--fts] [--no-refresh] [--rebuild]
+                                       [--root DIR] [--db PATH] [--profile] [--profile-json PATH]
+                                       [--profile-stats PATH]
+
+Options:
+    --step        Only match turns of this step
+    --family      Only match this family (scoring-matrix name, e.g. openai)
+    --version     Only match this version
+    --limit       Keys to list (default: 50)
+    --fts         Pass QUERY to SQLite FTS5 unchanged (phrases, OR, NEAR,
+                  prefix*); by default every word must appear
+    --no-refresh  Search the index as it is, without re-scanning responses/
+    --rebuild     Re-read every transcript
+    --root        Transcript tree (default: responses/)
+    --db          Index location (default: .index.sqlite inside the transcript tree)
+    --profile     Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                  Also write the breakdown as JSON / cProfile stats to PATH
+"""
+
+import argparse
+import sqlite3
+import sys
+from itertools import groupby
+from pathlib import Path
+
+from scoring.corpus import coverage, ingest, prompt_steps, search
+from scoring.instrument import add_profile_arguments, profiled
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESPONSES_DIR = REPO_ROOT / "responses"
+PROMPTS_DIR = REPO_ROOT / "prompts"
+DB_NAME = ".index.sqlite"
+
+
+def format_stats(root: Path, stats) -> str:
+    lines = [f"Indexed {root}: {stats.scanned} transcript(s); {stats.added} added, "
+             f"{stats.updated} updated, {stats.unchanged} unchanged, {stats.removed} removed "
+             f"({stats.turns} turn(s) written)."]
+    for path in stats.skipped:
+        lines.append(f"  skipped {path} (not under <family>/<version>/)")
+    return "\n".join(lines)
+
+
+def format_coverage(rows: list, steps: dict) -> str:
+    if not rows:
+        return "No transcripts indexed yet."
+    lines = ["\n| Family | Version | Steps (turns) |", "|:--|:--|:--|"]
+    for (family, version), keys in groupby(rows, key=lambda row: row[:2]):
+        cells = ", ".join(f"{step} ({turns})" if step in steps else f"preamble ({turns})"
+                          for _, _, step, turns in keys)
+        lines.append(f"| {family} | {version} | {cells} |")
+    return "\n".join(lines)
+
+
+def format_hits(hits: list, steps: dict) -> str:
+    if not hits:
+        return "No matching turns."
+    lines = [f"{len(hits)} matching (family, version, step) key(s), best first:"]
+    for hit in hits:
+        step = f"step {hit.step} ({steps[hit.step]})" if hit.step in steps else "preamble"
+        lines.append(f"  {hit.family}/{hit.version} {step}: {hit.turns} turn(s), "
+                     f"{hit.path}:{hit.line}")
+        lines.append(f"      {' '.join(hit.snippet.split())}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and search the model transcripts.")
+    parser.add_argument("query", nargs="?", default=None, help="Words to search for")
+    parser.add_argument("--step", type=int, default=None, help="Only match this step")
+    parser.add_argument("--family", default=None, help="Only match this family")
+    parser.add_argument("--version", default=None, help="Only match this version")
+    parser.add_argument("--limit", type=int, default=50, help="Keys to list")
+    parser.add_argument("--fts", action="store_true", help="Pass QUERY to FTS5 unchanged")
+    refresh = parser.add_mutually_exclusive_group()
+    refresh.add_argument("--no-refresh", action="store_true",
+                         help="Do not re-scan responses/ before searching")
+    refresh.add_argument("--rebuild", action="store_true", help="Re-read every transcript")
+    parser.add_argument("--root", type=Path, default=RESPONSES_DIR, help="Transcript tree")
+    parser.add_argument("--db", type=Path, default=None, help="Index location")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.root.is_dir():
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+    db = args.db or args.root / DB_NAME
+    steps = prompt_steps(PROMPTS_DIR)
+    if not steps:
+        print(f"Error: no step_0N_<name>.md prompts in {PROMPTS_DIR}.")
+        sys.exit(1)
+
+    with profiled(args):
+        if not args.no_refresh:
+            print(format_stats(args.root, ingest(args.root, db, steps, rebuild=args.rebuild)))
+        if args.query is None:
+            print(format_coverage(coverage(db), steps))
+            return
+        try:
+            hits = search(db, args.query, step=args.step, family=args.family,
+                          version=args.version, limit=args.limit, raw=args.fts)
+        except sqlite3.OperationalError as exc:
+            print(f"Error: invalid query {args.query!r}: {exc}")
+            sys.exit(1)
+        print(format_hits(hits, steps))
+
+
+if __name__ == "__main__":
+    main()
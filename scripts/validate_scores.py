@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Validate the scoring matrix against its schema.
+
+Checks every row of results/tables/scoring_matrix.csv (see
+scoring.validate) and lists each offending line and column:
+- Codes outside a dimension's alphabet, including lower-case codes
+- step_number outside 1–7 or a step_name that does not match it
+- Duplicate (model_family, model_version, step_number) keys
+- Models missing from scoring.engine.KNOWN_MODELS
+
+build.py runs the same checks before rendering anything.
+
+Usage:
+    python scripts/validate_scores.py [CSV] [--allow-replicates] [--any-model]
+                                      [--require-scores] [--max-issues N] [--output PATH]
+                                      [--profile] [--profile-json PATH] [--profile-stats PATH]
+
+Options:
+    CSV                 Matrix to check (default: results/tables/scoring_matrix.csv)
+    --allow-replicates  Accept several rows per (model, step), e.g. replicate conversations
+    --any-model         Do not check models against KNOWN_MODELS
+    --require-scores    Treat blank score cells as errors
+    --max-issues        Issues to print (default: 50; 0 prints all)
+    --output            Also write every issue to PATH as CSV
+    --profile           Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                        Also write the breakdown as JSON / cProfile stats to PATH
+
+Exits 1 if any problem is found.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from scoring import load_scores
+from scoring.instrument import add_profile_arguments, profiled, record_output
+from scoring.validate import add_validation_arguments, validate_scores, validation_options
+
+DEFAULT_MAX_ISSUES = 50
+
+
+def main():
+    repo_root = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Validate the scoring matrix.")
+    parser.add_argument("csv", nargs="?", type=Path,
+                        default=repo_root / "results" / "tables" / "scoring_matrix.csv",
+                        help="Matrix to check")
+    add_validation_arguments(parser)
+    parser.add_argument("--require-scores", action="store_true",
+                        help="Treat blank score cells as errors")
+    parser.add_argument("--max-issues", type=int, default=DEFAULT_MAX_ISSUES,
+                        help="Issues to print (0 prints all)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Also write every issue to PATH as CSV")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.csv.exists():
+        print(f"Error: {args.csv} not found.")
+        sys.exit(1)
+
+    with profiled(args):
+        report = validate_scores(load_scores(args.csv), allow_blank=not args.require_scores,
+                                 **validation_options(args))
+        print(report.format(max_issues=args.max_issues or None))
+        if args.output:
+            report.issues.to_csv(args.output, index=False)
+            record_output(args.output)
+            print(f"\n{len(report.issues)} issue(s) written to {args.output}")
+
+    if not report.ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Watch the scoring matrix and regenerate affected outputs on every edit.
+
+Polls results/tables/scoring_matrix.csv and waits for a burst of saves
+to settle. The matrix stays in memory between updates. The new file is
+compared byte for byte with the previous one, and only the lines between
+the unchanged head and tail are parsed and spliced into the held rows.
+A file whose records span lines (quoted newlines), or a changed header,
+is reloaded whole. The changed rows determine the changed
+(model_family, model_version, step_number) groups. Only the outputs drawn
+from a changed group are regenerated:
+- scoring_heatmap.png     if a changed model is in the heatmap
+- family_radar.png        if a changed family has a radar panel
+- version_timeline.png    if a changed version is on the timeline
+- step_difficulty.png, summary_generated.md, the error compounding
+  section of summary.md and the by_model/by_step pages on any change
+  (pages whose content is unchanged are not rewritten)
+
+Saves that fail validation (see scoring.validate) are reported and skipped.
+
+Usage:
+    python scripts/watch.py [--interval SECONDS] [--debounce SECONDS]
+                            [--allow-replicates] [--any-model]
+
+Options:
+    --interval          Polling interval (default: 0.5)
+    --debounce          Quiet period after the last save before rebuilding (default: 1.0)
+    --allow-replicates  Accept several rows per (model, step), e.g. replicate conversations
+    --any-model         Do not check models against scoring.engine.KNOWN_MODELS
+
+Stop with Ctrl-C.
+"""
+
+import argparse
+import io
+import sys
+import time
+import traceback
+
+import numpy as np
+import pandas as pd
+
+import build
+import generate_radar
+from scoring import DIMENSIONS, ScoreCube, load_scores
+from scoring.cube import parse_scores
+from scoring.engine import MODEL_ORDER
+from scoring.incremental import GROUP_KEYS, group_rows
+from scoring.validate import add_validation_arguments, validate_scores, validation_options
+
+ALWAYS_AFFECTED = ["step_difficulty.png", "summary_generated.md", "summary.md", "by_model/",
+                   "by_step/"]
+
+
+def file_stamp(path):
+    """(size, mtime_ns) of ``path``, or None while it is missing."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def wait_for_change(path, last_stamp, interval: float, debounce: float):
+    """Block until ``path`` changes and then stays unchanged for ``debounce`` s."""
+    stamp = file_stamp(path)
+    while stamp == last_stamp:
+        time.sleep(interval)
+        stamp = file_stamp(path)
+    settled_at = time.monotonic()
+    while time.monotonic() - settled_at < debounce or stamp is None:
+        time.sleep(interval)
+        current = file_stamp(path)
+        if current != stamp:
+            stamp, settled_at = current, time.monotonic()
+    return stamp
+
+
+def group_hashes(cube: ScoreCube) -> dict:
+    """{(family, version, step): content hash} for every group in the cube."""
+    _, keys, _, hashes = group_rows(cube.df)
+    result = {}
+    for key, digest in zip(keys, hashes):
+        family, version, step = key.split("\x1f")
+        result[(family, version, int(step))] = digest
+    return result
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    n = min(len(a), len(b))
+    differ = np.flatnonzero(np.frombuffer(a, np.uint8, n) != np.frombuffer(b, np.uint8, n))
+    return int(differ[0]) if len(differ) else n
+
+
+def _common_suffix(a: bytes, b: bytes, limit: int) -> int:
+    n = min(len(a), len(b), limit)
+    tail_a = np.frombuffer(a, np.uint8, n, len(a) - n)[::-1]
+    tail_b = np.frombuffer(b, np.uint8, n, len(b) - n)[::-1]
+    differ = np.flatnonzero(tail_a != tail_b)
+    return int(differ[0]) if len(differ) else n
+
+
+def line_aligned(raw: bytes, df: pd.DataFrame) -> bool:
+    """True if every row of ``df`` is one line of ``raw`` after the header."""
+    return raw.endswith(b"\n") and raw.count(b"\n") == len(df) + 1
+
+
+def _align_dtypes(df: pd.DataFrame, added: pd.DataFrame):
+    """Give the parsed rows the held rows' dtypes, widening categories as needed."""
+    added = added.copy()
+    for column, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            new = pd.Index(added[column].unique()).difference(dtype.categories)
+            if len(new):
+                df = df.assign(**{column: df[column].cat.add_categories(new)})
+            added[column] = pd.Categorical(added[column], dtype=df[column].dtype)
+        else:
+            added[column] = added[column].astype(dtype)
+    return df, added
+
+
+def splice(old_raw: bytes, new_raw: bytes, df: pd.DataFrame):
+    """Apply an edit of the CSV to its rows without re-parsing unchanged lines.
+
+    ``old_raw`` must be line-aligned with ``df``. Returns ``(rows, removed,
+    added)``: the updated rows and the old and new rows of the edited span.
+    Returns None when the edit cannot be spliced (header or multi-line
+    records changed) and the file has to be reloaded.
+    """
+    if not new_raw.endswith(b"\n"):
+        new_raw += b"\n"
+    start = old_raw.rfind(b"\n", 0, _common_prefix(old_raw, new_raw)) + 1
+    if start == 0:
+        return None                            # the header changed
+    tail = _common_suffix(old_raw, new_raw, min(len(old_raw), len(new_raw)) - start)
+    old_end = len(old_raw) - tail
+    if old_end > start and old_raw[old_end - 1:old_end] != b"\n":
+        old_end = old_raw.index(b"\n", old_end) + 1
+    new_end = len(new_raw) - (len(old_raw) - old_end)
+
+    first = old_raw.count(b"\n", 0, start) - 1
+    n_removed = old_raw.count(b"\n", start, old_end)
+    n_added = new_raw.count(b"\n", start, new_end)
+    if n_added:
+        header = old_raw[:old_raw.index(b"\n") + 1]
+        try:
+            added = parse_scores(io.BytesIO(header + new_raw[start:new_end]))
+        except (ValueError, pd.errors.ParserError):
+            return None
+        if len(added) != n_added:
+            return None                        # quoted newlines or blank lines
+        df, added = _align_dtypes(df, added)
+    else:
+        added = df.iloc[:0]
+    removed = df.iloc[first:first + n_removed]
+    rows = pd.concat([df.iloc[:first], added, df.iloc[first + n_removed:]], ignore_index=True)
+    return rows, removed, added
+
+
+def edited_groups(removed: pd.DataFrame, added: pd.DataFrame) -> set:
+    """Groups whose scored columns differ between the old and new span."""
+    columns = GROUP_KEYS + ["step_name"] + DIMENSIONS
+    if len(removed) == len(added):
+        old = removed[columns].astype(str).to_numpy()
+        new = added[columns].astype(str).to_numpy()
+        same = (old == new).all(axis=1)
+        removed, added = removed[~same], added[~same]
+    return group_keys(removed) | group_keys(added)
+
+
+def group_keys(rows: pd.DataFrame) -> set:
+    """(family, version, step) of every group with a row in ``rows``."""
+    keys = rows[GROUP_KEYS].drop_duplicates()
+    return {(str(family), str(version), int(step))
+            for family, version, step in keys.itertuples(index=False)}
+
+
+def changed_groups(old: dict, new: dict) -> set:
+    """Groups that were added, removed or edited between two snapshots."""
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+def affected_artifacts(changed: set, steps_changed: bool = False) -> list:
+    """Names in ``build.ARTIFACTS`` drawn from any of the ``changed`` groups."""
+    if not changed:
+        return []
+    models = {(family, version) for family, version, _ in changed}
+    families = {family for family, _ in models}
+
+    names = set(ALWAYS_AFFECTED)
+    if steps_changed or models & set(MODEL_ORDER):
+        names.add("scoring_heatmap.png")
+    if families & set(generate_radar.FAMILY_STYLES):
+        names.add("family_radar.png")
+    if any(version in generate_radar.VERSION_ORDER.get(family, []) for family, version in models):
+        names.add("version_timeline.png")
+    return [name for name in build.ARTIFACTS if name in names]
+
+
+def regenerate(cube: ScoreCube, names) -> bool:
+    """Render ``names`` in-process; returns False if any of them failed."""
+    ok = True
+    for name in names:
+        render, output_path = build.ARTIFACTS[name]
+        start = time.perf_counter()
+        try:
+            built = render(cube, output_path)
+        except Exception:
+            traceback.print_exc()
+            ok = False
+            continue
+        status = "" if built else "  (up to date)"
+        print(f"  {name:<24} {time.perf_counter() - start:>6.2f}s{status}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate outputs when the scoring matrix changes.")
+    parser.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds")
+    parser.add_argument("--debounce", type=float, default=1.0,
+                        help="Quiet period after the last save before rebuilding")
+    add_validation_arguments(parser)
+    args = parser.parse_args()
+
+    csv_path = build.CSV_PATH
+    if not csv_path.exists():
+        print(f"Error: {csv_path} not found.")
+        sys.exit(1)
+
+    stamp = file_stamp(csv_path)
+    raw = csv_path.read_bytes()
+    cube = ScoreCube(load_scores(csv_path))
+    print(f"Watching {csv_path} ({len(group_hashes(cube))} groups). Press Ctrl-C to stop.")
+    regenerate(cube, list(build.ARTIFACTS))
+
+    try:
+        while True:
+            stamp = wait_for_change(csv_path, stamp, args.interval, args.debounce)
+            try:
+                new_raw = csv_path.read_bytes()
+                spliced = splice(raw, new_raw, cube.df) if line_aligned(raw, cube.df) else None
+                if spliced is None:
+                    new_cube = ScoreCube(load_scores(csv_path))
+                    changed = changed_groups(group_hashes(cube), group_hashes(new_cube))
+                else:
+                    rows, removed, added = spliced
+                    new_cube = ScoreCube(rows)
+                    changed = edited_groups(removed, added)
+            except Exception as exc:
+                # Typically a half-written save; the next one will retrigger
+                print(f"Could not read {csv_path.name}: {exc}")
+                continue
+
+            report = validate_scores(new_cube.df, **validation_options(args))
+            if not report.ok:
+                print(f"[{time.strftime('%H:%M:%S')}] Not regenerating; "
+                      f"{report.format(max_issues=build.MAX_ISSUES)}")
+                continue
+
+            steps_changed = list(new_cube.steps) != list(cube.steps)
+            names = affected_artifacts(changed, steps_changed)
+            cube, raw = new_cube, new_raw
+            if not names:
+                print(f"[{time.strftime('%H:%M:%S')}] No score changes.")
+                continue
+
+            print(f"[{time.strftime('%H:%M:%S')}] {len(changed)} group(s) changed; "
+                  f"regenerating {', '.join(names)}")
+            regenerate(cube, names)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Check how the reports change when the scoring dimensions are weighted.
+
+Evaluates thousands of dimension-weight vectors drawn from the weight
+simplex (see scoring.sensitivity) and reports:
+- How often each step is the hardest and how stable its rank is
+- Kendall's tau of each weighted step ranking against equal weights
+- The hardest step when a single dimension carries all the weight
+- Per family, which version first reaches --threshold on every step,
+  and how often, across the weight vectors
+
+and draws a summary figure to results/figures/weight_sensitivity.png.
+
+Usage:
+    python scripts/weight_sensitivity.py [--samples N] [--seed N] [--threshold P] [--force]
+                                         [--profile] [--profile-json PATH] [--profile-stats PATH]
+
+Options:
+    --samples     Weight vectors drawn from the simplex (default: 5000)
+    --seed        Seed for the weight vectors (default: 0)
+    --threshold   Weighted composite every step must reach (default: 0.9)
+    --force       Re-render the figure even if its data is unchanged
+    --profile     Print a per-stage timing breakdown to stderr
+    --profile-json, --profile-stats
+                  Also write the breakdown as JSON / cProfile stats to PATH
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.patches import Rectangle
+
+from scoring import DIMENSIONS, ScoreCube, load_cube, render_if_stale
+from scoring.instrument import add_profile_arguments, profiled, record_output, stage, timed
+from scoring.sensitivity import (
+    DEFAULT_SAMPLES,
+    DEFAULT_THRESHOLD,
+    Sensitivity,
+    weight_sensitivity,
+)
+
+
+def format_report(cube: ScoreCube, result: Sensitivity) -> str:
+    ranks = result.step_ranks
+    n_weights = ranks.shape[1]
+    lines = [f"\n## Step Difficulty Across {n_weights} Weight Vectors\n"]
+    lines.append(f"Same ranking as equal weights: {result.same_ranking_share:.1%} of vectors; "
+                 f"mean Kendall tau {result.kendall_tau.mean():.2f} "
+                 f"(min {result.kendall_tau.min():.2f}).\n")
+    lines.append("| Step | Equal-weight rank | Hardest in | Mean rank | Rank 5–95% |")
+    lines.append("|:-----|:------------------|:-----------|:----------|:-----------|")
+    low, high = np.percentile(ranks, [5, 95], axis=1)
+    for s in np.argsort(ranks[:, 0], kind="stable"):
+        lines.append(f"| {cube.steps[s]}. {cube.step_names[s]} | {ranks[s, 0]} "
+                     f"| {result.hardest_share[s]:.1%} | {ranks[s].mean():.2f} "
+                     f"| {low[s]:.0f}–{high[s]:.0f} |")
+
+    lines.append("\n## Hardest Step When One Dimension Carries All Weight\n")
+    for j, dim in enumerate(DIMENSIONS, 1):
+        s = int(np.argmin(ranks[:, j]))
+        lines.append(f"- **{dim}:** {cube.steps[s]}. {cube.step_names[s]} "
+                     f"({result.step_scores[s, j]:.2f})")
+
+    lines.append(f"\n## First Version Reaching {result.threshold:g} on Every Step\n")
+    for family, firsts in result.first_passing.items():
+        baseline = firsts[0]
+        name = cube.models[baseline][1] if baseline >= 0 else "none"
+        picks, counts = np.unique(firsts, return_counts=True)
+        shares = ", ".join(
+            f"{cube.models[p][1] if p >= 0 else 'none'} {c / n_weights:.1%}"
+            for p, c in sorted(zip(picks, counts), key=lambda pc: -pc[1]))
+        lines.append(f"- **{family.capitalize()}:** {name} at equal weights; across weights: "
+                     f"{shares}")
+    return "\n".join(lines)
+
+
+@timed("plot_weight_sensitivity")
+def plot_sensitivity(cube: ScoreCube, result: Sensitivity, output_path: str):
+    """Rank distribution per step and first-passing version shares per family."""
+    n_steps = len(cube.steps)
+    ranks = result.step_ranks
+    shares = np.stack([(ranks == r).mean(axis=1) for r in range(1, n_steps + 1)], axis=1)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4.5),
+                                   gridspec_kw={"width_ratios": [1, 1.2]})
+    ax1.imshow(shares, cmap="Blues", vmin=0, vmax=1, aspect="auto")
+    for s, r in zip(*np.nonzero(shares >= 0.005)):
+        ax1.text(r, s, f"{shares[s, r]:.0%}", ha="center", va="center", fontsize=7,
+                 color="white" if shares[s, r] > 0.6 else "#1e293b")
+    for s, r in enumerate(ranks[:, 0]):
+        ax1.add_patch(Rectangle((r - 1.45, s - 0.45), 0.9, 0.9, fill=False, edgecolor="#ef4444",
+                                linewidth=1.2, label="Equal weights" if s == 0 else None))
+    ax1.set_xticks(range(n_steps))
+    ax1.set_xticklabels([str(r) for r in range(1, n_steps + 1)], fontsize=8)
+    ax1.set_yticks(range(n_steps))
+    ax1.set_yticklabels([f"{s}. {name}" for s, name in zip(cube.steps, cube.step_names)],
+                        fontsize=8)
+    ax1.set_xlabel("Difficulty rank (1 = hardest)", fontsize=9)
+    ax1.set_title("Step rank across weight vectors", fontsize=10, fontweight="bold")
+    ax1.legend(loc="upper center", bbox_to_anchor=(0.5, -0.15), fontsize=7, frameon=False)
+
+    families = list(result.first_passing)
+    cmap = plt.get_cmap("tab20")
+    for i, family in enumerate(families):
+        picks, counts = np.unique(result.first_passing[family], return_counts=True)
+        left = 0.0
+        for k, (pick, n) in enumerate(zip(picks, counts)):
+            share = n / ranks.shape[1]
+            label = cube.models[pick][1] if pick >= 0 else "none"
+            ax2.barh(i, share, left=left, color="#e2e8f0" if pick < 0 else cmap(k % 20),
+                     edgecolor="white", height=0.6)
+            if share >= 0.08:
+                ax2.text(left + share / 2, i, label, ha="center", va="center", fontsize=7)
+            left += share
+    ax2.set_yticks(range(len(families)))
+    ax2.set_yticklabels([f.capitalize() for f in families], fontsize=8)
+    ax2.invert_yaxis()
+    ax2.set_xlim(0, 1)
+    ax2.set_xlabel("Share of weight vectors", fontsize=9)
+    ax2.set_title(f"First version ≥ {result.threshold:g} on every step", fontsize=10,
+                  fontweight="bold")
+    for spine in ("top", "right"):
+        ax2.spines[spine].set_visible(False)
+
+    with stage("tight_layout"):
+        plt.tight_layout()
+    with stage("savefig"):
+        fig.savefig(output_path, dpi=200, bbox_inches="tight", facecolor="white")
+    record_output(output_path)
+    print(f"Weight sensitivity chart saved to {output_path}")
+    plt.close()
+
+
+def render(cube: ScoreCube, result: Sensitivity, output_path, force: bool = False) -> bool:
+    inputs = (cube.steps, result.weights, result.step_ranks, result.threshold,
+              [(family, firsts) for family, firsts in result.first_passing.items()],
+              [version for _, version in cube.models])
+    return render_if_stale(output_path, inputs,
+                           lambda: plot_sensitivity(cube, result, str(output_path)),
+                           sources=[__file__], force=force)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dimension-weighting sensitivity analysis.")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES,
+                        help="Weight vectors drawn from the simplex")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the weight vectors")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Weighted composite every step must reach")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-render the figure even if its data is unchanged")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parent.parent
+    csv_path = repo_root / "results" / "tables" / "scoring_matrix.csv"
+    output_path = repo_root / "results" / "figures" / "weight_sensitivity.png"
+
+    if not csv_path.exists():
+        print(f"Error: {csv_path} not found.")
+        sys.exit(1)
+
+    with profiled(args):
+        cube = load_cube(csv_path)
+        if not cube.encoded.scored.any():
+            print("No scores have been entered yet. Fill in scoring_matrix.csv and re-run.")
+            sys.exit(0)
+
+        result = weight_sensitivity(cube, n_samples=args.samples, seed=args.seed,
+                                    threshold=args.threshold)
+        print(format_report(cube, result))
+        render(cube, result, output_path, force=args.force)
+
+
+if __name__ == "__main__":
+    main()